@@ -16,39 +16,50 @@ from . import iam
 from . import kv
 from .auth import AuthorizationProvider
 from .common import (
-    Consistency, Durability, FieldRange, PutOption, Replica, ReplicaStats,
-    ResourcePrincipalClaimKeys, State, SystemState, TableLimits, TableUsage,
-    TimeToLive, TimeUnit, UserInfo, Version, IndexInfo, PreparedStatement)
+    Consistency, Durability, FieldRange, LoadBalancing, Priority, PutOption,
+    Replica, ReplicaStats, ResourcePrincipalClaimKeys, State, SystemState,
+    TableLimits, TableUsage, TimeToLive, TimeUnit, UserInfo, Version,
+    IndexInfo, PreparedStatement)
+from .batch import BatchingWriter, BulkWriteResult, BulkWriter
 from .config import (
-    DefaultRetryHandler, NoSQLHandleConfig, Region, Regions, RetryHandler,
-    StatsProfile)
+    BackoffRetryHandler, DefaultRetryHandler, NoSQLHandleConfig, Region,
+    Regions, RetryHandler, StatsProfile)
 from .driver import NoSQLHandle
 from .exception import (
-    BatchOperationNumberLimitException, IllegalArgumentException,
-    IllegalStateException, IndexExistsException, IndexNotFoundException,
-    InvalidAuthorizationException, NoSQLException,
+    BatchOperationNumberLimitException, CircuitOpenException,
+    IllegalArgumentException, IllegalStateException, IndexExistsException,
+    IndexNotFoundException, InvalidAuthorizationException, NoSQLException,
     OperationNotSupportedException, OperationThrottlingException,
     ReadThrottlingException, RequestSizeLimitException, RequestTimeoutException,
     ResourceExistsException, ResourceNotFoundException, RetryableException,
     SecurityInfoNotReadyException, SystemException, TableExistsException,
     TableNotFoundException, TableNotReadyException, ThrottlingException,
     UnsupportedQueryVersionException, WriteThrottlingException)
+from .metrics import (
+    MetricsExporter, OpenTelemetryExporter, PrometheusExporter)
 from .operations import (
     AddReplicaRequest, DeleteRequest, DeleteResult, DropReplicaRequest,
     GetIndexesRequest, GetIndexesResult, GetRequest,
     GetResult, GetTableRequest, ListTablesRequest, ListTablesResult,
     MultiDeleteRequest, MultiDeleteResult, OperationResult, PrepareRequest,
     PrepareResult, PutRequest, PutResult, QueryRequest, QueryIterableResult,
-    QueryResult, ReplicaStatsRequest, ReplicaStatsResult, Request, Result,
+    QueryResult, ReplicaStatsRequest, ReplicaStatsResult, Request,
+    RequestTimings, Result,
     SystemRequest, SystemResult,
     SystemStatusRequest, TableRequest, TableResult, TableUsageRequest,
     TableUsageResult, WriteMultipleRequest, WriteMultipleResult)
+from .scan import ParallelQueryIterableResult, ProcessScanExecutor
 from .stats import (StatsControl)
 from .version import __version__
 
 __all__ = ['AddReplicaRequest',
            'AuthorizationProvider',
+           'BackoffRetryHandler',
            'BatchOperationNumberLimitException',
+           'BatchingWriter',
+           'BulkWriteResult',
+           'BulkWriter',
+           'CircuitOpenException',
            'Consistency',
            'Durability',
            'DefaultRetryHandler',
@@ -69,17 +80,24 @@ __all__ = ['AddReplicaRequest',
            'InvalidAuthorizationException',
            'ListTablesRequest',
            'ListTablesResult',
+           'LoadBalancing',
+           'MetricsExporter',
            'MultiDeleteRequest',
            'MultiDeleteResult',
            'NoSQLException',
            'NoSQLHandle',
            'NoSQLHandleConfig',
+           'OpenTelemetryExporter',
            'OperationNotSupportedException',
            'OperationResult',
            'OperationThrottlingException',
+           'ParallelQueryIterableResult',
            'PreparedStatement',
            'PrepareRequest',
            'PrepareResult',
+           'ProcessScanExecutor',
+           'Priority',
+           'PrometheusExporter',
            'PutOption',
            'PutRequest',
            'PutResult',
@@ -96,6 +114,7 @@ __all__ = ['AddReplicaRequest',
            'Request',
            'RequestSizeLimitException',
            'RequestTimeoutException',
+           'RequestTimings',
            'ResourceExistsException',
            'ResourcePrincipalClaimKeys',
            'ResourceNotFoundException',
@@ -59,6 +59,17 @@ class AuthorizationProvider(object):
         """
         return self
 
+    def after_fork(self):
+        """
+        Called by the driver in a child process created by os.fork, it
+        re-creates the locks and the background threads of the provider that do
+        not survive the fork. Cached authorization information should be kept.
+        By default it does nothing.
+
+        :versionadded:: 5.6.0
+        """
+        pass
+
     def get_logger(self):
         """
         Returns the logger of this provider if set, None if not.
@@ -0,0 +1,251 @@
+#
+# Copyright (c) 2018, 2026 Oracle and/or its affiliates. All rights reserved.
+#
+# Licensed under the Universal Permissive License v 1.0 as shown at
+#  https://oss.oracle.com/licenses/upl/
+#
+
+from random import choice, sample
+from threading import Lock
+from time import monotonic
+
+from requests import codes
+
+from .common import HttpConstants, LoadBalancing, synchronized
+from .scheduler import get_scheduler
+
+
+class Endpoint(object):
+    """
+    Internal use only.
+
+    An endpoint of the service, with its own pool of connections, and the
+    requests in flight to it.
+    """
+
+    def __init__(self, url, session):
+        self._url = url
+        self._request_uri = url.geturl() + HttpConstants.NOSQL_DATA_PATH
+        self._session = session
+        # The number of requests in flight.
+        self._outstanding = 0
+        # The number of consecutive failures.
+        self._failures = 0
+        # The time it was ejected, None while it is used.
+        self._eject_time = None
+        # The stats of the interval.
+        self._request_count = 0
+        self._failure_count = 0
+        self._eject_count = 0
+
+    def get_host(self):
+        return self._url.hostname
+
+    def get_name(self):
+        return self._url.netloc
+
+    def get_request_uri(self):
+        return self._request_uri
+
+    def get_session(self):
+        return self._session
+
+    def is_ejected(self):
+        return self._eject_time is not None
+
+
+class EndpointBalancer(object):
+    """
+    Internal use only.
+
+    Balances the requests between the endpoints of the service, following the
+    :py:class:`LoadBalancing` policy. An endpoint is ejected after
+    failure_threshold consecutive failures, the same failures as those of the
+    circuit breaker, and is used again once a health check, a HEAD request sent
+    every eject_time_ms, is answered.
+    """
+
+    # The timeout of the health checks, they run in the worker threads of the
+    # scheduler.
+    HEALTH_CHECK_TIMEOUT_MS = 2000
+
+    def __init__(self, urls, create_session, policy, failure_threshold,
+                 eject_time_ms, logutils):
+        self._create_session = create_session
+        self._endpoints = [Endpoint(url, create_session()) for url in urls]
+        self._policy = policy
+        self._failure_threshold = failure_threshold
+        self._eject_time = float(eject_time_ms) / 1000
+        self._logutils = logutils
+        self._closed = False
+        self.lock = Lock()
+
+    def after_fork(self):
+        # The connections of the parent process must not be used, or closed,
+        # by the child.
+        self.lock = Lock()
+        for endpoint in self._endpoints:
+            endpoint._session = self._create_session()
+            endpoint._outstanding = 0
+            if endpoint.is_ejected():
+                # The health checks of the parent are not scheduled in the
+                # child.
+                get_scheduler().schedule_blocking(
+                    self._eject_time, self._check_health, endpoint)
+
+    @synchronized
+    def choose(self, excluded=None):
+        """
+        Chooses the endpoint of a request.
+
+        :param excluded: an endpoint to avoid if another one can be used, the
+            endpoint of the previous attempt.
+        :type excluded: Endpoint
+        :returns: the endpoint.
+        :rtype: Endpoint
+        """
+        endpoints = [e for e in self._endpoints
+                     if not e.is_ejected() and e is not excluded]
+        if not endpoints:
+            endpoints = [e for e in self._endpoints if not e.is_ejected()]
+        if not endpoints:
+            # All the endpoints are ejected, the first one ejected is the most
+            # likely to be back.
+            return min(self._endpoints, key=lambda e: e._eject_time)
+        if len(endpoints) == 1:
+            return endpoints[0]
+        if self._policy == LoadBalancing.LEAST_OUTSTANDING:
+            fewest = min(e._outstanding for e in endpoints)
+            return choice([e for e in endpoints if e._outstanding == fewest])
+        first, second = sample(endpoints, 2)
+        return second if second._outstanding < first._outstanding else first
+
+    def close(self):
+        self._closed = True
+        for endpoint in self._endpoints:
+            endpoint.get_session().close()
+
+    def get_endpoints(self):
+        """
+        Returns the endpoints.
+
+        :returns: the endpoints.
+        :rtype: list(Endpoint)
+        """
+        return list(self._endpoints)
+
+    @synchronized
+    def can_fail_over(self, endpoint):
+        """
+        Returns whether a request that failed on an endpoint can be retried on
+        another endpoint that is not ejected.
+
+        :param endpoint: the endpoint of the failed request.
+        :type endpoint: Endpoint
+        :returns: True if there is another endpoint.
+        :rtype: bool
+        """
+        return any(not e.is_ejected() and e is not endpoint
+                   for e in self._endpoints)
+
+    @synchronized
+    def get_stats(self):
+        """
+        Returns the state of the endpoints and the stats of the interval, for
+        the stats of the handle, and resets them.
+
+        :returns: the stats.
+        :rtype: list
+        """
+        stats = list()
+        for endpoint in self._endpoints:
+            stats.append({'endpoint': endpoint.get_name(),
+                          'ejected': endpoint.is_ejected(),
+                          'outstanding': endpoint._outstanding,
+                          'requestCount': endpoint._request_count,
+                          'failureCount': endpoint._failure_count,
+                          'ejectCount': endpoint._eject_count})
+            endpoint._request_count = 0
+            endpoint._failure_count = 0
+            endpoint._eject_count = 0
+        return stats
+
+    def on_failure(self, endpoint):
+        """
+        Records a request that the endpoint did not process, ejecting the
+        endpoint after failure_threshold consecutive failures.
+
+        :param endpoint: the endpoint.
+        :type endpoint: Endpoint
+        """
+        with self.lock:
+            endpoint._failures += 1
+            endpoint._failure_count += 1
+            if (endpoint.is_ejected() or
+                    endpoint._failures < self._failure_threshold):
+                return
+            endpoint._eject_time = monotonic()
+            endpoint._eject_count += 1
+        self._logutils.log_warning(
+            'Endpoint ' + endpoint.get_name() + ' ejected after ' +
+            str(endpoint._failures) + ' consecutive failures.')
+        get_scheduler().schedule_blocking(
+            self._eject_time, self._check_health, endpoint)
+
+    @synchronized
+    def on_success(self, endpoint):
+        """
+        Records a request that the endpoint processed.
+
+        :param endpoint: the endpoint.
+        :type endpoint: Endpoint
+        """
+        endpoint._failures = 0
+
+    @synchronized
+    def release(self, endpoint):
+        """
+        Records the end of a request started by :py:meth:`start`.
+
+        :param endpoint: the endpoint of the request.
+        :type endpoint: Endpoint
+        """
+        endpoint._outstanding -= 1
+
+    @synchronized
+    def start(self, endpoint):
+        """
+        Records a request sent to the endpoint, it must be released once it
+        completes.
+
+        :param endpoint: the endpoint of the request.
+        :type endpoint: Endpoint
+        """
+        endpoint._outstanding += 1
+        endpoint._request_count += 1
+
+    def _check_health(self, endpoint):
+        # Runs in a worker thread of the scheduler, while the endpoint is
+        # ejected.
+        if self._closed or not endpoint.is_ejected():
+            return
+        try:
+            response = endpoint.get_session().request(
+                'HEAD', endpoint.get_request_uri(),
+                timeout=float(EndpointBalancer.HEALTH_CHECK_TIMEOUT_MS) / 1000)
+            healthy = response.status_code < codes.server_error
+            response.close()
+        except Exception as e:
+            self._logutils.log_debug(
+                'Health check of endpoint ' + endpoint.get_name() +
+                ' failed: ' + str(e))
+            healthy = False
+        if not healthy:
+            get_scheduler().schedule_blocking(
+                self._eject_time, self._check_health, endpoint)
+            return
+        with self.lock:
+            endpoint._failures = 0
+            endpoint._eject_time = None
+        self._logutils.log_info(
+            'Endpoint ' + endpoint.get_name() + ' is used again.')
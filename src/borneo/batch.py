@@ -0,0 +1,824 @@
+#
+# Copyright (c) 2018, 2026 Oracle and/or its affiliates. All rights reserved.
+#
+# Licensed under the Universal Permissive License v 1.0 as shown at
+#  https://oss.oracle.com/licenses/upl/
+#
+
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from decimal import Decimal
+from json import loads
+from threading import Condition, Lock, Semaphore, Thread
+from time import time
+
+from .common import CheckValue, synchronized
+from .exception import (
+    BatchOperationNumberLimitException, IllegalArgumentException,
+    IllegalStateException, RequestSizeLimitException)
+from .operations import (
+    DeleteRequest, GetTableRequest, PutRequest, WriteMultipleRequest)
+
+
+class ShardKeyResolver(object):
+    """
+    Internal use only.
+
+    Resolves, and caches, the shard key fields of tables using the schema
+    returned by :py:meth:`NoSQLHandle.get_table`. Rows of a table and its child
+    tables that have the same values for the shard key fields of the top level
+    table can be written together using a single
+    :py:meth:`NoSQLHandle.write_multiple` operation.
+
+    :param handle: the handle used to get the table schemas.
+    :type handle: NoSQLHandle
+    """
+
+    def __init__(self, handle):
+        self._handle = handle
+        # (compartment, namespace, top table name) -> list of field names
+        self._shard_keys = dict()
+        self.lock = Lock()
+
+    def get_shard_key(self, table_name, compartment=None, namespace=None):
+        """
+        Returns the lower case names of the shard key fields of the top level
+        table of the given table. If the schema does not specify a shard key
+        the full primary key is used.
+
+        :param table_name: the table name.
+        :type table_name: str
+        :param compartment: the compartment name or id, or None.
+        :type compartment: str
+        :param namespace: the namespace, or None.
+        :type namespace: str
+        :returns: the shard key field names.
+        :rtype: list(str)
+        :raises IllegalArgumentException: raises the exception if the schema of
+            the table does not define a primary key.
+        """
+        top_table = WriteMultipleRequest.get_top_table_name(table_name)
+        key = (compartment, namespace, top_table.lower())
+        fields = self._get_cached(key)
+        if fields is not None:
+            return fields
+        get_table = GetTableRequest().set_table_name(top_table)
+        if compartment is not None:
+            get_table.set_compartment(compartment)
+        if namespace is not None:
+            get_table.set_namespace(namespace)
+        schema = self._handle.get_table(get_table).get_schema()
+        fields = ShardKeyResolver.parse_shard_key(schema)
+        if fields is None:
+            raise IllegalArgumentException(
+                'Unable to find the primary key of table ' + top_table)
+        self._set_cached(key, fields)
+        return fields
+
+    def get_shard_key_value(self, request):
+        """
+        Returns a hashable value identifying the shard of the row written or
+        deleted by the given request.
+
+        :param request: the request.
+        :type request: PutRequest or DeleteRequest
+        :returns: the table and shard key values of the row.
+        :rtype: tuple
+        """
+        compartment = request.get_compartment()
+        namespace = request.get_namespace()
+        table_name = request.get_table_name()
+        fields = self.get_shard_key(table_name, compartment, namespace)
+        row = (request.get_value() if isinstance(request, PutRequest) else
+               request.get_key())
+        # Field names are case insensitive.
+        lower_row = dict((k.lower(), v) for k, v in row.items())
+        values = list()
+        for field in fields:
+            value = lower_row.get(field)
+            try:
+                hash(value)
+            except TypeError:
+                value = str(value)
+            values.append(value)
+        return (compartment, namespace,
+                WriteMultipleRequest.get_top_table_name(table_name).lower(),
+                tuple(values))
+
+    def invalidate(self, table_name=None):
+        """
+        Removes the cached shard key of the given table, or of all tables if
+        table_name is None. This should be called if a table is dropped and
+        recreated with a different primary key.
+
+        :param table_name: the table name.
+        :type table_name: str
+        """
+        with self.lock:
+            if table_name is None:
+                self._shard_keys.clear()
+                return
+            top_table = WriteMultipleRequest.get_top_table_name(
+                table_name).lower()
+            for key in list(self._shard_keys):
+                if key[2] == top_table:
+                    del self._shard_keys[key]
+
+    @staticmethod
+    def parse_shard_key(schema):
+        # Returns the shard key field names from a JSON table schema, falling
+        # back to the primary key, or None if neither is present.
+        if schema is None:
+            return None
+        schema_map = loads(schema)
+        fields = schema_map.get('shardKey')
+        if not fields:
+            fields = schema_map.get('primaryKey')
+        if not fields:
+            return None
+        return [field.lower() for field in fields]
+
+    @synchronized
+    def _get_cached(self, key):
+        return self._shard_keys.get(key)
+
+    @synchronized
+    def _set_cached(self, key, fields):
+        self._shard_keys[key] = fields
+
+
+class BatchingWriter(object):
+    """
+    An opt-in write-behind writer that coalesces individual
+    :py:class:`PutRequest` and :py:class:`DeleteRequest` operations into
+    :py:meth:`NoSQLHandle.write_multiple` operations.
+
+    Pending operations are grouped by table and shard key. A group is sent when
+    it reaches the maximum number of operations or the maximum size, or when
+    its oldest operation has been pending for linger_ms milliseconds. Each call
+    to :py:meth:`put` or :py:meth:`delete` returns a
+    :py:class:`concurrent.futures.Future` that is resolved with the
+    :py:class:`OperationResult` of that operation, or with the exception that
+    caused the batch to fail. Operations on the same shard key are sent in the
+    order they were added, and only one batch per shard key is in flight at a
+    time. The number of operations added but not completed is bounded by
+    max_pending_operations, :py:meth:`put` and :py:meth:`delete` block, after
+    sending the batches that are still lingering, until it is below the bound.
+
+    Each operation is executed with abort_if_unsuccessful set to False, so the
+    failure of a conditional put or delete does not affect the other
+    operations of the batch. If the service rejects a batch because of its
+    number of operations or its size the batch is split and retried.
+
+    A BatchingWriter is thread safe. It must be closed using :py:meth:`close`,
+    which sends all pending operations, when it is no longer needed.
+
+    :param handle: the handle used to execute the operations.
+    :type handle: NoSQLHandle
+    :param max_batch_operations: the maximum number of operations in a batch,
+        defaults to 50, the limit of the service.
+    :type max_batch_operations: int
+    :param max_batch_size: the maximum estimated size in bytes of the
+        serialized operations of a batch, defaults to 25MB.
+    :type max_batch_size: int
+    :param linger_ms: the maximum time in milliseconds an operation waits for
+        other operations to share its batch, defaults to 10.
+    :type linger_ms: int
+    :param max_in_flight: the maximum number of batches being executed
+        concurrently, defaults to 4.
+    :type max_in_flight: int
+    :param max_pending_operations: the maximum number of operations added but
+        not completed, defaults to 10000.
+    :type max_pending_operations: int
+    :param timeout_ms: the timeout of each write multiple operation, 0 to use
+        the default timeout of the handle.
+    :type timeout_ms: int
+    :param durability: the durability of each write multiple operation, or
+        None to use the default.
+    :type durability: Durability
+    :raises IllegalArgumentException: raises the exception if any of the
+        parameters is invalid.
+    :versionadded:: 5.6.0
+    """
+
+    DEFAULT_MAX_BATCH_OPERATIONS = 50
+    DEFAULT_MAX_BATCH_SIZE = 25 * 1024 * 1024
+
+    def __init__(self, handle,
+                 max_batch_operations=DEFAULT_MAX_BATCH_OPERATIONS,
+                 max_batch_size=DEFAULT_MAX_BATCH_SIZE, linger_ms=10,
+                 max_in_flight=4, max_pending_operations=10000, timeout_ms=0,
+                 durability=None):
+        if handle is None:
+            raise IllegalArgumentException('handle must be non-none.')
+        CheckValue.check_int_gt_zero(max_batch_operations,
+                                     'max_batch_operations')
+        CheckValue.check_int_gt_zero(max_batch_size, 'max_batch_size')
+        CheckValue.check_int_ge_zero(linger_ms, 'linger_ms')
+        CheckValue.check_int_gt_zero(max_in_flight, 'max_in_flight')
+        CheckValue.check_int_gt_zero(max_pending_operations,
+                                     'max_pending_operations')
+        CheckValue.check_int_ge_zero(timeout_ms, 'timeout_ms')
+        self._handle = handle
+        self._resolver = ShardKeyResolver(handle)
+        self._max_ops = max_batch_operations
+        self._max_size = max_batch_size
+        self._linger_s = linger_ms / 1000.0
+        self._max_pending = max_pending_operations
+        # the number of operations added but not completed
+        self._num_pending = 0
+        self._timeout_ms = timeout_ms
+        self._durability = durability
+        # shard key -> _Batch, in the order the batches were created
+        self._pending = OrderedDict()
+        # shard keys having a batch in flight
+        self._in_flight = set()
+        self._closed = False
+        self._cond = Condition()
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight)
+        self._linger_thread = Thread(target=self._linger_task)
+        self._linger_thread.daemon = True
+        self._linger_thread.start()
+
+    def put(self, request):
+        """
+        Adds a put operation to the writer.
+
+        :param request: the put request.
+        :type request: PutRequest
+        :returns: a future resolved with the :py:class:`OperationResult` of the
+            operation.
+        :rtype: concurrent.futures.Future
+        :raises IllegalArgumentException: raises the exception if request is
+            not an instance of :py:class:`PutRequest` or is invalid.
+        :raises IllegalStateException: raises the exception if the writer is
+            closed.
+        """
+        if not isinstance(request, PutRequest):
+            raise IllegalArgumentException(
+                'The parameter should be an instance of PutRequest.')
+        return self._add(request)
+
+    def delete(self, request):
+        """
+        Adds a delete operation to the writer.
+
+        :param request: the delete request.
+        :type request: DeleteRequest
+        :returns: a future resolved with the :py:class:`OperationResult` of the
+            operation.
+        :rtype: concurrent.futures.Future
+        :raises IllegalArgumentException: raises the exception if request is
+            not an instance of :py:class:`DeleteRequest` or is invalid.
+        :raises IllegalStateException: raises the exception if the writer is
+            closed.
+        """
+        if not isinstance(request, DeleteRequest):
+            raise IllegalArgumentException(
+                'The parameter should be an instance of DeleteRequest.')
+        return self._add(request)
+
+    def flush(self):
+        """
+        Sends all pending operations and waits for them to complete.
+        """
+        with self._cond:
+            self._dispatch(True)
+            while self._pending or self._in_flight:
+                self._cond.wait()
+                self._dispatch(True)
+
+    def close(self):
+        """
+        Sends all pending operations, waits for them to complete and releases
+        the resources of the writer. The handle is not closed.
+        """
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+        self.flush()
+        with self._cond:
+            self._cond.notify_all()
+        self._linger_thread.join()
+        self._executor.shutdown()
+
+    def get_num_pending(self):
+        """
+        Returns the number of operations that have not been sent yet.
+
+        :returns: the number of pending operations.
+        :rtype: int
+        """
+        with self._cond:
+            return sum(len(batch.ops) for batch in self._pending.values())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _add(self, request):
+        request.validate()
+        shard = self._resolver.get_shard_key_value(request)
+        size = _estimate_size(request)
+        future = Future()
+        with self._cond:
+            while not self._closed and self._num_pending >= self._max_pending:
+                # Wait for the operations in flight, without waiting for the
+                # lingering ones.
+                self._dispatch(True)
+                self._cond.wait()
+            if self._closed:
+                raise IllegalStateException('BatchingWriter is closed.')
+            self._num_pending += 1
+            batch = self._pending.get(shard)
+            if batch is None:
+                batch = BatchingWriter._Batch(shard)
+                self._pending[shard] = batch
+            else:
+                # Operations are appended to the last batch of the shard key,
+                # a batch is full if it can not be sent yet because a
+                # previous batch of the same shard key is still in flight.
+                batch = batch.get_overflow()
+                if batch.ops and batch.size + size > self._max_size:
+                    batch.full = True
+                    batch = batch.get_overflow()
+            batch.ops.append((request, future))
+            batch.size += size
+            if len(batch.ops) >= self._max_ops:
+                batch.full = True
+            self._dispatch(False)
+            self._cond.notify_all()
+        return future
+
+    def _dispatch(self, force):
+        # Sends the batches that are ready and whose shard key has no batch in
+        # flight. Must be called with self._cond held.
+        now = time()
+        for shard in list(self._pending):
+            if shard in self._in_flight:
+                continue
+            batch = self._pending[shard]
+            if (force or batch.full or
+                    now - batch.created >= self._linger_s):
+                overflow = batch.overflow
+                if overflow is None:
+                    del self._pending[shard]
+                else:
+                    self._pending[shard] = overflow
+                self._in_flight.add(shard)
+                self._executor.submit(self._send, batch)
+
+    def _linger_task(self):
+        with self._cond:
+            while not self._closed:
+                if not self._pending:
+                    self._cond.wait()
+                    continue
+                created = [batch.created for shard, batch in
+                           self._pending.items()
+                           if shard not in self._in_flight]
+                if not created:
+                    self._cond.wait()
+                    continue
+                oldest = min(created)
+                wait = oldest + self._linger_s - time()
+                if wait > 0:
+                    self._cond.wait(wait)
+                self._dispatch(False)
+
+    def _send(self, batch):
+        try:
+            ops = [(request, future) for request, future in batch.ops
+                   if future.set_running_or_notify_cancel()]
+            if ops:
+                self._write(ops)
+        finally:
+            with self._cond:
+                self._num_pending -= len(batch.ops)
+                self._in_flight.discard(batch.shard)
+                self._dispatch(False)
+                self._cond.notify_all()
+
+    def _write(self, ops):
+        outcomes = _write_batch(
+            self._handle, [request for request, future in ops],
+            self._timeout_ms, self._durability)
+        for (request, future), (result, error) in zip(ops, outcomes):
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+    class _Batch(object):
+        # The pending operations of a shard key.
+        def __init__(self, shard):
+            self.shard = shard
+            self.ops = list()
+            self.size = 0
+            self.full = False
+            self.created = time()
+            # The next batch of the same shard key, used when this batch is
+            # full but can not be sent yet.
+            self.overflow = None
+
+        def get_overflow(self):
+            batch = self
+            while batch.full:
+                if batch.overflow is None:
+                    batch.overflow = BatchingWriter._Batch(self.shard)
+                batch = batch.overflow
+            return batch
+
+
+class BulkWriteResult(object):
+    """
+    The aggregate result of a :py:meth:`BulkWriter.write` or
+    :py:meth:`NoSQLHandle.bulk_put` operation.
+
+    An operation is failed if it could not be executed, in which case the
+    exception is reported, or if it was executed but did not succeed, for
+    example a put with an if-absent option of a row that exists, in which case
+    its :py:class:`OperationResult` is reported.
+
+    :versionadded:: 5.6.0
+    """
+
+    def __init__(self):
+        self._num_operations = 0
+        self._num_succeeded = 0
+        self._num_batches = 0
+        self._read_kb = 0
+        self._read_units = 0
+        self._write_kb = 0
+        self._write_units = 0
+        # list of (request, OperationResult, exception)
+        self._failures = list()
+        self.lock = Lock()
+
+    def __str__(self):
+        return ('BulkWriteResult [operations=' + str(self._num_operations) +
+                ', succeeded=' + str(self._num_succeeded) + ', failed=' +
+                str(len(self._failures)) + ', batches=' +
+                str(self._num_batches) + ', writeUnits=' +
+                str(self._write_units) + ']')
+
+    def get_num_operations(self):
+        """
+        Returns the number of operations.
+
+        :returns: the number of operations.
+        :rtype: int
+        """
+        return self._num_operations
+
+    def get_num_succeeded(self):
+        """
+        Returns the number of operations that succeeded.
+
+        :returns: the number of operations that succeeded.
+        :rtype: int
+        """
+        return self._num_succeeded
+
+    def get_num_failed(self):
+        """
+        Returns the number of operations that failed.
+
+        :returns: the number of operations that failed.
+        :rtype: int
+        """
+        return len(self._failures)
+
+    def get_num_batches(self):
+        """
+        Returns the number of write multiple operations executed.
+
+        :returns: the number of write multiple operations.
+        :rtype: int
+        """
+        return self._num_batches
+
+    def get_failures(self):
+        """
+        Returns the failed operations. Each failure is a tuple of the request,
+        its :py:class:`OperationResult` if it was executed or None, and the
+        exception that caused the failure or None.
+
+        :returns: the failed operations.
+        :rtype: list(tuple)
+        """
+        return self._failures
+
+    def get_read_kb(self):
+        """
+        Returns the read throughput consumed by the operations, in KBytes.
+
+        :returns: the read KBytes consumed.
+        :rtype: int
+        """
+        return self._read_kb
+
+    def get_read_units(self):
+        """
+        Returns the read throughput consumed by the operations, in read units.
+
+        :returns: the read units consumed.
+        :rtype: int
+        """
+        return self._read_units
+
+    def get_write_kb(self):
+        """
+        Returns the write throughput consumed by the operations, in KBytes.
+
+        :returns: the write KBytes consumed.
+        :rtype: int
+        """
+        return self._write_kb
+
+    def get_write_units(self):
+        """
+        Returns the write throughput consumed by the operations, in write
+        units.
+
+        :returns: the write units consumed.
+        :rtype: int
+        """
+        return self._write_units
+
+    @synchronized
+    def add_batch(self, requests, outcomes, wm_results):
+        # Internal use only, adds the outcomes of a sub-batch.
+        for wm_result in wm_results:
+            self._num_batches += 1
+            self._read_kb += wm_result.get_read_kb()
+            self._read_units += wm_result.get_read_units()
+            self._write_kb += wm_result.get_write_kb()
+            self._write_units += wm_result.get_write_units()
+        for request, (result, error) in zip(requests, outcomes):
+            self._num_operations += 1
+            if error is None and result.get_success():
+                self._num_succeeded += 1
+            else:
+                self._failures.append((request, result, error))
+
+    @synchronized
+    def add_failure(self, request, error):
+        # Internal use only, adds an operation that could not be executed.
+        self._num_operations += 1
+        self._failures.append((request, None, error))
+
+
+class BulkWriter(object):
+    """
+    Writes large numbers of rows using concurrent
+    :py:meth:`NoSQLHandle.write_multiple` operations.
+
+    The operations are grouped by table and shard key, using the primary key
+    definition returned by :py:meth:`NoSQLHandle.get_table`, and split in
+    sub-batches by number of operations and estimated payload size. The
+    sub-batches are executed concurrently by max_concurrency threads. When rate
+    limiting is enabled in the :py:class:`NoSQLHandleConfig` each sub-batch
+    waits on the rate limiters of its table, so the load does not exceed the
+    table limits.
+
+    The operations are consumed from the iterable as the sub-batches are sent,
+    so the number of operations held in memory is bounded by
+    max_pending_operations. There is no ordering guarantee between the
+    sub-batches of the same shard key, so an iterable should not include more
+    than one operation on the same row.
+
+    Each operation is executed with abort_if_unsuccessful set to False, a
+    failed operation is reported in the :py:class:`BulkWriteResult` and does
+    not stop the load.
+
+    :param handle: the handle used to execute the operations.
+    :type handle: NoSQLHandle
+    :param max_batch_operations: the maximum number of operations in a
+        sub-batch, defaults to 50, the limit of the service.
+    :type max_batch_operations: int
+    :param max_batch_size: the maximum estimated size in bytes of the
+        serialized operations of a sub-batch, defaults to 25MB.
+    :type max_batch_size: int
+    :param max_concurrency: the maximum number of sub-batches executed
+        concurrently, defaults to 4.
+    :type max_concurrency: int
+    :param max_pending_operations: the maximum number of operations grouped in
+        memory before the partial sub-batches are sent, defaults to 10000.
+    :type max_pending_operations: int
+    :param timeout_ms: the timeout of each write multiple operation, 0 to use
+        the default timeout of the handle.
+    :type timeout_ms: int
+    :param durability: the durability of each write multiple operation, or
+        None to use the default.
+    :type durability: Durability
+    :raises IllegalArgumentException: raises the exception if any of the
+        parameters is invalid.
+    :versionadded:: 5.6.0
+    """
+
+    def __init__(
+            self, handle,
+            max_batch_operations=BatchingWriter.DEFAULT_MAX_BATCH_OPERATIONS,
+            max_batch_size=BatchingWriter.DEFAULT_MAX_BATCH_SIZE,
+            max_concurrency=4, max_pending_operations=10000, timeout_ms=0,
+            durability=None):
+        if handle is None:
+            raise IllegalArgumentException('handle must be non-none.')
+        CheckValue.check_int_gt_zero(max_batch_operations,
+                                     'max_batch_operations')
+        CheckValue.check_int_gt_zero(max_batch_size, 'max_batch_size')
+        CheckValue.check_int_gt_zero(max_concurrency, 'max_concurrency')
+        CheckValue.check_int_gt_zero(max_pending_operations,
+                                     'max_pending_operations')
+        CheckValue.check_int_ge_zero(timeout_ms, 'timeout_ms')
+        self._handle = handle
+        self._resolver = ShardKeyResolver(handle)
+        self._max_ops = max_batch_operations
+        self._max_size = max_batch_size
+        self._max_concurrency = max_concurrency
+        self._max_pending = max_pending_operations
+        self._timeout_ms = timeout_ms
+        self._durability = durability
+
+    def write(self, requests):
+        """
+        Executes the given operations and waits for them to complete.
+
+        :param requests: the operations to execute.
+        :type requests: iterable of :py:class:`PutRequest` or
+            :py:class:`DeleteRequest`
+        :returns: the aggregate result of the operations. An element of
+            requests that is neither a :py:class:`PutRequest` nor a
+            :py:class:`DeleteRequest` is reported as a failure, with an
+            :py:class:`IllegalArgumentException`.
+        :rtype: BulkWriteResult
+        """
+        result = BulkWriteResult()
+        # shard key -> (list of requests, estimated size)
+        pending = dict()
+        num_pending = 0
+        # Bounds the number of sub-batches submitted but not completed.
+        slots = Semaphore(self._max_concurrency * 2)
+        with ThreadPoolExecutor(max_workers=self._max_concurrency) as executor:
+            for request in requests:
+                try:
+                    if not isinstance(request, (PutRequest, DeleteRequest)):
+                        raise IllegalArgumentException(
+                            'Invalid request, requires an instance of ' +
+                            'PutRequest or DeleteRequest. Got: ' +
+                            str(request))
+                    request.validate()
+                    shard = self._resolver.get_shard_key_value(request)
+                    size = _estimate_size(request)
+                except Exception as e:
+                    result.add_failure(request, e)
+                    continue
+                batch, batch_size = pending.get(shard, (None, 0))
+                if batch is not None and batch_size + size > self._max_size:
+                    self._submit(executor, slots, batch, result)
+                    num_pending -= len(batch)
+                    batch = None
+                if batch is None:
+                    batch, batch_size = list(), 0
+                batch.append(request)
+                num_pending += 1
+                if len(batch) >= self._max_ops:
+                    self._submit(executor, slots, batch, result)
+                    num_pending -= len(batch)
+                    pending.pop(shard, None)
+                else:
+                    pending[shard] = (batch, batch_size + size)
+                if num_pending >= self._max_pending:
+                    for batch, batch_size in pending.values():
+                        self._submit(executor, slots, batch, result)
+                    pending.clear()
+                    num_pending = 0
+            for batch, batch_size in pending.values():
+                self._submit(executor, slots, batch, result)
+        return result
+
+    def put(self, table_name, rows, compartment=None):
+        """
+        Puts the given rows into a table and waits for the operations to
+        complete.
+
+        :param table_name: the table name.
+        :type table_name: str
+        :param rows: the rows to put.
+        :type rows: iterable of dict
+        :param compartment: the compartment name or id, cloud service only.
+        :type compartment: str
+        :returns: the aggregate result of the operations.
+        :rtype: BulkWriteResult
+        :raises IllegalArgumentException: raises the exception if table_name is
+            not a string.
+        """
+        CheckValue.check_str(table_name, 'table_name')
+        CheckValue.check_str(compartment, 'compartment', True)
+
+        def put_requests():
+            for row in rows:
+                request = PutRequest().set_table_name(table_name).set_value(
+                    row)
+                if compartment is not None:
+                    request.set_compartment(compartment)
+                yield request
+
+        return self.write(put_requests())
+
+    def _submit(self, executor, slots, batch, result):
+        slots.acquire()
+        future = executor.submit(self._write, batch, result)
+        future.add_done_callback(lambda f: slots.release())
+
+    def _write(self, requests, result):
+        wm_results = list()
+        outcomes = _write_batch(self._handle, requests, self._timeout_ms,
+                                self._durability, wm_results)
+        result.add_batch(requests, outcomes, wm_results)
+
+
+def _estimate_size(request):
+    # Returns an estimate of the size of the serialized operation of a put or
+    # delete request, without serializing it, the operation being serialized
+    # once in its write multiple request.
+    row = (request.get_value() if isinstance(request, PutRequest) else
+           request.get_key())
+    return (_OPERATION_SIZE + len(request.get_table_name()) +
+            _estimate_value_size(row))
+
+
+def _estimate_value_size(value):
+    # Returns the size of a value serialized in NSON, exact for the strings and
+    # binary values and an upper bound for the other atomic values.
+    if isinstance(value, str):
+        return len(value.encode('utf-8')) + 5
+    if isinstance(value, (bytes, bytearray)):
+        return len(value) + 5
+    if isinstance(value, dict):
+        return 9 + sum(len(key) + 5 + _estimate_value_size(field)
+                       for key, field in value.items())
+    if isinstance(value, (list, tuple)):
+        return 9 + sum(_estimate_value_size(element) for element in value)
+    if isinstance(value, datetime):
+        # an ISO 8601 string
+        return 40
+    if isinstance(value, Decimal):
+        return len(str(value)) + 5
+    return 9
+
+
+# The estimated size of the fields of a serialized operation other than its
+# table name and row or key.
+_OPERATION_SIZE = 64
+
+
+def _write_batch(handle, requests, timeout_ms, durability, wm_results=None):
+    # Executes the requests as a single write multiple operation, splitting
+    # them if the service rejects the batch because of its size or number of
+    # operations. Returns a list of (OperationResult, exception) pairs in the
+    # order of the requests, one of which is None. The results of the write
+    # multiple operations are appended to wm_results if it is not None.
+    try:
+        wm_request = WriteMultipleRequest()
+        for request in requests:
+            wm_request.add(request, False)
+        compartment = requests[0].get_compartment()
+        if compartment is not None:
+            wm_request.set_compartment(compartment)
+        namespace = requests[0].get_namespace()
+        if namespace is not None:
+            wm_request.set_namespace(namespace)
+        if timeout_ms > 0:
+            wm_request.set_timeout(timeout_ms)
+        if durability is not None:
+            wm_request.set_durability(durability)
+        result = handle.write_multiple(wm_request)
+    except (BatchOperationNumberLimitException,
+            RequestSizeLimitException) as e:
+        if len(requests) == 1:
+            return [(None, e)]
+        half = len(requests) // 2
+        return (_write_batch(handle, requests[:half], timeout_ms, durability,
+                             wm_results) +
+                _write_batch(handle, requests[half:], timeout_ms, durability,
+                             wm_results))
+    except Exception as e:
+        return [(None, e)] * len(requests)
+    if wm_results is not None:
+        wm_results.append(result)
+    results = result.get_results()
+    outcomes = list()
+    for index in range(len(requests)):
+        if index < len(results):
+            outcomes.append((results[index], None))
+        else:
+            outcomes.append((None, IllegalStateException(
+                'Missing result of operation ' + str(index) +
+                ' of the write multiple operation.')))
+    return outcomes
@@ -0,0 +1,211 @@
+#
+# Copyright (c) 2018, 2026 Oracle and/or its affiliates. All rights reserved.
+#
+# Licensed under the Universal Permissive License v 1.0 as shown at
+#  https://oss.oracle.com/licenses/upl/
+#
+
+from threading import Lock
+from time import monotonic
+
+from .common import synchronized
+from .exception import CircuitOpenException
+
+
+class CircuitBreaker(object):
+    """
+    Internal use only.
+
+    A circuit breaker of the requests sent to an endpoint, or to a table of an
+    endpoint, with three states:
+
+      * closed: the requests are sent. The consecutive failures are counted,
+        the circuit opens when they reach the threshold.
+      * open: the requests fail immediately with a
+        :py:class:`CircuitOpenException`, without being sent, until the open
+        time has passed.
+      * half-open: once the open time has passed, a single request is sent as
+        a probe. The circuit closes if it succeeds and opens again if it fails.
+        The other requests keep failing immediately, and if the probe does not
+        complete another one is sent after the open time.
+
+    A failure is a response with a 5xx status code, a connection error or a
+    network timeout: the endpoint did not process the request. Any other
+    response, including an error returned by the service, shows the endpoint
+    is up and counts as a success.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'halfOpen'
+
+    def __init__(self, name, failure_threshold, open_time_ms):
+        self._name = name
+        self._failure_threshold = failure_threshold
+        self._open_time = float(open_time_ms) / 1000
+        self._state = CircuitBreaker.CLOSED
+        self._failures = 0
+        # The time the next probe can be sent when the circuit is not closed.
+        self._probe_time = 0.0
+        self.lock = Lock()
+        # The stats of the interval.
+        self._open_count = 0
+        self._rejected_count = 0
+        self._probe_count = 0
+
+    def after_fork(self):
+        self.lock = Lock()
+
+    @synchronized
+    def check(self):
+        """
+        Checks the circuit lets a request go, it is the probe if the open time
+        of the circuit has passed.
+
+        :raises CircuitOpenException: raises the exception if the circuit is
+            open.
+        """
+        if self._state == CircuitBreaker.CLOSED:
+            return
+        now = monotonic()
+        if now < self._probe_time:
+            self._rejected_count += 1
+            raise CircuitOpenException(
+                'The circuit of ' + self._name + ' is open after ' +
+                str(self._failures) + ' failures, the next request is sent ' +
+                'in ' + str(int((self._probe_time - now) * 1000)) + 'ms.')
+        self._state = CircuitBreaker.HALF_OPEN
+        self._probe_time = now + self._open_time
+        self._probe_count += 1
+
+    def get_state(self):
+        """
+        Returns the state of the circuit.
+
+        :returns: :py:attr:`CLOSED`, :py:attr:`OPEN` or :py:attr:`HALF_OPEN`.
+        :rtype: str
+        """
+        return self._state
+
+    def is_open(self):
+        """
+        Returns whether the circuit rejects the requests: it is not closed and
+        the next probe can not be sent yet.
+
+        :returns: True if a request would fail immediately.
+        :rtype: bool
+        """
+        return (self._state != CircuitBreaker.CLOSED and
+                monotonic() < self._probe_time)
+
+    @synchronized
+    def get_stats(self):
+        """
+        Returns the state of the circuit and the stats of the interval, and
+        resets them.
+
+        :returns: the stats.
+        :rtype: dict
+        """
+        stats = {'state': self._state,
+                 'failures': self._failures,
+                 'openCount': self._open_count,
+                 'rejectedCount': self._rejected_count,
+                 'probeCount': self._probe_count}
+        self._open_count = 0
+        self._rejected_count = 0
+        self._probe_count = 0
+        return stats
+
+    @synchronized
+    def on_failure(self):
+        """
+        Records a request that the endpoint did not process.
+        """
+        self._failures += 1
+        if (self._state != CircuitBreaker.CLOSED or
+                self._failures >= self._failure_threshold):
+            if self._state != CircuitBreaker.OPEN:
+                self._open_count += 1
+            self._state = CircuitBreaker.OPEN
+            self._probe_time = monotonic() + self._open_time
+
+    @synchronized
+    def on_success(self):
+        """
+        Records a request that the endpoint processed.
+        """
+        self._failures = 0
+        self._state = CircuitBreaker.CLOSED
+
+
+class CircuitBreakerMap(object):
+    """
+    Internal use only.
+
+    The circuit breakers of the endpoints: a single one per endpoint for all
+    the requests, or one per table of each endpoint if per_table is True, in
+    which case the requests without a table use the circuit of the endpoint.
+    The endpoint of the requests is the one given to the constructor unless
+    the requests are balanced between several endpoints.
+    """
+
+    def __init__(self, endpoint, failure_threshold, open_time_ms, per_table):
+        self._endpoint = endpoint
+        self._failure_threshold = failure_threshold
+        self._open_time_ms = open_time_ms
+        self._per_table = per_table
+        self._breaker_map = dict()
+        self.lock = Lock()
+
+    def after_fork(self):
+        self.lock = Lock()
+        for breaker in self._breaker_map.values():
+            breaker.after_fork()
+
+    @synchronized
+    def get_breaker(self, table_name, endpoint=None):
+        """
+        Returns the circuit breaker of the requests to a table, creating it if
+        needed.
+
+        :param table_name: name or OCID of the table, or None.
+        :type table_name: str
+        :param endpoint: the host and port of the endpoint of the requests, or
+            None for the endpoint of the map.
+        :type endpoint: str
+        :returns: the circuit breaker.
+        :rtype: CircuitBreaker
+        """
+        if endpoint is None:
+            endpoint = self._endpoint
+        key = (endpoint, None if table_name is None or not self._per_table
+               else table_name.lower())
+        breaker = self._breaker_map.get(key)
+        if breaker is None:
+            name = (endpoint if key[1] is None else
+                    endpoint + ' table ' + key[1])
+            breaker = CircuitBreaker(
+                name, self._failure_threshold, self._open_time_ms)
+            self._breaker_map[key] = breaker
+        return breaker
+
+    def get_stats(self):
+        """
+        Returns the stats of the circuit breakers, for the stats of the handle,
+        and resets them.
+
+        :returns: the stats.
+        :rtype: list
+        """
+        with self.lock:
+            breakers = sorted(self._breaker_map.items(),
+                              key=lambda item: (item[0][0], item[0][1] or ''))
+        stats = list()
+        for (endpoint, table_name), breaker in breakers:
+            entry = {'endpoint': endpoint}
+            if table_name is not None:
+                entry['table'] = table_name
+            entry.update(breaker.get_stats())
+            stats.append(entry)
+        return stats
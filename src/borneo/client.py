@@ -4,36 +4,64 @@
 # Licensed under the Universal Permissive License v 1.0 as shown at
 #  https://oss.oracle.com/licenses/upl/
 #
+import os
 import urllib.parse
 from concurrent.futures import ThreadPoolExecutor
 from logging import DEBUG
 from platform import python_version
 from sys import version_info
 from threading import Lock
-from time import time
+from time import perf_counter, time
+from weakref import WeakSet
 
 from requests import Session
 
+from .balancer import EndpointBalancer
 from .common import (
-    ByteOutputStream, CheckValue, HttpConstants, LogUtils, SSLAdapter,
-    TableLimits, synchronized)
-from .config import DefaultRetryHandler
+    ByteOutputStream, CheckValue, HttpConstants, LogUtils, Priority,
+    SSLAdapter, TableLimits, synchronized)
+from .circuit import CircuitBreakerMap
+from .concurrency import ConcurrencyLimiterMap
+from .config import BackoffRetryHandler, DefaultRetryHandler
+from .estimator import UnitCostEstimator
 from .exception import (IllegalArgumentException,
                         OperationNotSupportedException, RequestSizeLimitException)
+from .hedging import Hedger
 from .http import RateLimiterMap, RequestUtils
+from .iam import SignatureProvider
 from .kv import StoreAccessTokenProvider
 from .nson_protocol import LAST_WRITE_METADATA
 from .operations import (
-    GetTableRequest, QueryRequest, QueryResult, TableRequest, WriteRequest)
+    GetTableRequest, QueryRequest, QueryResult, RequestTimings, TableRequest,
+    WriteRequest)
 from .query import QueryDriver
+from .scheduler import get_scheduler
 from .serdeutil import SerdeUtil
 from .stats import StatsControl
+from .tracing import Tracer
 from .version import __version__
 
 
+# The clients that are alive in this process, they are re-initialized in a
+# child process created by os.fork.
+_clients = WeakSet()
+
+
+def _after_fork_in_child():
+    for client in list(_clients):
+        client.after_fork()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
 class Client(object):
     DEFAULT_MAX_CONTENT_LENGTH = 32 * 1024 * 1024
     LIMITER_REFRESH_NANOS = 600000000000
+    # The maximum number of threads that fetch the limits of the tables when
+    # the client is created.
+    LIMITER_STARTUP_THREADS = 8
     TRACE_LEVEL = 0
 
     # proxy enabled features flag bits, works on this._features
@@ -68,38 +96,25 @@ class Client(object):
         if self._auth_provider is None:
             raise IllegalArgumentException(
                 'Must configure AuthorizationProvider.')
-        self._sess = Session()
         self._session_cookie = None
 
-        ssl_ctx = None
+        self._ssl_ctx = None
         url_scheme = self._url.scheme
         if url_scheme == 'https':
-            ssl_ctx = config.get_ssl_context()
-            if ssl_ctx is None:
+            self._ssl_ctx = config.get_ssl_context()
+            if self._ssl_ctx is None:
                 raise IllegalArgumentException(
                     'Unable to configure https: SSLContext is missing from ' +
                     'config.')
-
-        # Session uses a urllib3 PoolManager for pooling connections. This is
-        # configured using requests.adapter.HTPPAdapter (see SSLAdapter in
-        # common.py)
-        #
-        # pool_connections: applies to the number of
-        #   pools to keep, where a pool applies to a single host.
-        # pool_maxsize: how many connections to reuse. More than this can
-        #   be created but will be dropped once used
-        # pool_block: if True once pool_maxsize connections are created new
-        #   calls will be blocked until a connection is released, defaults to
-        #   False in urllib3
-        # max_retries: internal retries in urllib3 because of network/system
-        #   issues, defaults to 0 in urllib3
-        #
-        adapter = SSLAdapter(
-            ssl_ctx, pool_connections=self._pool_connections,
-            pool_maxsize=self._pool_maxsize, max_retries=5, pool_block=True)
-        self._sess.mount(self._url.scheme + '://', adapter)
-        if self._proxy_host is not None:
-            self._check_and_set_proxy(self._sess)
+        self._sess = self._create_session()
+        endpoints = config.get_endpoints()
+        if len(endpoints) > 1:
+            self._balancer = EndpointBalancer(
+                endpoints, self._create_session, config.get_load_balancing(),
+                config.get_endpoint_failure_threshold(),
+                config.get_endpoint_eject_time(), self._logutils)
+        else:
+            self._balancer = None
         self.query_version = QueryDriver.QUERY_VERSION
         self._topology_info = None
         self.serial_version = config.get_serial_version()
@@ -108,35 +123,86 @@ class Client(object):
         if config.get_rate_limiting_enabled() and self._is_cloud:
             self._logutils.log_debug(
                 'Starting client with rate limiting enabled')
-            self._rate_limiter_map = RateLimiterMap()
+            self._rate_limiter_map = self._create_rate_limiter_map()
             self._table_limit_update_map = dict()
-            self._threadpool = ThreadPoolExecutor(max_workers=1)
+            self._limiter_refresh_tasks = dict()
+            self._unit_estimator = self._create_unit_estimator()
         else:
             self._logutils.log_debug('Starting client with no rate limiting')
             self._rate_limiter_map = None
             self._table_limit_update_map = None
-            self._threadpool = None
+            self._limiter_refresh_tasks = None
+            self._unit_estimator = None
         self.lock = Lock()
         self._ratelimiter_duration_seconds = 30
         self._one_time_messages = {}
         self._stats_control = StatsControl(config,
                                            logger,
                                            config.get_rate_limiting_enabled())
+        if isinstance(self._auth_provider, SignatureProvider):
+            self._stats_control.add_stats_source(
+                'signing', self._auth_provider.get_signing_stats)
+        self._stats_control.add_stats_source(
+            'scheduler', get_scheduler().get_stats)
+        if self._rate_limiter_map is not None:
+            self._stats_control.add_stats_source(
+                'rateLimiters', self._get_rate_limiter_stats)
+        if self._unit_estimator is not None:
+            self._stats_control.add_stats_source(
+                'unitEstimator', self._unit_estimator.get_stats)
+        if isinstance(self._retry_handler, BackoffRetryHandler):
+            self._stats_control.add_stats_source(
+                'retryBudget', self._retry_handler.get_stats)
+        concurrency_limit = config.get_adaptive_concurrency_limit()
+        if concurrency_limit > 0:
+            self._concurrency_limiters = ConcurrencyLimiterMap(
+                concurrency_limit)
+            self._stats_control.add_stats_source(
+                'concurrency', self._concurrency_limiters.get_stats)
+        else:
+            self._concurrency_limiters = None
+        failure_threshold = config.get_circuit_breaker_threshold()
+        if failure_threshold > 0:
+            self._circuit_breakers = CircuitBreakerMap(
+                self._url.netloc, failure_threshold,
+                config.get_circuit_breaker_open_time(),
+                config.get_circuit_breaker_per_table())
+            self._stats_control.add_stats_source(
+                'circuitBreakers', self._circuit_breakers.get_stats)
+        else:
+            self._circuit_breakers = None
+        if self._balancer is not None:
+            self._stats_control.add_stats_source(
+                'endpoints', self._balancer.get_stats)
+        hedging_delay = config.get_hedging_delay()
+        if hedging_delay > 0:
+            self._hedger = Hedger(
+                self._execute, hedging_delay,
+                config.get_hedging_budget_percent(),
+                config.get_hedging_adaptive())
+            self._stats_control.add_stats_source(
+                'hedging', self._hedger.get_stats)
+        else:
+            self._hedger = None
+        tracer_provider = config.get_tracer_provider()
+        self._tracer = (None if tracer_provider is None else
+                        Tracer(tracer_provider))
         # Keeps a set of bits each one corresponding to an enabled feature
         # signaled by the httpproxy. See FEATURE_FLAG_LAST_WRITE_METADATA.
         self._features = 0
+        _clients.add(self)
+        if self._rate_limiter_map is not None:
+            self._start_rate_limiters(config.get_rate_limiting_tables())
 
     @synchronized
     def background_update_limiters(self, table_name):
-        # Query table limits and create rate limiters for a table in a
-        # short-lived background thread.
-        if not self._table_needs_refresh(table_name):
+        # Query table limits and create rate limiters for a table in a worker
+        # thread of the scheduler.
+        if self._shut_down or not self._table_needs_refresh(table_name):
             return
         self._set_table_needs_refresh(table_name, False)
-        try:
-            self._threadpool.submit(self._update_table_limiters, ['table_name'])
-        except RuntimeError:
-            self._set_table_needs_refresh(table_name, True)
+        get_scheduler().schedule_blocking(
+            0, self._update_table_limiters, table_name)
 
     def enable_rate_limiting(self, enable, use_percent):
         """
@@ -148,17 +214,18 @@ class Client(object):
         """
         self._config.set_default_rate_limiting_percentage(use_percent)
         if enable and self._rate_limiter_map is None:
-            self._rate_limiter_map = RateLimiterMap()
+            self._rate_limiter_map = self._create_rate_limiter_map()
             self._table_limit_update_map = dict()
-            self._threadpool = ThreadPoolExecutor(max_workers=1)
+            self._limiter_refresh_tasks = dict()
+            self._unit_estimator = self._create_unit_estimator()
         elif not enable and self._rate_limiter_map is not None:
             self._rate_limiter_map.clear()
             self._rate_limiter_map = None
             self._table_limit_update_map.clear()
             self._table_limit_update_map = None
-            if self._threadpool is not None:
-                self._threadpool.shutdown()
-                self._threadpool = None
+            self._cancel_limiter_refresh(None)
+            self._limiter_refresh_tasks = None
+            self._unit_estimator = None
 
     def execute(self, request):
         """
@@ -184,6 +251,14 @@ class Client(object):
             None.
         """
         CheckValue.check_not_none(request, 'request')
+        execute = (self._execute if self._hedger is None else
+                   self._hedger.execute)
+        if self._tracer is None:
+            return execute(request)
+        with self._tracer.request_span(request):
+            return execute(request)
+
+    def _execute(self, request):
         request.set_defaults(self._config)
         request.validate()
 
@@ -255,7 +330,17 @@ class Client(object):
         if namespace is not None:
             headers[HttpConstants.REQUEST_NAMESPACE_HEADER] = namespace
 
-        content = self.serialize_request(request, headers)
+        # The time spent in each phase of the request is only collected with
+        # the stats.
+        if self._stats_control.is_started():
+            timings = RequestTimings()
+            start = perf_counter()
+            content = self.serialize_request(request, headers)
+            timings.add_serialization_ms((perf_counter() - start) * 1000)
+        else:
+            timings = None
+            content = self.serialize_request(request, headers)
+        request.set_request_timings(timings)
         content_len = len(content)
         # If on-premise the auth_provider will always be a
         # StoreAccessTokenProvider. If so, check against configurable limit.
@@ -326,6 +411,12 @@ class Client(object):
                 raise OperationNotSupportedException(
                     'The requested feature is not supported ' +
                     'by the connected server: on demand capacity table')
+        # parallel scan is only available with the NSON protocol
+        if (self.serial_version < 4 and isinstance(request, QueryRequest) and
+                request.get_number_of_operations() > 0):
+            raise OperationNotSupportedException(
+                'The requested feature is not supported ' +
+                'by the connected server: parallel scan')
 
     @synchronized
     def _next_request_id(self):
@@ -367,20 +458,54 @@ class Client(object):
         # Allow tests to override this hardcoded setting
         self._ratelimiter_duration_seconds = duration_seconds
 
+    def after_fork(self):
+        """
+        Re-creates the resources that do not survive a fork in a child
+        process: the connection pools, the stats timer, the locks and the
+        resources of the retry handler and the authorization provider.
+        Cached state such as the authorization, the rate limiter state, the
+        topology and the session cookie is kept.
+        """
+        if self._shut_down:
+            return
+        self._logutils.log_debug(
+            'Re-initializing driver http client after fork')
+        self.lock = Lock()
+        # The connections of the parent process must not be used, or closed,
+        # by the child, the old session is dropped without closing it.
+        self._sess = self._create_session()
+        if self._rate_limiter_map is not None:
+            self._rate_limiter_map.after_fork()
+        if self._unit_estimator is not None:
+            self._unit_estimator.after_fork()
+        if self._concurrency_limiters is not None:
+            self._concurrency_limiters.after_fork()
+        if self._circuit_breakers is not None:
+            self._circuit_breakers.after_fork()
+        if self._hedger is not None:
+            self._hedger.after_fork()
+        if self._balancer is not None:
+            self._balancer.after_fork()
+        self._stats_control.after_fork()
+        self._retry_handler.after_fork()
+        self._auth_provider.after_fork()
+
     def shut_down(self):
         # Shutdown the client.
         self._logutils.log_debug('Shutting down driver http client')
         if self._shut_down:
             return
         self._shut_down = True
+        _clients.discard(self)
         if self._auth_provider is not None:
             self._auth_provider.close()
         if self._sess is not None:
             self._sess.close()
-        if self._threadpool is not None:
-            self._threadpool.shutdown()
+        if self._balancer is not None:
+            self._balancer.close()
         if self._stats_control is not None:
             self._stats_control.shutdown()
+        self._cancel_limiter_refresh(None)
 
     def update_rate_limiters(self, table_name, limits):
         """
@@ -399,6 +524,7 @@ class Client(object):
         if (limits is None or limits.get_read_units() <= 0 and
                 limits.get_write_units() <= 0):
             self._rate_limiter_map.remove(table_name)
+            self._cancel_limiter_refresh(table_name)
             self._logutils.log_info(
                 'Removing rate limiting from table: ' + table_name)
             return False
@@ -421,6 +547,7 @@ class Client(object):
         self._rate_limiter_map.update(
             table_name, float(read_units), float(write_units),
             self._ratelimiter_duration_seconds)
+        self._schedule_limiter_refresh(table_name)
         msg = str.format('Updated table "{0}" to have RUs={1} and WUs={2} ' +
                          'per second.', table_name, str(read_units),
                          str(write_units))
@@ -505,13 +632,64 @@ class Client(object):
             return False
         return True
 
+    @synchronized
+    def _cancel_limiter_refresh(self, table_name):
+        # Cancels the refresh of the limits of a table, or of all the tables if
+        # table_name is None.
+        if self._limiter_refresh_tasks is None:
+            return
+        if table_name is None:
+            tasks = list(self._limiter_refresh_tasks.values())
+            self._limiter_refresh_tasks.clear()
+        else:
+            task = self._limiter_refresh_tasks.pop(table_name.lower(), None)
+            tasks = [] if task is None else [task]
+        for task in tasks:
+            task.cancel()
+
+    @synchronized
+    def _schedule_limiter_refresh(self, table_name):
+        # Schedules the refresh of the limits of a table in a worker thread of
+        # the scheduler, replacing the one already scheduled, so the limits of
+        # the tables with rate limiters are refreshed every
+        # LIMITER_REFRESH_NANOS.
+        if self._shut_down or self._limiter_refresh_tasks is None:
+            return
+        key = table_name.lower()
+        task = self._limiter_refresh_tasks.get(key)
+        if task is not None:
+            task.cancel()
+        self._limiter_refresh_tasks[key] = get_scheduler().schedule_blocking(
+            float(Client.LIMITER_REFRESH_NANOS) / 1000000000,
+            self._update_table_limiters, table_name)
+
+    def _start_rate_limiters(self, table_names):
+        # Fetches the limits of the declared tables in parallel, so that their
+        # rate limiters exist before the first requests. A table whose limits
+        # are not fetched is retried by its first request.
+        if not table_names:
+            return
+        for table_name in table_names:
+            # The requests sent meanwhile do not fetch them again.
+            self._set_table_needs_refresh(table_name, False)
+        start = perf_counter()
+        with ThreadPoolExecutor(
+                min(len(table_names), Client.LIMITER_STARTUP_THREADS),
+                'borneo-limits') as executor:
+            list(executor.map(self._update_table_limiters, table_names))
+        self._logutils.log_info(
+            'Fetched the limits of ' + str(len(table_names)) + ' tables in ' +
+            str(int((perf_counter() - start) * 1000)) + 'ms')
+
     @staticmethod
     def _trace(msg, level):
         if level <= Client.TRACE_LEVEL:
             print('DRIVER: ' + msg)
 
     def _update_table_limiters(self, table_name):
-        # This is meant to be run in a background thread.
+        # This is meant to be run in a worker thread of the scheduler.
+        if self._shut_down:
+            return
         req = GetTableRequest().set_table_name(table_name).set_timeout(1000)
         res = None
         try:
@@ -526,6 +704,13 @@ class Client(object):
             # table doesn't exist? other error?
             self._logutils.log_error(
                 'GetTableRequest for table "' + table_name + '" returned None')
+            rate_limiter_map = self._rate_limiter_map
+            if rate_limiter_map is None:
+                return
+            if rate_limiter_map.limiters_exist(table_name):
+                # The limiters are kept, their limits are refreshed later.
+                self._schedule_limiter_refresh(table_name)
+                return
             then = self._table_limit_update_map.get(table_name)
             if then is not None:
                 # Allow retry after 100ms.
@@ -614,9 +799,73 @@ class Client(object):
         headers.update({'Content-Length': str(len(content))})
         return content
 
+    def _create_rate_limiter_map(self):
+        weights = {priority: self._config.get_priority_weight(priority)
+                   for priority in (Priority.INTERACTIVE, Priority.BATCH)}
+        return RateLimiterMap(self._config.get_rate_limiter_directory(),
+                              weights)
+
+    def _create_unit_estimator(self):
+        return (UnitCostEstimator() if
+                self._config.get_rate_limiting_precharge() else None)
+
+    def _create_session(self):
+        sess = Session()
+        # Session uses a urllib3 PoolManager for pooling connections. This is
+        # configured using requests.adapter.HTPPAdapter (see SSLAdapter in
+        # common.py)
+        #
+        # pool_connections: applies to the number of
+        #   pools to keep, where a pool applies to a single host.
+        # pool_maxsize: how many connections to reuse. More than this can
+        #   be created but will be dropped once used
+        # pool_block: if True once pool_maxsize connections are created new
+        #   calls will be blocked until a connection is released, defaults to
+        #   False in urllib3
+        # max_retries: internal retries in urllib3 because of network/system
+        #   issues, defaults to 0 in urllib3
+        #
+        adapter = SSLAdapter(
+            self._ssl_ctx, pool_connections=self._pool_connections,
+            pool_maxsize=self._pool_maxsize, max_retries=5, pool_block=True)
+        sess.mount(self._url.scheme + '://', adapter)
+        if self._proxy_host is not None:
+            self._check_and_set_proxy(sess)
+        return sess
+
+    def _get_rate_limiter_stats(self):
+        # Returns the stats of the priority classes of the rate limiters.
+        rate_limiter_map = self._rate_limiter_map
+        return [] if rate_limiter_map is None else rate_limiter_map.get_stats()
+
     def get_stats_control(self):
         return self._stats_control
 
+    def get_tracer(self):
+        # Returns the tracer of the requests, None if tracing is disabled.
+        return self._tracer
+
+    def get_balancer(self):
+        # Returns the balancer of the endpoints, None if there is a single
+        # endpoint.
+        return self._balancer
+
+    def get_unit_estimator(self):
+        # Returns the estimator of the units of the requests, None if the
+        # units are not consumed from the rate limiters before the requests
+        # are sent.
+        return self._unit_estimator
+
+    def get_circuit_breakers(self):
+        # Returns the circuit breakers of the endpoint, None if they are
+        # disabled.
+        return self._circuit_breakers
+
+    def get_concurrency_limiters(self):
+        # Returns the adaptive concurrency limiters of the tables, None if they
+        # are disabled.
+        return self._concurrency_limiters
+
     def get_proxy_version(self):
         return self._proxy_version
 
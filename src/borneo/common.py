@@ -11,7 +11,6 @@ from functools import wraps
 from logging import Logger
 from struct import pack, unpack
 from threading import Lock
-from time import time
 from warnings import simplefilter, warn
 
 from dateutil import tz
@@ -185,6 +184,13 @@ class CheckValue(object):
         if data is not None and not isinstance(data, dict):
             raise IllegalArgumentException(name + ' must be a dict.')
 
+    @staticmethod
+    def check_float_ge_zero(data, name):
+        if not CheckValue.is_digit(data) or data < 0.0:
+            raise IllegalArgumentException(
+                name + ' must be a non-negative digital number. Got:' +
+                str(data))
+
     @staticmethod
     def check_float_gt_zero(data, name):
         if not CheckValue.is_digit(data) or data <= 0.0:
@@ -605,28 +611,6 @@ class LogUtils(object):
         return self._logger
 
 
-class Memoize(object):
-
-    # A cache that used for saving the access token.
-    def __init__(self, duration=60):
-        self._cache = {}
-        self._duration = duration
-        self.lock = Lock()
-
-    @synchronized
-    def set(self, key, value):
-        self._cache[key] = {'value': value, 'time': time()}
-
-    @synchronized
-    def get(self, key):
-        if key in self._cache and not self._is_obsolete(self._cache[key]):
-            return self._cache[key]['value']
-        return None
-
-    def _is_obsolete(self, entry):
-        return time() - entry['time'] > self._duration
-
-
 class PackedInteger(object):
     # The maximum number of bytes needed to store an int value (5).
     MAX_LENGTH = 5
@@ -1130,6 +1114,9 @@ class PreparedStatement(object):
         self._namespace = namespace
         self._table_name = table_name
         self._operation = operation
+        # The maximum number of operations a parallel scan of this query can
+        # be split into, 0 if the query can not be split.
+        self._max_parallelism = 0
         self.lock = Lock()
 
     def clear_variables(self):
@@ -1148,11 +1135,13 @@ class PreparedStatement(object):
             Bind variables are uninitialized.
         :rtype: PreparedStatement
         """
-        return PreparedStatement(
+        statement = PreparedStatement(
             self._sql_text, self._query_plan, self._query_schema,
             self._proxy_statement, self._driver_query_plan, self._num_iterators,
             self._num_registers, self._variables, self._namespace,
             self._table_name, self._operation)
+        statement.set_maximum_parallelism(self._max_parallelism)
+        return statement
 
     def does_writes(self):
         # if it's not SELECT, it does writes.
@@ -1161,6 +1150,18 @@ class PreparedStatement(object):
     def driver_plan(self):
         return self._driver_query_plan
 
+    def get_maximum_parallelism(self):
+        """
+        Returns the maximum number of operations a parallel scan of this query
+        can be split into, or 0 if the query can not be split. See
+        :py:meth:`QueryRequest.set_number_of_operations`.
+
+        :returns: the maximum parallelism.
+        :rtype: int
+        :versionadded:: 5.6.0
+        """
+        return self._max_parallelism
+
     def get_namespace(self):
         # Return namespace from prepared statement, if any.
         return self._namespace
@@ -1236,6 +1237,10 @@ class PreparedStatement(object):
             return self._driver_query_plan.display()
         return None
 
+    def set_maximum_parallelism(self, max_parallelism):
+        # internal use, set from the prepare or query response
+        self._max_parallelism = max_parallelism
+
     def set_variable(self, variable, value):
         """
         Binds an external variable to a given value. The variable is identified
@@ -1277,6 +1282,47 @@ class PreparedStatement(object):
                 'There is no external variable at position ' + str(variable))
 
 
+class Priority(object):
+    """
+    The priority class of a request, used by the internal rate limiters to
+    share the limits of a table between the requests of different classes,
+    see :py:meth:`Request.set_priority`.
+
+    :versionadded:: 5.6.0
+    """
+    INTERACTIVE = 0
+    """
+    Set Priority.INTERACTIVE for latency sensitive requests. This is the
+    default value for requests.
+    """
+    BATCH = 1
+    """
+    Set Priority.BATCH for background requests, such as bulk loads and
+    exports, which should not delay the interactive requests.
+    """
+
+
+class LoadBalancing(object):
+    """
+    The policy used to choose the endpoint of each request when several
+    endpoints are configured, see :py:meth:`NoSQLHandleConfig.set_endpoints`.
+
+    :versionadded:: 5.6.0
+    """
+    LEAST_OUTSTANDING = 0
+    """
+    Set LoadBalancing.LEAST_OUTSTANDING to send each request to the endpoint
+    with the fewest requests in flight.
+    """
+    POWER_OF_TWO_CHOICES = 1
+    """
+    Set LoadBalancing.POWER_OF_TWO_CHOICES to send each request to the one of
+    two endpoints chosen at random with the fewest requests in flight. This is
+    the default value, it spreads the requests of many handles more evenly
+    than LEAST_OUTSTANDING, whose handles tend to choose the same endpoint.
+    """
+
+
 class PutOption(object):
     """
     Set the put option for put requests.
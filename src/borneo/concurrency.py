@@ -0,0 +1,272 @@
+#
+# Copyright (c) 2018, 2026 Oracle and/or its affiliates. All rights reserved.
+#
+# Licensed under the Universal Permissive License v 1.0 as shown at
+#  https://oss.oracle.com/licenses/upl/
+#
+
+from threading import Condition, Lock
+from time import monotonic
+
+from .common import synchronized
+from .exception import ReadThrottlingException, WriteThrottlingException
+
+
+class ConcurrencyLimiter(object):
+    """
+    Internal use only.
+
+    An adaptive limit of the number of requests to a table that are in flight
+    at the same time, adjusted by additive increase and multiplicative
+    decrease (AIMD):
+
+      * each request that succeeds increases the limit by 1 / limit, that is
+        by 1 once a limit's worth of requests succeeded, up to the maximum.
+      * a request throttled by the service halves the limit.
+      * a request that succeeds while the smoothed latency of the requests of
+        its kind is more than twice their minimum latency decreases the limit
+        by 10%.
+
+    The limit is decreased at most once per round trip: a request only
+    decreases the limit if it was sent after the last decrease, so a burst of
+    throttled requests sent together counts as a single signal. The limit is
+    never decreased below 1.
+
+    The limit starts at its maximum, so the limiter does not slow down the
+    requests until the service or the latencies show it is needed. The
+    latencies are tracked by kind of request, as the latencies of queries and
+    single row operations are not comparable. The minimum latency of a kind of
+    request is measured again every :py:attr:`MIN_LATENCY_SAMPLES` requests.
+    """
+
+    # The factor applied to the limit when a request is throttled.
+    THROTTLING_DECREASE = 0.5
+    # The factor applied to the limit when the latency increases.
+    LATENCY_DECREASE = 0.9
+    # The ratio of the smoothed latency over the minimum latency above which
+    # the latency is considered increased.
+    LATENCY_TOLERANCE = 2.0
+    # The weight of a request in the smoothed latency.
+    LATENCY_SMOOTHING = 0.05
+    # The number of requests after which the minimum latency is measured
+    # again.
+    MIN_LATENCY_SAMPLES = 500
+
+    def __init__(self, max_limit):
+        self._max_limit = max_limit
+        self._limit = float(max_limit)
+        self._in_flight = 0
+        # Incremented by each decrease of the limit.
+        self._epoch = 0
+        self._latencies = dict()
+        self._cond = Condition()
+        # The stats of the interval.
+        self._max_in_flight = 0
+        self._wait_count = 0
+        self._timeout_count = 0
+        self._throttle_count = 0
+        self._decrease_count = 0
+
+    def after_fork(self):
+        # The requests in flight belong to the threads of the parent process.
+        self._cond = Condition()
+        self._in_flight = 0
+
+    def acquire(self, request_name, timeout_ms):
+        """
+        Waits for the number of requests in flight to be below the limit and
+        counts one more request in flight.
+
+        :param request_name: the kind of request.
+        :type request_name: str
+        :param timeout_ms: the maximum time to wait in milliseconds.
+        :type timeout_ms: int
+        :returns: the permit of the request, to release once it completes, or
+            None if the number of requests in flight did not go below the
+            limit before the timeout.
+        :rtype: ConcurrencyLimiter.Permit
+        """
+        with self._cond:
+            if self._in_flight >= int(self._limit):
+                self._wait_count += 1
+                deadline = monotonic() + float(timeout_ms) / 1000
+                while self._in_flight >= int(self._limit):
+                    remaining = deadline - monotonic()
+                    if remaining <= 0:
+                        self._timeout_count += 1
+                        return None
+                    self._cond.wait(remaining)
+            self._in_flight += 1
+            if self._in_flight > self._max_in_flight:
+                self._max_in_flight = self._in_flight
+            return ConcurrencyLimiter.Permit(self, self._epoch, request_name)
+
+    def get_limit(self):
+        """
+        Returns the current limit of requests in flight.
+
+        :returns: the limit.
+        :rtype: int
+        """
+        return int(self._limit)
+
+    def get_stats(self):
+        """
+        Returns the limit, the number of requests in flight and the stats of
+        the interval, and resets them.
+
+        :returns: the stats.
+        :rtype: dict
+        """
+        with self._cond:
+            stats = {'limit': int(self._limit),
+                     'inFlight': self._in_flight,
+                     'maxInFlight': self._max_in_flight,
+                     'waitCount': self._wait_count,
+                     'timeoutCount': self._timeout_count,
+                     'throttleCount': self._throttle_count,
+                     'decreaseCount': self._decrease_count}
+            self._max_in_flight = self._in_flight
+            self._wait_count = 0
+            self._timeout_count = 0
+            self._throttle_count = 0
+            self._decrease_count = 0
+            return stats
+
+    def _release(self, epoch, request_name, latency_ms, throttled):
+        # Counts one less request in flight and adjusts the limit by the
+        # outcome of the request.
+        with self._cond:
+            self._in_flight -= 1
+            if throttled:
+                self._throttle_count += 1
+                self._decrease(epoch, ConcurrencyLimiter.THROTTLING_DECREASE)
+            elif latency_ms is not None:
+                if self._latency_increased(request_name, latency_ms):
+                    self._decrease(epoch, ConcurrencyLimiter.LATENCY_DECREASE)
+                elif self._limit < self._max_limit:
+                    self._limit = min(float(self._max_limit),
+                                      self._limit + 1.0 / self._limit)
+            self._cond.notify()
+
+    def _decrease(self, epoch, factor):
+        if epoch != self._epoch:
+            # The request was sent before the last decrease.
+            return
+        self._limit = max(1.0, self._limit * factor)
+        self._epoch += 1
+        self._decrease_count += 1
+
+    def _latency_increased(self, request_name, latency_ms):
+        latency = self._latencies.get(request_name)
+        if latency is None:
+            latency = ConcurrencyLimiter.Latency(latency_ms)
+            self._latencies[request_name] = latency
+        return latency.observe(latency_ms)
+
+    class Permit(object):
+        """
+        A request in flight, counted by the limiter until it is released.
+        """
+
+        def __init__(self, limiter, epoch, request_name):
+            self._limiter = limiter
+            self._epoch = epoch
+            self._request_name = request_name
+            self._released = False
+
+        def release(self, latency_ms=None, error=None):
+            """
+            Releases the permit, only the first call has an effect.
+
+            :param latency_ms: the latency of the request if it succeeded.
+            :type latency_ms: float
+            :param error: the error of the request if it failed.
+            :type error: Exception
+            """
+            if self._released:
+                return
+            self._released = True
+            self._limiter._release(
+                self._epoch, self._request_name,
+                latency_ms if error is None else None,
+                isinstance(error, (ReadThrottlingException,
+                                   WriteThrottlingException)))
+
+    class Latency(object):
+        # The smoothed and minimum latencies of a kind of request.
+
+        def __init__(self, latency_ms):
+            self.smoothed = latency_ms
+            self.minimum = latency_ms
+            self.sample_minimum = latency_ms
+            self.samples = 0
+
+        def observe(self, latency_ms):
+            # Returns True if the smoothed latency is above the tolerance.
+            self.smoothed += (ConcurrencyLimiter.LATENCY_SMOOTHING *
+                              (latency_ms - self.smoothed))
+            if latency_ms < self.minimum:
+                self.minimum = latency_ms
+            if self.samples == 0 or latency_ms < self.sample_minimum:
+                self.sample_minimum = latency_ms
+            self.samples += 1
+            if self.samples >= ConcurrencyLimiter.MIN_LATENCY_SAMPLES:
+                # Follow the latency the service can currently deliver.
+                self.minimum = self.sample_minimum
+                self.samples = 0
+            return (self.smoothed >
+                    ConcurrencyLimiter.LATENCY_TOLERANCE * self.minimum)
+
+
+class ConcurrencyLimiterMap(object):
+    """
+    Internal use only.
+
+    A map of table names to :py:class:`ConcurrencyLimiter` instances, created
+    on the first request to each table.
+    """
+
+    def __init__(self, max_limit):
+        self._max_limit = max_limit
+        self._limiter_map = dict()
+        self.lock = Lock()
+
+    def after_fork(self):
+        self.lock = Lock()
+        for limiter in self._limiter_map.values():
+            limiter.after_fork()
+
+    @synchronized
+    def get_limiter(self, table_name):
+        """
+        Returns the limiter of a table, creating it if needed.
+
+        :param table_name: name or OCID of the table.
+        :type table_name: str
+        :returns: the limiter.
+        :rtype: ConcurrencyLimiter
+        """
+        lower_table = table_name.lower()
+        limiter = self._limiter_map.get(lower_table)
+        if limiter is None:
+            limiter = ConcurrencyLimiter(self._max_limit)
+            self._limiter_map[lower_table] = limiter
+        return limiter
+
+    def get_stats(self):
+        """
+        Returns the stats of the limiters by table, for the stats of the
+        handle, and resets them.
+
+        :returns: the stats.
+        :rtype: list
+        """
+        with self.lock:
+            limiters = sorted(self._limiter_map.items())
+        stats = list()
+        for table_name, limiter in limiters:
+            table = {'table': table_name}
+            table.update(limiter.get_stats())
+            stats.append(table)
+        return stats
@@ -8,9 +8,11 @@
 from abc import ABCMeta, abstractmethod
 from copy import deepcopy
 from os import getenv
+from os.path import isdir
 from random import random
 from ssl import SSLContext
-from time import sleep, time
+from threading import Lock
+from time import monotonic, sleep, time
 
 from enum import Enum
 from typing import Callable
@@ -23,7 +25,7 @@ except ImportError:
     from urllib.parse import urlparse
 
 from .auth import AuthorizationProvider
-from .common import CheckValue, Consistency
+from .common import CheckValue, Consistency, LoadBalancing, Priority
 from .exception import (
     IllegalArgumentException, OperationThrottlingException, RetryableException)
 from .operations import Request
@@ -56,6 +58,15 @@ class RetryHandler(object):
     """
     __metaclass__ = ABCMeta
 
+    def after_fork(self):
+        """
+        Called by the driver in a child process created by os.fork, it
+        re-creates the locks of the handler if any. By default it does nothing.
+
+        :versionadded:: 5.6.0
+        """
+        pass
+
     @abstractmethod
     def get_num_retries(self):
         """
@@ -129,6 +140,19 @@ class RetryHandler(object):
         """
         pass
 
+    def on_request(self, request):
+        """
+        This method is called once for each request before it is sent, it
+        allows a handler to account for the requests that may be retried. By
+        default it does nothing.
+
+        :param request: request to execute.
+        :type request: Request
+
+        :versionadded:: 5.6.0
+        """
+        pass
+
 
 class DefaultRetryHandler(RetryHandler):
     """
@@ -227,6 +251,197 @@ class DefaultRetryHandler(RetryHandler):
             raise IllegalArgumentException(
                 're must be an instance of RetryableException.')
 
+
+class BackoffRetryHandler(DefaultRetryHandler):
+    """
+    A retry handler with exponential backoff and a retry budget, to keep the
+    retries from amplifying the load on a service that is already overloaded.
+
+    The delay before a retry is chosen with "decorrelated jitter": it is a
+    random time between base_delay_ms and three times the previous delay of
+    the request, capped at max_delay_ms. The delays grow exponentially on
+    average while the retries of requests that failed together spread out. If
+    the service returned a retry hint with the exception, see
+    :py:meth:`RetryableException.get_retry_hint_ms`, the delay is at least the
+    hint. As with :py:class:`DefaultRetryHandler` the delay never goes past the
+    timeout of the request.
+
+    The retries are also limited by a budget shared by all the requests that
+    use the handler: a token bucket that gains budget_ratio tokens for each
+    request sent, and min_retries_per_sec tokens per second so the requests
+    of an idle handle can still be retried. Each retry takes a token and a
+    retry is refused, raising the exception to the application, when the
+    bucket is empty. With the default ratio of 0.1 the retries add at most
+    about 10% to the load of the service when all the requests fail, instead of
+    multiplying it by the number of retries. The bucket holds
+    :py:attr:`BUDGET_SECONDS` seconds of min_retries_per_sec tokens, and at
+    least one token.
+
+    The handler counts the requests, the retries and the retries refused by
+    the budget; these are reported in the **retryBudget** entry of the stats
+    of the handle, along with the retry amplification, the number of attempts
+    per request.
+
+    A handler is shared by all the handles it is configured on, and is not
+    copied by :py:meth:`NoSQLHandleConfig.clone`.
+
+    :param retries: the maximum number of retries of a request.
+    :type retries: int
+    :param base_delay_ms: the minimum delay before a retry in milliseconds.
+    :type base_delay_ms: int
+    :param max_delay_ms: the maximum delay before a retry in milliseconds.
+    :type max_delay_ms: int
+    :param budget_ratio: the number of retries allowed per request sent.
+    :type budget_ratio: float
+    :param min_retries_per_sec: the number of retries allowed per second
+        regardless of the number of requests sent.
+    :type min_retries_per_sec: float
+    :raises IllegalArgumentException: raises the exception if a parameter is
+        negative or max_delay_ms is less than base_delay_ms.
+
+    :versionadded:: 5.6.0
+    """
+
+    # The number of seconds of min_retries_per_sec tokens the retry budget
+    # can hold.
+    BUDGET_SECONDS = 10
+
+    def __init__(self, retries=10, base_delay_ms=100, max_delay_ms=10000,
+                 budget_ratio=0.1, min_retries_per_sec=10.0):
+        super(BackoffRetryHandler, self).__init__(retries)
+        CheckValue.check_int_ge_zero(base_delay_ms, 'base_delay_ms')
+        CheckValue.check_int_ge_zero(max_delay_ms, 'max_delay_ms')
+        CheckValue.check_float_ge_zero(budget_ratio, 'budget_ratio')
+        CheckValue.check_float_ge_zero(
+            min_retries_per_sec, 'min_retries_per_sec')
+        if max_delay_ms < base_delay_ms:
+            raise IllegalArgumentException(
+                'max_delay_ms must be greater than or equal to ' +
+                'base_delay_ms.')
+        self._base_delay_ms = base_delay_ms
+        self._max_delay_ms = max_delay_ms
+        self._budget_ratio = budget_ratio
+        self._min_retries_per_sec = min_retries_per_sec
+        self._capacity = max(
+            1.0, min_retries_per_sec * BackoffRetryHandler.BUDGET_SECONDS)
+        self._tokens = self._capacity
+        self._last_refill = monotonic()
+        self.lock = Lock()
+        # The counts of the stats interval.
+        self._request_count = 0
+        self._retry_count = 0
+        self._denied_count = 0
+        self._hinted_count = 0
+
+    def __deepcopy__(self, memo):
+        # The budget is shared by the copies of the config.
+        return self
+
+    def after_fork(self):
+        self.lock = Lock()
+
+    def do_retry(self, request, num_retried, re):
+        """
+        Decides whether to retry, as :py:meth:`DefaultRetryHandler.do_retry`
+        does, and takes a token from the retry budget if so. The retry is
+        refused if the budget is exhausted.
+        """
+        if not super(BackoffRetryHandler, self).do_retry(
+                request, num_retried, re):
+            return False
+        with self.lock:
+            self._refill()
+            if self._tokens < 1.0:
+                self._denied_count += 1
+                return False
+            self._tokens -= 1.0
+            self._retry_count += 1
+            return True
+
+    def delay(self, request, num_retried, re):
+        """
+        Delays (sleeps) for a decorrelated jitter backoff, at least the retry
+        hint of the exception if any, and no further than the timeout of the
+        request.
+        """
+        self._check_request(request)
+        CheckValue.check_int_ge_zero(num_retried, 'num_retried')
+        self._check_retryable_exception(re)
+        retry_stats = request.get_retry_stats()
+        previous_ms = (0 if retry_stats is None else
+                       retry_stats.get_last_delay_ms())
+        delay_ms = self.compute_jitter_delay(previous_ms)
+        hint_ms = re.get_retry_hint_ms()
+        if hint_ms > 0:
+            with self.lock:
+                self._hinted_count += 1
+            delay_ms = max(delay_ms, hint_ms)
+        delay_ms = self.compute_backoff_delay(request, delay_ms)
+        if delay_ms <= 0:
+            return
+        sleep(float(delay_ms) / 1000)
+        request.add_retry_delay_ms(delay_ms)
+
+    def compute_jitter_delay(self, previous_ms):
+        """
+        Computes the decorrelated jitter delay that follows a delay.
+
+        :param previous_ms: the previous delay in milliseconds, 0 for the first
+            retry.
+        :type previous_ms: int
+        :returns: the delay in milliseconds.
+        :rtype: int
+        """
+        upper_ms = max(self._base_delay_ms, previous_ms * 3)
+        return int(min(self._max_delay_ms, self._base_delay_ms +
+                       random() * (upper_ms - self._base_delay_ms)))
+
+    def get_stats(self):
+        """
+        Internal use only.
+
+        Returns the number of requests, retries, retries refused by the budget
+        and retries delayed by a server hint of the interval, the retry
+        amplification and the tokens left in the budget, and resets the
+        counts.
+
+        :returns: the stats.
+        :rtype: dict
+        """
+        with self.lock:
+            self._refill()
+            stats = {'requestCount': self._request_count,
+                     'retryCount': self._retry_count,
+                     'deniedCount': self._denied_count,
+                     'hintedCount': self._hinted_count,
+                     'amplification': (
+                         0 if self._request_count == 0 else
+                         round(float(self._request_count + self._retry_count) /
+                               self._request_count, 3)),
+                     'tokens': round(self._tokens, 3)}
+            self._request_count = 0
+            self._retry_count = 0
+            self._denied_count = 0
+            self._hinted_count = 0
+            return stats
+
+    def on_request(self, request):
+        """
+        Adds the share of a request to the retry budget.
+        """
+        with self.lock:
+            self._request_count += 1
+            self._refill()
+            self._tokens = min(self._capacity,
+                               self._tokens + self._budget_ratio)
+
+    def _refill(self):
+        # Adds the tokens of the time elapsed, the lock must be held.
+        now = monotonic()
+        self._tokens = min(self._capacity, self._tokens + (
+            now - self._last_refill) * self._min_retries_per_sec)
+        self._last_refill = now
+
 # === Begin autogenerated regions ===
 class Region(object):
     """
@@ -1550,6 +1765,7 @@ class NoSQLHandleConfig(object):
             raise IllegalArgumentException(
                 'One or both of endpoint and provider must be set.')
         self._service_url = NoSQLHandleConfig.create_url(ep, '/')
+        self._endpoints = [self._service_url]
         self._auth_provider = provider
         self._compartment = None
         self._timeout = 0
@@ -1561,6 +1777,20 @@ class NoSQLHandleConfig(object):
         self._retry_handler = None
         self._rate_limiting_enabled = False
         self._default_rate_limiter_percentage = 0.0
+        self._rate_limiter_directory = None
+        self._rate_limiting_tables = []
+        self._rate_limiting_precharge = True
+        self._priority_weights = {Priority.INTERACTIVE: 4, Priority.BATCH: 1}
+        self._adaptive_concurrency_limit = 0
+        self._circuit_breaker_threshold = 0
+        self._circuit_breaker_open_time = 5000
+        self._circuit_breaker_per_table = False
+        self._hedging_delay = 0
+        self._hedging_budget_percent = 5.0
+        self._hedging_adaptive = False
+        self._load_balancing = LoadBalancing.POWER_OF_TWO_CHOICES
+        self._endpoint_failure_threshold = 3
+        self._endpoint_eject_time = 10000
         self._proxy_host = None
         self._proxy_port = 0
         self._proxy_username = None
@@ -1590,6 +1820,7 @@ class NoSQLHandleConfig(object):
         self._stats_pretty_print = bool(self._stats_pretty_print)
         # noinspection PyTypeChecker
         self._stats_handler = None  # type: Callable
+        self._tracer_provider = None
 
     def get_service_url(self):
         """
@@ -2005,6 +2236,533 @@ class NoSQLHandleConfig(object):
             return 100.0
         return self._default_rate_limiter_percentage
 
+    def set_rate_limiting_tables(self, table_names):
+        """
+        Declares the tables used by the application so that their rate
+        limiters are ready before the first request. This only applies if rate
+        limiting is enabled using :py:meth:`set_rate_limiting_enabled`.
+
+        Without it the limits of a table are fetched in the background by its
+        first request, and the requests sent until they arrive are not
+        limited, so a burst at startup can be throttled by the service. The
+        limits of the declared tables are fetched in parallel when the handle
+        is created, which waits for them. A table whose limits can not be
+        fetched then has its limits fetched by its first request, as the tables
+        that are not declared.
+
+        The limits of all the tables with rate limiters are refreshed every 10
+        minutes, in the background.
+
+        Cloud service only.
+
+        :param table_names: the names or OCIDs of the tables.
+        :type table_names: list(str)
+        :returns: self.
+        :raises IllegalArgumentException: raises the exception if table_names
+            is not a list of strings.
+
+        :versionadded:: 5.6.0
+        """
+        CheckValue.check_list(table_names, 'table_names')
+        for table_name in table_names:
+            CheckValue.check_str(table_name, 'table_name')
+        self._rate_limiting_tables = list(table_names)
+        return self
+
+    def get_rate_limiting_tables(self):
+        """
+        Returns the tables whose rate limiters are created with the handle.
+
+        :returns: the names or OCIDs of the tables.
+        :rtype: list(str)
+
+        :versionadded:: 5.6.0
+        """
+        return list(self._rate_limiting_tables)
+
+    def set_rate_limiting_precharge(self, enable):
+        """
+        Sets whether the units of a request are consumed from the rate
+        limiters of its table before it is sent. This only applies if rate
+        limiting is enabled using :py:meth:`set_rate_limiting_enabled`.
+
+        The units consumed by a request are only known once it completes. If
+        this is enabled, the default, the units of a request are estimated from
+        the recent requests of the same table, kind and size and consumed
+        before it is sent, and the difference with the actual units is
+        consumed, or returned, once it completes. Otherwise the requests wait
+        for the limiters to be under their limits and consume their units once
+        they complete, so many concurrent requests pass the limiters together
+        and overshoot the limits.
+
+        The estimates are reported in the **unitEstimator** entry of the stats,
+        see :py:meth:`set_stats_profile`.
+
+        Cloud service only.
+
+        :param enable: whether the units are consumed before the requests are
+            sent.
+        :type enable: bool
+        :returns: self.
+        :raises IllegalArgumentException: raises the exception if enable is
+            not True or False.
+
+        :versionadded:: 5.6.0
+        """
+        CheckValue.check_boolean(enable, 'enable')
+        self._rate_limiting_precharge = enable
+        return self
+
+    def get_rate_limiting_precharge(self):
+        """
+        Returns whether the units of a request are consumed from the rate
+        limiters before it is sent.
+
+        :returns: True if the units are consumed before the requests are sent.
+        :rtype: bool
+
+        :versionadded:: 5.6.0
+        """
+        return self._rate_limiting_precharge
+
+    def set_rate_limiter_directory(self, directory):
+        """
+        Sets a directory used to share the rate limiters of the tables between
+        the processes of a host. This only applies if rate limiting is enabled
+        using :py:meth:`set_rate_limiting_enabled`.
+
+        By default each handle limits its own requests to the limits of the
+        tables, so N worker processes, e.g. the workers of gunicorn, uwsgi or
+        celery, together use up to N times the limits of a table and get
+        throttled. If a directory is set, the state of the rate limiter of each
+        table is kept in a small memory mapped file of the directory and the
+        processes of the host that use the same directory draw from a single
+        budget per table. The processes that share a directory must use the
+        same tables of the same service, with the same rate limiting
+        percentage, see :py:meth:`set_default_rate_limiting_percentage`. The
+        directory must exist and be writable, a tmpfs directory such as
+        /dev/shm is a good choice.
+
+        The shared rate limiters require the fcntl module, they are not
+        available on Windows.
+
+        Cloud service only.
+
+        :param directory: the directory of the shared rate limiters, or None
+            to limit the requests of each handle separately, the default.
+        :type directory: str
+        :returns: self.
+        :raises IllegalArgumentException: raises the exception if directory is
+            not a string or does not exist.
+
+        :versionadded:: 5.6.0
+        """
+        CheckValue.check_str(directory, 'directory', True)
+        if directory is not None and not isdir(directory):
+            raise IllegalArgumentException(
+                'directory ' + directory + ' does not exist.')
+        self._rate_limiter_directory = directory
+        return self
+
+    def get_rate_limiter_directory(self):
+        """
+        Returns the directory used to share the rate limiters between
+        processes, if set.
+
+        :returns: the directory, or None if not set.
+        :rtype: str
+
+        :versionadded:: 5.6.0
+        """
+        return self._rate_limiter_directory
+
+    def set_priority_weight(self, priority, weight):
+        """
+        Sets the weight of a priority class of requests, see
+        :py:meth:`Request.set_priority`. When rate limiting is enabled, see
+        :py:meth:`set_rate_limiting_enabled`, the limits of a table are shared
+        between the priority classes that use it in proportion to their
+        weights. The default weights are 4 for :py:attr:`Priority.INTERACTIVE`
+        and 1 for :py:attr:`Priority.BATCH`, so batch requests always get at
+        least 20% of the limits, and no more when interactive requests use the
+        rest.
+
+        The weights do not apply to the rate limiters shared between
+        processes, see :py:meth:`set_rate_limiter_directory`.
+
+        Cloud service only.
+
+        :param priority: the priority class, a value of :py:class:`Priority`.
+        :type priority: int
+        :param weight: the weight of the class, it must be positive.
+        :type weight: int or float
+        :returns: self.
+        :raises IllegalArgumentException: raises the exception if priority is
+            not a value of Priority or weight is not a positive number.
+
+        :versionadded:: 5.6.0
+        """
+        if priority not in self._priority_weights:
+            raise IllegalArgumentException(
+                'priority must be a value of Priority.')
+        CheckValue.check_float_gt_zero(weight, 'weight')
+        self._priority_weights[priority] = weight
+        return self
+
+    def get_priority_weight(self, priority):
+        """
+        Returns the weight of a priority class of requests.
+
+        :param priority: the priority class, a value of :py:class:`Priority`.
+        :type priority: int
+        :returns: the weight.
+        :rtype: int or float
+        :raises IllegalArgumentException: raises the exception if priority is
+            not a value of Priority.
+
+        :versionadded:: 5.6.0
+        """
+        if priority not in self._priority_weights:
+            raise IllegalArgumentException(
+                'priority must be a value of Priority.')
+        return self._priority_weights[priority]
+
+    def set_adaptive_concurrency_limit(self, limit):
+        """
+        Enables an adaptive limit of the number of requests to each table that
+        are in flight at the same time, and sets its maximum.
+
+        The limit of a table starts at the maximum. It is halved when a request
+        is throttled by the service and decreased when the latency of the
+        requests increases, then grows back as requests succeed. Requests that
+        would exceed the limit wait for a request to the table to complete,
+        within their timeout. This slows the application down before the
+        retries of throttled requests do, and it also protects tables without
+        limits, such as on-demand tables and the tables of on-premises stores.
+        It does not depend on the rate limiting, see
+        :py:meth:`set_rate_limiting_enabled`.
+
+        The current limit of each table is reported in the **concurrency**
+        entry of the stats, see :py:meth:`set_stats_profile`.
+
+        :param limit: the maximum number of requests in flight per table, or 0
+            to disable the adaptive limit, the default.
+        :type limit: int
+        :returns: self.
+        :raises IllegalArgumentException: raises the exception if limit is not
+            an integer greater than or equal to 0.
+
+        :versionadded:: 5.6.0
+        """
+        CheckValue.check_int_ge_zero(limit, 'limit')
+        self._adaptive_concurrency_limit = limit
+        return self
+
+    def get_adaptive_concurrency_limit(self):
+        """
+        Returns the maximum of the adaptive limit of requests in flight per
+        table.
+
+        :returns: the maximum, 0 if the adaptive limit is disabled.
+        :rtype: int
+
+        :versionadded:: 5.6.0
+        """
+        return self._adaptive_concurrency_limit
+
+    def set_circuit_breaker(self, failure_threshold, open_time_ms=5000,
+                            per_table=False):
+        """
+        Enables a circuit breaker of the requests to the endpoint, so the
+        requests fail fast while the endpoint is down instead of each using its
+        whole timeout.
+
+        The circuit opens when failure_threshold requests in a row fail with a
+        5xx status code, a connection error or a network timeout. While it is
+        open the requests raise a :py:class:`CircuitOpenException` without
+        being sent. After open_time_ms a single request is sent to probe the
+        endpoint: the circuit closes if it succeeds, and stays open for another
+        open_time_ms if it fails.
+
+        If per_table is True the requests to each table have their own
+        circuit, so a table whose requests fail does not stop the requests to
+        the other tables. The requests without a table use the circuit of the
+        endpoint. If several endpoints are set with :py:meth:`set_endpoints`
+        each endpoint has its own circuits, and the requests avoid the
+        endpoints whose circuit is open.
+
+        The state of the circuits is reported in the **circuitBreakers** entry
+        of the stats, see :py:meth:`set_stats_profile`.
+
+        :param failure_threshold: the number of consecutive failures that open
+            the circuit, or 0 to disable the circuit breaker, the default.
+        :type failure_threshold: int
+        :param open_time_ms: the time the circuit stays open before a probe is
+            sent, in milliseconds, 5000 by default.
+        :type open_time_ms: int
+        :param per_table: whether each table has its own circuit.
+        :type per_table: bool
+        :returns: self.
+        :raises IllegalArgumentException: raises the exception if
+            failure_threshold is not an integer greater than or equal to 0,
+            open_time_ms is not a positive integer or per_table is not True or
+            False.
+
+        :versionadded:: 5.6.0
+        """
+        CheckValue.check_int_ge_zero(failure_threshold, 'failure_threshold')
+        CheckValue.check_int_gt_zero(open_time_ms, 'open_time_ms')
+        CheckValue.check_boolean(per_table, 'per_table')
+        self._circuit_breaker_threshold = failure_threshold
+        self._circuit_breaker_open_time = open_time_ms
+        self._circuit_breaker_per_table = per_table
+        return self
+
+    def get_circuit_breaker_threshold(self):
+        """
+        Returns the number of consecutive failures that open the circuit.
+
+        :returns: the threshold, 0 if the circuit breaker is disabled.
+        :rtype: int
+
+        :versionadded:: 5.6.0
+        """
+        return self._circuit_breaker_threshold
+
+    def get_circuit_breaker_open_time(self):
+        """
+        Returns the time the circuit stays open before a probe is sent.
+
+        :returns: the time in milliseconds.
+        :rtype: int
+
+        :versionadded:: 5.6.0
+        """
+        return self._circuit_breaker_open_time
+
+    def get_circuit_breaker_per_table(self):
+        """
+        Returns whether each table has its own circuit.
+
+        :returns: True if each table has its own circuit.
+        :rtype: bool
+
+        :versionadded:: 5.6.0
+        """
+        return self._circuit_breaker_per_table
+
+    def set_hedging(self, delay_ms, budget_percent=5.0, adaptive=False):
+        """
+        Enables the hedging of get requests: a :py:class:`GetRequest` that did
+        not complete after delay_ms is sent a second time, on another
+        connection, while the first request stays in flight, and the first
+        successful response is used. This bounds the latency added by a slow
+        connection or proxy, at the cost of sending some requests twice.
+
+        The hedges are limited by a budget: at most budget_percent percent of
+        the get requests are hedged, so the load of the service is increased
+        by at most that much. A request that can not be hedged waits for its
+        response as long as its timeout allows. If adaptive is True the delay
+        follows the 95th percentile of the latency of the recent get requests,
+        so about 5% of the requests are hedged; delay_ms is used until enough
+        requests completed.
+
+        A request that can be hedged and its hedge each run in a thread of the
+        handle while the calling thread waits for the first successful
+        response. The request that loses is not interrupted, its response is
+        discarded when it arrives. The units it consumed are counted by the
+        rate limiters, or the estimated units if it fails, the
+        :py:class:`GetResult` only has the units of the response used. The
+        number of hedges and of hedges that completed before the first request
+        are reported in the **hedging** entry of the stats, see
+        :py:meth:`set_stats_profile`.
+
+        :param delay_ms: the delay after which a request is hedged, in
+            milliseconds, or 0 to disable the hedging, the default.
+        :type delay_ms: int
+        :param budget_percent: the maximum percentage of get requests that are
+            hedged, 5 by default.
+        :type budget_percent: float
+        :param adaptive: whether the delay follows the 95th percentile of the
+            latency of the get requests.
+        :type adaptive: bool
+        :returns: self.
+        :raises IllegalArgumentException: raises the exception if delay_ms is
+            not an integer greater than or equal to 0, budget_percent is not a
+            positive number or adaptive is not True or False.
+
+        :versionadded:: 5.6.0
+        """
+        CheckValue.check_int_ge_zero(delay_ms, 'delay_ms')
+        CheckValue.check_float_gt_zero(budget_percent, 'budget_percent')
+        CheckValue.check_boolean(adaptive, 'adaptive')
+        self._hedging_delay = delay_ms
+        self._hedging_budget_percent = budget_percent
+        self._hedging_adaptive = adaptive
+        return self
+
+    def get_hedging_delay(self):
+        """
+        Returns the delay after which a get request is hedged.
+
+        :returns: the delay in milliseconds, 0 if the hedging is disabled.
+        :rtype: int
+
+        :versionadded:: 5.6.0
+        """
+        return self._hedging_delay
+
+    def get_hedging_budget_percent(self):
+        """
+        Returns the maximum percentage of get requests that are hedged.
+
+        :returns: the percentage.
+        :rtype: float
+
+        :versionadded:: 5.6.0
+        """
+        return self._hedging_budget_percent
+
+    def get_hedging_adaptive(self):
+        """
+        Returns whether the hedging delay follows the 95th percentile of the
+        latency of the get requests.
+
+        :returns: True if the delay is adaptive.
+        :rtype: bool
+
+        :versionadded:: 5.6.0
+        """
+        return self._hedging_adaptive
+
+    def set_endpoints(self, endpoints):
+        """
+        Sets the endpoints of the service, for an on-premises store served by
+        several proxies. The requests are balanced between the endpoints
+        without an external load balancer, each endpoint has its own pool of
+        connections, see :py:meth:`set_load_balancing`.
+
+        The endpoints have the formats accepted by the constructor and must
+        all use the same protocol. The first one replaces the endpoint given to
+        the constructor, it is also used for the requests sent outside of the
+        data requests, such as the login to a secure store.
+
+        :param endpoints: the endpoints, at least one.
+        :type endpoints: list(str)
+        :returns: self.
+        :raises IllegalArgumentException: raises the exception if endpoints is
+            not a non-empty list of strings, if an endpoint is not valid or if
+            the endpoints do not use the same protocol.
+
+        :versionadded:: 5.6.0
+        """
+        CheckValue.check_list(endpoints, 'endpoints')
+        if len(endpoints) == 0:
+            raise IllegalArgumentException('endpoints must not be empty.')
+        urls = list()
+        for endpoint in endpoints:
+            CheckValue.check_str(endpoint, 'endpoint')
+            url = NoSQLHandleConfig.create_url(endpoint, '/')
+            if urls and url.scheme != urls[0].scheme:
+                raise IllegalArgumentException(
+                    'The endpoints must use the same protocol: ' +
+                    str(endpoints))
+            urls.append(url)
+        self._service_url = urls[0]
+        self._endpoints = urls
+        return self
+
+    def get_endpoints(self):
+        """
+        Returns the urls of the endpoints of the service, a single one unless
+        :py:meth:`set_endpoints` was called.
+
+        :returns: the urls.
+        :rtype: list(ParseResult)
+
+        :versionadded:: 5.6.0
+        """
+        return list(self._endpoints)
+
+    def set_load_balancing(self, policy, failure_threshold=3,
+                           eject_time_ms=10000):
+        """
+        Sets how the requests are balanced between the endpoints set by
+        :py:meth:`set_endpoints`.
+
+        The endpoint of each request is chosen by the policy, among the
+        endpoints that were not ejected. An endpoint is ejected when
+        failure_threshold requests in a row fail with a 5xx status code, a
+        connection error or a network timeout. Its health is then checked
+        every eject_time_ms, with a HEAD request, and it is used again once it
+        answers. If all the endpoints are ejected the requests are sent to the
+        one ejected first. A request that fails with a connection error is
+        retried on another endpoint, within its timeout.
+
+        The endpoints are reported in the **endpoints** entry of the stats,
+        see :py:meth:`set_stats_profile`.
+
+        :param policy: the policy, LoadBalancing.POWER_OF_TWO_CHOICES by
+            default.
+        :type policy: LoadBalancing
+        :param failure_threshold: the number of consecutive failures that
+            eject an endpoint, 3 by default.
+        :type failure_threshold: int
+        :param eject_time_ms: the interval of the health checks of an ejected
+            endpoint, in milliseconds, 10000 by default.
+        :type eject_time_ms: int
+        :returns: self.
+        :raises IllegalArgumentException: raises the exception if policy is
+            not a LoadBalancing value, or failure_threshold or eject_time_ms is
+            not a positive integer.
+
+        :versionadded:: 5.6.0
+        """
+        if (policy != LoadBalancing.LEAST_OUTSTANDING and
+                policy != LoadBalancing.POWER_OF_TWO_CHOICES):
+            raise IllegalArgumentException(
+                'policy must be LoadBalancing.LEAST_OUTSTANDING or ' +
+                'LoadBalancing.POWER_OF_TWO_CHOICES.')
+        CheckValue.check_int_gt_zero(failure_threshold, 'failure_threshold')
+        CheckValue.check_int_gt_zero(eject_time_ms, 'eject_time_ms')
+        self._load_balancing = policy
+        self._endpoint_failure_threshold = failure_threshold
+        self._endpoint_eject_time = eject_time_ms
+        return self
+
+    def get_load_balancing(self):
+        """
+        Returns the policy used to balance the requests between the endpoints.
+
+        :returns: the policy.
+        :rtype: LoadBalancing
+
+        :versionadded:: 5.6.0
+        """
+        return self._load_balancing
+
+    def get_endpoint_failure_threshold(self):
+        """
+        Returns the number of consecutive failures that eject an endpoint.
+
+        :returns: the threshold.
+        :rtype: int
+
+        :versionadded:: 5.6.0
+        """
+        return self._endpoint_failure_threshold
+
+    def get_endpoint_eject_time(self):
+        """
+        Returns the interval of the health checks of an ejected endpoint.
+
+        :returns: the interval in milliseconds.
+        :rtype: int
+
+        :versionadded:: 5.6.0
+        """
+        return self._endpoint_eject_time
+
     def set_proxy_host(self, proxy_host):
         """
         Sets an HTTP proxy host to be used for the session. If a proxy host is
@@ -2230,13 +2988,17 @@ class NoSQLHandleConfig(object):
         """
         auth_provider = self._auth_provider
         logger = self._logger
+        tracer_provider = self._tracer_provider
         self._auth_provider = None
         self._logger = None
+        self._tracer_provider = None
         clone_config = deepcopy(self)
         clone_config.set_authorization_provider(
             auth_provider).set_logger(logger)
+        clone_config._tracer_provider = tracer_provider
         self._logger = logger
         self._auth_provider = auth_provider
+        self._tracer_provider = tracer_provider
         return clone_config
 
     def is_default_logger(self):
@@ -2421,3 +3183,48 @@ class NoSQLHandleConfig(object):
         :versionadded:: 5.4.0
         """
         return self._default_namespace
+
+    def set_tracer_provider(self, tracer_provider):
+        """
+        Enables the tracing of the requests with OpenTelemetry. The handle
+        creates a span for each request, for each http request sent to the
+        service, for the signing of the requests, for the waits on the rate
+        limiters and for the fetch of each batch of results of the queries
+        that are executed partly by the driver. The trace context is
+        propagated to the service in the http headers, with the propagator
+        configured in OpenTelemetry.
+
+        Tracing requires the opentelemetry-api package, the spans are exported
+        by the OpenTelemetry SDK configured by the application. By default
+        tracing is disabled.
+
+        .. code-block:: pycon
+
+            from opentelemetry import trace
+            config.set_tracer_provider(trace.get_tracer_provider())
+
+        :param tracer_provider: the OpenTelemetry TracerProvider, or None to
+            disable tracing.
+        :type tracer_provider: TracerProvider
+        :returns: self.
+        :raises IllegalArgumentException: raises the exception if
+            tracer_provider is not None and has no get_tracer method.
+        :versionadded:: 5.6.0
+        """
+        if (tracer_provider is not None and
+                not callable(getattr(tracer_provider, 'get_tracer', None))):
+            raise IllegalArgumentException(
+                'tracer_provider must be an OpenTelemetry TracerProvider.')
+        self._tracer_provider = tracer_provider
+        return self
+
+    def get_tracer_provider(self):
+        """
+        Returns the OpenTelemetry tracer provider used to trace the requests,
+        or None if tracing is disabled.
+
+        :returns: the tracer provider or None.
+        :rtype: TracerProvider
+        :versionadded:: 5.6.0
+        """
+        return self._tracer_provider
@@ -11,6 +11,7 @@ from os import mkdir, path
 from ssl import SSLContext, SSLError, create_default_context
 from sys import argv
 
+from .batch import BulkWriter
 from .client import Client
 from .common import CheckValue, UserInfo
 from .config import NoSQLHandleConfig
@@ -22,6 +23,7 @@ from .operations import (
     ListTablesRequest, MultiDeleteRequest, PrepareRequest, PutRequest,
     QueryRequest, SystemRequest, SystemStatusRequest, TableRequest,
     TableUsageRequest, WriteMultipleRequest, QueryIterableResult)
+from .scan import ParallelQueryIterableResult
 
 
 class NoSQLHandle(object):
@@ -433,6 +435,37 @@ class NoSQLHandle(object):
                 'The parameter should be an instance of QueryRequest.')
         return QueryIterableResult(request, self)
 
+    def parallel_query(self, request, workers=4):
+        """
+        Queries a table splitting the query into independent operations that
+        are executed concurrently, and returns an iterable over the merged
+        results of all operations, in no particular order.
+
+        Only simple queries, with no sorting, grouping or aggregation, that
+        scan all partitions or all shards of a table can be split. The query is
+        prepared if the request is not prepared already. The number of
+        operations is the smaller of workers and
+        :py:meth:`PreparedStatement.get_maximum_parallelism`. To run the
+        operations in different processes, or on different hosts, use
+        :py:meth:`QueryRequest.set_number_of_operations` and
+        :py:meth:`QueryRequest.set_operation_number` instead.
+
+        :param request: the input parameters for the operation.
+        :type request: QueryRequest
+        :param workers: the maximum number of operations executed
+            concurrently, defaults to 4.
+        :type workers: int
+        :returns: the iterable over the results of the query.
+        :rtype: ParallelQueryIterableResult
+        :raises IllegalArgumentException: raises the exception if request is not
+            an instance of :py:class:`QueryRequest`, or if the query can not be
+            split.
+        :raises NoSQLException: raises the exception if the operation cannot be
+            performed for any other reason.
+        :versionadded:: 5.6.0
+        """
+        return ParallelQueryIterableResult(self, request, workers)
+
     def system_request(self, request):
         """
         Performs a system operation on the system, such as administrative
@@ -544,6 +577,24 @@ class NoSQLHandle(object):
                 'The parameter should be an instance of WriteMultipleRequest.')
         return self._execute(request)
 
+    def after_fork(self):
+        """
+        Re-initializes the handle in a child process created by os.fork, as
+        done by pre-fork servers such as gunicorn or uWSGI. The connection
+        pool, the locks, the stats timer and the refresh tasks of the
+        authorization provider do not survive a fork and are re-created.
+        Cached signatures, login tokens, prepared statements and rate limiter
+        state are kept.
+
+        On platforms that support :py:func:`os.register_at_fork` this method is
+        called automatically in the child process, it is safe to call it again.
+        It is a no-op if the handle has been closed.
+
+        :versionadded:: 5.6.0
+        """
+        if self._client is not None:
+            self._client.after_fork()
+
     def close(self):
         """
         Close the NoSQLHandle.
@@ -757,6 +808,34 @@ class NoSQLHandle(object):
         """
         return self._execute(request)
 
+    def bulk_put(self, table_name, rows, compartment=None, max_concurrency=4):
+        """
+        A convenience method that puts a large number of rows into a table
+        using concurrent :py:meth:`write_multiple` operations and waits for
+        them to complete. The rows are grouped by shard key and split in
+        sub-batches that respect the operation number and size limits of
+        :py:meth:`write_multiple`. See :py:class:`BulkWriter` for details and
+        for more options.
+
+        :param table_name: the table name.
+        :type table_name: str
+        :param rows: the rows to put.
+        :type rows: iterable of dict
+        :param compartment: the compartment name or id, cloud service only.
+        :type compartment: str
+        :param max_concurrency: the maximum number of write multiple operations
+            executed concurrently, defaults to 4.
+        :type max_concurrency: int
+        :returns: the aggregate result of the operations, including the failed
+            operations.
+        :rtype: BulkWriteResult
+        :raises IllegalArgumentException: raises the exception if any of the
+            parameters is invalid.
+        :versionadded:: 5.6.0
+        """
+        return BulkWriter(self, max_concurrency=max_concurrency).put(
+            table_name, rows, compartment)
+
     def get_client(self):
         # For testing use
         return self._client
@@ -0,0 +1,123 @@
+#
+# Copyright (c) 2018, 2026 Oracle and/or its affiliates. All rights reserved.
+#
+# Licensed under the Universal Permissive License v 1.0 as shown at
+#  https://oss.oracle.com/licenses/upl/
+#
+
+from collections import OrderedDict
+from threading import Lock
+
+from .common import synchronized
+
+
+class UnitCostEstimator(object):
+    """
+    Internal use only.
+
+    Estimates the read and write units a request consumes from the units
+    consumed by the recent requests of the same shape: the same table, kind of
+    request and size of the serialized request, in power of 2 buckets. The
+    estimate of a shape is an exponentially weighted moving average of its
+    units, 0 until a request of the shape completed.
+
+    The estimates are used to consume the units of a request from the rate
+    limiters before it is sent, the difference with the actual units is
+    consumed, or returned, once it completes. Concurrent requests then see the
+    units of each other instead of all passing the limiters at once.
+
+    The shapes are kept in LRU order, at most :py:attr:`MAX_SHAPES` of them.
+    """
+
+    # The weight of a request in the average of its shape.
+    SMOOTHING = 0.2
+    # The maximum number of shapes kept.
+    MAX_SHAPES = 1000
+
+    def __init__(self):
+        # The [read units, write units] averages by shape.
+        self._shapes = OrderedDict()
+        self.lock = Lock()
+        # The stats of the interval.
+        self._observe_count = 0
+        self._read_error = 0.0
+        self._write_error = 0.0
+
+    def after_fork(self):
+        self.lock = Lock()
+
+    @synchronized
+    def estimate(self, shape):
+        """
+        Returns the estimated units of a request.
+
+        :param shape: the shape of the request, see :py:meth:`get_shape`.
+        :type shape: tuple
+        :returns: the read units and the write units.
+        :rtype: tuple
+        """
+        units = self._shapes.get(shape)
+        if units is None:
+            return 0, 0
+        return int(round(units[0])), int(round(units[1]))
+
+    @staticmethod
+    def get_shape(request, size):
+        """
+        Returns the shape of a request.
+
+        :param request: the request.
+        :type request: Request
+        :param size: the size of the serialized request.
+        :type size: int
+        :returns: the shape.
+        :rtype: tuple
+        """
+        return (request.get_table_name().lower(), request.get_request_name(),
+                size.bit_length())
+
+    @synchronized
+    def get_stats(self):
+        """
+        Returns the number of shapes, the number of requests observed during
+        the interval and their average estimate errors, and resets them.
+
+        :returns: the stats.
+        :rtype: dict
+        """
+        count = self._observe_count
+        stats = {'shapes': len(self._shapes),
+                 'observeCount': count,
+                 'readErrorAvg': (0 if count == 0 else
+                                  round(self._read_error / count, 3)),
+                 'writeErrorAvg': (0 if count == 0 else
+                                   round(self._write_error / count, 3))}
+        self._observe_count = 0
+        self._read_error = 0.0
+        self._write_error = 0.0
+        return stats
+
+    @synchronized
+    def observe(self, shape, read_units, write_units):
+        """
+        Adds the units consumed by a request to the average of its shape.
+
+        :param shape: the shape of the request.
+        :type shape: tuple
+        :param read_units: the read units consumed.
+        :type read_units: int
+        :param write_units: the write units consumed.
+        :type write_units: int
+        """
+        units = self._shapes.get(shape)
+        if units is None:
+            if len(self._shapes) >= UnitCostEstimator.MAX_SHAPES:
+                self._shapes.popitem(last=False)
+            self._shapes[shape] = [float(read_units), float(write_units)]
+            return
+        self._shapes.move_to_end(shape)
+        self._observe_count += 1
+        self._read_error += abs(read_units - round(units[0]))
+        self._write_error += abs(write_units - round(units[1]))
+        units[0] += UnitCostEstimator.SMOOTHING * (read_units - units[0])
+        units[1] += UnitCostEstimator.SMOOTHING * (write_units - units[1])
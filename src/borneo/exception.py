@@ -164,6 +164,22 @@ class QueryStateException(IllegalStateException):
             'Unexpected state in query engine:\n' + message)
 
 
+class CircuitOpenException(NoSQLException):
+    """
+    Thrown without sending a request when the circuit breaker of its endpoint,
+    or of its table, is open: recent requests to the endpoint failed with
+    server or connection errors, see
+    :py:meth:`NoSQLHandleConfig.set_circuit_breaker`. The request may be
+    retried after a while, the circuit lets a request go through periodically
+    to probe the endpoint.
+
+    :versionadded:: 5.6.0
+    """
+
+    def __init__(self, message):
+        super(CircuitOpenException, self).__init__(message)
+
+
 class InvalidAuthorizationException(NoSQLException):
     """
     The exception is thrown if the application presents an invalid authorization
@@ -266,10 +282,28 @@ class RetryableException(NoSQLException):
 
     def __init__(self, message):
         super(RetryableException, self).__init__(message)
+        self._retry_hint_ms = 0
+
+    def get_retry_hint_ms(self):
+        """
+        Returns the time the service suggested to wait before retrying the
+        operation, if it returned one.
+
+        :returns: the time to wait in milliseconds, 0 if the service did not
+            return a hint.
+        :rtype: int
+
+        :versionadded:: 5.6.0
+        """
+        return self._retry_hint_ms
 
     def ok_to_retry(self):
         return True
 
+    def set_retry_hint_ms(self, retry_hint_ms):
+        # Internal use only.
+        self._retry_hint_ms = retry_hint_ms
+
 
 class TableSizeException(NoSQLException):
     """
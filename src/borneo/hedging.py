@@ -0,0 +1,253 @@
+#
+# Copyright (c) 2018, 2026 Oracle and/or its affiliates. All rights reserved.
+#
+# Licensed under the Universal Permissive License v 1.0 as shown at
+#  https://oss.oracle.com/licenses/upl/
+#
+
+from copy import copy
+from functools import partial
+from threading import Condition, Lock, Thread
+from time import perf_counter
+
+try:
+    from contextvars import copy_context
+except ImportError:
+    # Python 3.5 and 3.6, the tracing is not supported.
+    copy_context = None
+
+from .operations import GetRequest
+from .stats import Percentile
+
+
+class Hedger(object):
+    """
+    Internal use only.
+
+    Hedges the get requests: when a request did not complete after the hedging
+    delay it is sent a second time, on another connection of the pool, while
+    the first request stays in flight. The first successful response is used,
+    so a single slow connection or proxy does not delay the request much more
+    than the hedging delay.
+
+    The hedge is only sent if the hedge budget allows it: each request adds
+    budget_percent / 100 tokens to a bucket and a hedge takes one, so the
+    hedges add at most budget_percent percent to the requests sent. The token
+    is reserved before the request is sent, a request sent without one runs in
+    the calling thread and waits for its response as long as its timeout
+    allows. If the delay is adaptive it is the 95th percentile of the latency
+    of the last :py:attr:`ADAPTIVE_SAMPLES` requests, the configured delay is
+    used until that many requests completed.
+
+    A request with a token and its hedge each run in a thread of their own
+    while the calling thread waits for the first success. The request that
+    loses is not interrupted: its response is discarded and its connection
+    closed when it arrives, the units it consumed are counted by the rate
+    limiters. If it fails instead, the units estimated and consumed before it
+    was sent are kept, as the service may have processed it.
+    """
+
+    # The number of requests whose latencies make the adaptive delay.
+    ADAPTIVE_SAMPLES = 1000
+    # The number of tokens the hedge budget can hold.
+    BUDGET_CAPACITY = 10.0
+
+    def __init__(self, execute, delay_ms, budget_percent, adaptive):
+        self._execute = execute
+        self._delay_ms = float(delay_ms)
+        self._budget_ratio = float(budget_percent) / 100
+        self._adaptive = adaptive
+        self._tokens = Hedger.BUDGET_CAPACITY
+        self._latencies = Percentile()
+        self.lock = Lock()
+        # The stats of the interval.
+        self._request_count = 0
+        self._hedge_count = 0
+        self._win_count = 0
+        self._denied_count = 0
+
+    def after_fork(self):
+        self.lock = Lock()
+
+    def execute(self, request):
+        """
+        Executes a request, hedging it if it is a get request.
+
+        :param request: the request.
+        :type request: Request
+        :returns: the result of the request.
+        :rtype: Result
+        """
+        if not isinstance(request, GetRequest):
+            return self._execute(request)
+        delay_ms = self.get_delay_ms()
+        start = perf_counter()
+        if not self._reserve_token():
+            result = self._execute(request)
+            latency_ms = (perf_counter() - start) * 1000
+            if latency_ms > delay_ms:
+                with self.lock:
+                    self._denied_count += 1
+            self._observe(latency_ms, False)
+            return result
+        # Taken before the request is sent, as sending sets its state.
+        hedge_request = copy(request)
+        attempts = HedgedAttempts(self._execute)
+        attempts.start(request)
+        attempt = attempts.wait(delay_ms / 1000)
+        if attempt is not None:
+            # Completed before the delay, no hedge is needed.
+            self._release_token()
+        else:
+            with self.lock:
+                self._hedge_count += 1
+            # The hedge has the time left of the request.
+            timeout_ms = request.get_timeout()
+            if timeout_ms > 0:
+                hedge_request.set_timeout(max(
+                    1, timeout_ms - int((perf_counter() - start) * 1000)))
+            attempts.start(hedge_request)
+            attempt = attempts.wait()
+        winner, result, error = attempt
+        if error is not None:
+            raise error
+        self._observe((perf_counter() - start) * 1000,
+                      winner is hedge_request)
+        return result
+
+    def get_delay_ms(self):
+        """
+        Returns the current hedging delay.
+
+        :returns: the delay in milliseconds.
+        :rtype: float
+        """
+        return self._delay_ms
+
+    def get_stats(self):
+        """
+        Returns the hedging delay and the stats of the interval, and resets
+        them.
+
+        :returns: the stats.
+        :rtype: dict
+        """
+        with self.lock:
+            stats = {'delayMs': round(self._delay_ms, 3),
+                     'requestCount': self._request_count,
+                     'hedgeCount': self._hedge_count,
+                     'winCount': self._win_count,
+                     'winRate': (0 if self._hedge_count == 0 else round(
+                         float(self._win_count) / self._hedge_count, 3)),
+                     'deniedCount': self._denied_count}
+            self._request_count = 0
+            self._hedge_count = 0
+            self._win_count = 0
+            self._denied_count = 0
+            return stats
+
+    def _observe(self, latency_ms, hedge_won):
+        with self.lock:
+            if hedge_won:
+                self._win_count += 1
+            if not self._adaptive:
+                return
+            self._latencies.add_value(latency_ms)
+            if self._latencies.get_count() >= Hedger.ADAPTIVE_SAMPLES:
+                self._delay_ms = self._latencies.get_95th99th_percentile()[0]
+                self._latencies.clear()
+
+    def _release_token(self):
+        # Returns the token of a request that completed before the delay.
+        with self.lock:
+            self._tokens = min(Hedger.BUDGET_CAPACITY, self._tokens + 1.0)
+
+    def _reserve_token(self):
+        # Counts a request and reserves a token of the hedge budget for it if
+        # there is one.
+        with self.lock:
+            self._request_count += 1
+            self._tokens = min(Hedger.BUDGET_CAPACITY,
+                               self._tokens + self._budget_ratio)
+            if self._tokens < 1.0:
+                return False
+            self._tokens -= 1.0
+            return True
+
+
+class HedgedAttempts(object):
+    """
+    Internal use only.
+
+    The attempts of a hedged request, each executed in a thread of its own.
+    The attempts still in flight when one succeeds are marked as losers, see
+    :py:meth:`Request.set_hedge_loser`.
+    """
+
+    def __init__(self, execute):
+        self._execute = execute
+        self._cond = Condition()
+        # The requests in flight.
+        self._running = list()
+        # The (request, result, exception) of the completed attempts, in the
+        # order they completed.
+        self._done = list()
+
+    def start(self, request):
+        """
+        Starts the execution of a request.
+
+        :param request: the request.
+        :type request: Request
+        """
+        with self._cond:
+            self._running.append(request)
+        target = partial(self._run, request)
+        if copy_context is not None:
+            # The spans of the attempt are children of the request span.
+            target = partial(copy_context().run, target)
+        thread = Thread(target=target)
+        thread.daemon = True
+        thread.start()
+
+    def wait(self, timeout_s=None):
+        """
+        Waits for an attempt to succeed, or for all attempts to fail.
+
+        :param timeout_s: the maximum time to wait in seconds, or None to wait
+            until an attempt succeeds or all failed.
+        :type timeout_s: float
+        :returns: the (request, result, exception) of the successful attempt,
+            or of the first failed one if all failed, or None if the timeout
+            expired first.
+        :rtype: tuple
+        """
+        end = None if timeout_s is None else perf_counter() + timeout_s
+        with self._cond:
+            while True:
+                for attempt in self._done:
+                    if attempt[2] is None:
+                        for request in self._running:
+                            request.set_hedge_loser(True)
+                        return attempt
+                if not self._running:
+                    return self._done[0]
+                if end is None:
+                    self._cond.wait()
+                else:
+                    remaining = end - perf_counter()
+                    if remaining <= 0:
+                        return None
+                    self._cond.wait(remaining)
+
+    def _run(self, request):
+        result = None
+        error = None
+        try:
+            result = self._execute(request)
+        except Exception as e:
+            error = e
+        with self._cond:
+            self._running.remove(request)
+            self._done.append((request, result, error))
+            self._cond.notify_all()
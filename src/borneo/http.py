@@ -5,20 +5,30 @@
 #  https://oss.oracle.com/licenses/upl/
 #
 
+import os
+import re
 from abc import ABCMeta, abstractmethod
 from io import UnsupportedOperation
 from logging import DEBUG
+from mmap import mmap
+from random import random
+from struct import pack_into, unpack_from
+from concurrent.futures import Future
 from threading import Lock
-from time import sleep, time
+from time import perf_counter, sleep, time
 
 from requests import ConnectionError, Timeout, codes
 
-from .common import ByteInputStream, CheckValue, HttpConstants, synchronized
+from .common import (
+    ByteInputStream, CheckValue, HttpConstants, Priority, synchronized)
 from .exception import (
-    IllegalStateException, NoSQLException,
-    ReadThrottlingException, RequestTimeoutException, RetryableException,
-    SecurityInfoNotReadyException, UnsupportedQueryVersionException,
-    UnsupportedProtocolException, WriteThrottlingException)
+    CircuitOpenException, IllegalStateException, NoSQLException,
+    OperationNotSupportedException, ReadThrottlingException,
+    RequestTimeoutException, RetryableException, SecurityInfoNotReadyException,
+    UnsupportedQueryVersionException, UnsupportedProtocolException,
+    WriteThrottlingException)
+from .estimator import UnitCostEstimator
+from .scheduler import get_scheduler
 from .serdeutil import SerdeUtil
 
 try:
@@ -30,6 +40,11 @@ except ImportError:
     import kv
     import operations
 
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
 
 class HttpResponse(object):
 
@@ -78,6 +93,24 @@ class RequestUtils(object):
         self._retry_handler = retry_handler
         self._client = client
         self._rate_limiter_map = rate_limiter_map
+        # Only the requests to the proxy are traced.
+        self._tracer = (None if client is None or request is None else
+                        client.get_tracer())
+        self._concurrency_limiters = (
+            None if client is None or request is None else
+            client.get_concurrency_limiters())
+        self._circuit_breakers = (
+            None if client is None or request is None else
+            client.get_circuit_breakers())
+        self._balancer = (
+            None if client is None or request is None else
+            client.get_balancer())
+        self._unit_estimator = (
+            None if client is None or request is None else
+            client.get_unit_estimator())
+        # The units consumed from the limiters before the request was sent, by
+        # limiter, until they are reconciled with the actual units.
+        self._precharged = None
         self._auth_provider = (
             None if client is None else client.get_auth_provider())
         self.lock = Lock()
@@ -196,6 +229,33 @@ class RequestUtils(object):
 
     def _do_request(self, method, uri, headers, payload, timeout_ms,
                     stats_config):
+        try:
+            if self._tracer is None:
+                return self._do_attempts(method, uri, headers, payload,
+                                         timeout_ms, stats_config, None)
+            attempts = self._tracer.attempts()
+            try:
+                res = self._do_attempts(method, uri, headers, payload,
+                                        timeout_ms, stats_config, attempts)
+            except Exception as e:
+                attempts.end(e)
+                raise
+            attempts.end()
+            return res
+        finally:
+            if self._precharged is not None:
+                # The request failed, the units consumed before it was sent
+                # are returned, unless it lost a hedge race: the service may
+                # have processed it.
+                if self._request is None or not self._request.is_hedge_loser():
+                    for rl, units in self._precharged.items():
+                        rl.consume_units_unconditionally(-units)
+                self._precharged = None
+
+    def _do_attempts(self, method, uri, headers, payload, timeout_ms,
+                     stats_config, attempts):
+        # Sends the request until it succeeds, fails or times out. If tracing
+        # is enabled each attempt is traced by attempts.
         exception = None
         start_ms = int(round(time() * 1000))
         num_retried = 0
@@ -205,8 +265,20 @@ class RequestUtils(object):
         check_write_units = False
         read_limiter = None
         write_limiter = None
+        concurrency_limiter = None
+        circuit_breaker = None
+        endpoint = None
+        shape = None
+        estimated_read_units = 0
+        estimated_write_units = 0
+        # The total delay of the retries after a server error.
+        server_error_delay_ms = 0
+        timings = None
         if self._request is not None:
             self._request.set_retry_stats(None)
+            if self._retry_handler is not None:
+                self._retry_handler.on_request(self._request)
+            timings = self._request.get_request_timings()
             # If the request itself specifies rate limiters, use them
             read_limiter = self._request.get_read_rate_limiter()
             if read_limiter is not None:
@@ -228,10 +300,31 @@ class RequestUtils(object):
                                 self._request.does_writes()):
                             self._client.background_update_limiters(table_name)
                     else:
+                        read_limiter = self._get_lane(read_limiter)
+                        write_limiter = self._get_lane(write_limiter)
                         check_read_units = self._request.does_reads()
                         self._request.set_read_rate_limiter(read_limiter)
                         check_write_units = self._request.does_writes()
                         self._request.set_write_rate_limiter(write_limiter)
+            if self._concurrency_limiters is not None:
+                table_name = self._request.get_table_name()
+                if table_name is not None and (self._request.does_reads() or
+                                               self._request.does_writes()):
+                    concurrency_limiter = (
+                        self._concurrency_limiters.get_limiter(table_name))
+            if self._circuit_breakers is not None and self._balancer is None:
+                # With several endpoints, the circuit breaker is the one of the
+                # endpoint of each attempt.
+                circuit_breaker = self._circuit_breakers.get_breaker(
+                    self._request.get_table_name())
+            if (self._unit_estimator is not None and payload is not None and
+                    (check_read_units or check_write_units) and
+                    self._request.get_table_name() is not None):
+                # The estimated units are consumed before the request is sent.
+                shape = UnitCostEstimator.get_shape(
+                    self._request, len(payload))
+                estimated_read_units, estimated_write_units = (
+                    self._unit_estimator.estimate(shape))
             start_ms = int(round(time() * 1000))
             self._request.set_start_time_ms(start_ms)
 
@@ -239,8 +332,29 @@ class RequestUtils(object):
             this_time = int(round(time() * 1000))
             this_iteration_timeout_ms = timeout_ms - (this_time - start_ms)
             this_iteration_timeout_s = (float(this_iteration_timeout_ms) / 1000)
+            if attempts is not None:
+                attempts.start(headers)
             if self._request is not None:
                 self._client.check_request(self._request)
+                if self._balancer is not None:
+                    # Another endpoint than the one of the previous attempt is
+                    # preferred.
+                    endpoint = self._choose_endpoint(endpoint)
+                    uri = endpoint.get_request_uri()
+                    headers['Host'] = endpoint.get_host()
+                    if self._circuit_breakers is not None:
+                        circuit_breaker = self._circuit_breakers.get_breaker(
+                            self._request.get_table_name(),
+                            endpoint.get_name())
+                if circuit_breaker is not None:
+                    # Fail fast, without waiting for the limiters, while the
+                    # endpoint is down.
+                    try:
+                        circuit_breaker.check()
+                    except CircuitOpenException as coe:
+                        if stats_config is not None:
+                            stats_config.observe_error(self._request, coe)
+                        raise
                 """
                 Check rate limiters before executing the request. Wait for read
                 and/or write limiters to be below their limits before
@@ -251,9 +365,10 @@ class RequestUtils(object):
                         # This may sleep for a while, up to
                         # this_iteration_timeout_ms and may throw
                         # TimeoutException.
-                        rate_delayed_ms += (
-                            read_limiter.consume_units_with_timeout(
-                                0, this_iteration_timeout_ms, False))
+                        rate_delayed_ms += self._wait_for_limiter(
+                            read_limiter, this_iteration_timeout_ms,
+                            estimated_read_units)
+                        self._precharge(read_limiter, estimated_read_units)
                     except Exception as e:
                         exception = e
                         break
@@ -262,9 +377,10 @@ class RequestUtils(object):
                         # This may sleep for a while, up to
                         # this_iteration_timeout_ms and may throw
                         # TimeoutException.
-                        rate_delayed_ms += (
-                            write_limiter.consume_units_with_timeout(
-                                0, this_iteration_timeout_ms, False))
+                        rate_delayed_ms += self._wait_for_limiter(
+                            write_limiter, this_iteration_timeout_ms,
+                            estimated_write_units)
+                        self._precharge(write_limiter, estimated_write_units)
                     except Exception as e:
                         exception = e
                         break
@@ -272,23 +388,42 @@ class RequestUtils(object):
                 if self._timeout_request(start_ms, timeout_ms):
                     break
                 if self._auth_provider is not None:
-                    content = payload if self.require_content_signed() else None
-                    auth_string = self._auth_provider.get_authorization_string(
-                        self._request)
-                    self._auth_provider.validate_auth_string(auth_string)
-                    self._auth_provider.set_required_headers(
-                        self._request, auth_string, headers, content)
+                    if timings is not None:
+                        signing_start = perf_counter()
+                    if self._tracer is None:
+                        self._sign_request(headers, payload)
+                    else:
+                        with self._tracer.span('nosql.sign'):
+                            self._sign_request(headers, payload)
+                    if timings is not None:
+                        timings.add_signing_ms(
+                            (perf_counter() - signing_start) * 1000)
                 num_retried = self._request.get_num_retries()
             if num_retried > 0:
                 self._log_retried(num_retried, exception)
             response = None
-            network_time = 0
-            if stats_config is not None:
-                time()
             req_size = 0
             if payload is not None:
                 req_size = len(payload)
+            permit = None
+            if concurrency_limiter is not None:
+                # Wait for the requests in flight to the table to be below the
+                # adaptive limit, within the timeout.
+                permit = concurrency_limiter.acquire(
+                    self._request.get_request_name(),
+                    timeout_ms - (int(round(time() * 1000)) - start_ms))
+                if permit is None:
+                    break
+                sent = perf_counter()
+            # The wait for the adaptive limit is not network time.
+            network_time = 0
+            if stats_config is not None:
+                network_time = perf_counter()
 
+            sess = self._sess
+            if endpoint is not None:
+                sess = endpoint.get_session()
+                self._balancer.start(endpoint)
             try:
                 # this logic is accounting for the fact that there may
                 # be kv requests that do not have a request instance, and
@@ -296,18 +431,34 @@ class RequestUtils(object):
                 if self._request is None and payload is not None:
                     payload, req_size = payload.encode()
                 if payload is None:
-                    response = self._sess.request(
+                    response = sess.request(
                         method, uri, headers=headers,
                         timeout=this_iteration_timeout_s)
                 else:
                     # wrap the payload to make it compatible with pyOpenSSL,
                     # there maybe small cost to wrap it.
-                    response = self._sess.request(
+                    response = sess.request(
                         method, uri, headers=headers, data=memoryview(payload),
                         timeout=this_iteration_timeout_s)
+                if attempts is not None:
+                    attempts.set_status_code(response.status_code)
+                if permit is not None:
+                    latency_ms = (perf_counter() - sent) * 1000
+                if circuit_breaker is not None:
+                    if response.status_code >= codes.server_error:
+                        circuit_breaker.on_failure()
+                    else:
+                        circuit_breaker.on_success()
+                if endpoint is not None:
+                    if response.status_code >= codes.server_error:
+                        self._balancer.on_failure(endpoint)
+                    else:
+                        self._balancer.on_success(endpoint)
                 if stats_config is not None:
                     network_time = int(round(
-                        (time() - network_time) * 1000000)) / 1000
+                        (perf_counter() - network_time) * 1000000)) / 1000
+                    if timings is not None:
+                        timings.add_network_ms(network_time)
                 if self._logutils.is_enabled_for(DEBUG):
                     self._logutils.log_debug(
                         'Response: ' + self._request.__class__.__name__ +
@@ -316,8 +467,15 @@ class RequestUtils(object):
                     self._client.set_proxy_info(
                         response.headers.get(HttpConstants.RESPONSE_PROXY_INFO))
                 if self._request is not None:
+                    if timings is not None:
+                        deserialization_start = perf_counter()
                     res = self._process_response(
                         self._request, response.content, response.status_code)
+                    if permit is not None:
+                        permit.release(latency_ms)
+                    if timings is not None:
+                        timings.add_deserialization_ms(
+                            (perf_counter() - deserialization_start) * 1000)
                     # set server's serial version if available
                     server_version = response.headers.get(
                         HttpConstants.SERVER_SERIAL_VERSION)
@@ -336,21 +494,32 @@ class RequestUtils(object):
                             write_limiter is None):
                         write_limiter = self._get_query_rate_limiter(False)
 
-                    # Consume rate limiter units based on actual usage.
-                    rate_delayed_ms += RequestUtils._consume_limiter_units(
-                        read_limiter, res.get_read_units(),
+                    # Consume rate limiter units based on actual usage, less
+                    # the units consumed before the request was sent.
+                    rate_delayed_ms += self._consume_limiter_units(
+                        read_limiter, res.get_read_units() -
+                        self._take_precharge(read_limiter),
                         this_iteration_timeout_ms)
-                    rate_delayed_ms += RequestUtils._consume_limiter_units(
-                        write_limiter, res.get_write_units(),
+                    rate_delayed_ms += self._consume_limiter_units(
+                        write_limiter, res.get_write_units() -
+                        self._take_precharge(write_limiter),
                         this_iteration_timeout_ms)
+                    if shape is not None:
+                        self._unit_estimator.observe(
+                            shape, res.get_read_units(),
+                            res.get_write_units())
                     res.set_rate_limit_delayed_ms(rate_delayed_ms)
                     self._request.set_rate_limit_delayed_ms(rate_delayed_ms)
                     # Copy retry stats to Result on successful operation.
                     res.set_retry_stats(self._request.get_retry_stats())
+                    if timings is not None:
+                        timings.add_rate_limit_ms(rate_delayed_ms)
+                        timings.end()
+                        res.set_request_timings(timings)
                     if stats_config is not None:
                         stats_config.observe(self._request, req_size,
                                              len(response.content),
-                                             network_time)
+                                             network_time, res)
                     # check for a Set-Cookie header
                     cookie = response.headers.get('Set-Cookie', None)
                     if cookie is not None and cookie.startswith('session='):
@@ -359,9 +528,6 @@ class RequestUtils(object):
                 else:
                     res = HttpResponse(response.content.decode(),
                                        response.status_code)
-                    if stats_config is not None:
-                        network_time = int(round(
-                            (time() - network_time) * 1000000)) / 1000
                     """
                     Retry upon status code larger than 500, in general, this
                     indicates server internal error.
@@ -372,6 +538,14 @@ class RequestUtils(object):
                             'code ' + str(res.get_status_code()) +
                             ' , response ' + res.get_content())
                         num_retried += 1
+                        # Back off before the retry, not to hammer a server
+                        # that is down.
+                        delay_ms = self._server_error_delay(
+                            server_error_delay_ms, start_ms, timeout_ms)
+                        if delay_ms <= 0:
+                            break
+                        sleep(float(delay_ms) / 1000)
+                        server_error_delay_ms += delay_ms
                         continue
                     if stats_config is not None:
                         stats_config.observe(None, 0, len(response.content),
@@ -380,6 +554,10 @@ class RequestUtils(object):
             except kv.AuthenticationException as ae:
                 if (self._auth_provider is not None and isinstance(
                         self._auth_provider, kv.StoreAccessTokenProvider)):
+                    if attempts is not None:
+                        attempts.end(ae)
+                    if permit is not None:
+                        permit.release(error=ae)
                     self._auth_provider.bootstrap_login()
                     self._request.add_retry_exception(ae.__class__.__name__)
                     self._request.increment_retries()
@@ -388,9 +566,13 @@ class RequestUtils(object):
                 self._logutils.log_error(
                     'Unexpected authentication exception: ' + str(ae))
                 if stats_config is not None:
-                    stats_config.observe_error(self._request)
+                    stats_config.observe_error(self._request, ae)
                 raise NoSQLException('Unexpected exception: ' + str(ae), ae)
             except SecurityInfoNotReadyException as se:
+                if attempts is not None:
+                    attempts.end(se)
+                if permit is not None:
+                    permit.release(error=se)
                 self._request.add_retry_exception(se.__class__.__name__)
                 delay_ms = RequestUtils.SEC_ERROR_DELAY_MS
                 if self._request.get_num_retries() > 10:
@@ -419,6 +601,11 @@ class RequestUtils(object):
                     if read_limiter.get_current_rate() < 100.0:
                         read_limiter.set_current_rate(100.0)
                 self._logutils.log_debug('Retryable exception: ' + str(re))
+                if attempts is not None:
+                    attempts.end(re)
+                if permit is not None:
+                    # A throttled request decreases the adaptive limit.
+                    permit.release(error=re)
                 """
                 Handle automatic retries. If this does not throw an error, then
                 the delay (if any) will have been performed and the request
@@ -435,8 +622,7 @@ class RequestUtils(object):
             except UnsupportedQueryVersionException as uqve:
                 if self._client.decrement_query_version():
                     if self._request is not None:
-                        payload = self._client.serialize_request(self._request,
-                                                                 headers)
+                        payload = self._serialize_request(headers, timings)
                     self._request.increment_retries()
                     # don't set exception for this case -- it is misleading
                     # exception = uqve
@@ -448,8 +634,7 @@ class RequestUtils(object):
             except UnsupportedProtocolException as upe:
                 if self._client.decrement_serial_version():
                     if self._request is not None:
-                        payload = self._client.serialize_request(self._request,
-                                                                 headers)
+                        payload = self._serialize_request(headers, timings)
                     self._request.increment_retries()
                     # don't set exception for this case -- it is misleading
                     # exception = upe
@@ -461,28 +646,51 @@ class RequestUtils(object):
                 self._logutils.log_error(
                     'Client execution NoSQLException: ' + str(nse))
                 if stats_config is not None:
-                    stats_config.observe_error(self._request)
+                    stats_config.observe_error(self._request, nse)
                 raise nse
             except RuntimeError as re:
                 self._logutils.log_error(
                     'Client execution RuntimeError: ' + str(re))
                 if stats_config is not None:
-                    stats_config.observe_error(self._request)
+                    stats_config.observe_error(self._request, re)
                 raise re
             except ConnectionError as ce:
                 self._logutils.log_error(
                     'HTTP request execution ConnectionError: ' + str(ce))
+                if circuit_breaker is not None:
+                    circuit_breaker.on_failure()
+                if endpoint is not None:
+                    self._balancer.on_failure(endpoint)
+                    if (self._balancer.can_fail_over(endpoint) and
+                            not self._timeout_request(start_ms, timeout_ms)):
+                        # Retry on another endpoint.
+                        if attempts is not None:
+                            attempts.end(ce)
+                        self._request.add_retry_exception(
+                            ce.__class__.__name__)
+                        self._request.increment_retries()
+                        exception = ce
+                        continue
                 if stats_config is not None:
-                    stats_config.observe_error(self._request)
+                    stats_config.observe_error(self._request, ce)
                 raise ce
             except Timeout as t:
+                if circuit_breaker is not None and response is None:
+                    # The endpoint did not answer in time.
+                    circuit_breaker.on_failure()
+                if endpoint is not None and response is None:
+                    self._balancer.on_failure(endpoint)
                 if self._request is not None:
                     self._logutils.log_error('Timeout exception: ' + str(t))
                     break  # fall through to exception below
                 if stats_config is not None:
-                    stats_config.observe_error(self._request)
+                    stats_config.observe_error(self._request, t)
                 raise RuntimeError('Timeout exception: ' + str(t))
             finally:
+                if permit is not None:
+                    permit.release()
+                if endpoint is not None:
+                    self._balancer.release(endpoint)
                 if response is not None:
                     response.close()
             if self._timeout_request(start_ms, timeout_ms):
@@ -491,12 +699,23 @@ class RequestUtils(object):
         if self._request is not None:
             retry_stats = self._request.get_retry_stats()
             num_retried = self._request.get_num_retries()
-        if stats_config is not None:
-            stats_config.observe_error(self._request)
-        raise RequestTimeoutException(
+        timeout_exception = RequestTimeoutException(
             'Request timed out after ' + str(num_retried) +
             (' retry.' if num_retried == 0 or num_retried == 1
              else ' retries. ') + str(retry_stats), timeout_ms, exception)
+        if stats_config is not None:
+            stats_config.observe_error(self._request, timeout_exception)
+        raise timeout_exception
+
+    def _serialize_request(self, headers, timings):
+        # Serializes the request again after a protocol or query version
+        # change.
+        if timings is None:
+            return self._client.serialize_request(self._request, headers)
+        start = perf_counter()
+        payload = self._client.serialize_request(self._request, headers)
+        timings.add_serialization_ms((perf_counter() - start) * 1000)
+        return payload
 
     def require_content_signed(self):
         """
@@ -508,13 +727,70 @@ class RequestUtils(object):
             isinstance(self._request, operations.DropReplicaRequest) or \
             isinstance(self._request, operations.TableRequest)
 
-    @staticmethod
-    def _consume_limiter_units(rl, units, timeout_ms):
+    def _sign_request(self, headers, payload):
+        content = payload if self.require_content_signed() else None
+        auth_string = self._auth_provider.get_authorization_string(
+            self._request)
+        self._auth_provider.validate_auth_string(auth_string)
+        self._auth_provider.set_required_headers(
+            self._request, auth_string, headers, content)
+
+    def _wait_for_limiter(self, rl, timeout_ms, units=0):
+        """
+        Wait for a rate limiter to be below its limit before an operation,
+        consuming the estimated units of the operation. Returns the number of
+        milliseconds delayed, raises a timeout exception if the limiter cannot
+        be used within timeout_ms, in which case the units are not consumed.
+        """
+        if self._tracer is None:
+            return rl.consume_units_with_timeout(units, timeout_ms, False)
+        start_ns = int(round(time() * 1000000000))
+        delay_ms = rl.consume_units_with_timeout(units, timeout_ms, False)
+        self._trace_limiter_wait(start_ns, units, delay_ms)
+        return delay_ms
+
+    def _precharge(self, rl, units):
+        # Records units consumed from a limiter before the request is sent.
+        if units <= 0:
+            return
+        if self._precharged is None:
+            self._precharged = dict()
+        self._precharged[rl] = self._precharged.get(rl, 0) + units
+
+    def _take_precharge(self, rl):
+        # Returns the units consumed from a limiter before the request was
+        # sent, they are reconciled with the actual units.
+        if self._precharged is None or rl is None:
+            return 0
+        units = self._precharged.pop(rl, 0)
+        if not self._precharged:
+            self._precharged = None
+        return units
+
+    def _choose_endpoint(self, excluded):
+        # Chooses the endpoint of an attempt, avoiding the one of the previous
+        # attempt and, if another endpoint can be used, one whose circuit is
+        # open.
+        endpoint = self._balancer.choose(excluded)
+        if (self._circuit_breakers is None or
+                not self._circuit_breakers.get_breaker(
+                    self._request.get_table_name(),
+                    endpoint.get_name()).is_open() or
+                not self._balancer.can_fail_over(endpoint)):
+            return endpoint
+        return self._balancer.choose(endpoint)
+
+    def _consume_limiter_units(self, rl, units, timeout_ms):
         """
         Consume rate limiter units after successful operation. Returns the
         number of milliseconds delayed due to rate limiting.
         """
-        if rl is None or units <= 0:
+        if rl is None or units == 0:
+            return 0
+        if units < 0:
+            # More units were consumed before the operation than it used, the
+            # excess is returned.
+            rl.consume_units_unconditionally(units)
             return 0
         """
         The logic consumes units (and potentially delays) _after_ a successful
@@ -529,11 +805,25 @@ class RequestUtils(object):
           threads will get staggered better to avoid spikes in throughput and
           oscillation that can result from it.
         """
+        if self._tracer is not None:
+            start_ns = int(round(time() * 1000000000))
         try:
-            return rl.consume_units_with_timeout(units, timeout_ms, False)
+            delay_ms = rl.consume_units_with_timeout(units, timeout_ms, False)
         except Timeout:
             # Don't throw - operation succeeded. Just return timeout_ms.
-            return timeout_ms
+            delay_ms = timeout_ms
+        if self._tracer is not None:
+            self._trace_limiter_wait(start_ns, units, delay_ms)
+        return delay_ms
+
+    def _trace_limiter_wait(self, start_ns, units, delay_ms):
+        # Only the waits are traced, most operations do not wait.
+        if delay_ms > 0:
+            self._tracer.add_span(
+                'nosql.rate_limiter.wait', start_ns,
+                int(round(time() * 1000000000)),
+                {'nosql.rate_limiter.units': units,
+                 'nosql.rate_limiter.delay_ms': delay_ms})
 
     def _get_query_rate_limiter(self, read):
         """
@@ -555,8 +845,17 @@ class RequestUtils(object):
         if table_name is None or table_name == '':
             return None
         if read:
-            return self._rate_limiter_map.get_read_limiter(table_name)
-        return self._rate_limiter_map.get_write_limiter(table_name)
+            return self._get_lane(
+                self._rate_limiter_map.get_read_limiter(table_name))
+        return self._get_lane(
+            self._rate_limiter_map.get_write_limiter(table_name))
+
+    def _get_lane(self, rl):
+        # Returns the lane of the priority class of the request if the limiter
+        # shares its limit between priority classes.
+        if isinstance(rl, FairRateLimiter):
+            return rl.get_lane(self._request.get_priority())
+        return rl
 
     def _handle_retry(self, re, request):
         num_retries = self._request.get_num_retries()
@@ -570,6 +869,17 @@ class RequestUtils(object):
             raise re
         handler.delay(request, num_retries, re)
 
+    @staticmethod
+    def _server_error_delay(retry_delay_ms, start_time, request_timeout):
+        # Returns the delay before the retry of a request that has no Request
+        # instance after a server error. As with
+        # DefaultRetryHandler.compute_backoff_delay, it is the total delay of
+        # the previous retries plus about 200ms. Returns 0, not to retry, if
+        # the request would time out before the end of the delay.
+        delay_ms = retry_delay_ms + 200 + int(random() * 50)
+        ms_left = start_time + request_timeout - int(round(time() * 1000))
+        return delay_ms if delay_ms < ms_left else 0
+
     def _log_retried(self, num_retried, exception):
         msg = ('Client, doing retry: ' + str(num_retried) +
                ('' if exception is None else ', exception: ' + str(exception)))
@@ -892,6 +1202,16 @@ class RateLimiter(object):
         """
         raise UnsupportedOperation('Duration not implemented')
 
+    def after_fork(self):
+        """
+        Called by the driver in a child process created by os.fork, it
+        re-creates the locks of the rate limiter. The state of the limiter is
+        kept. By default it does nothing.
+
+        :versionadded:: 5.6.0
+        """
+        pass
+
     @abstractmethod
     def get_limit_per_second(self):
         """
@@ -989,12 +1309,31 @@ class RateLimiterMap(object):
     """
     A map of table names to RateLimiter instances.
     Each entry in the map has both a read and write rate limiter instance.
+
+    The limiters are instances of :py:class:`FairRateLimiter` which share the
+    limits between the priority classes of the requests, using the given
+    weights. If a directory is given, the limiters are instances of
+    :py:class:`SharedRateLimiter` whose state is kept in the files
+    <table>.read and <table>.write of the directory, shared by the processes
+    of the host that use the same directory, the priority classes are not
+    used in this case.
     """
+    # The characters of the table names that are not used in the file names.
+    _FILE_NAME_CHARS = re.compile(r'[^\w.-]')
 
-    def __init__(self):
+    def __init__(self, directory=None, weights=None):
+        self._directory = directory
+        self._weights = weights
         self._limiter_map = dict()
         self.lock = Lock()
 
+    def after_fork(self):
+        # Re-create the locks in a child process, the limiters are kept.
+        self.lock = Lock()
+        for rle in self._limiter_map.values():
+            rle.read_limiter.after_fork()
+            rle.write_limiter.after_fork()
+
     def clear(self):
         # Clear all rate limiters from map.
         self._limiter_map.clear()
@@ -1029,6 +1368,28 @@ class RateLimiterMap(object):
             return None
         return rle.write_limiter
 
+    def get_stats(self):
+        """
+        Internal use only.
+
+        Returns the stats of the priority classes of the limiters by table
+        since the last call, and resets them.
+
+        :returns: the stats.
+        :rtype: list
+        """
+        with self.lock:
+            entries = sorted(self._limiter_map.items())
+        stats = list()
+        for table_name, rle in entries:
+            for direction, limiter in (('read', rle.read_limiter),
+                                       ('write', rle.write_limiter)):
+                if isinstance(limiter, FairRateLimiter):
+                    stats.append({'table': table_name,
+                                  'direction': direction,
+                                  'priorities': limiter.get_stats()})
+        return stats
+
     def limiters_exist(self, table_name):
         """
         Return True if a pair of limiters exist for given table. This can be
@@ -1078,8 +1439,10 @@ class RateLimiterMap(object):
         lower_table = table_name.lower()
         rle = self._limiter_map.get(lower_table)
         if rle is None:
-            rrl = SimpleRateLimiter(read_units, duration_seconds)
-            wrl = SimpleRateLimiter(write_units, duration_seconds)
+            rrl = self._create_limiter(
+                lower_table, '.read', read_units, duration_seconds)
+            wrl = self._create_limiter(
+                lower_table, '.write', write_units, duration_seconds)
             self._limiter_map[lower_table] = RateLimiterMap.Entry(rrl, wrl)
         else:
             # Set existing limiters to new values. If the new values result in a
@@ -1093,6 +1456,14 @@ class RateLimiterMap(object):
             if rle.write_limiter.get_limit_per_second() != prev_wus:
                 rle.write_limiter.reset()
 
+    def _create_limiter(self, lower_table, suffix, units, duration_seconds):
+        if self._directory is None:
+            return FairRateLimiter(units, duration_seconds, self._weights)
+        file_name = os.path.join(
+            self._directory,
+            RateLimiterMap._FILE_NAME_CHARS.sub('_', lower_table) + suffix)
+        return SharedRateLimiter(file_name, units, duration_seconds)
+
     class Entry(object):
 
         def __init__(self, read_limiter, write_limiter):
@@ -1110,7 +1481,10 @@ class SimpleRateLimiter(RateLimiter):
 
     When units are consumed, the last_nano value is incremented by
     (units * nanos_per_unit). If the result is greater than the current time, a
-    single sleep() is called to wait for the time difference.
+    single sleep() is called to wait for the time difference. The
+    :py:meth:`reserve_units` and :py:meth:`consume_units_async` methods consume
+    the units the same way but return the time to wait, or a future completed
+    after it, instead of sleeping in the calling thread.
 
     This method inherently "queues" the consume calls, since each consume will
     increment the last_nano time. For example, a request for a small number of
@@ -1155,6 +1529,9 @@ class SimpleRateLimiter(RateLimiter):
                 str(self.get_capacity()) + ', rate=' +
                 str(self.get_current_rate()))
 
+    def after_fork(self):
+        self.lock = Lock()
+
     def consume_externally(self, units):
         """
         Consumes units and returns the time to sleep.
@@ -1185,6 +1562,48 @@ class SimpleRateLimiter(RateLimiter):
         # Return the amount of time slept
         return ms_to_sleep
 
+    def consume_units_async(self, units, timeout_ms=0, always_consume=False):
+        """
+        Attempts to consume a number of units without blocking the calling
+        thread.
+
+        The units are reserved like :py:meth:`reserve_units` does, and the
+        returned future is completed by the scheduler thread of the driver once
+        the limiter would have let a blocking consume go. This allows a caller
+        that runs many logical workers on a few threads to park a worker on the
+        future instead of sleeping in one of the threads.
+
+        :param units: the number of units to consume. This can be a negative
+            value to "give back" units.
+        :type units: int
+        :param timeout_ms: the timeout in milliseconds. Pass 0 to wait
+            indefinitely.
+        :type timeout_ms: int
+        :param always_consume: if True, consume units even on timeout.
+        :type always_consume: bool
+        :returns: a future whose result is the amount of time waited in
+            milliseconds, or whose exception is a Timeout raised after
+            timeout_ms if the units can not be acquired in time.
+        :rtype: concurrent.futures.Future
+        :raises IllegalArgumentException: raises the exception if timeout_ms is
+            a negative number.
+
+        :versionadded:: 5.6.0
+        """
+        future = Future()
+        try:
+            ms_to_wait = self.reserve_units(units, timeout_ms, always_consume)
+        except Timeout as e:
+            get_scheduler().schedule(
+                float(timeout_ms) / 1000, future.set_exception, e)
+            return future
+        if ms_to_wait == 0:
+            future.set_result(0)
+        else:
+            get_scheduler().schedule(
+                float(ms_to_wait) / 1000, future.set_result, ms_to_wait)
+        return future
+
     def consume_units_unconditionally(self, units):
         # Consume units, ignore amount of time to sleep.
         self._consume(
@@ -1238,6 +1657,44 @@ class SimpleRateLimiter(RateLimiter):
             return 0.0
         return SimpleRateLimiter.NANOS / self._nanos_per_unit
 
+    def reserve_units(self, units, timeout_ms=0, always_consume=False):
+        """
+        Attempts to consume a number of units and returns the time the caller
+        must wait before using them, instead of sleeping.
+
+        The units are consumed as by :py:meth:`consume_units_with_timeout`, so
+        the consumes made after this one are queued behind it whether or not
+        the caller waits. The caller may sleep, schedule its work after the
+        returned time or park it on :py:meth:`consume_units_async`.
+
+        :param units: the number of units to consume. This can be a negative
+            value to "give back" units.
+        :type units: int
+        :param timeout_ms: the timeout in milliseconds. Pass 0 to wait
+            indefinitely.
+        :type timeout_ms: int
+        :param always_consume: if True, consume units even on timeout.
+        :type always_consume: bool
+        :returns: the time to wait in milliseconds. If not needed to wait, 0 is
+            returned.
+        :rtype: float
+        :raises Timeout: raises the exception immediately if the units can not
+            be acquired before the timeout. The units are consumed anyway if
+            always_consume is True.
+        :raises IllegalArgumentException: raises the exception if timeout_ms is
+            a negative number.
+
+        :versionadded:: 5.6.0
+        """
+        CheckValue.check_int_ge_zero(timeout_ms, 'timeout_ms')
+        ms_to_wait = self._consume(
+            units, timeout_ms, always_consume,
+            int(round(time() * SimpleRateLimiter.NANOS)))
+        if 0 < timeout_ms <= ms_to_wait:
+            raise Timeout('Timed out waiting ' + str(timeout_ms) + 'ms for ' +
+                          str(units) + ' units in rate limiter.')
+        return ms_to_wait
+
     def reset(self):
         self._last_nano = int(round(time() * SimpleRateLimiter.NANOS))
 
@@ -1276,8 +1733,12 @@ class SimpleRateLimiter(RateLimiter):
 
     @synchronized
     def _consume(self, units, timeout_ms, always_consume, now_nanos):
+        return self._do_consume(units, timeout_ms, always_consume, now_nanos)
+
+    def _do_consume(self, units, timeout_ms, always_consume, now_nanos):
         """
-        Returns the time to sleep to consume units.
+        Returns the time to sleep to consume units, the lock of the limiter
+        must be held.
 
         Note this method returns immediately in all cases. It returns the number
         of milliseconds to sleep.
@@ -1351,3 +1812,346 @@ class SimpleRateLimiter(RateLimiter):
         """
         if self._duration_nanos < self._nanos_per_unit:
             self._duration_nanos = self._nanos_per_unit
+
+
+class SharedRateLimiter(SimpleRateLimiter):
+    """
+    Internal use only.
+
+    A :py:class:`SimpleRateLimiter` whose last_nano value is shared by the
+    processes of a host, so that they draw from a single budget.
+
+    The last_nano value is kept in a file of 8 bytes mapped in memory by all
+    the limiters that use the file. It is read and updated under an exclusive
+    fcntl lock of the file, which serializes the processes, and a lock of the
+    limiter, which serializes the threads of a process as fcntl locks are
+    held by processes. The limits and the duration are not shared, each
+    limiter uses its own, like the SimpleRateLimiter. The consume calls sleep
+    in the process that consumes the units, so a process sleeping for its
+    units does not block the others.
+
+    The limiters are created without resetting the shared value if another
+    limiter already uses the file, so a new process does not discard the units
+    consumed by the others.
+    """
+
+    def __init__(self, file_name, rate_limit_per_sec, duration_secs=1.0):
+        """
+        Creates a rate limiter shared by the limiters that use the same file.
+
+        :param file_name: the name of the file that keeps the shared state of
+            the limiter, it is created if it does not exist.
+        :type file_name: str
+        :param rate_limit_per_sec: the maximum number of units allowed per
+            second.
+        :type rate_limit_per_sec: float
+        :param duration_secs: maximum amount of time to consume unused units
+            from the past, default is 1 second.
+        :type duration_secs: float
+        :raises OperationNotSupportedException: raises the exception if the
+            fcntl module is not available.
+        """
+        if fcntl is None:
+            raise OperationNotSupportedException(
+                'Shared rate limiters require the fcntl module, they are ' +
+                'not supported on this platform.')
+        self._duration_nanos = 0
+        self._nanos_per_unit = 0
+        self._file = os.fdopen(
+            os.open(file_name, os.O_RDWR | os.O_CREAT, 0o600), 'r+b')
+        self.lock = SharedRateLimiter.FileLock(self._file.fileno())
+        with self.lock:
+            if os.fstat(self._file.fileno()).st_size < 8:
+                os.ftruncate(self._file.fileno(), 8)
+        self._mmap = mmap(self._file.fileno(), 8)
+        self.set_limit_per_second(rate_limit_per_sec)
+        self.set_duration(duration_secs)
+        with self.lock:
+            # Only the first limiter of the file starts from the current time.
+            if self._last_nano == 0:
+                SimpleRateLimiter.reset(self)
+
+    @property
+    def _last_nano(self):
+        return unpack_from('<q', self._mmap)[0]
+
+    @_last_nano.setter
+    def _last_nano(self, last_nano):
+        pack_into('<q', self._mmap, 0, int(last_nano))
+
+    def after_fork(self):
+        # The mapping is shared with the parent, only the locks are re-created.
+        self.lock = SharedRateLimiter.FileLock(self._file.fileno())
+
+    def reset(self):
+        with self.lock:
+            SimpleRateLimiter.reset(self)
+
+    def set_current_rate(self, percent):
+        with self.lock:
+            SimpleRateLimiter.set_current_rate(self, percent)
+
+    class FileLock(object):
+        # Locks a file against the other threads of the process, then against
+        # the other processes.
+
+        def __init__(self, fd):
+            self._fd = fd
+            self._lock = Lock()
+
+        def __enter__(self):
+            self._lock.acquire()
+            try:
+                fcntl.lockf(self._fd, fcntl.LOCK_EX)
+            except BaseException:
+                self._lock.release()
+                raise
+            return self
+
+        def __exit__(self, exc_type, exc_val, exc_tb):
+            try:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN)
+            finally:
+                self._lock.release()
+
+
+class FairRateLimiter(RateLimiter):
+    """
+    Internal use only.
+
+    A rate limiter that shares its limit between the priority classes of the
+    requests, see :py:class:`Priority`, in proportion to their weights.
+
+    Each class uses a lane, a :py:class:`SimpleRateLimiter` whose limit is the
+    share of the class, obtained with :py:meth:`get_lane`. A lane without
+    units available borrows the units that another lane accumulated and did
+    not use, so the limit is not wasted when a class is idle, a class alone
+    can use the whole limit. A lane never lends more than it accumulated,
+    lending does not delay the requests of the lender, so each class always
+    gets at least its share: a batch class can not delay the interactive
+    requests by more than its share, and it is never starved by them.
+
+    The lanes are created on first use, the limit is only shared by the
+    classes that used the limiter, so a limiter used by a single class
+    behaves as a SimpleRateLimiter. The methods of the RateLimiter interface
+    use the lane of :py:attr:`Priority.INTERACTIVE`, except the limit, the
+    duration and :py:meth:`reset` which apply to all the lanes.
+    """
+    # The default weights of the priority classes.
+    DEFAULT_WEIGHTS = {Priority.INTERACTIVE: 4, Priority.BATCH: 1}
+    # The names of the priority classes in the stats.
+    PRIORITY_NAMES = {Priority.INTERACTIVE: 'interactive',
+                      Priority.BATCH: 'batch'}
+
+    def __init__(self, rate_limit_per_sec, duration_secs=1.0, weights=None):
+        """
+        Creates a rate limiter shared by priority classes.
+
+        :param rate_limit_per_sec: the maximum number of units allowed per
+            second.
+        :type rate_limit_per_sec: float
+        :param duration_secs: maximum amount of time to consume unused units
+            from the past, default is 1 second.
+        :type duration_secs: float
+        :param weights: the weights of the priority classes, by default 4 for
+            interactive requests and 1 for batch requests.
+        :type weights: dict
+        """
+        self._limit_per_sec = rate_limit_per_sec
+        self._duration_secs = duration_secs
+        self._weights = (dict(FairRateLimiter.DEFAULT_WEIGHTS) if
+                         weights is None else dict(weights))
+        self._lanes = dict()
+        self.lock = Lock()
+        self.get_lane(Priority.INTERACTIVE)
+
+    def __str__(self):
+        return ', '.join(str(priority) + ': ' + str(lane) for priority, lane in
+                         sorted(self._lanes.items()))
+
+    def after_fork(self):
+        self.lock = Lock()
+        for lane in self._lanes.values():
+            lane.lock = self.lock
+
+    def consume_units(self, units):
+        return self._default_lane().consume_units(units)
+
+    def consume_units_async(self, units, timeout_ms=0, always_consume=False):
+        return self._default_lane().consume_units_async(
+            units, timeout_ms, always_consume)
+
+    def consume_units_unconditionally(self, units):
+        self._default_lane().consume_units_unconditionally(units)
+
+    def consume_units_with_timeout(self, units, timeout_ms, always_consume):
+        return self._default_lane().consume_units_with_timeout(
+            units, timeout_ms, always_consume)
+
+    def get_current_rate(self):
+        return self._default_lane().get_current_rate()
+
+    def get_duration(self):
+        return self._duration_secs
+
+    @synchronized
+    def get_lane(self, priority):
+        """
+        Returns the lane of a priority class, creating it if needed.
+
+        :param priority: the priority class, a value of :py:class:`Priority`.
+        :type priority: int
+        :returns: the lane.
+        :rtype: SimpleRateLimiter
+        """
+        lane = self._lanes.get(priority)
+        if lane is None:
+            lane = FairRateLimiter.Lane(
+                self, priority, self._weights.get(priority, 1),
+                self._duration_secs)
+            self._lanes[priority] = lane
+            self._share_limit()
+        return lane
+
+    def get_limit_per_second(self):
+        return self._limit_per_sec
+
+    @synchronized
+    def get_stats(self):
+        """
+        Returns the stats of the lanes since the last call, and resets them.
+
+        :returns: a dict of priority class name to stats.
+        :rtype: dict
+        """
+        return {FairRateLimiter.PRIORITY_NAMES[priority]: lane.get_stats()
+                for priority, lane in sorted(self._lanes.items())}
+
+    def reserve_units(self, units, timeout_ms=0, always_consume=False):
+        return self._default_lane().reserve_units(
+            units, timeout_ms, always_consume)
+
+    @synchronized
+    def reset(self):
+        for lane in self._lanes.values():
+            SimpleRateLimiter.reset(lane)
+
+    def set_current_rate(self, percent):
+        self._default_lane().set_current_rate(percent)
+
+    @synchronized
+    def set_duration(self, duration_secs):
+        self._duration_secs = duration_secs
+        for lane in self._lanes.values():
+            SimpleRateLimiter.set_duration(lane, duration_secs)
+
+    @synchronized
+    def set_limit_per_second(self, rate_limit_per_sec):
+        self._limit_per_sec = rate_limit_per_sec
+        self._share_limit()
+
+    def try_consume_units(self, units):
+        return self._default_lane().try_consume_units(units)
+
+    def _default_lane(self):
+        return self._lanes[Priority.INTERACTIVE]
+
+    def _get_lender(self, borrower, units, now_nanos):
+        # Returns a lane that accumulated units and did not use them, the lock
+        # must be held.
+        for lane in self._lanes.values():
+            if lane is borrower or lane._nanos_per_unit <= 0:
+                continue
+            last_nano = max(lane._last_nano, now_nanos - lane._duration_nanos)
+            if last_nano + units * lane._nanos_per_unit < now_nanos:
+                return lane
+        return None
+
+    def _share_limit(self):
+        # Sets the limit of each lane to its share, the lock must be held.
+        total_weight = sum(lane.get_weight() for lane in self._lanes.values())
+        for lane in self._lanes.values():
+            lane.set_share(self._limit_per_sec * lane.get_weight() /
+                           total_weight)
+
+    class Lane(SimpleRateLimiter):
+        """
+        The rate limiter of a priority class, it shares the lock of its
+        FairRateLimiter.
+        """
+
+        def __init__(self, limiter, priority, weight, duration_secs):
+            SimpleRateLimiter.__init__(self, 0.0, duration_secs)
+            self._limiter = limiter
+            self._priority = priority
+            self._weight = weight
+            self.lock = limiter.lock
+            self._units = 0
+            self._borrowed_units = 0
+            self._delay_count = 0
+            self._delay_ms = 0
+            self._max_delay_ms = 0
+
+        def after_fork(self):
+            # The lock is re-created by the FairRateLimiter.
+            pass
+
+        def get_priority(self):
+            return self._priority
+
+        def get_stats(self):
+            # Returns the stats of the lane and resets them, the lock must be
+            # held.
+            stats = {'weight': self._weight,
+                     'limit': round(self.get_limit_per_second(), 3),
+                     'units': self._units,
+                     'borrowedUnits': self._borrowed_units,
+                     'delayCount': self._delay_count,
+                     'delayMs': round(self._delay_ms, 3),
+                     'delayMaxMs': round(self._max_delay_ms, 3)}
+            self._units = 0
+            self._borrowed_units = 0
+            self._delay_count = 0
+            self._delay_ms = 0
+            self._max_delay_ms = 0
+            return stats
+
+        def get_weight(self):
+            return self._weight
+
+        def set_share(self, rate_limit_per_sec):
+            # Sets the share of the limit of the lane, like
+            # set_limit_per_second, the lock must be held.
+            if rate_limit_per_sec <= 0.0:
+                self._nanos_per_unit = 0
+            else:
+                self._nanos_per_unit = int(
+                    SimpleRateLimiter.NANOS / rate_limit_per_sec)
+            self._enforce_minimum_duration()
+
+        @synchronized
+        def _consume(self, units, timeout_ms, always_consume, now_nanos):
+            if (units >= 0 and self._nanos_per_unit > 0 and
+                    self._last_nano >= now_nanos):
+                # The lane is over its share, use the units another lane
+                # did not use if any.
+                lender = self._limiter._get_lender(self, units, now_nanos)
+                if lender is not None:
+                    lender._do_consume(units, 0, True, now_nanos)
+                    self._units += units
+                    self._borrowed_units += units
+                    return 0
+            ms_to_sleep = self._do_consume(
+                units, timeout_ms, always_consume, now_nanos)
+            if units < 0:
+                # The units returned are deducted.
+                self._units += units
+            elif units > 0 and (ms_to_sleep == 0 or always_consume or
+                                timeout_ms == 0 or ms_to_sleep < timeout_ms):
+                self._units += units
+            if ms_to_sleep > 0:
+                self._delay_count += 1
+                self._delay_ms += ms_to_sleep
+                if ms_to_sleep > self._max_delay_ms:
+                    self._max_delay_ms = ms_to_sleep
+            return ms_to_sleep
@@ -8,8 +8,8 @@
 OCI_PYTHON_SDK_NO_SERVICE_IMPORTS = True
 
 from os import path
-from threading import Lock, Timer
-from time import sleep, time
+from threading import Lock
+from time import perf_counter, time
 
 from requests import Request
 
@@ -35,9 +35,10 @@ except ImportError:
 
 from borneo.auth import AuthorizationProvider
 from borneo.common import (
-    CheckValue, HttpConstants, LogUtils, Memoize, synchronized)
+    CheckValue, HttpConstants, LogUtils, synchronized)
 from borneo.config import Region, Regions
 from borneo.exception import IllegalArgumentException
+from borneo.scheduler import get_scheduler
 
 
 class SignatureProvider(AuthorizationProvider):
@@ -125,8 +126,6 @@ class SignatureProvider(AuthorizationProvider):
         are not valid.
     """
 
-    CACHE_KEY = 'signature'
-    """Cache key name."""
     # Use 240 so that it expires well before the 300s token lifetime
     MAX_ENTRY_LIFE_TIME = 240
     """Maximum lifetime of signature 240 seconds."""
@@ -221,13 +220,21 @@ class SignatureProvider(AuthorizationProvider):
                 self._provider.region = region.get_region_id()
                 self._region = region
 
-        self._signature_cache = Memoize(duration_seconds)
+        # The cached signature, a tuple of the signature details and the time
+        # they expire. It is replaced, never modified, so it is read without
+        # a lock.
+        self._signature = None
+        self._duration_seconds = duration_seconds
+        self._signing_stats = SignatureProvider.SigningStats()
         self._refresh_ahead = refresh_ahead
         self._refresh_interval_s = (duration_seconds - refresh_ahead if
                                     duration_seconds > refresh_ahead else 0)
 
-        # Refresh timer.
+        # Refresh timer, the scheduled task of the refresh identified by
+        # _refresh_id. Both are only changed with the lock held.
         self._timer = None
+        self._refresh_id = 0
+        self._closed = False
         self._service_url = None
         self._logger = None
         self._logutils = LogUtils()
@@ -237,9 +244,23 @@ class SignatureProvider(AuthorizationProvider):
         """
         Closes the signature provider.
         """
-        if self._timer is not None:
-            self._timer.cancel()
-            self._timer = None
+        with self.lock:
+            # A refresh that is already running does not schedule another one.
+            self._closed = True
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    def after_fork(self):
+        """
+        Re-creates the locks of the signature provider in a child process
+        created by os.fork. The cached signature and its scheduled refresh are
+        kept.
+
+        :versionadded:: 5.6.0
+        """
+        self.lock = Lock()
+        self._signing_stats.after_fork()
 
     def get_authorization_string(self, request=None):
         if self._service_url is None:
@@ -282,7 +303,16 @@ class SignatureProvider(AuthorizationProvider):
 
     def set_required_headers(self, request, auth_string, headers,
                                  content = None):
-        sig_details = self._get_signature_details(content, headers)
+        sig_details = None
+        if content is None:
+            # Reuse the signature of the authorization string returned by
+            # get_authorization_string, unless it was replaced meanwhile.
+            signature = self._signature
+            if (signature is not None and
+                    signature[0]['authorization'] == auth_string):
+                sig_details = signature[0]
+        if sig_details is None:
+            sig_details = self._get_signature_details(content, headers)
         if sig_details is None:
             return
         # choose headers from signature:
@@ -392,23 +422,34 @@ class SignatureProvider(AuthorizationProvider):
         return (signature_provider if logger is None else
                 signature_provider.set_logger(logger))
 
-    @synchronized
+    def get_signing_stats(self):
+        """
+        Internal use only.
+
+        Returns the statistics of the signatures created since the last call
+        and resets them. The statistics are included in the driver stats, see
+        :py:class:`StatsControl`.
+
+        :returns: a dict with the number of signatures created, the number of
+            content signatures, the number of threads that waited for a
+            signature created by another thread and the total and maximum
+            signing time in milliseconds.
+        :rtype: dict
+        """
+        return self._signing_stats.get_and_clear()
+
     def get_signature_details_internal(self, content=None, headers=None):
         # Visible for testing
-        # the OCI signing code uses a Request instance even though that
-        # is not what we send (see caller in http.py). The signing ends
-        # up putting the required signature in the headers
-        # NOTE: Signer in OCI is callable object
-        request = Request(method='post', url=self._service_url, data=content, headers=headers)
-        if content is None:
-            request = self._provider.without_content_headers(request.prepare())
-        else:
-            request = self._provider(request.prepare())
-        sig_details = request.headers
+        # Creates a new signature, caching it if it does not sign content.
         # don't cache content-signed requests (TableRequest, Add/Drop Replica)
-        if content is None:
-            self._signature_cache.set(SignatureProvider.CACHE_KEY, sig_details)
-            self._schedule_refresh()
+        if content is not None:
+            return self._sign(content, headers)
+        # Only one thread creates the signature that is cached, the others
+        # wait for the lock.
+        with self.lock:
+            sig_details = self._sign(None, headers)
+            self._signature = (sig_details, time() + self._duration_seconds)
+        self._schedule_refresh()
         return sig_details
 
     @staticmethod
@@ -417,12 +458,24 @@ class SignatureProvider(AuthorizationProvider):
             raise ImportError('Package "oci" is required; please install.')
 
     def _get_signature_details(self, content=None, headers=None):
-        # don't use cache if signing content
-        if content is None:
-            sig_details = self._signature_cache.get(SignatureProvider.CACHE_KEY)
-            if sig_details is not None:
-                return sig_details
-        return self.get_signature_details_internal(content, headers)
+        if content is not None:
+            # The signature depends on the content, it is not cached and does
+            # not need the lock.
+            return self._sign(content, headers)
+        signature = self._signature
+        if signature is not None and time() < signature[1]:
+            return signature[0]
+        with self.lock:
+            # Another thread may have created the signature while this one was
+            # waiting for the lock.
+            signature = self._signature
+            if signature is not None and time() < signature[1]:
+                self._signing_stats.add_wait()
+                return signature[0]
+            sig_details = self._sign(None, headers)
+            self._signature = (sig_details, time() + self._duration_seconds)
+        self._schedule_refresh()
+        return sig_details
 
     def _get_tenant_ocid(self):
         """
@@ -434,55 +487,123 @@ class SignatureProvider(AuthorizationProvider):
         if isinstance(self._provider, Signer):
             return self._provider.api_key.split('/')[0]
 
-    def _refresh_task(self):
-        timeout = self._refresh_ahead
-        start_ms = int(round(time() * 1000))
-        error_logged = False
-        while True:
-            try:
-                # refresh security token before create new signature
-                if (
-                    isinstance(self._provider, InstancePrincipalsSecurityTokenSigner)
-                    or isinstance(
-                        self._provider, OkeWorkloadIdentityResourcePrincipalSigner
-                    )
-                    or isinstance(self._provider, EphemeralResourcePrincipalSigner)
-                ):
-                    self._provider.refresh_security_token()
-
-                self.get_signature_details_internal()
+    def _refresh_task(self, refresh_id, start_ms=None, error_logged=False):
+        # Runs in a worker thread of the scheduler. A failed attempt schedules
+        # the next one instead of sleeping, until refresh_ahead expires. The
+        # refresh stops once the provider is closed or another refresh is
+        # scheduled, by a signature created in-line.
+        with self.lock:
+            if self._closed or refresh_id != self._refresh_id:
                 return
-            except Exception as e:
-                # Ignore the refresh failure, then sleep and try again until
-                # the timeout. Log the failure the first time only. If the
-                # refresh failure continues until the task times out the
-                # driver will attempt to generate a signature in the next
-                # request. If that operation fails, it will be reported to
-                # the user as an exception
-                if not error_logged:
-                    self._logutils.log_error(
-                        'Unable to refresh cached request signature, ' + str(e))
-                    error_logged = True
-
-            # check for timeout in the loop
-            if int(round(time() * 1000)) - start_ms >= timeout:
+        if start_ms is None:
+            start_ms = int(round(time() * 1000))
+        try:
+            # refresh security token before create new signature
+            if isinstance(self._provider, (
+                    InstancePrincipalsSecurityTokenSigner,
+                    OkeWorkloadIdentityResourcePrincipalSigner,
+                    EphemeralResourcePrincipalSigner)):
+                self._provider.refresh_security_token()
+
+            self.get_signature_details_internal()
+            return
+        except Exception as e:
+            # Ignore the refresh failure and try again until the timeout. Log
+            # the failure the first time only. If the refresh failure
+            # continues until the task times out the driver will attempt to
+            # generate a signature in the next request. If that operation
+            # fails, it will be reported to the user as an exception
+            if not error_logged:
                 self._logutils.log_error(
-                    'Request signature refresh timed out after ' + str(timeout))
-                break
-            sleep(0.1)
-
-        # if we get here the refresh failed and timed out. Cancel the timer.
-        # It will get re-created when the next in-line call to get signature
-        # details is called
-        self._timer.cancel()
-        self._timer = None
+                    'Unable to refresh cached request signature, ' + str(e))
+                error_logged = True
+
+        # check for timeout
+        timeout = self._refresh_ahead
+        if int(round(time() * 1000)) - start_ms >= timeout:
+            self._logutils.log_error(
+                'Request signature refresh timed out after ' + str(timeout))
+            # The refresh failed and timed out. It will get re-scheduled when
+            # the next in-line call to get signature details is called
+            with self.lock:
+                if refresh_id == self._refresh_id:
+                    self._timer = None
+            return
+        with self.lock:
+            if self._closed or refresh_id != self._refresh_id:
+                return
+            self._timer = get_scheduler().schedule_blocking(
+                0.1, self._refresh_task, refresh_id, start_ms, error_logged)
+
+    def _sign(self, content, headers):
+        # the OCI signing code uses a Request instance even though that
+        # is not what we send (see caller in http.py). The signing ends
+        # up putting the required signature in the headers
+        # NOTE: Signer in OCI is callable object
+        start = perf_counter()
+        request = Request(method='post', url=self._service_url, data=content,
+                          headers=headers)
+        if content is None:
+            request = self._provider.without_content_headers(request.prepare())
+        else:
+            request = self._provider(request.prepare())
+        self._signing_stats.add(content is not None, perf_counter() - start)
+        return request.headers
 
     def _schedule_refresh(self):
         # If refresh interval is 0, don't schedule a refresh.
         if self._refresh_interval_s == 0:
             return
-        if self._timer is not None:
-            self._timer.cancel()
-            self._timer = None
-        self._timer = Timer(self._refresh_interval_s, self._refresh_task)
-        self._timer.start()
+        with self.lock:
+            if self._closed:
+                return
+            # The refresh scheduled before, or its next attempt, is replaced.
+            if self._timer is not None:
+                self._timer.cancel()
+            self._refresh_id += 1
+            self._timer = get_scheduler().schedule_blocking(
+                self._refresh_interval_s, self._refresh_task,
+                self._refresh_id)
+
+    class SigningStats(object):
+        # The statistics of the signatures created by a SignatureProvider. They
+        # are only updated when a signature is created, not when a cached
+        # signature is used.
+
+        def __init__(self):
+            self._count = 0
+            self._content_count = 0
+            self._waits = 0
+            self._total_time = 0
+            self._max_time = 0
+            self.lock = Lock()
+
+        @synchronized
+        def add(self, content, elapsed):
+            self._count += 1
+            if content:
+                self._content_count += 1
+            self._total_time += elapsed
+            if elapsed > self._max_time:
+                self._max_time = elapsed
+
+        @synchronized
+        def add_wait(self):
+            self._waits += 1
+
+        def after_fork(self):
+            self.lock = Lock()
+
+        @synchronized
+        def get_and_clear(self):
+            stats = {'count': self._count,
+                     'contentCount': self._content_count,
+                     'waits': self._waits,
+                     'totalMs': round(self._total_time * 1000, 3),
+                     'maxMs': round(self._max_time * 1000, 3)}
+            self._count = 0
+            self._content_count = 0
+            self._waits = 0
+            self._total_time = 0
+            self._max_time = 0
+            return stats
@@ -7,7 +7,7 @@
 
 from base64 import b64encode
 from json import loads
-from threading import Lock, Timer
+from threading import Lock
 from time import time
 from traceback import format_exc
 
@@ -28,6 +28,7 @@ from borneo.common import (
     CheckValue, HttpConstants, LogUtils, SSLAdapter, synchronized)
 from borneo.exception import (
     IllegalArgumentException, InvalidAuthorizationException, NoSQLException)
+from borneo.scheduler import get_scheduler
 
 
 class StoreAccessTokenProvider(AuthorizationProvider):
@@ -105,6 +106,7 @@ class StoreAccessTokenProvider(AuthorizationProvider):
         self._expiration_time = 0
         self._logger = None
         self._logutils = LogUtils(self._logger)
+        self._ssl_ctx = None
         self._sess = Session()
         self._request_utils = borneo.http.RequestUtils(
             self._sess, self._logutils)
@@ -124,6 +126,26 @@ class StoreAccessTokenProvider(AuthorizationProvider):
             self._user_name = user_name
             self._password = password
 
+    def after_fork(self):
+        """
+        Re-creates the session and the locks of the provider in a child
+        process created by os.fork. The login token and its scheduled renewal
+        are kept.
+
+        :versionadded:: 5.6.0
+        """
+        self._lock = Lock()
+        self.lock = Lock()
+        if self._is_closed:
+            return
+        # The connections of the parent process must not be used, or closed,
+        # by the child, the old session is dropped without closing it.
+        self._sess = Session()
+        if self._ssl_ctx is not None:
+            self._mount_ssl_adapter()
+        self._request_utils = borneo.http.RequestUtils(
+            self._sess, self._logutils)
+
     @synchronized
     def bootstrap_login(self):
         # Bootstrap login using the provided credentials.
@@ -275,14 +297,18 @@ class StoreAccessTokenProvider(AuthorizationProvider):
 
     def set_ssl_context(self, ssl_ctx):
         # Internal use only
-        adapter = SSLAdapter(ssl_ctx)
-        self._sess.mount(self._url.scheme + '://', adapter)
+        self._ssl_ctx = ssl_ctx
+        self._mount_ssl_adapter()
 
     def validate_auth_string(self, auth_string):
         if self._is_secure and auth_string is None:
             raise IllegalArgumentException(
                 'Secured StoreAccessProvider requires a non-none string.')
 
+    def _mount_ssl_adapter(self):
+        adapter = SSLAdapter(self._ssl_ctx)
+        self._sess.mount(self._url.scheme + '://', adapter)
+
     def _parse_json_result(self, json_result):
         # Retrieve login token from JSON string.
         result = loads(json_result)
@@ -336,9 +362,8 @@ class StoreAccessTokenProvider(AuthorizationProvider):
         if self._expiration_time > acquire_time + 10000:
             renew_time = (
                 acquire_time + (self._expiration_time - acquire_time) // 2)
-            self._timer = Timer(
+            self._timer = get_scheduler().schedule_blocking(
                 float(renew_time - acquire_time) / 1000, self._refresh_task)
-            self._timer.start()
 
     def _send_request(self, auth_header, service_name):
         # Send HTTPS request to login/renew/logout service location with proper
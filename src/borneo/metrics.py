@@ -0,0 +1,578 @@
+#
+# Copyright (c) 2018, 2026 Oracle and/or its affiliates. All rights reserved.
+#
+# Licensed under the Universal Permissive License v 1.0 as shown at
+#  https://oss.oracle.com/licenses/upl/
+#
+
+from abc import ABCMeta, abstractmethod
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from threading import Lock, Thread, current_thread, local
+
+try:
+    from opentelemetry import metrics as otel_metrics
+except ImportError:
+    otel_metrics = None
+
+try:
+    from prometheus_client.core import (
+        CounterMetricFamily, HistogramMetricFamily)
+except ImportError:
+    CounterMetricFamily = None
+    HistogramMetricFamily = None
+
+from .common import CheckValue, synchronized
+from .exception import (
+    IllegalArgumentException, SecurityInfoNotReadyException,
+    ThrottlingException)
+from .kv.exception import AuthenticationException
+from .version import __version__
+
+
+class MetricsExporter(object):
+    """
+    MetricsExporter is a callback interface used by the driver to publish the
+    metrics of each request as soon as it completes, for instance to a
+    monitoring system. Exporters are added to a handle using
+    :py:meth:`StatsControl.add_metrics_exporter`. They are called whatever the
+    stats profile of the handle, the stats do not need to be collected or
+    logged.
+
+    The driver provides :py:class:`PrometheusExporter` and
+    :py:class:`OpenTelemetryExporter`.
+
+    Instances of this interface are called by the threads executing the
+    requests, they must be thread-safe and should not block.
+
+    :versionadded:: 5.6.0
+    """
+    __metaclass__ = ABCMeta
+
+    @abstractmethod
+    def observe(self, request, error, req_size, res_size, latency_ms):
+        """
+        Called when a request completes, successfully or not.
+
+        :param request: the request.
+        :type request: Request
+        :param error: the name of the class of the exception raised by the
+            request, or None if the request succeeded.
+        :type error: str
+        :param req_size: the size of the request in bytes, 0 if the request
+            failed.
+        :type req_size: int
+        :param res_size: the size of the response in bytes, 0 if the request
+            failed.
+        :type res_size: int
+        :param latency_ms: the time of the http request in milliseconds, 0 if
+            the request failed.
+        :type latency_ms: float
+        """
+        pass
+
+    def after_fork(self):
+        """
+        Called by the driver in a child process created by os.fork, it
+        re-creates the locks and threads of the exporter. By default it does
+        nothing.
+        """
+        pass
+
+    def close(self):
+        """
+        Releases the resources used by the exporter. By default it does
+        nothing.
+        """
+        pass
+
+    @staticmethod
+    def get_retry_counts(request):
+        """
+        Returns the number of retries of a request, the number of retries
+        caused by throttling and by authentication, and the time spent between
+        the retries in milliseconds.
+
+        :param request: the request.
+        :type request: Request
+        :returns: the counts.
+        :rtype: tuple(int, int, int, int)
+        """
+        retry_stats = request.get_retry_stats()
+        if retry_stats is None:
+            return 0, 0, 0, 0
+        auth_retries = (
+            retry_stats.get_num_exceptions(AuthenticationException) +
+            retry_stats.get_num_exceptions(SecurityInfoNotReadyException))
+        return (retry_stats.get_retries(),
+                retry_stats.get_num_exceptions(ThrottlingException),
+                auth_retries, retry_stats.get_delay_ms())
+
+
+class PrometheusExporter(MetricsExporter):
+    """
+    A :py:class:`MetricsExporter` that keeps the metrics of the requests as
+    Prometheus counters and histograms, labeled by type of request
+    (**request**), table (**table**) and, for errors, exception class
+    (**error**). The following metrics are exported, their names start with
+    the prefix given to the constructor, nosql by default:
+
+      * **nosql_requests_total** - number of requests completed.
+      * **nosql_request_errors_total** - number of requests that failed.
+      * **nosql_retries_total** - number of retries.
+      * **nosql_throttle_retries_total** - number of retries caused by
+        throttling.
+      * **nosql_auth_retries_total** - number of retries caused by
+        authentication.
+      * **nosql_retry_delay_seconds_total** - time spent between retries.
+      * **nosql_rate_limit_delay_seconds_total** - time spent waiting for the
+        rate limiters.
+      * **nosql_request_bytes_total** - size of the successful requests.
+      * **nosql_response_bytes_total** - size of the successful responses.
+      * **nosql_request_latency_seconds** - histogram of the time of the http
+        requests that succeeded.
+
+    The metrics are available in the Prometheus text format with
+    :py:meth:`generate_text`, or served by :py:meth:`start_http_server`. When
+    the prometheus_client package is installed the exporter can also be
+    registered as a collector of a prometheus_client registry.
+
+    Each thread updates its own set of metrics, they are merged when the
+    metrics are read, so exporting the metrics does not serialize the request
+    threads.
+
+    .. code-block:: pycon
+
+        exporter = PrometheusExporter()
+        handle.get_stats_control().add_metrics_exporter(exporter)
+        exporter.start_http_server(8000)
+
+        # or, with prometheus_client
+        prometheus_client.REGISTRY.register(exporter)
+
+    :param prefix: the prefix of the metric names.
+    :type prefix: str
+    :param buckets: the upper bounds in seconds of the buckets of the latency
+        histogram, the default bounds go from 1 ms to 10 s.
+    :type buckets: list(float)
+    :raises IllegalArgumentException: raises the exception if prefix is not a
+        string or buckets is not a list of positive numbers.
+    :versionadded:: 5.6.0
+    """
+
+    DEFAULT_BUCKETS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                       1.0, 2.5, 5.0, 10.0]
+
+    # Name, help and attribute of the counters of a series. Times are kept in
+    # milliseconds and exported in seconds.
+    _COUNTERS = [
+        ('requests', 'Number of requests completed.', 'requests', 1),
+        ('retries', 'Number of retries.', 'retries', 1),
+        ('throttle_retries', 'Number of retries caused by throttling.',
+         'throttle_retries', 1),
+        ('auth_retries', 'Number of retries caused by authentication.',
+         'auth_retries', 1),
+        ('retry_delay_seconds', 'Time spent between retries.',
+         'retry_delay_ms', 0.001),
+        ('rate_limit_delay_seconds', 'Time spent waiting for rate limiters.',
+         'rate_limit_delay_ms', 0.001),
+        ('request_bytes', 'Size of the successful requests.', 'request_bytes',
+         1),
+        ('response_bytes', 'Size of the successful responses.',
+         'response_bytes', 1)]
+    _LABELS = ['request', 'table']
+
+    def __init__(self, prefix='nosql', buckets=None):
+        CheckValue.check_str(prefix, 'prefix')
+        if buckets is None:
+            buckets = PrometheusExporter.DEFAULT_BUCKETS
+        CheckValue.check_list(buckets, 'buckets')
+        for bound in buckets:
+            CheckValue.check_float_gt_zero(bound, 'buckets')
+        self._prefix = prefix
+        self._buckets = sorted(buckets)
+        self._server = None
+        self.after_fork()
+
+    def after_fork(self):
+        # The metrics of the parent process are not exported by the child.
+        self.lock = Lock()
+        self._local = local()
+        self._shards = []
+        # The metrics of the threads that ended.
+        self._retired = {}
+        self._server = None
+
+    def close(self):
+        """
+        Stops the http server started by :py:meth:`start_http_server`.
+        """
+        server = self._server
+        self._server = None
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+    def observe(self, request, error, req_size, res_size, latency_ms):
+        retries, throttle_retries, auth_retries, retry_delay_ms = \
+            MetricsExporter.get_retry_counts(request)
+        key = (request.get_request_name(), request.get_table_name() or '')
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = PrometheusExporter._Shard()
+            self._local.shard = shard
+            with self.lock:
+                self._shards.append(shard)
+        with shard.lock:
+            series = shard.series.get(key)
+            if series is None:
+                series = PrometheusExporter._Series(len(self._buckets))
+                shard.series[key] = series
+            series.requests += 1
+            series.retries += retries
+            series.throttle_retries += throttle_retries
+            series.auth_retries += auth_retries
+            series.retry_delay_ms += retry_delay_ms
+            series.rate_limit_delay_ms += request.get_rate_limit_delayed_ms()
+            if error is not None:
+                series.errors[error] = series.errors.get(error, 0) + 1
+            else:
+                series.request_bytes += req_size
+                series.response_bytes += res_size
+                latency = latency_ms / 1000
+                series.latency_counts[
+                    bisect_left(self._buckets, latency)] += 1
+                series.latency_sum += latency
+
+    def collect(self):
+        """
+        Returns the metrics as prometheus_client metric families, this method
+        is called by a prometheus_client registry the exporter is registered
+        to. It requires the prometheus_client package.
+
+        :returns: the metric families.
+        :rtype: list
+        :raises ImportError: raises the exception if the prometheus_client
+            package is not installed.
+        """
+        if CounterMetricFamily is None:
+            raise ImportError(
+                'Package "prometheus_client" is required; please install.')
+        series = self._get_series()
+        families = []
+        for name, doc, attr, scale in PrometheusExporter._COUNTERS:
+            family = CounterMetricFamily(self._prefix + '_' + name, doc,
+                                         labels=PrometheusExporter._LABELS)
+            for key, s in series.items():
+                family.add_metric(list(key), getattr(s, attr) * scale)
+            families.append(family)
+        family = CounterMetricFamily(
+            self._prefix + '_request_errors',
+            'Number of requests that failed.',
+            labels=PrometheusExporter._LABELS + ['error'])
+        for key, s in series.items():
+            for error, count in s.errors.items():
+                family.add_metric(list(key) + [error], count)
+        families.append(family)
+        family = HistogramMetricFamily(
+            self._prefix + '_request_latency_seconds',
+            'Time of the successful http requests.',
+            labels=PrometheusExporter._LABELS)
+        for key, s in series.items():
+            family.add_metric(list(key), self._get_buckets(s),
+                              s.latency_sum)
+        families.append(family)
+        return families
+
+    def generate_text(self):
+        """
+        Returns the metrics in the Prometheus text exposition format.
+
+        :returns: the metrics.
+        :rtype: str
+        """
+        series = self._get_series()
+        lines = []
+        for name, doc, attr, scale in PrometheusExporter._COUNTERS:
+            name = self._prefix + '_' + name + '_total'
+            lines.append('# HELP ' + name + ' ' + doc)
+            lines.append('# TYPE ' + name + ' counter')
+            for key, s in series.items():
+                lines.append(name + PrometheusExporter._labels(key) + ' ' +
+                             PrometheusExporter._number(
+                                 getattr(s, attr) * scale))
+        name = self._prefix + '_request_errors_total'
+        lines.append('# HELP ' + name + ' Number of requests that failed.')
+        lines.append('# TYPE ' + name + ' counter')
+        for key, s in series.items():
+            for error, count in s.errors.items():
+                lines.append(name + PrometheusExporter._labels(
+                    key, ('error', error)) + ' ' + str(count))
+        name = self._prefix + '_request_latency_seconds'
+        lines.append('# HELP ' + name +
+                     ' Time of the successful http requests.')
+        lines.append('# TYPE ' + name + ' histogram')
+        for key, s in series.items():
+            for bound, count in self._get_buckets(s):
+                lines.append(name + '_bucket' + PrometheusExporter._labels(
+                    key, ('le', bound)) + ' ' + str(count))
+            labels = PrometheusExporter._labels(key)
+            lines.append(name + '_sum' + labels + ' ' +
+                         PrometheusExporter._number(s.latency_sum))
+            lines.append(name + '_count' + labels + ' ' +
+                         str(sum(s.latency_counts)))
+        return '\n'.join(lines) + '\n'
+
+    def start_http_server(self, port, addr='localhost'):
+        """
+        Starts an http server that serves the metrics in the Prometheus text
+        format on the /metrics path, in a daemon thread. The server is stopped
+        by :py:meth:`close`.
+
+        :param port: the port to listen on, 0 to use any free port.
+        :type port: int
+        :param addr: the address to listen on.
+        :type addr: str
+        :returns: the port the server listens on.
+        :rtype: int
+        :raises IllegalArgumentException: raises the exception if port is not
+            a non-negative integer or the server is already started.
+        """
+        CheckValue.check_int_ge_zero(port, 'port')
+        CheckValue.check_str(addr, 'addr')
+        if self._server is not None:
+            raise IllegalArgumentException('The http server is started.')
+        exporter = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                content = exporter.generate_text().encode()
+                self.send_response(200)
+                self.send_header('Content-Type',
+                                 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = _ThreadingHTTPServer((addr, port), MetricsHandler)
+        thread = Thread(target=server.serve_forever,
+                        name='borneo-prometheus-exporter')
+        thread.daemon = True
+        thread.start()
+        self._server = server
+        return server.server_address[1]
+
+    @synchronized
+    def _get_series(self):
+        # Merges the metrics of all the threads. The metrics of the threads
+        # that ended are moved to the retired metrics.
+        merged = {}
+        for key, series in self._retired.items():
+            merged[key] = series.copy()
+        for shard in list(self._shards):
+            alive = shard.thread.is_alive()
+            with shard.lock:
+                for key, series in shard.series.items():
+                    total = merged.get(key)
+                    if total is None:
+                        merged[key] = series.copy()
+                    else:
+                        total.merge(series)
+                    if not alive:
+                        retired = self._retired.get(key)
+                        if retired is None:
+                            self._retired[key] = series.copy()
+                        else:
+                            retired.merge(series)
+            if not alive:
+                self._shards.remove(shard)
+        return merged
+
+    def _get_buckets(self, series):
+        # Returns the cumulative counts of the buckets.
+        buckets = []
+        count = 0
+        for i, bound in enumerate(self._buckets):
+            count += series.latency_counts[i]
+            buckets.append((PrometheusExporter._number(bound), count))
+        buckets.append(('+Inf', count + series.latency_counts[-1]))
+        return buckets
+
+    @staticmethod
+    def _labels(key, extra=None):
+        labels = [('request', key[0]), ('table', key[1])]
+        if extra is not None:
+            labels.append(extra)
+        return '{' + ','.join(
+            name + '="' + value.replace('\\', '\\\\').replace(
+                '"', '\\"').replace('\n', '\\n') + '"'
+            for name, value in labels) + '}'
+
+    @staticmethod
+    def _number(value):
+        if isinstance(value, float) and value.is_integer():
+            return str(int(value))
+        return str(value)
+
+    class _Series(object):
+        # The metrics of a type of request on a table.
+
+        def __init__(self, bucket_count):
+            self.requests = 0
+            self.errors = {}
+            self.retries = 0
+            self.throttle_retries = 0
+            self.auth_retries = 0
+            self.retry_delay_ms = 0
+            self.rate_limit_delay_ms = 0
+            self.request_bytes = 0
+            self.response_bytes = 0
+            # The last count is for the latencies above the last bound.
+            self.latency_counts = [0] * (bucket_count + 1)
+            self.latency_sum = 0
+
+        def copy(self):
+            series = PrometheusExporter._Series(len(self.latency_counts) - 1)
+            series.merge(self)
+            return series
+
+        def merge(self, other):
+            self.requests += other.requests
+            for error, count in other.errors.items():
+                self.errors[error] = self.errors.get(error, 0) + count
+            self.retries += other.retries
+            self.throttle_retries += other.throttle_retries
+            self.auth_retries += other.auth_retries
+            self.retry_delay_ms += other.retry_delay_ms
+            self.rate_limit_delay_ms += other.rate_limit_delay_ms
+            self.request_bytes += other.request_bytes
+            self.response_bytes += other.response_bytes
+            for i, count in enumerate(other.latency_counts):
+                self.latency_counts[i] += count
+            self.latency_sum += other.latency_sum
+
+    class _Shard(object):
+        # The metrics updated by one thread.
+
+        def __init__(self):
+            self.thread = current_thread()
+            self.lock = Lock()
+            self.series = {}
+
+
+class OpenTelemetryExporter(MetricsExporter):
+    """
+    A :py:class:`MetricsExporter` that records the metrics of the requests
+    with OpenTelemetry instruments, with the attributes **nosql.request** for
+    the type of request, **nosql.table** for the table and, for errors,
+    **error.type** for the exception class. The following instruments are
+    created:
+
+      * **nosql.client.requests** - counter of the requests completed.
+      * **nosql.client.request.errors** - counter of the requests that failed.
+      * **nosql.client.retries** - counter of the retries.
+      * **nosql.client.throttle_retries** - counter of the retries caused by
+        throttling.
+      * **nosql.client.auth_retries** - counter of the retries caused by
+        authentication.
+      * **nosql.client.retry.delay** - counter of the time spent between
+        retries, in seconds.
+      * **nosql.client.rate_limit.delay** - counter of the time spent waiting
+        for the rate limiters, in seconds.
+      * **nosql.client.request.size** - counter of the size of the successful
+        requests, in bytes.
+      * **nosql.client.response.size** - counter of the size of the successful
+        responses, in bytes.
+      * **nosql.client.request.duration** - histogram of the time of the http
+        requests that succeeded, in seconds.
+
+    The metrics are exported by the meter provider configured by the
+    application with the OpenTelemetry SDK.
+
+    .. code-block:: pycon
+
+        handle.get_stats_control().add_metrics_exporter(
+            OpenTelemetryExporter())
+
+    :param meter: the meter used to create the instruments. If None the meter
+        named borneo of the global meter provider is used, which requires the
+        opentelemetry-api package.
+    :type meter: Meter
+    :raises ImportError: raises the exception if meter is None and the
+        opentelemetry-api package is not installed.
+    :versionadded:: 5.6.0
+    """
+
+    def __init__(self, meter=None):
+        if meter is None:
+            if otel_metrics is None:
+                raise ImportError(
+                    'Package "opentelemetry-api" is required; please install.')
+            meter = otel_metrics.get_meter('borneo', __version__)
+        self._requests = meter.create_counter(
+            'nosql.client.requests', unit='{request}',
+            description='Number of requests completed.')
+        self._errors = meter.create_counter(
+            'nosql.client.request.errors', unit='{request}',
+            description='Number of requests that failed.')
+        self._retries = meter.create_counter(
+            'nosql.client.retries', unit='{retry}',
+            description='Number of retries.')
+        self._throttle_retries = meter.create_counter(
+            'nosql.client.throttle_retries', unit='{retry}',
+            description='Number of retries caused by throttling.')
+        self._auth_retries = meter.create_counter(
+            'nosql.client.auth_retries', unit='{retry}',
+            description='Number of retries caused by authentication.')
+        self._retry_delay = meter.create_counter(
+            'nosql.client.retry.delay', unit='s',
+            description='Time spent between retries.')
+        self._rate_limit_delay = meter.create_counter(
+            'nosql.client.rate_limit.delay', unit='s',
+            description='Time spent waiting for rate limiters.')
+        self._request_size = meter.create_counter(
+            'nosql.client.request.size', unit='By',
+            description='Size of the successful requests.')
+        self._response_size = meter.create_counter(
+            'nosql.client.response.size', unit='By',
+            description='Size of the successful responses.')
+        self._duration = meter.create_histogram(
+            'nosql.client.request.duration', unit='s',
+            description='Time of the successful http requests.')
+
+    def observe(self, request, error, req_size, res_size, latency_ms):
+        retries, throttle_retries, auth_retries, retry_delay_ms = \
+            MetricsExporter.get_retry_counts(request)
+        attributes = {'nosql.request': request.get_request_name(),
+                      'nosql.table': request.get_table_name() or ''}
+        self._requests.add(1, attributes)
+        if retries > 0:
+            self._retries.add(retries, attributes)
+            self._throttle_retries.add(throttle_retries, attributes)
+            self._auth_retries.add(auth_retries, attributes)
+            self._retry_delay.add(retry_delay_ms / 1000, attributes)
+        rate_limit_delay_ms = request.get_rate_limit_delayed_ms()
+        if rate_limit_delay_ms > 0:
+            self._rate_limit_delay.add(rate_limit_delay_ms / 1000, attributes)
+        if error is not None:
+            error_attributes = dict(attributes)
+            error_attributes['error.type'] = error
+            self._errors.add(1, error_attributes)
+        else:
+            self._request_size.add(req_size, attributes)
+            self._response_size.add(res_size, attributes)
+            self._duration.record(latency_ms / 1000, attributes)
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    # The http.server.ThreadingHTTPServer of Python 3.7+, serves each scrape
+    # in a daemon thread.
+    daemon_threads = True
@@ -14,7 +14,9 @@ import borneo.operations
 from .common import (
     ByteInputStream, ByteOutputStream, Empty, IndexInfo, PreparedStatement,
     Replica, ReplicaStats, TableLimits, TableUsage, Version)
-from .exception import IllegalArgumentException
+from .exception import (
+    IllegalArgumentException, OperationNotSupportedException,
+    RetryableException)
 from .nson_protocol import *
 from .query import PlanIter, QueryDriver, TopologyInfo
 from .serde import (math_name_to_value)
@@ -244,39 +246,10 @@ class Nson(object):
         Generate NSON "events" from a field value instance
         """
         t = SerdeUtil.get_type(value)
-        if t == SerdeUtil.FIELD_VALUE_TYPE.BINARY:
+        event = Nson._VALUE_EVENTS.get(t)
+        if event is not None:
             if not skip:
-                handler.binary_value(value)
-        elif t == SerdeUtil.FIELD_VALUE_TYPE.BOOLEAN:
-            if not skip:
-                handler.boolean_value(value)
-        elif t == SerdeUtil.FIELD_VALUE_TYPE.DOUBLE:
-            if not skip:
-                handler.double_value(value)
-        elif t == SerdeUtil.FIELD_VALUE_TYPE.INTEGER:
-            if not skip:
-                handler.integer_value(value)
-        elif t == SerdeUtil.FIELD_VALUE_TYPE.LONG:
-            if not skip:
-                handler.long_value(value)
-        elif t == SerdeUtil.FIELD_VALUE_TYPE.STRING:
-            if not skip:
-                handler.string_value(value)
-        elif t == SerdeUtil.FIELD_VALUE_TYPE.TIMESTAMP:
-            if not skip:
-                handler.timestamp_value(value)
-        elif t == SerdeUtil.FIELD_VALUE_TYPE.NUMBER:
-            if not skip:
-                handler.number_value(value)
-        elif t == SerdeUtil.FIELD_VALUE_TYPE.JSON_NULL:
-            if not skip:
-                handler.json_null_value()
-        elif t == SerdeUtil.FIELD_VALUE_TYPE.NULL:
-            if not skip:
-                handler.null_value()
-        elif t == SerdeUtil.FIELD_VALUE_TYPE.EMPTY:
-            if not skip:
-                handler.empty_value()
+                event(handler, value)
         elif t == SerdeUtil.FIELD_VALUE_TYPE.MAP:
             if skip:
                 return
@@ -325,6 +298,32 @@ class Nson(object):
     def iso_time_to_ms(iso_str):
         return SerdeUtil.iso_time_to_ms(iso_str)
 
+    # The handler events of the atomic field value types, indexed by type code.
+    # Maps and arrays are handled by generate_events_from_value.
+    _VALUE_EVENTS = {
+        SerdeUtil.FIELD_VALUE_TYPE.BINARY:
+            lambda handler, value: handler.binary_value(value),
+        SerdeUtil.FIELD_VALUE_TYPE.BOOLEAN:
+            lambda handler, value: handler.boolean_value(value),
+        SerdeUtil.FIELD_VALUE_TYPE.DOUBLE:
+            lambda handler, value: handler.double_value(value),
+        SerdeUtil.FIELD_VALUE_TYPE.INTEGER:
+            lambda handler, value: handler.integer_value(value),
+        SerdeUtil.FIELD_VALUE_TYPE.LONG:
+            lambda handler, value: handler.long_value(value),
+        SerdeUtil.FIELD_VALUE_TYPE.STRING:
+            lambda handler, value: handler.string_value(value),
+        SerdeUtil.FIELD_VALUE_TYPE.TIMESTAMP:
+            lambda handler, value: handler.timestamp_value(value),
+        SerdeUtil.FIELD_VALUE_TYPE.NUMBER:
+            lambda handler, value: handler.number_value(value),
+        SerdeUtil.FIELD_VALUE_TYPE.JSON_NULL:
+            lambda handler, value: handler.json_null_value(),
+        SerdeUtil.FIELD_VALUE_TYPE.NULL:
+            lambda handler, value: handler.null_value(),
+        SerdeUtil.FIELD_VALUE_TYPE.EMPTY:
+            lambda handler, value: handler.empty_value()}
+
 
 class NsonSerializer(NsonEventHandler):
     """
@@ -537,7 +536,7 @@ class JsonSerializer(NsonEventHandler):
         self._append(val, False)
 
     def binary_value(self, value):
-        self._append(b64encode(value), True)
+        self._append(b64encode(value).decode('ascii'), True)
 
     def string_value(self, value):
         self._append(str(value), True)
@@ -1906,6 +1905,18 @@ class QueryRequestSerializer(RequestSerializer):
             if request.get_last_write_metadata() is not None:
                 Proto.write_string_map_field(ns, LAST_WRITE_METADATA,
                      json.dumps(request.get_last_write_metadata()))
+            if request.get_number_of_operations() > 0:
+                Proto.write_int_map_field(ns, NUM_QUERY_OPERATIONS,
+                                          request.get_number_of_operations())
+                Proto.write_int_map_field(ns, QUERY_OPERATION_NUM,
+                                          request.get_operation_number())
+        elif request.get_number_of_operations() > 0:
+            # the server would ignore the operation number and return the
+            # results of the full query
+            raise OperationNotSupportedException(
+                'Parallel scan requires query version ' +
+                str(QueryDriver.QUERY_V4) + ', the server supports ' +
+                str(request.get_query_version()))
 
         Proto.end_map(ns, PAYLOAD)
 
@@ -2650,6 +2661,7 @@ class Proto(object):
         cont_key = None
         virtual_scans = None # array of dict
         query_traces = None  # dict
+        max_parallelism = 0
 
         walker = MapWalker(bis)
         while walker.has_next():
@@ -2677,6 +2689,8 @@ class Proto(object):
                 namespace = Nson.read_string(bis)
             elif name == QUERY_OPERATION:
                 operation = Nson.read_int(bis)
+            elif name == MAX_QUERY_PARALLELISM:
+                max_parallelism = Nson.read_int(bis)
             elif name == QUERY_RESULTS:
                 # query only
                 Proto.read_query_results(query_result, bis)
@@ -2749,6 +2763,7 @@ class Proto(object):
             namespace,
             table_name,
             operation)
+        prepared_statement.set_maximum_parallelism(max_parallelism)
         if prepare_result is not None:
             prepare_result.set_prepared_statement(prepared_statement)
         elif query_request is not None:
@@ -2902,17 +2917,25 @@ class Proto(object):
         code = Nson.read_int(bis)
         if code == 0:
             return
+        msg = None
+        retry_hint_ms = 0
         while walker.has_next():
             walker.next()
             name = walker.get_current_name()
             if name == EXCEPTION:
                 msg = Nson.read_string(bis)
-                raise SerdeUtil.map_exception(code, msg)
+            elif name == RETRY_HINT:
+                retry_hint_ms = Nson.read_int(bis)
             elif name == CONSUMED:
                 # TODO -- this means delaying raise until end
                 walker.skip()
             else:
                 walker.skip()
+        if msg is not None:
+            exception = SerdeUtil.map_exception(code, msg)
+            if retry_hint_ms > 0 and isinstance(exception, RetryableException):
+                exception.set_retry_hint_ms(retry_hint_ms)
+            raise exception
 
 
 # This code is redundant WRT code in serde.py that does the same thing but
@@ -44,11 +44,13 @@ LIST_START_INDEX = 'ls'
 MATCH_VERSION = 'mv'
 MAX_READ_KB = 'mr'
 MAX_SHARD_USAGE_PERCENT = 'ms'
+MAX_QUERY_PARALLELISM = 'mp'
 MAX_WRITE_KB = 'mw'
 NAME = 'm'
 NAMESPACE = 'ns'
 NUMBER_LIMIT = 'nl'
 NUM_OPERATIONS = 'no'
+NUM_QUERY_OPERATIONS = 'nqo'
 OPERATIONS = 'os'
 OPERATION_ID = 'od'
 OP_CODE = 'o'
@@ -60,6 +62,7 @@ PREPARED_STATEMENT = 'ps'
 QUERY = 'q'
 QUERY_BATCH_TRACES = 'qts',
 QUERY_ID = 'qn'
+QUERY_OPERATION_NUM = 'qon'
 QUERY_VERSION = 'qv'
 RANGE = 'rg'
 RANGE_PATH = 'rp'
@@ -8,14 +8,14 @@ from abc import abstractmethod
 from datetime import datetime
 from decimal import Context, ROUND_HALF_EVEN
 from json import loads
-from time import sleep, time
+from time import perf_counter, sleep, time
 
 from dateutil import tz
 
 from .common import (
     CheckValue, Consistency, Durability, FieldRange, PreparedStatement,
-    PutOption, ReplicaStats, State, SystemState, TableLimits, TableUsage,
-    TimeToLive, Version, deprecated)
+    Priority, PutOption, ReplicaStats, State, SystemState, TableLimits,
+    TableUsage, TimeToLive, Version, deprecated)
 from .exception import (
     IllegalArgumentException, RequestTimeoutException)
 from .http import RateLimiter
@@ -50,7 +50,9 @@ class Request(object):
     def __init__(self):
         # Cloud service only.
         self._compartment = None
+        self._hedge_loser = False
         self._read_rate_limiter = None
+        self._request_timings = None
         self._retry_stats = None
         self._start_time_ms = 0
         self._table_name = None
@@ -59,6 +61,7 @@ class Request(object):
         self._rate_limit_delayed_ms = 0
         self._namespace = None
         self._topo_seq_num = -1
+        self._priority = Priority.INTERACTIVE
 
     def add_retry_delay_ms(self, millis):
         """
@@ -129,6 +132,17 @@ class Request(object):
             return 0
         return self._retry_stats.get_retries()
 
+    def get_priority(self):
+        """
+        Returns the priority class of the request.
+
+        :returns: the priority, a value of :py:class:`Priority`.
+        :rtype: int
+
+        :versionadded:: 5.6.0
+        """
+        return self._priority
+
     def get_read_rate_limiter(self):
         """
         Returns the read rate limiter instance used during this request.
@@ -159,6 +173,10 @@ class Request(object):
             return 0
         return self._retry_stats.get_delay_ms()
 
+    def get_request_timings(self):
+        # Internal use only.
+        return self._request_timings
+
     def get_retry_stats(self):
         """
         Returns a stats object with information about retries. This may be used
@@ -218,6 +236,16 @@ class Request(object):
         """
         return self._write_rate_limiter
 
+    def is_hedge_loser(self):
+        """
+        Internal use only.
+
+        :returns: whether the request is hedged and was still in flight when
+            the other attempt succeeded.
+        :rtype: bool
+        """
+        return self._hedge_loser
+
     def is_query_request(self):
         return False
 
@@ -263,6 +291,46 @@ class Request(object):
             self._timeout_ms = cfg.get_default_timeout()
         return self
 
+    def set_hedge_loser(self, hedge_loser):
+        """
+        Internal use only.
+
+        :param hedge_loser: whether the request is hedged and was still in
+            flight when the other attempt succeeded.
+        :type hedge_loser: bool
+        """
+        self._hedge_loser = hedge_loser
+
+    def set_priority(self, priority):
+        """
+        Sets the priority class of the request, :py:attr:`Priority.INTERACTIVE`
+        by default.
+
+        When rate limiting is enabled, see
+        :py:meth:`NoSQLHandleConfig.set_rate_limiting_enabled`, the limits of a
+        table are shared between the priority classes in proportion to their
+        weights, see :py:meth:`NoSQLHandleConfig.set_priority_weight`. A class
+        that does not use its share lends it to the others, so a class alone
+        can use the whole limits, but a batch job can not delay the
+        interactive requests by more than its share, and the batch requests
+        always get their share.
+
+        Cloud service only.
+
+        :param priority: the priority, a value of :py:class:`Priority`.
+        :type priority: int
+        :returns: self.
+        :raises IllegalArgumentException: raises the exception if priority is
+            not a value of Priority.
+
+        :versionadded:: 5.6.0
+        """
+        if priority not in (Priority.INTERACTIVE, Priority.BATCH):
+            raise IllegalArgumentException(
+                'priority must be a value of Priority.')
+        self._priority = priority
+        return self
+
     def set_read_rate_limiter(self, rate_limiter):
         """
         Sets a read rate limiter to use for this request.
@@ -284,6 +352,11 @@ class Request(object):
         self._read_rate_limiter = rate_limiter
         return self
 
+    def set_request_timings(self, request_timings):
+        # Internal use only.
+        self._request_timings = request_timings
+        return self
+
     def set_retry_stats(self, retry_stats):
         """
         Internal use only.
@@ -2557,6 +2630,9 @@ class QueryRequest(Request):
         self._server_query_traces = None # dict if set
         self._batch_counter = 0
         self._last_write_metadata = None # dict, list, string, number, bool or None
+        # parallel scan, 0 if the query is not split
+        self._num_operations = 0
+        self._operation_number = 0
 
     def __str__(self):
         return 'QueryRequest'
@@ -2588,6 +2664,9 @@ class QueryRequest(Request):
         internal_req._driver_query_trace = self._driver_query_trace
         internal_req._topo_seq_num = self._topo_seq_num
         internal_req._in_test_mode = self._in_test_mode
+        internal_req._num_operations = self._num_operations
+        internal_req._operation_number = self._operation_number
+        internal_req._priority = self._priority
         return internal_req
 
     def copy(self):
@@ -3091,6 +3170,27 @@ class QueryRequest(Request):
         if self._statement is None and self._prepared_statement is None:
             raise IllegalArgumentException(
                 'Either statement or prepared statement should be set.')
+        if self._num_operations > 0:
+            if self._prepared_statement is None:
+                raise IllegalArgumentException(
+                    'A query must be prepared to set the number of '
+                    'operations.')
+            if not self._prepared_statement.is_simple_query():
+                raise IllegalArgumentException(
+                    'The number of operations can only be set for simple '
+                    'queries.')
+            max_parallelism = (
+                self._prepared_statement.get_maximum_parallelism())
+            if self._num_operations > max_parallelism:
+                raise IllegalArgumentException(
+                    'The number of operations, ' +
+                    str(self._num_operations) + ', exceeds the maximum ' +
+                    'parallelism of the query: ' + str(max_parallelism))
+            if (self._operation_number < 1 or
+                    self._operation_number > self._num_operations):
+                raise IllegalArgumentException(
+                    'The operation number must be between 1 and the number '
+                    'of operations: ' + str(self._operation_number))
 
     @staticmethod
     def get_serial_version(serial_version):
@@ -3106,6 +3206,69 @@ class QueryRequest(Request):
         # type: () -> str
         return "Query"
 
+    def set_number_of_operations(self, num_operations):
+        """
+        Sets the number of independent operations a parallel scan is split
+        into. A query can be split if it is a simple query, with no sorting,
+        grouping or aggregation at the driver, that scans all partitions or all
+        shards of a table. The maximum value is returned by
+        :py:meth:`PreparedStatement.get_maximum_parallelism`, the query must be
+        prepared to use this setting. Each operation is run using a separate
+        QueryRequest that has the same number of operations and its own
+        operation number, see :py:meth:`set_operation_number`. The union of
+        the results of all operations is the result of the query.
+
+        :param num_operations: the number of operations, 0 to not split the
+            query.
+        :type num_operations: int
+        :returns: self.
+        :raises IllegalArgumentException: raises the exception if
+            num_operations is a negative number.
+        :versionadded:: 5.6.0
+        """
+        CheckValue.check_int_ge_zero(num_operations, 'num_operations')
+        self._num_operations = num_operations
+        return self
+
+    def get_number_of_operations(self):
+        """
+        Returns the number of operations of a parallel scan, or 0 if the query
+        is not split.
+
+        :returns: the number of operations.
+        :rtype: int
+        :versionadded:: 5.6.0
+        """
+        return self._num_operations
+
+    def set_operation_number(self, operation_number):
+        """
+        Sets the operation of a parallel scan executed by this request, from 1
+        to the number of operations set using
+        :py:meth:`set_number_of_operations`.
+
+        :param operation_number: the operation number.
+        :type operation_number: int
+        :returns: self.
+        :raises IllegalArgumentException: raises the exception if
+            operation_number is not a positive number.
+        :versionadded:: 5.6.0
+        """
+        CheckValue.check_int_gt_zero(operation_number, 'operation_number')
+        self._operation_number = operation_number
+        return self
+
+    def get_operation_number(self):
+        """
+        Returns the operation number of a parallel scan, or 0 if it is not
+        set.
+
+        :returns: the operation number.
+        :rtype: int
+        :versionadded:: 5.6.0
+        """
+        return self._operation_number
+
     def get_last_write_metadata(self):
         """
         Returns the last write metadata to be used for this request or None if
@@ -4761,6 +4924,7 @@ class Result(object):
         self._rate_limit_delayed_ms = 0
         self._read_kb = 0
         self._read_units = 0
+        self._request_timings = None
         self._retry_stats = None
         self._write_kb = 0
         self._write_units = 0
@@ -4783,6 +4947,18 @@ class Result(object):
         # Internal use only.
         return self._read_units
 
+    def get_request_timings(self):
+        """
+        Returns the time spent in each phase of the request: serialization,
+        signing, wait for the rate limiters, network and deserialization.
+
+        :returns: the timings of the request, or None if the collection of
+            driver stats is not enabled.
+        :rtype: RequestTimings
+        :versionadded:: 5.6.0
+        """
+        return self._request_timings
+
     def get_retry_stats(self):
         """
         Returns a stats object with information about retries.
@@ -4816,6 +4992,10 @@ class Result(object):
         self._read_units = read_units
         return self
 
+    def set_request_timings(self, request_timings):
+        # Internal use only.
+        self._request_timings = request_timings
+
     def set_retry_stats(self, retry_stats):
         """
         Internal use only.
@@ -6939,6 +7119,127 @@ class ReplicaStatsResult(Result):
         return records_str
 
 
+class RequestTimings(object):
+    """
+    A class that maintains the time spent in each phase of a request.
+
+    The phases are the serialization of the request, the signing of the
+    request, the wait for the rate limiters, the network round trips with the
+    server and the deserialization of the response. When a request is retried
+    the times of all the attempts are added, so the sum of the phases may be
+    less than the total time of the request, which also includes the delays
+    between retries.
+
+    Timings are collected only while the collection of driver stats is enabled
+    (see :py:class:`StatsControl`), otherwise
+    :py:meth:`Result.get_request_timings` returns None. The timings are also
+    aggregated by type of request in the driver stats.
+
+    :versionadded:: 5.6.0
+    """
+
+    def __init__(self):
+        self._start_time = perf_counter()
+        self._serialization_ms = 0
+        self._signing_ms = 0
+        self._rate_limit_ms = 0
+        self._network_ms = 0
+        self._deserialization_ms = 0
+        self._total_ms = 0
+
+    def __str__(self):
+        return ('serialization_ms=' + str(self.get_serialization_ms()) +
+                ', signing_ms=' + str(self.get_signing_ms()) +
+                ', rate_limit_ms=' + str(self.get_rate_limit_ms()) +
+                ', network_ms=' + str(self.get_network_ms()) +
+                ', deserialization_ms=' +
+                str(self.get_deserialization_ms()) +
+                ', total_ms=' + str(self.get_total_ms()))
+
+    def add_serialization_ms(self, ms):
+        # Internal use only.
+        self._serialization_ms += ms
+
+    def add_signing_ms(self, ms):
+        # Internal use only.
+        self._signing_ms += ms
+
+    def add_rate_limit_ms(self, ms):
+        # Internal use only.
+        self._rate_limit_ms += ms
+
+    def add_network_ms(self, ms):
+        # Internal use only.
+        self._network_ms += ms
+
+    def add_deserialization_ms(self, ms):
+        # Internal use only.
+        self._deserialization_ms += ms
+
+    def end(self):
+        # Internal use only, called when the result is returned.
+        self._total_ms = (perf_counter() - self._start_time) * 1000
+
+    def get_serialization_ms(self):
+        """
+        Returns the time spent serializing the request.
+
+        :returns: the time in milliseconds.
+        :rtype: float
+        """
+        return round(self._serialization_ms, 3)
+
+    def get_signing_ms(self):
+        """
+        Returns the time spent getting the authorization of the request, that
+        is signing it for the cloud service or getting the login token for the
+        on-premises service.
+
+        :returns: the time in milliseconds.
+        :rtype: float
+        """
+        return round(self._signing_ms, 3)
+
+    def get_rate_limit_ms(self):
+        """
+        Returns the time spent waiting for the rate limiters, before and after
+        the request is sent. Cloud only.
+
+        :returns: the time in milliseconds.
+        :rtype: float
+        """
+        return round(self._rate_limit_ms, 3)
+
+    def get_network_ms(self):
+        """
+        Returns the time spent sending the request and receiving the response,
+        which includes the processing of the request by the server.
+
+        :returns: the time in milliseconds.
+        :rtype: float
+        """
+        return round(self._network_ms, 3)
+
+    def get_deserialization_ms(self):
+        """
+        Returns the time spent deserializing the response.
+
+        :returns: the time in milliseconds.
+        :rtype: float
+        """
+        return round(self._deserialization_ms, 3)
+
+    def get_total_ms(self):
+        """
+        Returns the total time of the request, from the call of the
+        :py:class:`NoSQLHandle` method to the return of the result.
+
+        :returns: the time in milliseconds.
+        :rtype: float
+        """
+        return round(self._total_ms, 3)
+
+
 class RetryStats(object):
     """
     A class that maintains stats on retries during a request.
@@ -6951,6 +7252,7 @@ class RetryStats(object):
     def __init__(self):
         self._delay_ms = 0
         self._exception_map = dict()
+        self._last_delay_ms = 0
         self._retries = 0
 
     def __str__(self):
@@ -6968,6 +7270,7 @@ class RetryStats(object):
         :type delay_ms: int
         """
         self._delay_ms += delay_ms
+        self._last_delay_ms = delay_ms
 
     def add_exception(self, e):
         """
@@ -7019,6 +7322,7 @@ class RetryStats(object):
         """
         self._delay_ms = 0
         self._exception_map.clear()
+        self._last_delay_ms = 0
         self._retries = 0
 
     def get_delay_ms(self):
@@ -7031,6 +7335,17 @@ class RetryStats(object):
         """
         return self._delay_ms
 
+    def get_last_delay_ms(self):
+        """
+        Returns the time delayed (slept) before the last retry event.
+
+        :returns: the last delay, in milliseconds.
+        :rtype: int
+
+        :versionadded:: 5.6.0
+        """
+        return self._last_delay_ms
+
     def get_num_exceptions(self, e):
         """
         Returns the number of exceptions of a particular class. If no exceptions
@@ -2032,6 +2032,22 @@ class ReceiveIter(PlanIter):
             return self.virtual_scans
 
         def fetch(self):
+            tracer = self.rcb.get_client().get_tracer()
+            if tracer is None:
+                self._fetch()
+                return
+            attributes = {
+                ('nosql.query.shard_id' if self.is_for_shard else
+                 'nosql.query.partition_id'): self.shard_or_part_id}
+            with tracer.span('nosql.query.fetch', attributes) as span:
+                self._fetch()
+                span.set_attribute('nosql.query.batch',
+                                   self.rcb.get_request().get_batch_counter())
+                span.set_attribute('nosql.query.results', len(self.results))
+                span.set_attribute('nosql.query.more_results',
+                                   self.more_remote_results)
+
+        def _fetch(self):
             orig_request = self.rcb.get_request()
             orig_request.incr_batch_counter()
             req = orig_request.copy_internal()
@@ -0,0 +1,475 @@
+#
+# Copyright (c) 2018, 2026 Oracle and/or its affiliates. All rights reserved.
+#
+# Licensed under the Universal Permissive License v 1.0 as shown at
+#  https://oss.oracle.com/licenses/upl/
+#
+
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from os import cpu_count
+from pickle import dumps, loads
+from queue import Empty, Full, Queue
+from threading import Event, Lock, Thread
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+from .common import ByteInputStream, CheckValue, synchronized
+from .exception import IllegalArgumentException
+from .nson import JsonSerializer, Nson, Proto
+from .operations import PrepareRequest, QueryRequest
+
+
+class ParallelQueryIterableResult(object):
+    """
+    ParallelQueryIterableResult is returned by
+    :py:meth:`NoSQLHandle.parallel_query`. It is an iterable of dict instances
+    representing all the results of a query that is split into independent
+    operations executed concurrently, see
+    :py:meth:`QueryRequest.set_number_of_operations`.
+
+    Each iterator starts one thread per operation and returns the results of
+    all operations, in no particular order, as soon as they are available. If
+    an operation fails the exception is raised by the iterator and the other
+    operations are stopped. An iterator that is not consumed to the end should
+    be closed using its close method, or by exiting the for loop, to stop the
+    operations.
+
+    .. code-block:: pycon
+
+        handle = ...
+        request = QueryRequest().set_statement('SELECT * FROM foo')
+        for row in handle.parallel_query(request, workers=8):
+            # do something with the result row
+            print(row)
+
+    :versionadded:: 5.6.0
+    """
+
+    # The number of batches of results buffered per operation.
+    QUEUE_BATCHES_PER_OPERATION = 2
+
+    def __init__(self, handle, request, workers):
+        if not isinstance(request, QueryRequest):
+            raise IllegalArgumentException(
+                'The parameter should be an instance of QueryRequest.')
+        CheckValue.check_int_gt_zero(workers, 'workers')
+        request.validate()
+        if not request.is_prepared():
+            prep_request = PrepareRequest().set_statement(
+                request.get_statement())
+            if request.get_compartment() is not None:
+                prep_request.set_compartment(request.get_compartment())
+            if request.get_namespace() is not None:
+                prep_request.set_namespace(request.get_namespace())
+            request.set_prepared_statement(
+                handle.prepare(prep_request).get_prepared_statement())
+        max_parallelism = (
+            request.get_prepared_statement().get_maximum_parallelism())
+        if not request.is_simple_query() or max_parallelism < 1:
+            raise IllegalArgumentException(
+                'The query can not be split into parallel operations, it '
+                'must be a simple query that scans all partitions or all '
+                'shards of a table: ' + str(
+                    request.get_prepared_statement().get_sql_text()))
+        self._handle = handle
+        self._request = request
+        self._num_operations = min(workers, max_parallelism)
+        self._read_kb = 0
+        self._read_units = 0
+        self._write_kb = 0
+        self._write_units = 0
+        self.lock = Lock()
+
+    def __str__(self):
+        return ('ParallelQueryIterableResult(' + str(self._request) +
+                ', operations=' + str(self._num_operations) + ')\n')
+
+    def __iter__(self):
+        return self._iterate()
+
+    def get_number_of_operations(self):
+        """
+        Returns the number of operations the query is split into. It is the
+        smaller of the number of workers and the maximum parallelism of the
+        query.
+
+        :returns: the number of operations.
+        :rtype: int
+        """
+        return self._num_operations
+
+    def get_read_kb(self):
+        """
+        Returns the read throughput consumed by all operations, in KBytes. This
+        is the cumulative amount since the beginning of the iterable.
+
+        :returns: the read KBytes consumed.
+        :rtype: int
+        """
+        return self._read_kb
+
+    def get_read_units(self):
+        """
+        Returns the read throughput consumed by all operations, in read units.
+        This is the cumulative amount since the beginning of the iterable.
+
+        :returns: the read units consumed.
+        :rtype: int
+        """
+        return self._read_units
+
+    def get_write_kb(self):
+        """
+        Returns the write throughput consumed by all operations, in KBytes.
+
+        :returns: the write KBytes consumed.
+        :rtype: int
+        """
+        return self._write_kb
+
+    def get_write_units(self):
+        """
+        Returns the write throughput consumed by all operations, in write
+        units.
+
+        :returns: the write units consumed.
+        :rtype: int
+        """
+        return self._write_units
+
+    @synchronized
+    def _add_consumed(self, result):
+        self._read_kb += result.get_read_kb()
+        self._read_units += result.get_read_units()
+        self._write_kb += result.get_write_kb()
+        self._write_units += result.get_write_units()
+
+    def _iterate(self):
+        queue = Queue(
+            self._num_operations *
+            ParallelQueryIterableResult.QUEUE_BATCHES_PER_OPERATION)
+        stop = Event()
+        threads = list()
+        for operation in range(1, self._num_operations + 1):
+            request = self._request.copy()
+            request.set_number_of_operations(self._num_operations)
+            request.set_operation_number(operation)
+            thread = Thread(target=self._run_operation,
+                            args=(request, queue, stop))
+            thread.daemon = True
+            thread.start()
+            threads.append(thread)
+        running = len(threads)
+        try:
+            while running > 0:
+                item = queue.get()
+                if item is None:
+                    running -= 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    for row in item:
+                        yield row
+        finally:
+            # Stops the operations if the iterator is closed, or failed,
+            # before all results are consumed.
+            stop.set()
+            while running > 0:
+                try:
+                    if queue.get(timeout=0.1) is None:
+                        running -= 1
+                except Empty:
+                    if not any(thread.is_alive() for thread in threads):
+                        break
+
+    def _run_operation(self, request, queue, stop):
+        try:
+            while not stop.is_set():
+                result = self._handle.query(request)
+                self._add_consumed(result)
+                results = result.get_results()
+                if results:
+                    ParallelQueryIterableResult._put(queue, stop, results)
+                if request.is_done():
+                    break
+        except Exception as e:
+            ParallelQueryIterableResult._put(queue, stop, e)
+        finally:
+            request.close()
+            ParallelQueryIterableResult._put(queue, None, None)
+
+    @staticmethod
+    def _put(queue, stop, item):
+        # Blocks while the queue is full unless the iteration is stopped, the
+        # end of operation marker (stop is None) is always queued.
+        while stop is None or not stop.is_set():
+            try:
+                queue.put(item, timeout=0.1)
+                return
+            except Full:
+                pass
+
+
+class ProcessScanExecutor(object):
+    """
+    Runs parallel scans in a pool of processes, so that decoding the results
+    and any transformation of the rows use more than one core.
+
+    A query is split into independent operations, see
+    :py:meth:`QueryRequest.set_number_of_operations`, and each step of an
+    operation, a few query batches, is run by a worker process. A worker opens
+    its own :py:class:`NoSQLHandle`, once, using the NoSQLHandleConfig returned
+    by config_factory. Because a NoSQLHandleConfig holds objects that can not
+    be pickled, such as its authorization provider and SSL context,
+    config_factory must be a picklable callable, for example a module level
+    function or a functools.partial of one, that returns a new
+    NoSQLHandleConfig.
+
+    The rows are not pickled back to the calling process. Each step returns
+    either the value returned by a worker side transform function applied to
+    its list of rows, or the rows serialized in one of these formats:
+
+        FORMAT_JSON: bytes of newline delimited JSON, one row per line.\n
+        FORMAT_NSON: bytes of an NSON array of the rows, see
+        :py:meth:`decode_nson`.\n
+        FORMAT_ARROW: bytes of an Arrow IPC stream of a table of the rows. This
+        requires the pyarrow package.
+
+    .. code-block:: pycon
+
+        def create_config():
+            return NoSQLHandleConfig(...).set_authorization_provider(...)
+
+        with ProcessScanExecutor(create_config, workers=8) as executor:
+            with open('export.json', 'wb') as f:
+                for payload in executor.scan('SELECT * FROM foo'):
+                    f.write(payload)
+
+    :param config_factory: a picklable callable that returns the
+        NoSQLHandleConfig used by the worker processes.
+    :type config_factory: callable
+    :param workers: the number of worker processes, defaults to the number of
+        CPUs.
+    :type workers: int
+    :param batches_per_step: the maximum number of query batches executed by a
+        worker before returning its results, defaults to 10.
+    :type batches_per_step: int
+    :param mp_context: the multiprocessing context used to start the worker
+        processes, or None to use the default one.
+    :type mp_context: multiprocessing.context.BaseContext
+    :raises IllegalArgumentException: raises the exception if any of the
+        parameters is invalid.
+    :versionadded:: 5.6.0
+    """
+
+    FORMAT_ARROW = 'arrow'
+    FORMAT_JSON = 'json'
+    FORMAT_NSON = 'nson'
+
+    def __init__(self, config_factory, workers=None, batches_per_step=10,
+                 mp_context=None):
+        if not callable(config_factory):
+            raise IllegalArgumentException('config_factory must be callable.')
+        if workers is not None:
+            CheckValue.check_int_gt_zero(workers, 'workers')
+        CheckValue.check_int_gt_zero(batches_per_step, 'batches_per_step')
+        try:
+            self._factory = dumps(config_factory)
+        except Exception as e:
+            raise IllegalArgumentException(
+                'config_factory must be picklable: ' + str(e))
+        self._batches_per_step = batches_per_step
+        # the number of processes of the pool, by default the number of CPUs
+        self._workers = workers or cpu_count() or 1
+        if mp_context is None:
+            self._pool = ProcessPoolExecutor(self._workers)
+        else:
+            self._pool = ProcessPoolExecutor(self._workers, mp_context)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """
+        Shuts down the worker processes.
+        """
+        self._pool.shutdown()
+
+    def scan(self, statement, variables=None, num_operations=0,
+             output_format=FORMAT_JSON, transform=None):
+        """
+        Runs a query split into independent operations executed by the worker
+        processes, and returns a generator of the results of each step, in no
+        particular order.
+
+        Only simple queries, with no sorting, grouping or aggregation, that
+        scan all partitions or all shards of a table can be split.
+
+        :param statement: the query statement.
+        :type statement: str
+        :param variables: the values of the external variables of the query,
+            by name, or None.
+        :type variables: dict
+        :param num_operations: the number of operations, 0 to use the number of
+            workers. It is limited by the maximum parallelism of the query.
+        :type num_operations: int
+        :param output_format: the serialization format of the rows returned by
+            each step if transform is None, defaults to FORMAT_JSON.
+        :type output_format: str
+        :param transform: a picklable callable applied by the workers to the
+            list of rows of each step, or None. Its return value must be
+            picklable.
+        :type transform: callable
+        :returns: a generator of the serialized rows, or of the values returned
+            by transform.
+        :rtype: generator
+        :raises IllegalArgumentException: raises the exception if any of the
+            parameters is invalid or if the query can not be split.
+        :raises ImportError: raises the exception if output_format is
+            FORMAT_ARROW and pyarrow is not installed.
+        :raises NoSQLException: raises the exception if the operation cannot be
+            performed for any other reason.
+        """
+        CheckValue.check_str(statement, 'statement')
+        CheckValue.check_int_ge_zero(num_operations, 'num_operations')
+        if output_format not in (ProcessScanExecutor.FORMAT_ARROW,
+                                 ProcessScanExecutor.FORMAT_JSON,
+                                 ProcessScanExecutor.FORMAT_NSON):
+            raise IllegalArgumentException(
+                'Invalid output format: ' + str(output_format))
+        if (transform is None and
+                output_format == ProcessScanExecutor.FORMAT_ARROW and
+                pyarrow is None):
+            raise ImportError('Package "pyarrow" is required; please install.')
+        if transform is not None and not callable(transform):
+            raise IllegalArgumentException('transform must be callable.')
+        max_parallelism = self._pool.submit(
+            _worker_max_parallelism, self._factory, statement).result()
+        if max_parallelism < 1:
+            raise IllegalArgumentException(
+                'The query can not be split into parallel operations, it '
+                'must be a simple query that scans all partitions or all '
+                'shards of a table: ' + statement)
+        if num_operations == 0:
+            num_operations = self._workers
+        num_operations = min(num_operations, max_parallelism)
+        return self._scan(statement, variables, num_operations,
+                          output_format, transform)
+
+    @staticmethod
+    def decode_nson(payload):
+        """
+        Decodes the rows of a step returned in FORMAT_NSON.
+
+        :param payload: the result of a step.
+        :type payload: bytes
+        :returns: the rows.
+        :rtype: list(dict)
+        """
+        return Proto.nson_to_value(ByteInputStream(bytearray(payload)))
+
+    def _scan(self, statement, variables, num_operations, output_format,
+              transform):
+        def submit(operation, cont_key):
+            future = self._pool.submit(
+                _worker_scan_step, self._factory, statement, variables,
+                num_operations, operation, cont_key, self._batches_per_step,
+                output_format, transform)
+            pending[future] = operation
+
+        pending = dict()
+        for operation in range(1, num_operations + 1):
+            submit(operation, None)
+        try:
+            while pending:
+                done, not_done = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    operation = pending.pop(future)
+                    payload, cont_key = future.result()
+                    if cont_key is not None:
+                        submit(operation, cont_key)
+                    if payload is not None:
+                        yield payload
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+# State of a worker process of a ProcessScanExecutor, keyed by the pickled
+# config factory.
+_worker_handles = dict()
+_worker_statements = dict()
+
+
+def _worker_handle(factory):
+    handle = _worker_handles.get(factory)
+    if handle is None:
+        from .driver import NoSQLHandle
+        handle = NoSQLHandle(loads(factory)())
+        _worker_handles[factory] = handle
+    return handle
+
+
+def _worker_prepare(factory, statement):
+    prepared = _worker_statements.get((factory, statement))
+    if prepared is None:
+        prepared = _worker_handle(factory).prepare(
+            PrepareRequest().set_statement(statement)).get_prepared_statement()
+        _worker_statements[(factory, statement)] = prepared
+    return prepared
+
+
+def _worker_max_parallelism(factory, statement):
+    prepared = _worker_prepare(factory, statement)
+    if not prepared.is_simple_query():
+        return 0
+    return prepared.get_maximum_parallelism()
+
+
+def _worker_scan_step(factory, statement, variables, num_operations,
+                      operation, cont_key, max_batches, output_format,
+                      transform):
+    handle = _worker_handle(factory)
+    prepared = _worker_prepare(factory, statement).copy_statement()
+    if variables:
+        for name, value in variables.items():
+            prepared.set_variable(name, value)
+    request = QueryRequest().set_prepared_statement(prepared)
+    request.set_number_of_operations(num_operations)
+    request.set_operation_number(operation)
+    request.set_cont_key(cont_key)
+    rows = list()
+    for i in range(max_batches):
+        rows.extend(handle.query(request).get_results())
+        if request.is_done():
+            break
+    next_cont_key = None if request.is_done() else request.get_cont_key()
+    if transform is not None:
+        return transform(rows), next_cont_key
+    if not rows:
+        return None, next_cont_key
+    return _encode_rows(rows, output_format), next_cont_key
+
+
+def _encode_rows(rows, output_format):
+    if output_format == ProcessScanExecutor.FORMAT_NSON:
+        return bytes(Proto.value_to_nson(rows))
+    if output_format == ProcessScanExecutor.FORMAT_ARROW:
+        sink = pyarrow.BufferOutputStream()
+        table = pyarrow.Table.from_pylist(rows)
+        with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+    lines = list()
+    for row in rows:
+        js = JsonSerializer()
+        Nson.generate_events_from_value(row, js, False)
+        lines.append(str(js))
+    lines.append('')
+    return '\n'.join(lines).encode('utf-8')
@@ -0,0 +1,230 @@
+#
+# Copyright (c) 2018, 2026 Oracle and/or its affiliates. All rights reserved.
+#
+# Licensed under the Universal Permissive License v 1.0 as shown at
+#  https://oss.oracle.com/licenses/upl/
+#
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from heapq import heappop, heappush
+from itertools import count
+from logging import getLogger
+from threading import Condition, Thread, current_thread
+from time import monotonic
+
+from .exception import IllegalArgumentException
+
+
+class Scheduler(object):
+    """
+    Internal use only.
+
+    Runs the background tasks of the driver, such as the refresh of request
+    signatures and login tokens, the logging of stats and the refresh of rate
+    limiters, in a single daemon thread shared by all the handles of the
+    process. Tasks are kept in a heap ordered by the time they are due.
+
+    Tasks run in the scheduler thread, one at a time, so they must not block
+    for long: a task delays the ones that are due after it. The tasks that
+    block, such as those that send requests, are scheduled with
+    :py:meth:`schedule_blocking` and run in one of :py:attr:`WORKER_THREADS`
+    worker threads once they are due. The delay between the time a task is
+    due and the time it runs, or is handed to a worker, is reported as the
+    scheduling lag by :py:meth:`get_stats`.
+    """
+
+    # The number of threads that run the blocking tasks.
+    WORKER_THREADS = 4
+
+    def __init__(self, name='borneo-scheduler'):
+        self._name = name
+        # Heap of (due time, sequence number, task).
+        self._heap = []
+        self._sequence = count()
+        self._cond = Condition()
+        self._thread = None
+        self._workers = None
+        self._task_count = 0
+        self._total_lag = 0
+        self._max_lag = 0
+
+    def after_fork(self):
+        # The scheduler thread does not exist in a child process. The pending
+        # tasks are kept, the thread is started again by the next schedule.
+        self._cond = Condition()
+        self._thread = None
+        self._workers = None
+
+    def get_stats(self):
+        """
+        Returns the number of running scheduler threads, the number of pending
+        tasks, the number of tasks run, including the blocking tasks handed to
+        the workers, and the average and maximum scheduling lag in
+        milliseconds since the scheduler was created.
+
+        :returns: the stats.
+        :rtype: dict
+        """
+        with self._cond:
+            thread = self._thread
+            task_count = self._task_count
+            return {
+                'threadCount':
+                    1 if thread is not None and thread.is_alive() else 0,
+                'pendingTasks': sum(
+                    1 for entry in self._heap if not entry[2].is_cancelled()),
+                'taskCount': task_count,
+                'lagAvgMs': (0 if task_count == 0 else
+                             round(self._total_lag * 1000 / task_count, 3)),
+                'lagMaxMs': round(self._max_lag * 1000, 3)}
+
+    def schedule(self, delay, function, *args, **kwargs):
+        """
+        Schedules a function to be run after a delay.
+
+        :param delay: the delay in seconds.
+        :type delay: float
+        :param function: the function to run.
+        :type function: callable
+        :returns: the task, it can be used to cancel the run.
+        :rtype: ScheduledTask
+        :raises IllegalArgumentException: raises the exception if delay is
+            negative.
+        """
+        return self._schedule(
+            delay, ScheduledTask(function, args, kwargs, False))
+
+    def schedule_blocking(self, delay, function, *args, **kwargs):
+        """
+        Schedules a function that may block, such as one that sends a
+        request, to be run in a worker thread after a delay.
+
+        :param delay: the delay in seconds.
+        :type delay: float
+        :param function: the function to run.
+        :type function: callable
+        :returns: the task, it can be used to cancel the run.
+        :rtype: ScheduledTask
+        :raises IllegalArgumentException: raises the exception if delay is
+            negative.
+        """
+        return self._schedule(
+            delay, ScheduledTask(function, args, kwargs, True))
+
+    def _get_workers(self):
+        with self._cond:
+            if self._workers is None:
+                self._workers = ThreadPoolExecutor(
+                    Scheduler.WORKER_THREADS, self._name + '-worker')
+            return self._workers
+
+    def _schedule(self, delay, task):
+        if delay < 0:
+            raise IllegalArgumentException(
+                'delay must be a non-negative number.')
+        with self._cond:
+            heappush(self._heap,
+                     (monotonic() + delay, next(self._sequence), task))
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = Thread(target=self._run, name=self._name)
+                self._thread.daemon = True
+                self._thread.start()
+            else:
+                self._cond.notify()
+        return task
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if self._thread is not current_thread():
+                    # Replaced after a fork.
+                    return
+                while True:
+                    # Drop the cancelled tasks at the head of the heap.
+                    while self._heap and self._heap[0][2].is_cancelled():
+                        heappop(self._heap)
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    wait = self._heap[0][0] - monotonic()
+                    if wait <= 0:
+                        break
+                    self._cond.wait(wait)
+                due, _, task = heappop(self._heap)
+                lag = monotonic() - due
+                self._task_count += 1
+                self._total_lag += lag
+                if lag > self._max_lag:
+                    self._max_lag = lag
+            if task.is_blocking():
+                self._get_workers().submit(_run_task, task)
+            else:
+                _run_task(task)
+
+
+class ScheduledTask(object):
+    """
+    Internal use only.
+
+    A function scheduled by :py:meth:`Scheduler.schedule`.
+    """
+
+    def __init__(self, function, args, kwargs, blocking):
+        self._function = function
+        self._args = args
+        self._kwargs = kwargs
+        self._blocking = blocking
+        self._cancelled = False
+
+    def __str__(self):
+        return getattr(self._function, '__qualname__', str(self._function))
+
+    def cancel(self):
+        """
+        Cancels the task, it has no effect if the task already ran.
+        """
+        self._cancelled = True
+
+    def is_blocking(self):
+        """
+        Returns whether the task runs in a worker thread.
+
+        :returns: True if the task was scheduled with
+            :py:meth:`Scheduler.schedule_blocking`.
+        :rtype: bool
+        """
+        return self._blocking
+
+    def is_cancelled(self):
+        """
+        Returns whether the task has been cancelled.
+
+        :returns: True if the task has been cancelled.
+        :rtype: bool
+        """
+        return self._cancelled
+
+    def run(self):
+        if not self._cancelled:
+            self._function(*self._args, **self._kwargs)
+
+
+def _run_task(task):
+    try:
+        task.run()
+    except Exception as e:
+        getLogger(__name__).error(
+            'Scheduled task ' + str(task) + ' failed: ' + str(e))
+
+
+_scheduler = Scheduler()
+
+
+def get_scheduler():
+    # Returns the scheduler shared by the handles of the process.
+    return _scheduler
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_scheduler.after_fork)
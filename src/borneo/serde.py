@@ -6,9 +6,8 @@
 #
 
 from collections import OrderedDict
-from datetime import datetime
 from decimal import (
-    Context, Decimal, ROUND_05UP, ROUND_CEILING, ROUND_DOWN, ROUND_FLOOR,
+    Context, ROUND_05UP, ROUND_CEILING, ROUND_DOWN, ROUND_FLOOR,
     ROUND_HALF_DOWN, ROUND_HALF_EVEN, ROUND_HALF_UP, ROUND_UP)
 
 from .common import (
@@ -48,6 +47,23 @@ class BinaryProtocol(object):
     or other derived protocol state.
     """
 
+    # The writers of the field values, indexed by type code.
+    _FIELD_VALUE_WRITERS = {
+        SerdeUtil.FIELD_VALUE_TYPE.ARRAY:
+            lambda bos, value: BinaryProtocol.write_list(bos, value),
+        SerdeUtil.FIELD_VALUE_TYPE.BINARY: SerdeUtil.write_bytearray,
+        SerdeUtil.FIELD_VALUE_TYPE.BOOLEAN:
+            lambda bos, value: bos.write_boolean(value),
+        SerdeUtil.FIELD_VALUE_TYPE.DOUBLE:
+            lambda bos, value: bos.write_float(value),
+        SerdeUtil.FIELD_VALUE_TYPE.INTEGER: SerdeUtil.write_packed_int,
+        SerdeUtil.FIELD_VALUE_TYPE.LONG: SerdeUtil.write_packed_long,
+        SerdeUtil.FIELD_VALUE_TYPE.MAP:
+            lambda bos, value: BinaryProtocol.write_dict(bos, value),
+        SerdeUtil.FIELD_VALUE_TYPE.STRING: SerdeUtil.write_string,
+        SerdeUtil.FIELD_VALUE_TYPE.TIMESTAMP: SerdeUtil.write_datetime,
+        SerdeUtil.FIELD_VALUE_TYPE.NUMBER: SerdeUtil.write_decimal}
+
     @staticmethod
     def deserialize_consumed_capacity(bis, result):
         result.set_read_units(SerdeUtil.read_packed_int(bis))
@@ -275,31 +291,14 @@ class BinaryProtocol(object):
     @staticmethod
     def write_field_value(bos, value):
         # Serialize a generic field value.
-        bos.write_byte(SerdeUtil.get_type(value))
+        t = SerdeUtil.get_type(value)
+        bos.write_byte(t)
         if value is not None:
-            if isinstance(value, list):
-                BinaryProtocol.write_list(bos, value)
-            elif isinstance(value, bytearray):
-                SerdeUtil.write_bytearray(bos, value)
-            elif isinstance(value, bool):
-                bos.write_boolean(value)
-            elif isinstance(value, float):
-                bos.write_float(value)
-            elif CheckValue.is_int_value(value):
-                SerdeUtil.write_packed_int(bos, value)
-            elif CheckValue.is_long_value(value):
-                SerdeUtil.write_packed_long(bos, value)
-            elif isinstance(value, dict):
-                BinaryProtocol.write_dict(bos, value)
-            elif CheckValue.is_str(value):
-                SerdeUtil.write_string(bos, value)
-            elif isinstance(value, datetime):
-                SerdeUtil.write_datetime(bos, value)
-            elif isinstance(value, Decimal) or CheckValue.is_overlong(value):
-                SerdeUtil.write_decimal(bos, value)
-            else:
+            writer = BinaryProtocol._FIELD_VALUE_WRITERS.get(t)
+            if writer is None:
                 raise IllegalStateException(
                     'Unknown value type ' + str(type(value)))
+            writer(bos, value)
 
     @staticmethod
     def write_list(bos, value):
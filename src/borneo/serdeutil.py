@@ -5,14 +5,15 @@
 #  https://oss.oracle.com/licenses/upl/
 #
 
+import re
 from abc import ABCMeta, abstractmethod
+from calendar import timegm
 from datetime import datetime
 from dateutil import parser, tz
 from decimal import (
     Decimal, ROUND_05UP, ROUND_CEILING, ROUND_DOWN, ROUND_FLOOR,
     ROUND_HALF_DOWN, ROUND_HALF_EVEN, ROUND_HALF_UP, ROUND_UP)
 from sys import version_info
-from time import mktime
 
 from .common import (
     CheckValue, Empty, JsonNone, PackedInteger, PutOption, State, SystemState, enum)
@@ -154,6 +155,14 @@ class SerdeUtil(object):
     """
     TRACE_LEVEL = 0
 
+    # The ISO 8601 form of the timestamps returned by the proxy.
+    _ISO_DATETIME = re.compile(
+        r'(\d{4})-(\d{2})-(\d{2})T(\d{2}):(\d{2}):(\d{2})(?:\.(\d{1,9}))?Z\Z',
+        re.ASCII)
+    # Multipliers of the fraction of second digits of an ISO 8601 string,
+    # indexed by the number of digits, to get microseconds.
+    _USEC_SCALE = (0, 100000, 10000, 1000, 100, 10, 1, 1, 1, 1)
+
     # protocol serial versions
     SERIAL_VERSION_3 = 3
     SERIAL_VERSION_4 = 4
@@ -174,6 +183,24 @@ class SerdeUtil(object):
                             NULL=11,
                             EMPTY=12)
 
+    # Marks the int types in _VALUE_TYPES, the field value type of an int
+    # depends on its value.
+    _INT_VALUE = -1
+    # Cache of the field value type of each concrete Python type, it avoids
+    # going through the isinstance checks of _get_value_type for every value.
+    _VALUE_TYPES = {list: FIELD_VALUE_TYPE.ARRAY,
+                    bytearray: FIELD_VALUE_TYPE.BINARY,
+                    bool: FIELD_VALUE_TYPE.BOOLEAN,
+                    float: FIELD_VALUE_TYPE.DOUBLE,
+                    int: _INT_VALUE,
+                    dict: FIELD_VALUE_TYPE.MAP,
+                    str: FIELD_VALUE_TYPE.STRING,
+                    datetime: FIELD_VALUE_TYPE.TIMESTAMP,
+                    Decimal: FIELD_VALUE_TYPE.NUMBER,
+                    type(None): FIELD_VALUE_TYPE.NULL,
+                    Empty: FIELD_VALUE_TYPE.EMPTY,
+                    JsonNone: FIELD_VALUE_TYPE.JSON_NULL}
+
     # Operation codes
     OP_CODE = enum(DELETE=0,
                    DELETE_IF_VERSION=1,
@@ -457,9 +484,8 @@ class SerdeUtil(object):
 
     @staticmethod
     def read_datetime(bis):
-        # Deserialize a datetime value. Timezone is UTC, object is naive, not
-        # timezone aware
-        return parser.parse(SerdeUtil.read_string(bis))
+        # Deserialize a datetime value. Timezone is UTC.
+        return SerdeUtil.iso_to_datetime(SerdeUtil.read_string(bis))
 
     @staticmethod
     def read_decimal(bis):
@@ -635,20 +661,9 @@ class SerdeUtil(object):
     #
     @staticmethod
     def datetime_to_iso(date):
-        daysep = '-'
-        timesep = ':'
-        val = SerdeUtil.append_with_pad(None, str(date.year), 4)
-        val += daysep
-        val = SerdeUtil.append_with_pad(val, str(date.month), 2)
-        val += daysep
-        val = SerdeUtil.append_with_pad(val, str(date.day), 2)
-        # always add time even if it's 0; simpler that way
-        val += 'T'
-        val = SerdeUtil.append_with_pad(val, str(date.hour), 2)
-        val += timesep
-        val = SerdeUtil.append_with_pad(val, str(date.minute), 2)
-        val += timesep
-        val = SerdeUtil.append_with_pad(val, str(date.second), 2)
+        val = '%04d-%02d-%02dT%02d:%02d:%02d' % (
+            date.year, date.month, date.day, date.hour, date.minute,
+            date.second)
         if date.microsecond > 0:
             # usecs need to be 6 digits, so pad to 6 chars but strip
             # trailing 0. The strip isn't strictly necessary but plays
@@ -656,11 +671,29 @@ class SerdeUtil(object):
             # microseconds or milliseconds. E.g. these are the same:
             #  .1, .100, .100000 and they all mean 100ms (100000us)
             # In other words the trailing 0 values are implied
-            val += '.'
-            val = SerdeUtil.append_with_pad(val,
-                                            str(date.microsecond), 6).rstrip('0')
-        val += 'Z'
-        return val
+            val += ('.%06d' % date.microsecond).rstrip('0')
+        return val + 'Z'
+
+    #
+    # Parses the ISO 8601 strings written by the proxy, of the form
+    # YYYY-MM-DDTHH:MM:SS[.fffffffff]Z, without the generic parser of dateutil,
+    # which is much slower. Digits beyond microseconds are truncated, as done
+    # by dateutil. Any other form is handed to dateutil.
+    #
+    @staticmethod
+    def iso_to_datetime(iso_string):
+        match = SerdeUtil._ISO_DATETIME.match(iso_string)
+        if match is None:
+            return parser.parse(iso_string)
+        year, month, day, hour, minute, second, frac = match.groups()
+        usec = 0 if frac is None else (
+            int(frac[:6]) * SerdeUtil._USEC_SCALE[len(frac)])
+        try:
+            return datetime(int(year), int(month), int(day), int(hour),
+                            int(minute), int(second), usec, tz.UTC)
+        except ValueError:
+            # Out of range field, let dateutil report the error.
+            return parser.parse(iso_string)
 
     @staticmethod
     def write_datetime(bos, value):
@@ -671,10 +704,11 @@ class SerdeUtil(object):
 
     @staticmethod
     def iso_time_to_ms(iso_string):
-        dt = parser.parse(iso_string)
+        # The time is UTC if the string has no timezone.
+        dt = SerdeUtil.iso_to_datetime(iso_string)
         if dt.tzinfo is not None:
             dt = dt.astimezone(tz.UTC)
-        return int(mktime(dt.timetuple()) * 1000) + dt.microsecond // 1000
+        return timegm(dt.timetuple()) * 1000 + dt.microsecond // 1000
 
     @staticmethod
     def write_decimal(bos, value):
@@ -815,6 +849,22 @@ class SerdeUtil(object):
 
     @staticmethod
     def get_type(value):
+        value_type = type(value)
+        t = SerdeUtil._VALUE_TYPES.get(value_type)
+        if t is None:
+            # A subclass, or an unknown type which raises an exception.
+            t = SerdeUtil._get_value_type(value)
+            SerdeUtil._VALUE_TYPES[value_type] = t
+        if t == SerdeUtil._INT_VALUE:
+            if -2147483648 <= value < 2147483648:
+                return SerdeUtil.FIELD_VALUE_TYPE.INTEGER
+            if -9223372036854775808 <= value < 9223372036854775808:
+                return SerdeUtil.FIELD_VALUE_TYPE.LONG
+            return SerdeUtil.FIELD_VALUE_TYPE.NUMBER
+        return t
+
+    @staticmethod
+    def _get_value_type(value):
         if isinstance(value, list):
             return SerdeUtil.FIELD_VALUE_TYPE.ARRAY
         elif isinstance(value, bytearray):
@@ -823,20 +873,16 @@ class SerdeUtil(object):
             return SerdeUtil.FIELD_VALUE_TYPE.BOOLEAN
         elif isinstance(value, float):
             return SerdeUtil.FIELD_VALUE_TYPE.DOUBLE
-        elif CheckValue.is_int_value(value):
-            return SerdeUtil.FIELD_VALUE_TYPE.INTEGER
-        elif CheckValue.is_long_value(value):
-            return SerdeUtil.FIELD_VALUE_TYPE.LONG
+        elif isinstance(value, int):
+            return SerdeUtil._INT_VALUE
         elif isinstance(value, dict):
             return SerdeUtil.FIELD_VALUE_TYPE.MAP
         elif CheckValue.is_str(value):
             return SerdeUtil.FIELD_VALUE_TYPE.STRING
         elif isinstance(value, datetime):
             return SerdeUtil.FIELD_VALUE_TYPE.TIMESTAMP
-        elif isinstance(value, Decimal) or CheckValue.is_overlong(value):
+        elif isinstance(value, Decimal):
             return SerdeUtil.FIELD_VALUE_TYPE.NUMBER
-        elif value is None:
-            return SerdeUtil.FIELD_VALUE_TYPE.NULL
         elif isinstance(value, Empty):
             return SerdeUtil.FIELD_VALUE_TYPE.EMPTY
         elif isinstance(value, JsonNone):
@@ -6,11 +6,14 @@
 #
 
 import pprint
+import re
 import sys
 import uuid
+from collections import OrderedDict
 from datetime import datetime
 from logging import INFO
-from threading import Timer, Lock
+from math import frexp, ldexp
+from threading import Lock, current_thread, local
 from time import localtime
 from typing import Any, Dict
 
@@ -20,6 +23,8 @@ from .exception import (SecurityInfoNotReadyException, ThrottlingException,
                         IllegalArgumentException)
 from .common import LogUtils, synchronized, CheckValue
 from .kv.exception import AuthenticationException
+from .metrics import MetricsExporter
+from .scheduler import get_scheduler
 from .version import __version__
 
 
@@ -45,7 +50,9 @@ class StatsControl:
           * none - disabled,
           * regular - per request: counters, errors, latencies, delays, retries.
             This incurs minimum overhead.
-          * more - stats above with 95th and 99th percentile latencies.
+          * more - stats above with 50th, 90th, 95th, 99th and 99.9th
+            percentile latencies. Percentiles are computed from a fixed size
+            histogram and are within 1% of the exact values.
             This may add 0.5% overhead compared to none stats profile.
           * all - stats above with per query information.
             This may add 1% overhead compared to none stats profile.
@@ -128,8 +135,33 @@ class StatsControl:
              "min" : 4,                            // minimum value in interval
              "avg" : 4.5,                          // average value in interval
              "max" : 5,                            // maximum value in interval
+             "50th" : 4,                           // 50th percentile value
+             "90th" : 5,                           // 90th percentile value
              "95th" : 5,                           // 95th percentile value
-             "99th" : 5                            // 99th percentile value
+             "99th" : 5,                           // 99th percentile value
+             "99.9th" : 5                          // 99.9th percentile value
+           },
+           "phaseLatencyMs" : {                  // time of each phase of requests
+             "serialization" : {                   // serialization of the request
+               "avg" : 0.021,                        // average value in interval
+               "max" : 0.025                         // maximum value in interval
+             },
+             "signing" : {                         // authorization of the request
+               "avg" : 0.008,
+               "max" : 0.01
+             },
+             "rateLimit" : {                       // wait for the rate limiters
+               "avg" : 0,
+               "max" : 0
+             },
+             "network" : {                         // http request and response
+               "avg" : 4.5,
+               "max" : 5
+             },
+             "deserialization" : {                 // deserialization of the response
+               "avg" : 0.03,
+               "max" : 0.034
+             }
            },
            "requestSize" : {                     // http request size in bytes
              "min" : 42,                           // minimum value in interval
@@ -156,8 +188,11 @@ class StatsControl:
              "min" : 3,
              "avg" : 13.0,
              "max" : 32,
+             "50th" : 12,
+             "90th" : 30,
              "95th" : 32,
-             "99th" : 32
+             "99th" : 32,
+             "99.9th" : 32
            },
            "resultSize" : {
              "min" : 146,
@@ -184,8 +219,11 @@ class StatsControl:
              "min" : 1,
              "avg" : 4.41,
              "max" : 80,
+             "50th" : 4,
+             "90th" : 7,
              "95th" : 8,
-             "99th" : 20
+             "99th" : 20,
+             "99.9th" : 68
            },
            "requestSize" : {
              "min" : 90,
@@ -234,8 +272,11 @@ class StatsControl:
              "min" : 8,                // minimum value in interval
              "avg" : 14.58,            // average value in interval
              "max" : 32,               // maximum value in interval
+             "50th" : 12,              // 50th percentile value in interval
+             "90th" : 30,              // 90th percentile value in interval
              "95th" : 32,              // 95th percentile value in interval
-             "99th" : 32               // 99th percentile value in interval
+             "99th" : 32,              // 99th percentile value in interval
+             "99.9th" : 32            // 99.9th percentile value in interval
            },
            "requestSize" : {         // http request size in bytes
              "min" : 65,               // minimum value in interval
@@ -275,6 +316,41 @@ class StatsControl:
    type of queries, the driver executes several simpler queries, per
    shard or partition, and than combines the results locally.
 
+   The **phaseLatencyMs** entry of each type of request splits the time of the
+   successful requests in phases: the serialization of the request, its
+   signing, the wait for the rate limiters, the http round trips and the
+   deserialization of the response. The times of the phases of a single
+   request are available with :py:meth:`Result.get_request_timings`.
+
+   With the more and all profiles the **tables** entry contains the same stats
+   for each table, ordered by number of requests, with the **readUnits** and
+   **writeUnits** consumed. The **queries** entry aggregates the queries by
+   shape, the statement with its literals replaced by **?**. To keep the
+   memory used fixed only the 50 tables and query shapes used the most are
+   kept, using the space-saving algorithm: a table or query shape can replace
+   one used less often during the interval, its **countError** field is then
+   the maximum number of its requests that were not counted.
+
+   Other components of the driver add their own entries to the stats of each
+   interval. When using a :py:class:`borneo.iam.SignatureProvider` the
+   **signing** entry contains the number of request signatures created
+   (**count**), how many of them signed the request content
+   (**contentCount**), how many requests waited for a signature being created
+   by another thread (**waits**) and the total and maximum time spent signing
+   (**totalMs**, **maxMs**). Requests that use the cached signature are not
+   counted.
+   The **scheduler** entry describes the thread shared by the handles of the
+   process to run background tasks: the number of running threads
+   (**threadCount**), the pending and run tasks (**pendingTasks**,
+   **taskCount**) and the average and maximum delay of the tasks
+   (**lagAvgMs**, **lagMaxMs**) since the process started.
+
+   The metrics of each request can also be published to a monitoring system as
+   soon as the request completes, independently of the stats profile and of
+   the logging interval, by adding a :py:class:`MetricsExporter` with
+   :py:meth:`add_metrics_exporter`. The driver provides
+   :py:class:`PrometheusExporter` and :py:class:`OpenTelemetryExporter`.
+
     Note: connection statistics are not available for NoSQL Python driver.
     """
     LOG_PREFIX = "Client stats|"
@@ -293,6 +369,9 @@ class StatsControl:
         # noinspection PyTypeChecker
         self._stats = None  # type: Stats
         self._id = str(uuid.uuid4())[:8]
+        # Callables returning the stats of other components, by entry name.
+        self._stats_sources = OrderedDict()
+        self._metrics_exporters = ()
 
         if self._profile is not StatsProfile.NONE:
             self._logutils.set_level(INFO)
@@ -332,6 +411,75 @@ class StatsControl:
         """
         return self._stats_handler
 
+    def add_stats_source(self, name, source):
+        # type: (str, Callable[[], Dict]) -> StatsControl
+        """
+        Internal use only.
+
+        Registers a callable that returns the stats of a driver component for
+        the interval, as a dict, and resets them. The stats are added to the
+        stats of each interval under the given name.
+        """
+        self._stats_sources[name] = source
+        return self
+
+    def get_stats_sources(self):
+        # type: () -> Dict[str, Callable[[], Dict]]
+        """
+        Internal use only.
+
+        Returns the registered stats sources by name.
+        """
+        return self._stats_sources
+
+    def add_metrics_exporter(self, exporter):
+        # type: (MetricsExporter) -> StatsControl
+        """
+        Adds an exporter that receives the metrics of each request of the
+        handle as soon as it completes. Exporters are called whatever the stats
+        profile.
+
+        :param exporter: the exporter.
+        :type exporter: MetricsExporter
+        :returns: self.
+        :raises IllegalArgumentException: raises the exception if exporter is
+            not an instance of MetricsExporter.
+        :versionadded:: 5.6.0
+        """
+        if not isinstance(exporter, MetricsExporter):
+            raise IllegalArgumentException(
+                'exporter must be an instance of MetricsExporter.')
+        # The tuple is replaced, not modified, so that the request threads can
+        # read it without locking.
+        self._metrics_exporters = self._metrics_exporters + (exporter,)
+        return self
+
+    def remove_metrics_exporter(self, exporter):
+        # type: (MetricsExporter) -> StatsControl
+        """
+        Removes an exporter added by :py:meth:`add_metrics_exporter`. The
+        exporter is not closed.
+
+        :param exporter: the exporter.
+        :type exporter: MetricsExporter
+        :returns: self.
+        :versionadded:: 5.6.0
+        """
+        self._metrics_exporters = tuple(
+            e for e in self._metrics_exporters if e is not exporter)
+        return self
+
+    def get_metrics_exporters(self):
+        # type: () -> [MetricsExporter]
+        """
+        Returns the exporters added by :py:meth:`add_metrics_exporter`.
+
+        :returns: the exporters.
+        :rtype: list(MetricsExporter)
+        :versionadded:: 5.6.0
+        """
+        return list(self._metrics_exporters)
+
     def start(self):
         """
         Collection of stats is enabled only between start and stop or from the
@@ -358,6 +506,17 @@ class StatsControl:
         """
         return self._enable_collection
 
+    def after_fork(self):
+        """
+        Called in a child process created by os.fork. The child gets a new
+        client id and starts with empty stats.
+        """
+        self._id = str(uuid.uuid4())[:8]
+        if self._stats is not None:
+            self._stats.after_fork()
+        for exporter in self._metrics_exporters:
+            exporter.after_fork()
+
     def shutdown(self):
         """
         Logs the stats collected and stops the timer.
@@ -425,20 +584,30 @@ class StatsControl:
         else:
             return None
 
-    def observe(self, request, req_size, res_size, network_latency):
+    def observe(self, request, req_size, res_size, network_latency,
+                result=None):
         """
         Internal method only.
         """
         if self._enable_collection and self._stats is not None:
             self._stats.observe(request, False, req_size, res_size,
-                                network_latency)
+                                network_latency, result)
+        if request is not None:
+            for exporter in self._metrics_exporters:
+                exporter.observe(request, None, req_size, res_size,
+                                 network_latency)
 
-    def observe_error(self, request):
+    def observe_error(self, request, error=None):
         """
         Internal method only.
         """
         if self._enable_collection and self._stats is not None:
             self._stats.observe_error(request)
+        if request is not None and self._metrics_exporters:
+            error_name = ('Exception' if error is None else
+                          error.__class__.__name__)
+            for exporter in self._metrics_exporters:
+                exporter.observe(request, error_name, 0, 0, 0)
 
     def observe_query(self, query_request):
         """
@@ -452,6 +621,8 @@ class RepeatedTimer(object):
     """
     Class that implements the timer to log stats at certain interval. The first
     event is called after the delay and the rest are called after each interval.
+    The events run in the thread of the scheduler shared by the handles of the
+    process.
     """
 
     def __init__(self, delay, interval, function, *args, **kwargs):
@@ -477,8 +648,7 @@ class RepeatedTimer(object):
             if self._firstTime:
                 interval = self._delay
                 self._firstTime = False
-            self._timer = Timer(interval, self._run)
-            self._timer.start()
+            self._timer = get_scheduler().schedule(interval, self._run)
             self._is_running = True
 
     def stop(self):
@@ -509,19 +679,32 @@ class QueryEntryStat:
 
     def observe(self, error, retries, retry_delay,
                 rate_limit_delay, auth_count, throttle_count,
-                req_size, res_size, network_latency):
-        # type: (bool, int, int, int, int, int, int, int, int) -> None
+                req_size, res_size, network_latency, read_units=0,
+                write_units=0):
+        # type: (bool, int, int, int, int, int, int, int, int, int, int) -> None
         self._req_stats.observe(error, retries, retry_delay, rate_limit_delay,
                                 auth_count, throttle_count, req_size, res_size,
-                                network_latency)
-
-    def to_json(self, queries, query):
-        # type: ([Any], str) -> None
+                                network_latency, read_units, write_units)
+
+    def merge(self, other):
+        # type: (QueryEntryStat) -> None
+        if self._plan is None:
+            self._plan = other._plan
+            self._does_writes = other._does_writes
+        self._count += other._count
+        self._unprepared += other._unprepared
+        self._simple = self._simple or other._simple
+        self._req_stats.merge(other._req_stats)
+
+    def to_json(self, queries, query, count_error=0):
+        # type: ([Any], str, int) -> None
         q = {"query": query, "count": self._count,
              "unprepared": self._unprepared, "simple": self._simple,
              "doesWrites": self._does_writes}
         if self._plan is not None:
             q["plan"] = self._plan
+        if count_error > 0:
+            q["countError"] = count_error
 
         self._req_stats.to_map_value(q)
         queries.append(q)
@@ -532,13 +715,37 @@ class QueryEntryStat:
 
 class ExtraQueryStats:
     """
-    Statistics for all queries.
+    Statistics for all queries, by query shape: the statement with its
+    literals replaced by ? and its white spaces collapsed. Only the
+    _CAPACITY shapes seen most often are kept.
     """
+    _CAPACITY = 50
+    # String and number literals, outside of identifiers and variables.
+    _LITERALS = re.compile(
+        r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"|"
+        r"(?<![\w$.])\d+(?:\.\d+)?(?:[eE][+-]?\d+)?(?![\w.])")
+    # Lists of literals, such as the values of an IN operator.
+    _LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+    _SPACES = re.compile(r"\s+")
 
     def __init__(self, profile):
-        self._queries = {}  # type: Dict[str, QueryEntryStat]
+        self._queries = TopK(ExtraQueryStats._CAPACITY,
+                             lambda: QueryEntryStat(profile))
         self._profile = profile
 
+    @staticmethod
+    def get_query_shape(sql):
+        # type: (str) -> str
+        """
+        Returns the shape of a statement, used to aggregate the stats of the
+        statements that differ only by their literals.
+        """
+        if sql is None:
+            return None
+        shape = ExtraQueryStats._LITERALS.sub('?', sql)
+        shape = ExtraQueryStats._LISTS.sub('(?)', shape)
+        return ExtraQueryStats._SPACES.sub(' ', shape).strip()
+
     def observe_query(self, query_request):
         q_stat = self.get_extra_query_stat_entry(query_request)
         q_stat.observe_query(query_request)
@@ -546,25 +753,22 @@ class ExtraQueryStats:
     def observe_q_rec(self, query_request, error, retries,
                       retry_delay, rate_limit_delay, auth_count,
                       throttle_count, req_size, res_size,
-                      network_latency):
+                      network_latency, read_units=0, write_units=0):
         """
-        type: (borneo.Request, bool, int, int, int, int, int, int, int, int) ->
-          None
+        type: (borneo.Request, bool, int, int, int, int, int, int, int, int,
+          int, int) -> None
         """
         q_stat = self.get_extra_query_stat_entry(query_request)
         q_stat.observe(error, retries, retry_delay, rate_limit_delay,
                        auth_count, throttle_count, req_size, res_size,
-                       network_latency)
+                       network_latency, read_units, write_units)
 
     def get_extra_query_stat_entry(self, query_request):
         # type: (borneo.QueryRequest) -> QueryEntryStat
         sql = query_request.get_statement()
         if sql is None and query_request.get_prepared_statement() is not None:
             sql = query_request.get_prepared_statement().get_sql_text()
-        q_stat = self._queries.get(sql)
-        if q_stat is None:
-            q_stat = QueryEntryStat(self._profile)
-            self._queries[sql] = q_stat
+        q_stat = self._queries.get(ExtraQueryStats.get_query_shape(sql))
         if q_stat.get_plan() is None:
             if query_request.get_prepared_statement() is not None:
                 prep_stmt = query_request.get_prepared_statement()
@@ -572,50 +776,224 @@ class ExtraQueryStats:
                 q_stat._does_writes = prep_stmt.does_writes()
         return q_stat
 
+    def merge(self, other):
+        # type: (ExtraQueryStats) -> None
+        self._queries.merge(other._queries)
+
     def to_json(self, root):
         if len(self._queries) > 0:
             queries = []
             root["queries"] = queries
-            for k in self._queries:
-                self._queries[k].to_json(queries, k)
+            for k, count_error, q_stat in self._queries.items():
+                q_stat.to_json(queries, k, count_error)
 
     def clear(self):
-        self._queries = {}  # type: Dict[str, QueryEntryStat]
+        self._queries.clear()
+
+
+class TopK:
+    """
+    Keeps the stats of the keys seen most often, at most capacity of them,
+    with the space-saving algorithm: when a new key is seen and the capacity
+    is reached, the key seen the least often is evicted and the new key
+    inherits its count. The count of a key is then over-estimated by at most
+    its error, the count of the evicted key, and a key seen more often than
+    1/capacity of the observations is never evicted.
+
+    The memory used does not depend on the number of distinct keys, an
+    eviction costs a scan of the keys.
+    """
+
+    def __init__(self, capacity, factory):
+        # type: (int, Callable) -> None
+        self._capacity = capacity
+        # Creates the stats of a key.
+        self._factory = factory
+        # [count, error, stats] by key.
+        self._entries = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """
+        Counts an observation of a key and returns its stats.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            if len(self._entries) < self._capacity:
+                entry = [0, 0, self._factory()]
+            else:
+                evicted = min(self._entries,
+                              key=lambda k: self._entries[k][0])
+                count = self._entries.pop(evicted)[0]
+                entry = [count, count, self._factory()]
+            self._entries[key] = entry
+        entry[0] += 1
+        return entry[2]
+
+    def merge(self, other):
+        # type: (TopK) -> None
+        """
+        Merges the keys of another instance, the stats of other are merged in
+        place and must not be used after. The count of a key missing from a
+        full instance is bounded by its minimum count.
+        """
+        self_min = self._get_min_count()
+        other_min = other._get_min_count()
+        entries = self._entries
+        merged = {}
+        for key in set(entries).union(other._entries):
+            entry = entries.get(key)
+            other_entry = other._entries.get(key)
+            if entry is None:
+                entry = [self_min + other_entry[0], self_min + other_entry[1],
+                         other_entry[2]]
+            elif other_entry is None:
+                entry = [entry[0] + other_min, entry[1] + other_min, entry[2]]
+            else:
+                entry[2].merge(other_entry[2])
+                entry = [entry[0] + other_entry[0], entry[1] + other_entry[1],
+                         entry[2]]
+            merged[key] = entry
+        if len(merged) > self._capacity:
+            keys = sorted(merged, key=lambda k: merged[k][0], reverse=True)
+            merged = {k: merged[k] for k in keys[:self._capacity]}
+        self._entries = merged
+
+    def items(self):
+        """
+        Returns the (key, error, stats) of the keys, by decreasing count.
+        """
+        keys = sorted(self._entries, key=lambda k: self._entries[k][0],
+                      reverse=True)
+        return [(k, self._entries[k][1], self._entries[k][2]) for k in keys]
+
+    def clear(self):
+        self._entries = {}
+
+    def _get_min_count(self):
+        # The minimum count of a full instance, 0 if it is not full.
+        if len(self._entries) < self._capacity:
+            return 0
+        return min(entry[0] for entry in self._entries.values())
 
 
 class Percentile:
     """
-    Implements storing and computation of percentiles for a given set of values.
+    Histogram of latencies used to compute percentiles in bounded memory.
+
+    Values are counted in logarithmic buckets: each power of two range is
+    split in _SUB_BUCKETS linear sub-buckets, so recording a value is O(1) and
+    a percentile is reported within 1 / (2 * _SUB_BUCKETS), less than 1%, of
+    the value recorded at that rank, however many values are recorded. Only
+    the buckets that were hit are stored and there are at most
+    _BUCKET_COUNT of them. Values below 2^_MIN_EXPONENT are counted in the
+    first bucket and values of 2^_MAX_EXPONENT or more in the last one, the
+    exact minimum and maximum are kept to bound the reported percentiles.
+
+    Histograms can be merged, for instance the ones of several threads or
+    intervals, the result is the same as if all the values had been recorded
+    in one histogram.
     """
 
+    _SUB_BUCKETS = 64
+    # 2^-10 ms is about 1 microsecond, 2^27 ms about 37 hours.
+    _MIN_EXPONENT = -10
+    _MAX_EXPONENT = 27
+    _BUCKET_COUNT = (_MAX_EXPONENT - _MIN_EXPONENT) * _SUB_BUCKETS
+
     def __init__(self):
-        self._values = []  # type: [int]
+        # Count of values by bucket index.
+        self._counts = {}  # type: Dict[int, int]
+        self._count = 0
+        self._min = 0
+        self._max = 0
 
     def add_value(self, network_latency):
-        # type: (int) -> None
-        self._values.append(network_latency)
+        # type: (float) -> None
+        # network_latency is mantissa * 2^exponent with mantissa in [0.5, 1),
+        # the sub-bucket is the position of the mantissa in that range.
+        mantissa, exponent = frexp(network_latency)
+        if exponent <= Percentile._MIN_EXPONENT or network_latency <= 0:
+            index = 0
+        elif exponent > Percentile._MAX_EXPONENT:
+            index = Percentile._BUCKET_COUNT - 1
+        else:
+            index = ((exponent - Percentile._MIN_EXPONENT - 1) *
+                     Percentile._SUB_BUCKETS +
+                     int((2 * mantissa - 1) * Percentile._SUB_BUCKETS))
+        counts = self._counts
+        counts[index] = counts.get(index, 0) + 1
+        if self._count == 0:
+            self._min = self._max = network_latency
+        elif network_latency < self._min:
+            self._min = network_latency
+        elif network_latency > self._max:
+            self._max = network_latency
+        self._count += 1
+
+    def merge(self, other):
+        # type: (Percentile) -> None
+        if other._count == 0:
+            return
+        counts = self._counts
+        for index, count in other._counts.items():
+            counts[index] = counts.get(index, 0) + count
+        if self._count == 0:
+            self._min = other._min
+            self._max = other._max
+        else:
+            self._min = min(self._min, other._min)
+            self._max = max(self._max, other._max)
+        self._count += other._count
+
+    def get_count(self):
+        # type: () -> int
+        return self._count
 
     def get_percentile(self, percentiles):
-        # type: ([float]) -> [int]
-        size = len(self._values)
-        self._values.sort()
+        # type: ([float]) -> [float]
+        size = self._count
         # if no values available return -1
-        # if requested percentile is 0 or less return first value
-        # if 1 or more return last value
-        # else return corresponding value
-        return [-1 if size == 0 else
-                self._values[0] if round(v * size) <= 0 else
-                self._values[size - 1] if round(v * size) >= size
-                else self._values[round(v * size) - 1]
-                for v in percentiles]
+        # if requested percentile is 0 or less return the minimum
+        # if 1 or more return the maximum
+        # else return the value of the bucket holding the value of that rank
+        if size == 0:
+            return [-1 for _ in percentiles]
+        ranks = [round(v * size) for v in percentiles]
+        result = dict()
+        cumulative = 0
+        pending = sorted(r for r in set(ranks) if 0 < r < size)
+        if pending:
+            i = 0
+            for index in sorted(self._counts):
+                cumulative += self._counts[index]
+                while i < len(pending) and pending[i] <= cumulative:
+                    result[pending[i]] = self._get_value(index)
+                    i += 1
+                if i == len(pending):
+                    break
+        return [self._min if r <= 0 else self._max if r >= size else result[r]
+                for r in ranks]
 
     def get_95th99th_percentile(self):
-        # type: () -> (int, int)
+        # type: () -> (float, float)
         parr = self.get_percentile([0.95, 0.99])
         return parr[0], parr[1]
 
     def clear(self):
-        self._values = []
+        self._counts = {}
+        self._count = 0
+        self._min = 0
+        self._max = 0
+
+    def _get_value(self, index):
+        # Returns the middle of the bucket, within the recorded values.
+        exponent, sub_bucket = divmod(index, Percentile._SUB_BUCKETS)
+        value = ldexp(1 + (sub_bucket + 0.5) / Percentile._SUB_BUCKETS,
+                      exponent + Percentile._MIN_EXPONENT)
+        return round(min(max(value, self._min), self._max), 3)
 
 
 # noinspection PyPep8Naming
@@ -623,6 +1001,10 @@ class ReqStats:
     """
     Statistics per type of request.
     """
+    _PERCENTILES = [0.5, 0.9, 0.95, 0.99, 0.999]
+    _PERCENTILE_NAMES = ["50th", "90th", "95th", "99th", "99.9th"]
+    _PHASE_NAMES = ["serialization", "signing", "rateLimit", "network",
+                    "deserialization"]
 
     def __init__(self, profile):
         # type: (StatsProfile) -> None
@@ -642,6 +1024,12 @@ class ReqStats:
         self._requestLatencyMin = sys.maxsize
         self._requestLatencyMax = 0
         self._requestLatencySum = 0
+        self._readUnits = 0
+        self._writeUnits = 0
+        # Count, sum and max of the time of each phase of the requests.
+        self._phaseCount = 0
+        self._phaseSums = [0] * len(ReqStats._PHASE_NAMES)
+        self._phaseMaxs = [0] * len(ReqStats._PHASE_NAMES)
         if profile.value >= StatsProfile.MORE.value:
             self._requestLatencyPercentile = Percentile()
         else:
@@ -649,14 +1037,17 @@ class ReqStats:
 
     def observe(self, error, retries, retry_delay,
                 rate_limit_delay, auth_count, throttle_count,
-                req_size, res_size, network_latency):
-        # type: (bool, int, int, int, int, int, int, int, int) -> None
+                req_size, res_size, network_latency, read_units=0,
+                write_units=0):
+        # type: (bool, int, int, int, int, int, int, int, int, int, int) -> None
         self._httpRequestCount += 1
         self._retryCount += retries
         self._retryDelayMs += retry_delay
         self._retryAuthCount += auth_count
         self._retryThrottleCount += throttle_count
         self._rateLimitDelayMs += rate_limit_delay
+        self._readUnits += read_units
+        self._writeUnits += write_units
 
         if error:
             self._errors += 1
@@ -675,6 +1066,50 @@ class ReqStats:
             if self._requestLatencyPercentile is not None:
                 self._requestLatencyPercentile.add_value(network_latency)
 
+    def observe_timings(self, timings):
+        # type: (RequestTimings) -> None
+        values = (timings.get_serialization_ms(), timings.get_signing_ms(),
+                  timings.get_rate_limit_ms(), timings.get_network_ms(),
+                  timings.get_deserialization_ms())
+        self._phaseCount += 1
+        sums = self._phaseSums
+        maxs = self._phaseMaxs
+        for i, value in enumerate(values):
+            sums[i] += value
+            if value > maxs[i]:
+                maxs[i] = value
+
+    def merge(self, other):
+        # type: (ReqStats) -> None
+        self._httpRequestCount += other._httpRequestCount
+        self._errors += other._errors
+        self._reqSizeMin = min(self._reqSizeMin, other._reqSizeMin)
+        self._reqSizeMax = max(self._reqSizeMax, other._reqSizeMax)
+        self._reqSizeSum += other._reqSizeSum
+        self._resSizeMin = min(self._resSizeMin, other._resSizeMin)
+        self._resSizeMax = max(self._resSizeMax, other._resSizeMax)
+        self._resSizeSum += other._resSizeSum
+        self._retryAuthCount += other._retryAuthCount
+        self._retryThrottleCount += other._retryThrottleCount
+        self._retryCount += other._retryCount
+        self._retryDelayMs += other._retryDelayMs
+        self._rateLimitDelayMs += other._rateLimitDelayMs
+        self._requestLatencyMin = min(self._requestLatencyMin,
+                                      other._requestLatencyMin)
+        self._requestLatencyMax = max(self._requestLatencyMax,
+                                      other._requestLatencyMax)
+        self._requestLatencySum += other._requestLatencySum
+        self._readUnits += other._readUnits
+        self._writeUnits += other._writeUnits
+        self._phaseCount += other._phaseCount
+        for i in range(len(ReqStats._PHASE_NAMES)):
+            self._phaseSums[i] += other._phaseSums[i]
+            self._phaseMaxs[i] = max(self._phaseMaxs[i], other._phaseMaxs[i])
+        if (self._requestLatencyPercentile is not None and
+                other._requestLatencyPercentile is not None):
+            self._requestLatencyPercentile.merge(
+                other._requestLatencyPercentile)
+
     def to_json(self, request_name, req_array):
         # type: (str, []) -> None
         if self._httpRequestCount > 0:
@@ -695,6 +1130,10 @@ class ReqStats:
         map_value["retry"] = retry
         map_value["rateLimitDelayMs"] = self._rateLimitDelayMs
 
+        if self._readUnits > 0 or self._writeUnits > 0:
+            map_value["readUnits"] = self._readUnits
+            map_value["writeUnits"] = self._writeUnits
+
         if self._requestLatencyMax > 0:
             latency = {
                 "min": self._requestLatencyMin,
@@ -702,12 +1141,21 @@ class ReqStats:
                 "avg": self._requestLatencySum / (self._httpRequestCount - self._errors)
             }
             if self._requestLatencyPercentile is not None:
-                (p95th, p99th) = \
-                    self._requestLatencyPercentile.get_95th99th_percentile()
-                latency["95th"] = p95th
-                latency["99th"] = p99th
+                values = self._requestLatencyPercentile.get_percentile(
+                    ReqStats._PERCENTILES)
+                for name, value in zip(ReqStats._PERCENTILE_NAMES, values):
+                    latency[name] = value
             map_value["httpRequestLatencyMs"] = latency
 
+        if self._phaseCount > 0:
+            phases = {}
+            for i, name in enumerate(ReqStats._PHASE_NAMES):
+                phases[name] = {
+                    "avg": round(self._phaseSums[i] / self._phaseCount, 3),
+                    "max": self._phaseMaxs[i]
+                }
+            map_value["phaseLatencyMs"] = phases
+
         if self._reqSizeMax > 0:
             reqSize = {
                 "min": self._reqSizeMin,
@@ -741,6 +1189,11 @@ class ReqStats:
         self._requestLatencyMin = sys.maxsize
         self._requestLatencyMax = 0
         self._requestLatencySum = 0
+        self._readUnits = 0
+        self._writeUnits = 0
+        self._phaseCount = 0
+        self._phaseSums = [0] * len(ReqStats._PHASE_NAMES)
+        self._phaseMaxs = [0] * len(ReqStats._PHASE_NAMES)
         if self._requestLatencyPercentile is not None:
             self._requestLatencyPercentile.clear()
 
@@ -749,10 +1202,14 @@ class ReqStats:
 class Stats:
     """
     Implements all the statistics.
+
+    Each thread observes its requests in its own :py:class:`StatsShard`, so
+    request threads don't contend on a lock shared by all the requests. The
+    shards are merged when the stats are logged.
     """
     _stats_control = None  # type: StatsControl
     _timer = None  # type: RepeatedTimer
-    _requests = None  # type: Dict[str, ReqStats]
+    _shards = None  # type: [StatsShard]
 
     _request_names = ["Delete", "Get", "GetIndexes", "GetTable",
                       "ListTables", "MultiDelete", "Prepare", "Put", "Query",
@@ -774,15 +1231,20 @@ class Stats:
 
         self._start_time = datetime.utcnow()
         self._end_time = self._start_time
-        self._extra_query_stats = None
-        profile = self._stats_control.get_profile()
-        if profile is not None and profile.value >= StatsProfile.ALL.value:
-            self._extra_query_stats = ExtraQueryStats(profile)
+        # The shard of the current thread and the shards of all the threads.
+        self._local = local()
+        self._shards = []
+        self._shards_lock = Lock()
+        self.lock = Lock()
 
-        self._requests = {}
-        for i in self._request_names:
-            self._requests[i] = ReqStats(stats_control.get_profile())
+    def after_fork(self):
+        # Called in a child process created by os.fork: the stats collected so
+        # far belong to the parent process. The timer is kept by the scheduler.
         self.lock = Lock()
+        self._local = local()
+        self._shards = []
+        self._shards_lock = Lock()
+        self.clear()
 
     @synchronized
     def log_client_stats(self):
@@ -794,8 +1256,9 @@ class Stats:
                self._stats_control.get_logger().isEnabledFor(INFO))
 
         if handler is not None or log:
+            # The shards are reset by __generate_stats.
             stats = self.__generate_stats()
-            self.clear()
+            self._start_time = self._end_time
 
             if handler is not None:
                 handler(stats)
@@ -816,41 +1279,151 @@ class Stats:
             "clientId": self._stats_control.get_id()
         }
 
-        if self._extra_query_stats is not None:
-            self._extra_query_stats.to_json(root)
+        profile = self._stats_control.get_profile()
+        requests = {}
+        for i in self._request_names:
+            requests[i] = ReqStats(profile)
+        extra_query_stats = None
+        tables = None
+        for (shard_requests, shard_extra_query_stats,
+             shard_tables) in self.__drain_shards():
+            for k, req_stat in shard_requests.items():
+                total = requests.get(k)
+                if total is None:
+                    total = ReqStats(profile)
+                    requests[k] = total
+                total.merge(req_stat)
+            if shard_extra_query_stats is not None:
+                if extra_query_stats is None:
+                    extra_query_stats = ExtraQueryStats(profile)
+                extra_query_stats.merge(shard_extra_query_stats)
+            if shard_tables is not None:
+                if tables is None:
+                    tables = StatsShard.create_table_stats(profile)
+                tables.merge(shard_tables)
+
+        if extra_query_stats is not None:
+            extra_query_stats.to_json(root)
+
+        if tables is not None and len(tables) > 0:
+            table_array = []
+            for table_name, count_error, table_stat in tables.items():
+                table = {"table": table_name}
+                if count_error > 0:
+                    table["countError"] = count_error
+                table_stat.to_map_value(table)
+                table_array.append(table)
+            root["tables"] = table_array
+
+        for name, source in self._stats_control.get_stats_sources().items():
+            root[name] = source()
 
         req_array = []
-        for k in self._requests:
-            self._requests[k].to_json(k, req_array)
+        for k in requests:
+            requests[k].to_json(k, req_array)
 
         root["requests"] = req_array
         return root
 
+    def __drain_shards(self):
+        # Returns the stats of all the shards and resets them. The shards of
+        # the threads that ended are dropped.
+        with self._shards_lock:
+            shards = list(self._shards)
+        stats = []
+        for shard in shards:
+            stats.append(shard.drain())
+            if not shard.is_alive():
+                with self._shards_lock:
+                    self._shards.remove(shard)
+        return stats
+
+    def __get_shard(self):
+        # type: () -> StatsShard
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = StatsShard(self._stats_control)
+            self._local.shard = shard
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
     def clear(self):
         self._start_time = datetime.utcnow()
         self._end_time = self._start_time
-        if self._extra_query_stats is not None:
-            self._extra_query_stats.clear()
-
-        for k in self._requests:
-            self._requests[k].clear()
+        self.__drain_shards()
 
     @synchronized
     def shutdown(self):
         self.__log_client_stats()
         self._timer.stop()
 
-    @synchronized
     def observe_error(self, request):
-        self.__observe(request, True, -1, -1, -1)
+        self.__get_shard().observe(request, True, -1, -1, -1)
+
+    def observe(self, request, error, req_size, res_size, network_latency,
+                result=None):
+        self.__get_shard().observe(request, error, req_size, res_size,
+                                   network_latency, result)
+
+    def observe_query(self, query_request):
+        self.__get_shard().observe_query(query_request)
+
+
+# noinspection PyPep8Naming
+class StatsShard:
+    """
+    Statistics observed by one thread. The lock of a shard is only contended
+    when the stats are logged.
+    """
+    # The maximum number of tables the stats are kept for.
+    _TABLES_CAPACITY = 50
+
+    _requests = None  # type: Dict[str, ReqStats]
+
+    def __init__(self, stats_control):
+        # type: (StatsControl) -> None
+        self._stats_control = stats_control
+        self._thread = current_thread()
+        self._requests = {}
+        self._extra_query_stats = None
+        self._tables = None
+        profile = self._stats_control.get_profile()
+        if profile is not None and profile.value >= StatsProfile.ALL.value:
+            self._extra_query_stats = ExtraQueryStats(profile)
+        if profile is not None and profile.value >= StatsProfile.MORE.value:
+            self._tables = StatsShard.create_table_stats(profile)
+        self.lock = Lock()
+
+    @staticmethod
+    def create_table_stats(profile):
+        # type: (StatsProfile) -> TopK
+        # The stats of the tables used the most.
+        return TopK(StatsShard._TABLES_CAPACITY, lambda: ReqStats(profile))
+
+    def is_alive(self):
+        return self._thread.is_alive()
 
     @synchronized
-    def observe(self, request, error, req_size, res_size, network_latency):
-        self.__observe(request, error, req_size, res_size,
-                       network_latency)
+    def drain(self):
+        # type: () -> (Dict[str, ReqStats], ExtraQueryStats)
+        """
+        Returns the stats observed since the last call and resets them.
+        """
+        requests = self._requests
+        extra_query_stats = self._extra_query_stats
+        tables = self._tables
+        self._requests = {}
+        profile = self._stats_control.get_profile()
+        if extra_query_stats is not None:
+            self._extra_query_stats = ExtraQueryStats(profile)
+        if profile is not None and profile.value >= StatsProfile.MORE.value:
+            self._tables = StatsShard.create_table_stats(profile)
+        return requests, extra_query_stats, tables
 
-    def __observe(self, request, error, req_size, res_size,
-                  network_latency):
+    @synchronized
+    def observe(self, request, error, req_size, res_size, network_latency,
+                result=None):
         reqStr = request.get_request_name()
         req_stat = self._requests.get(reqStr)
         if req_stat is None:
@@ -867,10 +1440,29 @@ class Stats:
             throttle_count = request.get_retry_stats().get_num_exceptions(
                 ThrottlingException)
 
+        read_units = 0
+        write_units = 0
+        if result is not None:
+            read_units = result.get_read_units()
+            write_units = result.get_write_units()
         req_stat.observe(error, request.get_num_retries(),
                          request.get_retry_delay_ms(),
                          request.get_rate_limit_delayed_ms(), auth_count,
-                         throttle_count, req_size, res_size, network_latency)
+                         throttle_count, req_size, res_size, network_latency,
+                         read_units, write_units)
+        timings = request.get_request_timings()
+        if not error and timings is not None:
+            req_stat.observe_timings(timings)
+
+        if self._tables is not None:
+            table_name = request.get_table_name()
+            if table_name is not None:
+                self._tables.get(table_name).observe(
+                    error, request.get_num_retries(),
+                    request.get_retry_delay_ms(),
+                    request.get_rate_limit_delayed_ms(), auth_count,
+                    throttle_count, req_size, res_size, network_latency,
+                    read_units, write_units)
 
         from . import QueryRequest
 
@@ -885,7 +1477,8 @@ class Stats:
                                                   get_rate_limit_delayed_ms(),
                                                   auth_count, throttle_count,
                                                   req_size, res_size,
-                                                  network_latency)
+                                                  network_latency, read_units,
+                                                  write_units)
 
     @synchronized
     def observe_query(self, query_request):
@@ -0,0 +1,146 @@
+#
+# Copyright (c) 2018, 2026 Oracle and/or its affiliates. All rights reserved.
+#
+# Licensed under the Universal Permissive License v 1.0 as shown at
+#  https://oss.oracle.com/licenses/upl/
+#
+
+try:
+    from opentelemetry import context as otel_context
+    from opentelemetry import trace as otel_trace
+    from opentelemetry.propagate import inject as otel_inject
+except ImportError:
+    otel_context = None
+    otel_trace = None
+    otel_inject = None
+
+from .version import __version__
+
+
+class Tracer(object):
+    """
+    Internal use only.
+
+    Creates the OpenTelemetry spans of the requests of a handle, using the
+    tracer provider set with :py:meth:`NoSQLHandleConfig.set_tracer_provider`.
+    The following spans are created:
+
+      * **<request> <table>**, a client span covering
+        :py:meth:`NoSQLHandle` operations, from the serialization of the
+        request to the deserialization of the result, retries included.
+      * **nosql.attempt**, a client span for each http request sent to the
+        proxy, child of the request span. Its context is propagated to the
+        proxy in the http headers.
+      * **nosql.sign**, the authorization of an attempt.
+      * **nosql.rate_limiter.wait**, the time an attempt waited for a rate
+        limiter, only created if the request actually waited.
+      * **nosql.query.fetch**, the fetch of a batch of results from a shard
+        or partition by an advanced query; the requests it sends are its
+        children.
+    """
+
+    # The value of the db.system.name attribute.
+    DB_SYSTEM = 'oracle.nosql'
+
+    def __init__(self, tracer_provider):
+        if otel_trace is None:
+            raise ImportError(
+                'Package "opentelemetry-api" is required; please install.')
+        self._tracer = tracer_provider.get_tracer('borneo', __version__)
+
+    def span(self, name, attributes=None, kind=None):
+        """
+        Returns a context manager that starts a span, child of the current
+        span, and makes it the current span until it exits. An exception
+        raised in the context is recorded in the span.
+        """
+        if kind is None:
+            kind = otel_trace.SpanKind.INTERNAL
+        return self._tracer.start_as_current_span(
+            name, kind=kind, attributes=attributes)
+
+    def request_span(self, request):
+        """
+        Returns a context manager of the span of the execution of a request.
+        """
+        name = request.get_request_name()
+        attributes = {'db.system.name': Tracer.DB_SYSTEM,
+                      'db.operation.name': name}
+        table_name = request.get_table_name()
+        if table_name is not None:
+            attributes['db.collection.name'] = table_name
+            name += ' ' + table_name
+        return self.span(name, attributes, otel_trace.SpanKind.CLIENT)
+
+    def add_span(self, name, start_ns, end_ns, attributes=None):
+        """
+        Adds a span, child of the current span, for an interval that already
+        elapsed. It is used for the events that are only worth tracing once
+        their duration is known.
+        """
+        self._tracer.start_span(
+            name, attributes=attributes, start_time=start_ns).end(end_ns)
+
+    def attempts(self):
+        """
+        Returns the tracker of the spans of the attempts of a request.
+        """
+        return RequestAttempts(self._tracer)
+
+
+class RequestAttempts(object):
+    """
+    Internal use only.
+
+    The spans of the attempts of a request, one per http request. The attempts
+    are not scoped by a with statement as the retry loop leaves them in many
+    places, the span of the current attempt is made current with
+    :py:meth:`start` and ended by the next :py:meth:`start` or by
+    :py:meth:`end`.
+    """
+
+    def __init__(self, tracer):
+        self._tracer = tracer
+        self._count = 0
+        self._span = None
+        self._token = None
+
+    def start(self, headers):
+        """
+        Ends the current attempt, starts the next one and adds its trace
+        context to the http headers.
+        """
+        self.end()
+        self._count += 1
+        self._span = self._tracer.start_span(
+            'nosql.attempt', kind=otel_trace.SpanKind.CLIENT,
+            attributes={'nosql.attempt': self._count})
+        self._token = otel_context.attach(
+            otel_trace.set_span_in_context(self._span))
+        otel_inject(headers)
+
+    def set_status_code(self, status_code):
+        """
+        Sets the http status code of the response of the current attempt.
+        """
+        if self._span is not None:
+            self._span.set_attribute('http.response.status_code', status_code)
+
+    def end(self, error=None):
+        """
+        Ends the current attempt if any, recording the error that caused it
+        to fail if not None.
+        """
+        span = self._span
+        if span is None:
+            return
+        self._span = None
+        otel_context.detach(self._token)
+        self._token = None
+        if error is not None:
+            span.record_exception(error)
+            span.set_status(otel_trace.Status(
+                otel_trace.StatusCode.ERROR,
+                error.__class__.__name__ + ': ' + str(error)))
+            span.set_attribute('error.type', error.__class__.__name__)
+        span.end()
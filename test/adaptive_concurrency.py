@@ -0,0 +1,178 @@
+#
+# Copyright (c) 2018, 2026 Oracle and/or its affiliates. All rights reserved.
+#
+# Licensed under the Universal Permissive License v 1.0 as shown at
+#  https://oss.oracle.com/licenses/upl/
+#
+
+import unittest
+from threading import Thread, Timer
+
+from borneo import (
+    GetRequest, IllegalArgumentException, NoSQLHandle, NoSQLHandleConfig,
+    ReadThrottlingException, RequestTimeoutException, StatsProfile)
+from borneo.concurrency import ConcurrencyLimiter, ConcurrencyLimiterMap
+from borneo.kv import StoreAccessTokenProvider
+from borneo.serdeutil import SerdeUtil
+from testutils import ProxyServer
+
+
+class TestConcurrencyLimiter(unittest.TestCase):
+
+    def testIncrease(self):
+        limiter = ConcurrencyLimiter(10)
+        limiter._limit = 2.0
+        for i in range(4):
+            limiter.acquire('Get', 0).release(1)
+        # one per limit's worth of successes
+        self.assertEqual(limiter.get_limit(), 3)
+        for i in range(100):
+            limiter.acquire('Get', 0).release(1)
+        self.assertEqual(limiter.get_limit(), 10)
+
+    def testThrottlingDecrease(self):
+        limiter = ConcurrencyLimiter(8)
+        permits = [limiter.acquire('Get', 0) for _ in range(3)]
+        error = ReadThrottlingException('throttled')
+        for permit in permits:
+            permit.release(error=error)
+        # the requests sent together decrease the limit once
+        self.assertEqual(limiter.get_limit(), 4)
+        limiter.acquire('Get', 0).release(error=error)
+        self.assertEqual(limiter.get_limit(), 2)
+        for i in range(3):
+            limiter.acquire('Get', 0).release(error=error)
+        self.assertEqual(limiter.get_limit(), 1)
+        # other errors do not change the limit
+        limiter.acquire('Get', 0).release(error=RuntimeError('error'))
+        self.assertEqual(limiter.get_limit(), 1)
+        stats = limiter.get_stats()
+        self.assertEqual(stats['limit'], 1)
+        self.assertEqual(stats['inFlight'], 0)
+        self.assertEqual(stats['maxInFlight'], 3)
+        self.assertEqual(stats['throttleCount'], 7)
+        self.assertEqual(stats['decreaseCount'], 5)
+        self.assertEqual(limiter.get_stats()['throttleCount'], 0)
+
+    def testLatencyDecrease(self):
+        limiter = ConcurrencyLimiter(100)
+        for i in range(10):
+            limiter.acquire('Get', 0).release(1)
+            limiter.acquire('Query', 0).release(50)
+        # the latencies of the other kinds of requests are not compared
+        self.assertEqual(limiter.get_limit(), 100)
+        for i in range(50):
+            limiter.acquire('Get', 0).release(10)
+        self.assertLess(limiter.get_limit(), 100)
+
+    def testAcquireTimeout(self):
+        limiter = ConcurrencyLimiter(1)
+        permit = limiter.acquire('Get', 0)
+        self.assertIsNone(limiter.acquire('Get', 10))
+        # a permit is only released once
+        permit.release(1)
+        permit.release(1)
+        self.assertEqual(limiter.get_stats()['inFlight'], 0)
+        waiter = Thread(target=lambda: limiter.acquire('Get', 5000).release())
+        permit = limiter.acquire('Get', 0)
+        waiter.start()
+        permit.release(1)
+        waiter.join()
+        stats = limiter.get_stats()
+        self.assertEqual(stats['inFlight'], 0)
+        self.assertEqual(stats['timeoutCount'], 0)
+
+    def testLimiterMap(self):
+        limiters = ConcurrencyLimiterMap(5)
+        limiter = limiters.get_limiter('Users')
+        self.assertIs(limiters.get_limiter('users'), limiter)
+        stats = limiters.get_stats()
+        self.assertEqual(stats[0]['table'], 'users')
+        self.assertEqual(stats[0]['limit'], 5)
+
+
+class TestAdaptiveConcurrency(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.proxy = ProxyServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.proxy.stop()
+
+    def setUp(self):
+        self.proxy.reset()
+        self.config = NoSQLHandleConfig(self.proxy.get_endpoint())
+        self.config.set_authorization_provider(StoreAccessTokenProvider())
+
+    def testThrottling(self):
+        handle = NoSQLHandle(self.config.set_adaptive_concurrency_limit(8))
+        try:
+            self.proxy.errors = [
+                (SerdeUtil.THROTTLING_ERROR.READ_LIMIT_EXCEEDED, 'throttled',
+                 0)]
+            handle.get(GetRequest().set_table_name('users').set_key({'id': 1}))
+            client = handle.get_client()
+            limiter = client.get_concurrency_limiters().get_limiter('users')
+            self.assertEqual(limiter.get_limit(), 4)
+            stats = client.get_stats_control().get_stats_sources()
+            stats = stats['concurrency']()
+            self.assertEqual(stats[0]['table'], 'users')
+            self.assertEqual(stats[0]['throttleCount'], 1)
+            self.assertEqual(stats[0]['inFlight'], 0)
+        finally:
+            handle.close()
+
+    def testTimeout(self):
+        handle = NoSQLHandle(self.config.set_adaptive_concurrency_limit(1))
+        try:
+            limiter = handle.get_client().get_concurrency_limiters(
+            ).get_limiter('users')
+            permit = limiter.acquire('Get', 0)
+            request = GetRequest().set_table_name('users').set_key(
+                {'id': 1}).set_timeout(100)
+            self.assertRaises(RequestTimeoutException, handle.get, request)
+            permit.release()
+            handle.get(request)
+        finally:
+            handle.close()
+
+    def testNetworkTime(self):
+        handle = NoSQLHandle(self.config.set_adaptive_concurrency_limit(
+            1).set_stats_profile(StatsProfile.REGULAR))
+        try:
+            limiter = handle.get_client().get_concurrency_limiters(
+            ).get_limiter('users')
+            permit = limiter.acquire('Get', 0)
+            timer = Timer(0.3, permit.release)
+            timer.start()
+            result = handle.get(GetRequest().set_table_name('users').set_key(
+                {'id': 1}).set_timeout(5000))
+            timer.join()
+            # the wait for the permit is not counted as network time
+            self.assertGreater(result.get_request_timings().get_total_ms(),
+                               250)
+            self.assertLess(result.get_request_timings().get_network_ms(),
+                            250)
+        finally:
+            handle.close()
+
+    def testDisabled(self):
+        self.assertEqual(self.config.get_adaptive_concurrency_limit(), 0)
+        self.assertRaises(IllegalArgumentException,
+                          self.config.set_adaptive_concurrency_limit, -1)
+        self.assertRaises(IllegalArgumentException,
+                          self.config.set_adaptive_concurrency_limit, 'a')
+        handle = NoSQLHandle(self.config)
+        try:
+            self.assertIsNone(handle.get_client().get_concurrency_limiters())
+            self.assertNotIn(
+                'concurrency',
+                handle.get_client().get_stats_control().get_stats_sources())
+        finally:
+            handle.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+#
+# Copyright (c) 2018, 2026 Oracle and/or its affiliates. All rights reserved.
+#
+# Licensed under the Universal Permissive License v 1.0 as shown at
+#  https://oss.oracle.com/licenses/upl/
+#
+
+import os
+import unittest
+
+from borneo import NoSQLHandle, NoSQLHandleConfig, StatsProfile
+from borneo.http import RateLimiterMap
+from borneo.kv import StoreAccessTokenProvider
+
+
+class TestAfterFork(unittest.TestCase):
+
+    def setUp(self):
+        config = NoSQLHandleConfig('http://localhost:8080')
+        config.set_authorization_provider(
+            StoreAccessTokenProvider()).set_stats_profile(StatsProfile.REGULAR)
+        self.handle = NoSQLHandle(config)
+
+    def tearDown(self):
+        self.handle.close()
+
+    def testAfterFork(self):
+        client = self.handle.get_client()
+        sess = client._sess
+        lock = client.lock
+        stats = client.get_stats_control()
+        client_id = stats.get_id()
+        auth_sess = client._auth_provider._sess
+        self.handle.after_fork()
+        self.assertIsNot(client._sess, sess)
+        self.assertIsNot(client.lock, lock)
+        self.assertIsNot(client._auth_provider._sess, auth_sess)
+        self.assertNotEqual(stats.get_id(), client_id)
+        # closed handles are ignored
+        self.handle.close()
+        self.handle.after_fork()
+
+    def testRateLimiterMapAfterFork(self):
+        limiter_map = RateLimiterMap()
+        limiter_map.update('Foo', 100, 200, 1)
+        read_limiter = limiter_map.get_read_limiter('foo')
+        lock = read_limiter.lock
+        limiter_map.after_fork()
+        self.assertIs(limiter_map.get_read_limiter('foo'), read_limiter)
+        self.assertIsNot(read_limiter.lock, lock)
+        self.assertEqual(read_limiter.get_limit_per_second(), 100)
+        self.assertEqual(
+            limiter_map.get_write_limiter('foo').get_limit_per_second(), 200)
+
+    @unittest.skipUnless(hasattr(os, 'fork') and
+                         hasattr(os, 'register_at_fork'),
+                         'os.fork is not available')
+    def testForkReinitializesHandle(self):
+        client = self.handle.get_client()
+        sess = client._sess
+        pid = os.fork()
+        if pid == 0:
+            # child process, the handle is re-initialized by the fork hook
+            status = 0 if client._sess is not sess else 1
+            os._exit(status)
+        _, status = os.waitpid(pid, 0)
+        self.assertEqual(os.WEXITSTATUS(status), 0)
+        self.assertIs(client._sess, sess)
+
+
+if __name__ == '__main__':
+    unittest.main()
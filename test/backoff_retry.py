@@ -0,0 +1,135 @@
+#
+# Copyright (c) 2018, 2026 Oracle and/or its affiliates. All rights reserved.
+#
+# Licensed under the Universal Permissive License v 1.0 as shown at
+#  https://oss.oracle.com/licenses/upl/
+#
+
+import unittest
+from time import time
+
+from borneo import (
+    BackoffRetryHandler, GetRequest, IllegalArgumentException, NoSQLHandle,
+    NoSQLHandleConfig, ReadThrottlingException, TableRequest)
+from borneo.kv import StoreAccessTokenProvider
+from borneo.serdeutil import SerdeUtil
+from testutils import ProxyServer
+
+
+class TestBackoffRetryHandler(unittest.TestCase):
+
+    def testJitterDelay(self):
+        handler = BackoffRetryHandler(base_delay_ms=100, max_delay_ms=1000)
+        self.assertEqual(handler.compute_jitter_delay(0), 100)
+        for i in range(100):
+            delay_ms = handler.compute_jitter_delay(200)
+            self.assertGreaterEqual(delay_ms, 100)
+            self.assertLessEqual(delay_ms, 600)
+            self.assertLessEqual(handler.compute_jitter_delay(900), 1000)
+        self.assertRaises(IllegalArgumentException, BackoffRetryHandler,
+                          base_delay_ms=100, max_delay_ms=10)
+        self.assertRaises(IllegalArgumentException, BackoffRetryHandler,
+                          budget_ratio=-1)
+
+    def testRetryBudget(self):
+        handler = BackoffRetryHandler(
+            retries=5, budget_ratio=0.5, min_retries_per_sec=0)
+        request = GetRequest().set_table_name('users')
+        error = ReadThrottlingException('throttled')
+        # the budget holds a single retry
+        self.assertTrue(handler.do_retry(request, 0, error))
+        self.assertFalse(handler.do_retry(request, 0, error))
+        handler.on_request(request)
+        handler.on_request(request)
+        self.assertTrue(handler.do_retry(request, 1, error))
+        # the retries are still limited by the request and the max retries
+        handler.on_request(request)
+        handler.on_request(request)
+        self.assertFalse(handler.do_retry(request, 5, error))
+        self.assertFalse(handler.do_retry(TableRequest(), 0, error))
+        stats = handler.get_stats()
+        self.assertEqual(stats['requestCount'], 4)
+        self.assertEqual(stats['retryCount'], 2)
+        self.assertEqual(stats['deniedCount'], 1)
+        self.assertEqual(stats['amplification'], 1.5)
+        self.assertEqual(stats['tokens'], 1)
+        self.assertEqual(handler.get_stats()['requestCount'], 0)
+
+    def testRetryHint(self):
+        handler = BackoffRetryHandler(base_delay_ms=1, max_delay_ms=10)
+        request = GetRequest().set_table_name('users').set_timeout(5000)
+        request.set_start_time_ms(int(round(time() * 1000)))
+        error = ReadThrottlingException('throttled')
+        error.set_retry_hint_ms(50)
+        handler.delay(request, 0, error)
+        self.assertEqual(request.get_retry_stats().get_last_delay_ms(), 50)
+        self.assertEqual(handler.get_stats()['hintedCount'], 1)
+
+    def testConfig(self):
+        handler = BackoffRetryHandler()
+        config = NoSQLHandleConfig('http://localhost:8080')
+        config.set_authorization_provider(StoreAccessTokenProvider())
+        config.set_retry_handler(handler)
+        # the budget is shared by the copies of the config
+        self.assertIs(config.clone().get_retry_handler(), handler)
+
+
+class TestBackoffRetry(unittest.TestCase):
+
+    RETRY_HINT_MS = 20
+    # The error of a throttled request, with a retry hint.
+    THROTTLED = (SerdeUtil.THROTTLING_ERROR.READ_LIMIT_EXCEEDED, 'throttled',
+                 RETRY_HINT_MS)
+
+    @classmethod
+    def setUpClass(cls):
+        cls.proxy = ProxyServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.proxy.stop()
+
+    def setUp(self):
+        self.proxy.reset()
+        self.config = NoSQLHandleConfig(self.proxy.get_endpoint())
+        self.config.set_authorization_provider(StoreAccessTokenProvider())
+
+    def testRetries(self):
+        self.config.set_retry_handler(
+            BackoffRetryHandler(base_delay_ms=1, max_delay_ms=10))
+        handle = NoSQLHandle(self.config)
+        try:
+            self.proxy.errors = [self.THROTTLED] * 2
+            request = GetRequest().set_table_name('users').set_key({'id': 1})
+            result = handle.get(request)
+            retry_stats = result.get_retry_stats()
+            self.assertEqual(retry_stats.get_retries(), 2)
+            # the delays follow the hint of the service
+            self.assertEqual(retry_stats.get_delay_ms(),
+                             2 * self.RETRY_HINT_MS)
+            stats = handle.get_client().get_stats_control().get_stats_sources()
+            stats = stats['retryBudget']()
+            self.assertEqual(stats['requestCount'], 1)
+            self.assertEqual(stats['retryCount'], 2)
+            self.assertEqual(stats['hintedCount'], 2)
+            self.assertEqual(stats['amplification'], 3)
+        finally:
+            handle.close()
+
+    def testBudgetExhausted(self):
+        self.config.set_retry_handler(BackoffRetryHandler(
+            base_delay_ms=1, max_delay_ms=10, budget_ratio=0,
+            min_retries_per_sec=0))
+        handle = NoSQLHandle(self.config)
+        try:
+            self.proxy.errors = [self.THROTTLED] * 2
+            request = GetRequest().set_table_name('users').set_key({'id': 1})
+            # the single retry of the budget is not enough
+            self.assertRaises(ReadThrottlingException, handle.get, request)
+            self.assertEqual(request.get_retry_stats().get_retries(), 1)
+        finally:
+            handle.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,202 @@
+#
+# Copyright (c) 2018, 2026 Oracle and/or its affiliates. All rights reserved.
+#
+# Licensed under the Universal Permissive License v 1.0 as shown at
+#  https://oss.oracle.com/licenses/upl/
+#
+
+import unittest
+from json import dumps
+from threading import Event, Lock, Thread
+
+from borneo import (
+    BatchOperationNumberLimitException, BatchingWriter, BulkWriter,
+    DeleteRequest, GetRequest, IllegalArgumentException, IllegalStateException,
+    OperationResult, PutRequest, TableResult, WriteMultipleResult)
+from borneo.batch import ShardKeyResolver, _estimate_size
+
+
+class FakeHandle(object):
+    # Executes write multiple operations in memory, it fails the batches that
+    # have more than max_ops operations like the service does. The operations
+    # wait for the gate to be open.
+
+    def __init__(self, max_ops=50):
+        self.max_ops = max_ops
+        self.batches = list()
+        self.get_table_count = 0
+        self.gate = Event()
+        self.gate.set()
+        self.lock = Lock()
+
+    def get_table(self, request):
+        with self.lock:
+            self.get_table_count += 1
+        return TableResult().set_schema(dumps(
+            {'name': request.get_table_name(),
+             'shardKey': ['sid'], 'primaryKey': ['sid', 'id']}))
+
+    def write_multiple(self, request):
+        self.gate.wait()
+        ops = request.get_operations()
+        if len(ops) > self.max_ops:
+            raise BatchOperationNumberLimitException('Too many operations.')
+        with self.lock:
+            self.batches.append(ops)
+        result = WriteMultipleResult()
+        for op in ops:
+            result.add_result(OperationResult().set_success(True))
+        return result
+
+
+class TestBatchingWriter(unittest.TestCase):
+
+    def testBatchingWriterIllegalArguments(self):
+        handle = FakeHandle()
+        self.assertRaises(IllegalArgumentException, BatchingWriter, None)
+        self.assertRaises(IllegalArgumentException, BatchingWriter, handle,
+                          max_batch_operations=0)
+        self.assertRaises(IllegalArgumentException, BatchingWriter, handle,
+                          linger_ms=-1)
+        writer = BatchingWriter(handle)
+        self.assertRaises(IllegalArgumentException, writer.put,
+                          GetRequest())
+        self.assertRaises(IllegalArgumentException, writer.delete,
+                          PutRequest().set_table_name('t').set_value(
+                              {'sid': 1, 'id': 1}))
+        writer.close()
+        self.assertRaises(IllegalStateException, writer.put, PutRequest(
+            ).set_table_name('t').set_value({'sid': 1, 'id': 1}))
+
+    def testBatchingWriterGroupsByShardKey(self):
+        handle = FakeHandle()
+        futures = list()
+        with BatchingWriter(handle, max_batch_operations=10,
+                            linger_ms=1000) as writer:
+            for i in range(40):
+                futures.append(writer.put(PutRequest().set_table_name(
+                    'T').set_value({'SID': i % 2, 'id': i})))
+            futures.append(writer.delete(DeleteRequest().set_table_name(
+                't').set_key({'sid': 0, 'id': 0})))
+        for future in futures:
+            self.assertTrue(future.result().get_success())
+        self.assertEqual(handle.get_table_count, 1)
+        self.assertEqual(
+            sum(len(batch) for batch in handle.batches), len(futures))
+        for batch in handle.batches:
+            self.assertLessEqual(len(batch), 10)
+            sids = set(op.get_request().get_value()['SID']
+                       if isinstance(op.get_request(), PutRequest) else
+                       op.get_request().get_key()['sid'] for op in batch)
+            self.assertEqual(len(sids), 1)
+
+    def testBatchingWriterSplitsBatches(self):
+        handle = FakeHandle(max_ops=3)
+        writer = BatchingWriter(handle, max_batch_operations=8)
+        futures = [writer.put(PutRequest().set_table_name('t').set_value(
+            {'sid': 1, 'id': i})) for i in range(8)]
+        writer.flush()
+        self.assertEqual(writer.get_num_pending(), 0)
+        for future in futures:
+            self.assertTrue(future.result().get_success())
+        for batch in handle.batches:
+            self.assertLessEqual(len(batch), 3)
+        # Operations are sent in the order they were added.
+        ids = [op.get_request().get_value()['id'] for batch in handle.batches
+               for op in batch]
+        self.assertEqual(ids, list(range(8)))
+        writer.close()
+
+    def testBatchingWriterSplitsBySize(self):
+        handle = FakeHandle()
+        request = PutRequest().set_table_name('t').set_value(
+            {'sid': 1, 'id': 0, 'name': 'a' * 1000})
+        size = _estimate_size(request)
+        self.assertGreater(size, 1000)
+        self.assertLess(size, 1200)
+        with BatchingWriter(handle, max_batch_size=2 * size + 1) as writer:
+            for i in range(6):
+                writer.put(PutRequest().set_table_name('t').set_value(
+                    {'sid': 1, 'id': i, 'name': 'a' * 1000}))
+        self.assertEqual([len(batch) for batch in handle.batches], [2] * 3)
+
+    def testBatchingWriterMaxPendingOperations(self):
+        handle = FakeHandle()
+        handle.gate.clear()
+        writer = BatchingWriter(handle, linger_ms=1000,
+                                max_pending_operations=2)
+        futures = [writer.put(PutRequest().set_table_name('t').set_value(
+            {'sid': i, 'id': i})) for i in range(2)]
+        # The third operation waits for one of the first two to complete,
+        # the lingering operations are sent.
+        thread = Thread(target=lambda: futures.append(writer.put(
+            PutRequest().set_table_name('t').set_value({'sid': 2, 'id': 2}))))
+        thread.start()
+        thread.join(0.2)
+        self.assertTrue(thread.is_alive())
+        self.assertEqual(writer.get_num_pending(), 0)
+        handle.gate.set()
+        thread.join()
+        writer.close()
+        self.assertEqual(len(futures), 3)
+        for future in futures:
+            self.assertTrue(future.result().get_success())
+        self.assertRaises(IllegalArgumentException, BatchingWriter, handle,
+                          max_pending_operations=0)
+
+    def testBulkWriterPut(self):
+        handle = FakeHandle(max_ops=20)
+        writer = BulkWriter(handle, max_batch_operations=30,
+                            max_concurrency=3, max_pending_operations=100)
+        rows = ({'sid': i % 7, 'id': i} for i in range(1000))
+        result = writer.put('t', rows)
+        self.assertEqual(result.get_num_operations(), 1000)
+        self.assertEqual(result.get_num_succeeded(), 1000)
+        self.assertEqual(result.get_num_failed(), 0)
+        self.assertEqual(result.get_num_batches(), len(handle.batches))
+        ids = set()
+        for batch in handle.batches:
+            self.assertLessEqual(len(batch), 20)
+            sids = set(op.get_request().get_value()['sid'] for op in batch)
+            self.assertEqual(len(sids), 1)
+            ids.update(op.get_request().get_value()['id'] for op in batch)
+        self.assertEqual(ids, set(range(1000)))
+
+    def testBulkWriterFailures(self):
+        handle = FakeHandle()
+        writer = BulkWriter(handle)
+        # An element of the wrong type is reported, the batches submitted
+        # before it are kept.
+        writer = BulkWriter(handle, max_batch_operations=2)
+        puts = [PutRequest().set_table_name('t').set_value(
+            {'sid': 1, 'id': i}) for i in range(3)]
+        result = writer.write(puts[:2] + [GetRequest()] + puts[2:])
+        self.assertEqual(result.get_num_operations(), 4)
+        self.assertEqual(result.get_num_succeeded(), 3)
+        failures = result.get_failures()
+        self.assertEqual(len(failures), 1)
+        self.assertIsInstance(failures[0][0], GetRequest)
+        self.assertIsInstance(failures[0][2], IllegalArgumentException)
+        self.assertEqual(sum(len(ops) for ops in handle.batches), 3)
+        writer = BulkWriter(handle)
+        # A put without a value fails validation and is reported.
+        result = writer.write([PutRequest().set_table_name('t'),
+                               PutRequest().set_table_name('t').set_value(
+                                   {'sid': 1, 'id': 1})])
+        self.assertEqual(result.get_num_operations(), 2)
+        self.assertEqual(result.get_num_succeeded(), 1)
+        failures = result.get_failures()
+        self.assertEqual(len(failures), 1)
+        self.assertIsNone(failures[0][1])
+        self.assertIsInstance(failures[0][2], IllegalArgumentException)
+
+    def testShardKeyResolverParseSchema(self):
+        self.assertEqual(ShardKeyResolver.parse_shard_key(dumps(
+            {'shardKey': ['A'], 'primaryKey': ['A', 'B']})), ['a'])
+        self.assertEqual(ShardKeyResolver.parse_shard_key(dumps(
+            {'primaryKey': ['A', 'B']})), ['a', 'b'])
+        self.assertIsNone(ShardKeyResolver.parse_shard_key(dumps({})))
+
+
+if __name__ == '__main__':
+    unittest.main()
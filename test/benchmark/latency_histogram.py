@@ -0,0 +1,86 @@
+#
+# Copyright (c) 2018, 2026 Oracle and/or its affiliates. All rights reserved.
+#
+# Licensed under the Universal Permissive License v 1.0 as shown at
+#  https://oss.oracle.com/licenses/upl/
+#
+
+#
+# Records 100000 latencies per simulated second in the histogram of
+# stats.Percentile and in the list it replaced, and reports the memory used,
+# the time to record a value and the time to compute the percentiles.
+#
+# Usage: python latency_histogram.py [seconds]
+#
+
+import sys
+import tracemalloc
+from random import Random
+from time import perf_counter
+
+from borneo.stats import Percentile
+
+RATE = 100000
+PERCENTILES = [0.5, 0.9, 0.95, 0.99, 0.999]
+
+
+class ListPercentile(object):
+    # The list based implementation replaced by the histogram.
+
+    def __init__(self):
+        self._values = []
+
+    def add_value(self, network_latency):
+        self._values.append(network_latency)
+
+    def get_percentile(self, percentiles):
+        size = len(self._values)
+        self._values.sort()
+        return [-1 if size == 0 else
+                self._values[0] if round(v * size) <= 0 else
+                self._values[size - 1] if round(v * size) >= size
+                else self._values[round(v * size) - 1]
+                for v in percentiles]
+
+
+def run(name, factory, latencies, seconds):
+    # Memory used after each second.
+    percentile = factory()
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    for second in range(seconds):
+        for v in latencies:
+            percentile.add_value(v)
+        print('%-10s second %2d: %10d bytes' %
+              (name, second + 1, tracemalloc.get_traced_memory()[0] - start))
+    tracemalloc.stop()
+    # Time to record the values and compute the percentiles.
+    percentile = factory()
+    begin = perf_counter()
+    for _ in range(seconds):
+        for v in latencies:
+            percentile.add_value(v)
+    record = perf_counter() - begin
+    begin = perf_counter()
+    result = percentile.get_percentile(PERCENTILES)
+    compute = perf_counter() - begin
+    print('%-10s %.3f us/record, %.2f ms/percentiles' %
+          (name, record * 1000000 / (seconds * RATE), compute * 1000))
+    return result
+
+
+def main():
+    seconds = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    random = Random(35)
+    # One second of latencies in milliseconds, with a long tail.
+    latencies = [round(random.lognormvariate(1.5, 0.8), 3)
+                 for _ in range(RATE)]
+    histogram = run('histogram', Percentile, latencies, seconds)
+    exact = run('list', ListPercentile, latencies, seconds)
+    for p, h, e in zip(PERCENTILES, histogram, exact):
+        print('p%-6s histogram %9.3f  exact %9.3f  error %.3f%%' %
+              (p * 100, h, e, abs(h - e) * 100 / e))
+
+
+if __name__ == '__main__':
+    main()
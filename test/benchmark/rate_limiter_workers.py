@@ -0,0 +1,125 @@
+#
+# Copyright (c) 2018, 2026 Oracle and/or its affiliates. All rights reserved.
+#
+# Licensed under the Universal Permissive License v 1.0 as shown at
+#  https://oss.oracle.com/licenses/upl/
+#
+
+#
+# Measures the throughput of 200 logical workers sharing a rate limited table
+# on a pool of 8 threads.
+#
+# Each operation of a worker uses some CPU, waits for a simulated request and
+# then consumes its units in the rate limiter of the table. The first part
+# runs the operations as tasks of the pool that wait for the request and the
+# limiter with sleep(), as the driver does, so a thread is tied up during the
+# waits. The second part simulates an asynchronous request completed by the
+# scheduler of the driver, and parks the worker on the future returned by
+# SimpleRateLimiter.consume_units_async, so the threads only run the CPU part
+# of the operations.
+#
+# Usage: python rate_limiter_workers.py [seconds] [limit per second]
+#
+
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event, Lock
+from time import perf_counter, sleep
+
+from borneo.http import SimpleRateLimiter
+from borneo.scheduler import get_scheduler
+
+WORKERS = 200
+THREADS = 8
+# The latency of a request in seconds.
+REQUEST_TIME = 0.02
+# The units consumed by an operation.
+UNITS = 1
+
+
+def cpu_work():
+    total = 0
+    for i in range(200):
+        total += i * i
+    return total
+
+
+class Run(object):
+    # Counts the operations of the workers until the end of the run.
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.count = 0
+        self.lock = Lock()
+        self.done = Event()
+        self.start = perf_counter()
+
+    def next(self):
+        # Counts an operation and returns whether the worker continues.
+        with self.lock:
+            self.count += 1
+        if perf_counter() - self.start >= self.seconds:
+            self.done.set()
+            return False
+        return True
+
+
+def run_blocking(seconds, limit):
+    limiter = SimpleRateLimiter(limit)
+    pool = ThreadPoolExecutor(THREADS)
+    run = Run(seconds)
+
+    def operation():
+        cpu_work()
+        sleep(REQUEST_TIME)
+        limiter.consume_units(UNITS)
+        if run.next():
+            pool.submit(operation)
+
+    for _ in range(WORKERS):
+        pool.submit(operation)
+    run.done.wait()
+    rate = run.count / (perf_counter() - run.start)
+    pool.shutdown(cancel_futures=True)
+    print('blocking, sleep in threads %10.0f operations/s' % rate)
+    return rate
+
+
+def run_non_blocking(seconds, limit):
+    limiter = SimpleRateLimiter(limit)
+    pool = ThreadPoolExecutor(THREADS)
+    scheduler = get_scheduler()
+    run = Run(seconds)
+
+    def operation():
+        cpu_work()
+        scheduler.schedule(REQUEST_TIME, request_done)
+
+    def request_done():
+        limiter.consume_units_async(UNITS).add_done_callback(units_consumed)
+
+    def units_consumed(future):
+        if run.next():
+            pool.submit(operation)
+
+    for _ in range(WORKERS):
+        pool.submit(operation)
+    run.done.wait()
+    rate = run.count / (perf_counter() - run.start)
+    pool.shutdown(cancel_futures=True)
+    print('non-blocking, futures      %10.0f operations/s' % rate)
+    return rate
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    limit = float(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    print('%d workers on %d threads, limit %.0f units/s' %
+          (WORKERS, THREADS, limit))
+    blocking = run_blocking(seconds, limit)
+    non_blocking = run_non_blocking(seconds, limit)
+    print('speedup: %.2fx' % (non_blocking / blocking))
+
+
+if __name__ == '__main__':
+    main()
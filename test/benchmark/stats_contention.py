@@ -0,0 +1,138 @@
+#
+# Copyright (c) 2018, 2026 Oracle and/or its affiliates. All rights reserved.
+#
+# Licensed under the Universal Permissive License v 1.0 as shown at
+#  https://oss.oracle.com/licenses/upl/
+#
+
+#
+# Measures the cost of the driver stats with many request threads.
+#
+# The first part runs get requests from 64 threads against a local stand-in
+# proxy, which answers all the requests with an empty result, with the stats
+# disabled and with the stats of the "more" profile. The second part calls
+# the stats from 64 threads directly, with the per thread shards of Stats and
+# with all the threads serialized on a single lock as they were before.
+#
+# Usage: python stats_contention.py [requests per thread]
+#
+
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Barrier, Lock, Thread
+from time import perf_counter
+
+from borneo import GetRequest, NoSQLHandle, NoSQLHandleConfig, StatsProfile
+from borneo.common import ByteOutputStream
+from borneo.kv import StoreAccessTokenProvider
+from borneo.nson import NsonSerializer, Proto
+from borneo.nson_protocol import ERROR_CODE
+from borneo.stats import StatsControl
+
+THREADS = 64
+
+
+class ProxyHandler(BaseHTTPRequestHandler):
+    # Stand-in for the proxy, answers all the requests with an empty result.
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers['Content-Length']))
+        ns = NsonSerializer(ByteOutputStream(bytearray()))
+        ns.start_map()
+        Proto.write_int_map_field(ns, ERROR_CODE, 0)
+        ns.end_map()
+        content = ns.get_stream().get_content()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_request(self, code='-', size='-'):
+        pass
+
+
+class ProxyServer(ThreadingHTTPServer):
+
+    daemon_threads = True
+    request_queue_size = THREADS
+
+
+def run_threads(function, count):
+    barrier = Barrier(THREADS + 1)
+
+    def run():
+        barrier.wait()
+        for _ in range(count):
+            function()
+
+    threads = [Thread(target=run) for _ in range(THREADS)]
+    for t in threads:
+        t.start()
+    barrier.wait()
+    start = perf_counter()
+    for t in threads:
+        t.join()
+    return THREADS * count / (perf_counter() - start)
+
+
+def run_requests(port, profile, count):
+    config = NoSQLHandleConfig('http://localhost:' + str(port))
+    config.set_authorization_provider(StoreAccessTokenProvider())
+    config.set_stats_profile(profile).set_stats_handler(lambda stats: None)
+    config.set_pool_maxsize(THREADS)
+    handle = NoSQLHandle(config)
+    try:
+        request = GetRequest().set_table_name('users').set_key({'id': 1})
+        handle.get(request)
+        rate = run_threads(lambda: handle.get(request), count)
+    finally:
+        handle.close()
+    print('requests, stats %-8s %10.0f requests/s' % (profile.name, rate))
+    return rate
+
+
+def run_observe(name, observe, count):
+    rate = run_threads(observe, count)
+    print('observe, %-18s %10.0f calls/s' % (name, rate))
+    return rate
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    httpd = ProxyServer(('localhost', 0), ProxyHandler)
+    thread = Thread(target=httpd.serve_forever)
+    thread.daemon = True
+    thread.start()
+    try:
+        port = httpd.server_address[1]
+        none = run_requests(port, StatsProfile.NONE, count)
+        more = run_requests(port, StatsProfile.MORE, count)
+        print('stats overhead: %.1f%%' % ((none - more) * 100 / none))
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+    config = NoSQLHandleConfig('http://localhost:8080').set_stats_profile(
+        StatsProfile.MORE).set_stats_handler(lambda stats: None)
+    stats_control = StatsControl(config, None, False)
+    request = GetRequest().set_table_name('users')
+    lock = Lock()
+
+    def observe():
+        stats_control.observe(request, 10, 100, 5)
+
+    def observe_locked():
+        with lock:
+            stats_control.observe(request, 10, 100, 5)
+
+    sharded = run_observe('per thread shards', observe, count * 50)
+    locked = run_observe('single lock', observe_locked, count * 50)
+    print('observe speedup: %.2fx' % (sharded / locked))
+    stats_control.shutdown()
+
+
+if __name__ == '__main__':
+    main()
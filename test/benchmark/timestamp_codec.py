@@ -0,0 +1,62 @@
+#
+# Copyright (c) 2018, 2026 Oracle and/or its affiliates. All rights reserved.
+#
+# Licensed under the Universal Permissive License v 1.0 as shown at
+#  https://oss.oracle.com/licenses/upl/
+#
+
+#
+# Compares the ISO 8601 timestamp codec of SerdeUtil with the dateutil based
+# parsing and the padding based formatting it replaced.
+#
+# Usage: python timestamp_codec.py [iterations]
+#
+
+import sys
+from datetime import datetime, timedelta
+from timeit import timeit
+
+from dateutil import parser
+
+from borneo.serdeutil import SerdeUtil
+
+
+def old_datetime_to_iso(date):
+    val = SerdeUtil.append_with_pad(None, str(date.year), 4) + '-'
+    val = SerdeUtil.append_with_pad(val, str(date.month), 2) + '-'
+    val = SerdeUtil.append_with_pad(val, str(date.day), 2) + 'T'
+    val = SerdeUtil.append_with_pad(val, str(date.hour), 2) + ':'
+    val = SerdeUtil.append_with_pad(val, str(date.minute), 2) + ':'
+    val = SerdeUtil.append_with_pad(val, str(date.second), 2)
+    if date.microsecond > 0:
+        val += '.'
+        val = SerdeUtil.append_with_pad(
+            val, str(date.microsecond), 6).rstrip('0')
+    return val + 'Z'
+
+
+def run(name, function, values, iterations):
+    seconds = timeit(lambda: [function(v) for v in values], number=iterations)
+    usec = seconds * 1000000 / (iterations * len(values))
+    print('%-24s %8.2f us/op' % (name, usec))
+    return usec
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    start = datetime(2020, 1, 1)
+    dates = [start + timedelta(seconds=i * 7919, microseconds=i * 37)
+             for i in range(1000)]
+    strings = [SerdeUtil.datetime_to_iso(d) for d in dates]
+
+    old = run('dateutil parse', parser.parse, strings, iterations)
+    new = run('iso_to_datetime', SerdeUtil.iso_to_datetime, strings,
+              iterations)
+    print('parse speedup: %.1fx' % (old / new))
+    old = run('append_with_pad format', old_datetime_to_iso, dates, iterations)
+    new = run('datetime_to_iso', SerdeUtil.datetime_to_iso, dates, iterations)
+    print('format speedup: %.1fx' % (old / new))
+
+
+if __name__ == '__main__':
+    main()
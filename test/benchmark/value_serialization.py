@@ -0,0 +1,52 @@
+#
+# Copyright (c) 2018, 2026 Oracle and/or its affiliates. All rights reserved.
+#
+# Licensed under the Universal Permissive License v 1.0 as shown at
+#  https://oss.oracle.com/licenses/upl/
+#
+
+#
+# Measures the NSON serialization of a wide row, as done for the value of a
+# PutRequest, and the cost of SerdeUtil.get_type per field.
+#
+# Usage: python value_serialization.py [iterations]
+#
+
+import sys
+from collections import OrderedDict
+from datetime import datetime
+from decimal import Decimal
+from timeit import timeit
+
+from borneo.nson import Proto
+from borneo.serdeutil import SerdeUtil
+
+
+def create_row(num_fields):
+    row = OrderedDict()
+    for i in range(num_fields // 5):
+        row['int' + str(i)] = i
+        row['long' + str(i)] = i * 2 ** 40
+        row['string' + str(i)] = 'value' + str(i)
+        row['double' + str(i)] = i / 3.0
+        row['time' + str(i)] = datetime(2020, 1, 2, 3, 4, 5)
+    row['number'] = Decimal('1.5')
+    row['array'] = [1, 2, 3]
+    return row
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    row = create_row(200)
+    values = list(row.values())
+    seconds = timeit(lambda: [SerdeUtil.get_type(v) for v in values],
+                     number=iterations)
+    print('get_type        %8.3f us/field' %
+          (seconds * 1000000 / (iterations * len(values))))
+    seconds = timeit(lambda: Proto.value_to_nson(row), number=iterations)
+    print('value_to_nson   %8.1f us/row (%d fields)' %
+          (seconds * 1000000 / iterations, len(values)))
+
+
+if __name__ == '__main__':
+    main()
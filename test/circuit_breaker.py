@@ -0,0 +1,180 @@
+#
+# Copyright (c) 2018, 2026 Oracle and/or its affiliates. All rights reserved.
+#
+# Licensed under the Universal Permissive License v 1.0 as shown at
+#  https://oss.oracle.com/licenses/upl/
+#
+
+import unittest
+from socket import socket
+from time import sleep, time
+
+from requests import ConnectionError, Session
+
+from borneo import (
+    CircuitOpenException, GetRequest, IllegalArgumentException, NoSQLException,
+    NoSQLHandle, NoSQLHandleConfig, RequestTimeoutException)
+from borneo.circuit import CircuitBreaker, CircuitBreakerMap
+from borneo.common import LogUtils
+from borneo.http import RequestUtils
+from borneo.kv import StoreAccessTokenProvider
+from testutils import ProxyServer
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def testStates(self):
+        breaker = CircuitBreaker('localhost', 3, 50)
+        breaker.check()
+        breaker.on_failure()
+        breaker.on_failure()
+        # a success resets the consecutive failures
+        breaker.on_success()
+        breaker.on_failure()
+        breaker.on_failure()
+        self.assertEqual(breaker.get_state(), CircuitBreaker.CLOSED)
+        breaker.on_failure()
+        self.assertEqual(breaker.get_state(), CircuitBreaker.OPEN)
+        self.assertRaises(CircuitOpenException, breaker.check)
+        sleep(0.06)
+        # a single probe is sent once the open time has passed
+        breaker.check()
+        self.assertEqual(breaker.get_state(), CircuitBreaker.HALF_OPEN)
+        self.assertRaises(CircuitOpenException, breaker.check)
+        breaker.on_failure()
+        self.assertEqual(breaker.get_state(), CircuitBreaker.OPEN)
+        self.assertRaises(CircuitOpenException, breaker.check)
+        sleep(0.06)
+        breaker.check()
+        breaker.on_success()
+        self.assertEqual(breaker.get_state(), CircuitBreaker.CLOSED)
+        breaker.check()
+        stats = breaker.get_stats()
+        self.assertEqual(stats['state'], CircuitBreaker.CLOSED)
+        self.assertEqual(stats['openCount'], 2)
+        self.assertEqual(stats['rejectedCount'], 3)
+        self.assertEqual(stats['probeCount'], 2)
+        self.assertEqual(breaker.get_stats()['openCount'], 0)
+
+    def testBreakerMap(self):
+        breakers = CircuitBreakerMap('localhost:8080', 1, 1000, False)
+        self.assertIs(breakers.get_breaker('users'),
+                      breakers.get_breaker(None))
+        breakers = CircuitBreakerMap('localhost:8080', 1, 1000, True)
+        users = breakers.get_breaker('Users')
+        self.assertIs(breakers.get_breaker('users'), users)
+        users.on_failure()
+        # the other tables are not affected
+        breakers.get_breaker('orders').check()
+        breakers.get_breaker(None).check()
+        self.assertRaises(CircuitOpenException, users.check)
+        stats = breakers.get_stats()
+        self.assertEqual([s.get('table') for s in stats],
+                         [None, 'orders', 'users'])
+        self.assertEqual(stats[2]['state'], CircuitBreaker.OPEN)
+        self.assertEqual(stats[2]['endpoint'], 'localhost:8080')
+        # each endpoint has its own circuits
+        other = breakers.get_breaker('users', 'localhost:8081')
+        self.assertIsNot(other, users)
+        other.check()
+        self.assertIs(breakers.get_breaker('users', 'localhost:8080'), users)
+        self.assertEqual(breakers.get_stats()[3]['endpoint'], 'localhost:8081')
+
+    def testConfig(self):
+        config = NoSQLHandleConfig('http://localhost:8080')
+        self.assertEqual(config.get_circuit_breaker_threshold(), 0)
+        config.set_circuit_breaker(5, 1000, True)
+        self.assertEqual(config.get_circuit_breaker_threshold(), 5)
+        self.assertEqual(config.get_circuit_breaker_open_time(), 1000)
+        self.assertTrue(config.get_circuit_breaker_per_table())
+        self.assertRaises(IllegalArgumentException,
+                          config.set_circuit_breaker, -1)
+        self.assertRaises(IllegalArgumentException,
+                          config.set_circuit_breaker, 5, 0)
+        self.assertRaises(IllegalArgumentException,
+                          config.set_circuit_breaker, 5, 1000, 'yes')
+
+
+class TestCircuitBreakerRequests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.proxy = ProxyServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.proxy.stop()
+
+    def setUp(self):
+        self.proxy.reset()
+        self.config = NoSQLHandleConfig(self.proxy.get_endpoint())
+        self.config.set_authorization_provider(StoreAccessTokenProvider())
+        self.request = GetRequest().set_table_name('users').set_key(
+            {'id': 1}).set_timeout(5000)
+
+    def testFailFast(self):
+        handle = NoSQLHandle(self.config.set_circuit_breaker(3, 100))
+        try:
+            self.proxy.down = True
+            start = time()
+            # the 5xx responses open the circuit
+            for i in range(3):
+                self.assertRaises(NoSQLException, handle.get, self.request)
+            self.assertEqual(self.proxy.count, 3)
+            self.assertRaises(CircuitOpenException, handle.get, self.request)
+            self.assertEqual(self.proxy.count, 3)
+            self.assertLess(time() - start, 1)
+            self.proxy.down = False
+            sleep(0.15)
+            # the probe closes the circuit
+            handle.get(self.request)
+            self.assertEqual(self.proxy.count, 4)
+            stats = handle.get_client().get_stats_control().get_stats_sources()
+            stats = stats['circuitBreakers']()
+            self.assertEqual(stats[0]['state'], CircuitBreaker.CLOSED)
+            self.assertEqual(stats[0]['openCount'], 1)
+            self.assertEqual(stats[0]['rejectedCount'], 1)
+        finally:
+            handle.close()
+
+    def testConnectionErrors(self):
+        # an endpoint nothing listens on
+        listener = socket()
+        listener.bind(('localhost', 0))
+        port = listener.getsockname()[1]
+        listener.close()
+        config = NoSQLHandleConfig('http://localhost:' + str(port))
+        config.set_authorization_provider(StoreAccessTokenProvider())
+        handle = NoSQLHandle(config.set_circuit_breaker(2))
+        try:
+            for i in range(2):
+                self.assertRaises(ConnectionError, handle.get, self.request)
+            self.assertRaises(CircuitOpenException, handle.get, self.request)
+        finally:
+            handle.close()
+
+    def testServerErrorBackoff(self):
+        # the requests without a Request instance, as the login requests of
+        # the secure store, are retried after a 5xx response with a delay
+        request_utils = RequestUtils(Session(), LogUtils())
+        self.proxy.down = True
+        start = time()
+        self.assertRaises(RequestTimeoutException,
+                          request_utils.do_get_request,
+                          self.proxy.get_endpoint(), {}, 1000)
+        self.assertLess(time() - start, 1.5)
+        # the retries after about 0.2 and 0.7 seconds, the next would end
+        # after the timeout
+        self.assertEqual(self.proxy.count, 3)
+
+    def testDisabled(self):
+        handle = NoSQLHandle(self.config)
+        try:
+            self.assertIsNone(handle.get_client().get_circuit_breakers())
+            handle.get(self.request)
+        finally:
+            handle.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
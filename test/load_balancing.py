@@ -0,0 +1,236 @@
+#
+# Copyright (c) 2018, 2026 Oracle and/or its affiliates. All rights reserved.
+#
+# Licensed under the Universal Permissive License v 1.0 as shown at
+#  https://oss.oracle.com/licenses/upl/
+#
+
+import unittest
+from socket import socket
+from time import sleep
+
+from requests import Session
+
+from borneo import (
+    GetRequest, IllegalArgumentException, LoadBalancing, NoSQLException,
+    NoSQLHandle, NoSQLHandleConfig)
+from borneo.balancer import EndpointBalancer
+from borneo.common import LogUtils
+from borneo.kv import StoreAccessTokenProvider
+from testutils import ProxyServer
+
+
+class TestEndpointBalancer(unittest.TestCase):
+
+    def setUp(self):
+        self.urls = NoSQLHandleConfig('http://localhost:8080').set_endpoints(
+            ['http://localhost:8080', 'http://localhost:8081',
+             'http://localhost:8082']).get_endpoints()
+
+    def testLeastOutstanding(self):
+        balancer = EndpointBalancer(
+            self.urls, Session, LoadBalancing.LEAST_OUTSTANDING, 3, 1000,
+            LogUtils())
+        try:
+            first, second, third = balancer.get_endpoints()
+            balancer.start(first)
+            balancer.start(second)
+            self.assertIs(balancer.choose(), third)
+            balancer.start(third)
+            balancer.start(third)
+            balancer.release(first)
+            self.assertIs(balancer.choose(), first)
+            # the endpoint of the previous attempt is avoided
+            self.assertIsNot(balancer.choose(first), first)
+            stats = balancer.get_stats()
+            self.assertEqual([s['outstanding'] for s in stats], [0, 1, 2])
+            self.assertEqual([s['requestCount'] for s in stats], [1, 1, 2])
+        finally:
+            balancer.close()
+
+    def testPowerOfTwoChoices(self):
+        balancer = EndpointBalancer(
+            self.urls, Session, LoadBalancing.POWER_OF_TWO_CHOICES, 3, 1000,
+            LogUtils())
+        try:
+            busiest = balancer.get_endpoints()[0]
+            balancer.start(busiest)
+            # the busiest endpoint is never chosen over another one
+            for i in range(50):
+                self.assertIsNot(balancer.choose(), busiest)
+        finally:
+            balancer.close()
+
+    def testEjection(self):
+        balancer = EndpointBalancer(
+            self.urls, Session, LoadBalancing.LEAST_OUTSTANDING, 2, 60000,
+            LogUtils())
+        try:
+            first, second, third = balancer.get_endpoints()
+            balancer.on_failure(first)
+            # a success resets the consecutive failures
+            balancer.on_success(first)
+            balancer.on_failure(first)
+            self.assertFalse(first.is_ejected())
+            balancer.on_failure(first)
+            self.assertTrue(first.is_ejected())
+            balancer.start(second)
+            balancer.start(third)
+            for i in range(10):
+                self.assertIsNot(balancer.choose(), first)
+            self.assertTrue(balancer.can_fail_over(second))
+            for endpoint in (second, third):
+                balancer.on_failure(endpoint)
+                balancer.on_failure(endpoint)
+            self.assertFalse(balancer.can_fail_over(second))
+            # the first endpoint ejected is used if they are all ejected
+            self.assertIs(balancer.choose(), first)
+            stats = balancer.get_stats()
+            self.assertEqual([s['ejectCount'] for s in stats], [1, 1, 1])
+            self.assertEqual(stats[0]['failureCount'], 3)
+            self.assertEqual(stats[0]['endpoint'], 'localhost:8080')
+        finally:
+            balancer.close()
+
+    def testConfig(self):
+        config = NoSQLHandleConfig('http://localhost:8080')
+        self.assertEqual(len(config.get_endpoints()), 1)
+        config.set_endpoints(['localhost:8081', 'http://localhost:8082'])
+        self.assertEqual(config.get_service_url().netloc, 'localhost:8081')
+        self.assertEqual([url.netloc for url in config.get_endpoints()],
+                         ['localhost:8081', 'localhost:8082'])
+        self.assertEqual(config.get_load_balancing(),
+                         LoadBalancing.POWER_OF_TWO_CHOICES)
+        config.set_load_balancing(LoadBalancing.LEAST_OUTSTANDING, 5, 2000)
+        self.assertEqual(config.get_load_balancing(),
+                         LoadBalancing.LEAST_OUTSTANDING)
+        self.assertEqual(config.get_endpoint_failure_threshold(), 5)
+        self.assertEqual(config.get_endpoint_eject_time(), 2000)
+        self.assertRaises(IllegalArgumentException, config.set_endpoints, [])
+        self.assertRaises(IllegalArgumentException, config.set_endpoints,
+                          'localhost:8080')
+        self.assertRaises(IllegalArgumentException, config.set_endpoints,
+                          ['http://localhost:8080', 'https://localhost:443'])
+        self.assertRaises(IllegalArgumentException, config.set_load_balancing,
+                          2)
+        self.assertRaises(IllegalArgumentException, config.set_load_balancing,
+                          LoadBalancing.LEAST_OUTSTANDING, 0)
+
+
+class TestLoadBalancing(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.servers = [ProxyServer().start() for i in range(2)]
+
+    @classmethod
+    def tearDownClass(cls):
+        for proxy in cls.servers:
+            proxy.stop()
+
+    def setUp(self):
+        for proxy in self.servers:
+            proxy.reset()
+        self.request = GetRequest().set_table_name('users').set_key(
+            {'id': 1}).set_timeout(5000)
+
+    def _create_handle(self, endpoints, *balancing):
+        config = NoSQLHandleConfig(endpoints[0]).set_endpoints(endpoints)
+        config.set_authorization_provider(StoreAccessTokenProvider())
+        if balancing:
+            config.set_load_balancing(*balancing)
+        return NoSQLHandle(config)
+
+    def testBalancing(self):
+        handle = self._create_handle(
+            [proxy.get_endpoint() for proxy in self.servers])
+        try:
+            for i in range(40):
+                handle.get(self.request)
+            # both proxies receive requests
+            self.assertGreater(self.servers[0].count, 0)
+            self.assertGreater(self.servers[1].count, 0)
+            self.assertEqual(self.servers[0].count + self.servers[1].count, 40)
+            stats = handle.get_client().get_stats_control().get_stats_sources()
+            stats = stats['endpoints']()
+            self.assertEqual(sum(s['requestCount'] for s in stats), 40)
+        finally:
+            handle.close()
+
+    def testFailover(self):
+        # an endpoint nothing listens on
+        listener = socket()
+        listener.bind(('localhost', 0))
+        port = listener.getsockname()[1]
+        listener.close()
+        handle = self._create_handle(
+            ['http://localhost:' + str(port), self.servers[0].get_endpoint()],
+            LoadBalancing.LEAST_OUTSTANDING, 2)
+        try:
+            # the requests sent to the dead endpoint are retried on the other
+            for i in range(20):
+                handle.get(self.request)
+            self.assertEqual(self.servers[0].count, 20)
+            stats = handle.get_client().get_stats_control().get_stats_sources()
+            stats = stats['endpoints']()
+            self.assertTrue(stats[0]['ejected'])
+            self.assertEqual(stats[0]['failureCount'], 2)
+        finally:
+            handle.close()
+
+    def testCircuitBreakers(self):
+        config = NoSQLHandleConfig(self.servers[0].get_endpoint())
+        config.set_endpoints([proxy.get_endpoint() for proxy in self.servers])
+        config.set_authorization_provider(StoreAccessTokenProvider())
+        config.set_load_balancing(LoadBalancing.LEAST_OUTSTANDING, 10)
+        handle = NoSQLHandle(config.set_circuit_breaker(1, 60000))
+        try:
+            self.servers[0].down = True
+            # the open circuit of the proxy that is down does not stop the
+            # requests to the other one
+            errors = 0
+            for i in range(10):
+                try:
+                    handle.get(self.request)
+                except NoSQLException:
+                    errors += 1
+            self.assertLessEqual(errors, 1)
+            self.assertEqual(self.servers[0].count, 1)
+            stats = handle.get_client().get_stats_control().get_stats_sources()
+            states = dict((s['endpoint'], s['state'])
+                          for s in stats['circuitBreakers']())
+            self.assertEqual(states, {
+                self.servers[0].get_endpoint()[7:]: 'open',
+                self.servers[1].get_endpoint()[7:]: 'closed'})
+        finally:
+            handle.close()
+
+    def testHealthCheck(self):
+        handle = self._create_handle(
+            [proxy.get_endpoint() for proxy in self.servers],
+            LoadBalancing.LEAST_OUTSTANDING, 1, 100)
+        try:
+            self.servers[0].down = True
+            errors = 0
+            while errors == 0:
+                try:
+                    handle.get(self.request)
+                except NoSQLException:
+                    errors += 1
+            # the ejected proxy receives no requests
+            count = self.servers[0].count
+            for i in range(10):
+                handle.get(self.request)
+            self.assertEqual(self.servers[0].count, count)
+            self.servers[0].down = False
+            sleep(0.5)
+            stats = handle.get_client().get_stats_control().get_stats_sources()
+            stats = stats['endpoints']()
+            self.assertFalse(stats[0]['ejected'])
+            self.assertEqual(stats[0]['ejectCount'], 1)
+        finally:
+            handle.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,184 @@
+#
+# Copyright (c) 2018, 2026 Oracle and/or its affiliates. All rights reserved.
+#
+# Licensed under the Universal Permissive License v 1.0 as shown at
+#  https://oss.oracle.com/licenses/upl/
+#
+
+import unittest
+from threading import Thread
+
+from requests import get
+
+from borneo import (
+    GetRequest, IllegalArgumentException, NoSQLHandleConfig,
+    OpenTelemetryExporter, PrometheusExporter, PutRequest,
+    ReadThrottlingException, StatsProfile)
+from borneo.metrics import CounterMetricFamily, otel_metrics
+from borneo.stats import StatsControl
+
+
+class TestMetricsExporters(unittest.TestCase):
+
+    def setUp(self):
+        # Exporters do not depend on the stats profile.
+        config = NoSQLHandleConfig('http://localhost:8080').set_stats_profile(
+            StatsProfile.NONE)
+        self.stats_control = StatsControl(config, None, False)
+
+    def tearDown(self):
+        self.stats_control.shutdown()
+
+    def testPrometheusExporter(self):
+        exporter = PrometheusExporter(buckets=[0.01, 0.1])
+        self.stats_control.add_metrics_exporter(exporter)
+        self.assertEqual(self.stats_control.get_metrics_exporters(),
+                         [exporter])
+        threads = 4
+        count = 100
+
+        def observe():
+            get_request = GetRequest().set_table_name('users')
+            put_request = PutRequest().set_table_name('users')
+            for i in range(count):
+                self.stats_control.observe(get_request, 10, 100, 5)
+                self.stats_control.observe(put_request, 200, 20, 50)
+            self.stats_control.observe_error(
+                put_request, ReadThrottlingException('throttled'))
+
+        workers = [Thread(target=observe) for _ in range(threads)]
+        for t in workers:
+            t.start()
+        for t in workers:
+            t.join()
+        text = exporter.generate_text()
+        get_labels = '{request="Get",table="users"}'
+        put_labels = '{request="Put",table="users"}'
+        self.assertIn('# TYPE nosql_requests_total counter', text)
+        self.assertIn('nosql_requests_total' + get_labels + ' ' +
+                      str(threads * count), text)
+        self.assertIn('nosql_requests_total' + put_labels + ' ' +
+                      str(threads * (count + 1)), text)
+        self.assertIn('nosql_request_bytes_total' + get_labels + ' ' +
+                      str(threads * count * 10), text)
+        self.assertIn('nosql_response_bytes_total' + get_labels + ' ' +
+                      str(threads * count * 100), text)
+        self.assertIn(
+            'nosql_request_errors_total{request="Put",table="users",' +
+            'error="ReadThrottlingException"} ' + str(threads), text)
+        self.assertIn('# TYPE nosql_request_latency_seconds histogram', text)
+        self.assertIn(
+            'nosql_request_latency_seconds_bucket{request="Get",' +
+            'table="users",le="0.01"} ' + str(threads * count), text)
+        self.assertIn(
+            'nosql_request_latency_seconds_bucket{request="Put",' +
+            'table="users",le="0.01"} 0', text)
+        self.assertIn(
+            'nosql_request_latency_seconds_bucket{request="Put",' +
+            'table="users",le="+Inf"} ' + str(threads * count), text)
+        self.assertIn('nosql_request_latency_seconds_count' + put_labels +
+                      ' ' + str(threads * count), text)
+        # the metrics of the threads that ended are kept
+        self.assertEqual(len(exporter._shards), 0)
+        self.assertEqual(exporter.generate_text(), text)
+
+        self.stats_control.remove_metrics_exporter(exporter)
+        self.assertEqual(self.stats_control.get_metrics_exporters(), [])
+        self.stats_control.observe(GetRequest().set_table_name('users'), 1,
+                                   1, 1)
+        self.assertEqual(exporter.generate_text(), text)
+
+    def testPrometheusLabels(self):
+        exporter = PrometheusExporter(prefix='app')
+        exporter.observe(GetRequest().set_table_name('a"b\\c'), None, 1, 1, 1)
+        text = exporter.generate_text()
+        self.assertIn('app_requests_total{request="Get",table="a\\"b\\\\c"} 1',
+                      text)
+        self.assertIn('app_retry_delay_seconds_total', text)
+
+    def testPrometheusHttpServer(self):
+        exporter = PrometheusExporter()
+        exporter.observe(GetRequest().set_table_name('users'), None, 1, 1, 1)
+        port = exporter.start_http_server(0)
+        try:
+            self.assertRaises(IllegalArgumentException,
+                              exporter.start_http_server, 0)
+            response = get('http://localhost:' + str(port) + '/metrics')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.text, exporter.generate_text())
+            response = get('http://localhost:' + str(port) + '/other')
+            self.assertEqual(response.status_code, 404)
+        finally:
+            exporter.close()
+
+    def testIllegalPrometheusExporter(self):
+        self.assertRaises(IllegalArgumentException, PrometheusExporter, 1)
+        self.assertRaises(IllegalArgumentException, PrometheusExporter,
+                          'nosql', 0.1)
+        self.assertRaises(IllegalArgumentException, PrometheusExporter,
+                          'nosql', [0.1, -1])
+
+    @unittest.skipUnless(CounterMetricFamily is None,
+                         'prometheus_client is installed')
+    def testPrometheusCollectRequiresPackage(self):
+        self.assertRaises(ImportError, PrometheusExporter().collect)
+
+    def testOpenTelemetryExporter(self):
+        meter = FakeMeter()
+        exporter = OpenTelemetryExporter(meter)
+        self.stats_control.add_metrics_exporter(exporter)
+        request = GetRequest().set_table_name('users')
+        self.stats_control.observe(request, 10, 100, 5)
+        self.stats_control.observe_error(request)
+        attributes = {'nosql.request': 'Get', 'nosql.table': 'users'}
+        self.assertEqual(meter.instruments['nosql.client.requests'].values,
+                         [(1, attributes), (1, attributes)])
+        self.assertEqual(
+            meter.instruments['nosql.client.request.size'].values,
+            [(10, attributes)])
+        self.assertEqual(
+            meter.instruments['nosql.client.request.duration'].values,
+            [(0.005, attributes)])
+        error_attributes = dict(attributes)
+        error_attributes['error.type'] = 'Exception'
+        self.assertEqual(
+            meter.instruments['nosql.client.request.errors'].values,
+            [(1, error_attributes)])
+        self.assertEqual(meter.instruments['nosql.client.retries'].values, [])
+
+    @unittest.skipUnless(otel_metrics is None,
+                         'opentelemetry-api is installed')
+    def testOpenTelemetryRequiresPackage(self):
+        self.assertRaises(ImportError, OpenTelemetryExporter)
+
+    def testIllegalExporter(self):
+        self.assertRaises(IllegalArgumentException,
+                          self.stats_control.add_metrics_exporter, 'exporter')
+
+
+class FakeInstrument(object):
+
+    def __init__(self):
+        self.values = list()
+
+    def add(self, value, attributes=None):
+        self.values.append((value, attributes))
+
+    record = add
+
+
+class FakeMeter(object):
+    # Records the values of the instruments, in place of an OpenTelemetry
+    # meter.
+
+    def __init__(self):
+        self.instruments = dict()
+
+    def create_counter(self, name, unit='', description=''):
+        return self.instruments.setdefault(name, FakeInstrument())
+
+    create_histogram = create_counter
+
+
+if __name__ == '__main__':
+    unittest.main()
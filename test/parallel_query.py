@@ -0,0 +1,282 @@
+#
+# Copyright (c) 2018, 2026 Oracle and/or its affiliates. All rights reserved.
+#
+# Licensed under the Universal Permissive License v 1.0 as shown at
+#  https://oss.oracle.com/licenses/upl/
+#
+
+import unittest
+from datetime import datetime
+from decimal import Decimal
+from functools import partial
+from json import loads
+from threading import Lock
+
+from borneo import (
+    IllegalArgumentException, NoSQLException, NoSQLHandleConfig,
+    PreparedStatement, PrepareResult, QueryRequest)
+from borneo.common import ByteInputStream
+from borneo.kv import StoreAccessTokenProvider
+from borneo.nson import Proto
+from borneo.nson_protocol import (
+    CONTINUATION_KEY, HEADER, MAX_QUERY_PARALLELISM, NUM_QUERY_OPERATIONS,
+    OP_CODE, PAYLOAD, PREPARED_QUERY, QUERY_OPERATION, QUERY_OPERATION_NUM,
+    QUERY_RESULTS, TABLE_NAME)
+from borneo.scan import ProcessScanExecutor, _encode_rows
+from borneo.serdeutil import SerdeUtil
+from testutils import ProxyServer
+
+
+def create_config():
+    return NoSQLHandleConfig('http://localhost:8080')
+
+
+def create_proxy_config(endpoint):
+    # The config factory of the scans of a ScanServer.
+    return NoSQLHandleConfig(endpoint).set_authorization_provider(
+        StoreAccessTokenProvider())
+
+
+class FakeQueryResult(object):
+
+    def __init__(self, results):
+        self._results = results
+
+    def get_results(self):
+        return self._results
+
+    def get_read_kb(self):
+        return 1
+
+    def get_read_units(self):
+        return 2
+
+    def get_write_kb(self):
+        return 0
+
+    def get_write_units(self):
+        return 0
+
+
+class FakeHandle(object):
+    # Returns the rows id % num_operations == operation_number - 1 of a table
+    # with num_rows rows, batch_size rows per query call.
+
+    def __init__(self, num_rows, max_parallelism, fail_operation=0):
+        self.num_rows = num_rows
+        self.max_parallelism = max_parallelism
+        self.fail_operation = fail_operation
+        self.operations = set()
+        self.batch_size = 7
+        self.lock = Lock()
+
+    def prepare(self, request):
+        statement = PreparedStatement(
+            request.get_statement(), None, None, bytearray(16), None, None,
+            None, None, None, 'foo', PreparedStatement.OPCODE_SELECT)
+        statement.set_maximum_parallelism(self.max_parallelism)
+        return PrepareResult().set_prepared_statement(statement)
+
+    def query(self, request):
+        request.validate()
+        num_ops = request.get_number_of_operations()
+        op_num = request.get_operation_number()
+        with self.lock:
+            self.operations.add((num_ops, op_num))
+        if op_num == self.fail_operation:
+            raise NoSQLException('Operation failed.')
+        cont_key = request.get_cont_key()
+        start = 0 if cont_key is None else cont_key[0]
+        ids = [i for i in range(self.num_rows) if i % num_ops == op_num - 1]
+        batch = ids[start:start + self.batch_size]
+        start += self.batch_size
+        request.set_cont_key(
+            bytearray([start]) if start < len(ids) else None)
+        return FakeQueryResult([{'id': i} for i in batch])
+
+
+class ScanServer(ProxyServer):
+    # Answers the prepare and query requests of a simple query of a table
+    # with num_rows rows, an operation returns the rows id % num_operations ==
+    # operation_number - 1, batch_size rows per query request. The queries of
+    # fail_operation fail.
+
+    def reset(self):
+        ProxyServer.reset(self)
+        self.num_rows = 100
+        self.max_parallelism = 4
+        self.batch_size = 3
+        self.fail_operation = 0
+        self.queries = list()
+
+    def next_error(self, content):
+        payload = ScanServer._decode(content)[PAYLOAD]
+        if payload.get(QUERY_OPERATION_NUM) == self.fail_operation != 0:
+            return (SerdeUtil.USER_ERROR.ILLEGAL_ARGUMENT, 'Scan failed.', 0)
+        return ProxyServer.next_error(self, content)
+
+    def write_result(self, ns, content):
+        request = ScanServer._decode(content)
+        payload = request[PAYLOAD]
+        if request[HEADER][OP_CODE] == SerdeUtil.OP_CODE.PREPARE:
+            Proto.write_bin_map_field(ns, PREPARED_QUERY, bytearray(16))
+            Proto.write_int_map_field(
+                ns, MAX_QUERY_PARALLELISM, self.max_parallelism)
+            Proto.write_string_map_field(ns, TABLE_NAME, 'foo')
+            Proto.write_int_map_field(
+                ns, QUERY_OPERATION, PreparedStatement.OPCODE_SELECT)
+            return
+        num_ops = payload[NUM_QUERY_OPERATIONS]
+        op_num = payload[QUERY_OPERATION_NUM]
+        cont_key = payload.get(CONTINUATION_KEY)
+        start = 0 if cont_key is None else int(cont_key.decode())
+        with self.lock:
+            self.queries.append((num_ops, op_num, start))
+        ids = [i for i in range(self.num_rows) if i % num_ops == op_num - 1]
+        ns.start_map_field(QUERY_RESULTS)
+        Proto.write_field_value(
+            ns, [{'id': i} for i in ids[start:start + self.batch_size]])
+        ns.end_map_field(QUERY_RESULTS)
+        start += self.batch_size
+        if start < len(ids):
+            Proto.write_bin_map_field(
+                ns, CONTINUATION_KEY, bytearray(str(start).encode()))
+
+    @staticmethod
+    def _decode(content):
+        bis = ByteInputStream(bytearray(content))
+        bis.read_short_int()  # serial version
+        return Proto.nson_to_value(bis)
+
+
+class TestParallelQuery(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.proxy = ScanServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.proxy.stop()
+
+    def setUp(self):
+        self.proxy.reset()
+        self.config_factory = partial(
+            create_proxy_config, self.proxy.get_endpoint())
+
+    def testQueryRequestSetNumberOfOperations(self):
+        request = QueryRequest().set_statement('SELECT * FROM foo')
+        self.assertRaises(IllegalArgumentException,
+                          request.set_number_of_operations, -1)
+        self.assertRaises(IllegalArgumentException,
+                          request.set_operation_number, 0)
+        request.set_number_of_operations(4).set_operation_number(2)
+        self.assertEqual(request.get_number_of_operations(), 4)
+        self.assertEqual(request.get_operation_number(), 2)
+        # not prepared
+        self.assertRaises(IllegalArgumentException, request.validate)
+        copy = request.copy()
+        self.assertEqual(copy.get_number_of_operations(), 4)
+        self.assertEqual(copy.get_operation_number(), 2)
+
+    def testParallelQuery(self):
+        from borneo.scan import ParallelQueryIterableResult
+        handle = FakeHandle(100, 3)
+        result = ParallelQueryIterableResult(
+            handle, QueryRequest().set_statement('SELECT * FROM foo'), 8)
+        self.assertEqual(result.get_number_of_operations(), 3)
+        ids = sorted(row['id'] for row in result)
+        self.assertEqual(ids, list(range(100)))
+        self.assertEqual(handle.operations, {(3, 1), (3, 2), (3, 3)})
+        self.assertGreater(result.get_read_units(), 0)
+        # each iterator runs the full query
+        self.assertEqual(len(list(result)), 100)
+
+    def testParallelQueryErrors(self):
+        from borneo.scan import ParallelQueryIterableResult
+        self.assertRaises(IllegalArgumentException,
+                          ParallelQueryIterableResult, FakeHandle(10, 0),
+                          QueryRequest().set_statement('SELECT * FROM foo'), 2)
+        self.assertRaises(IllegalArgumentException,
+                          ParallelQueryIterableResult, FakeHandle(10, 2),
+                          QueryRequest().set_statement('SELECT * FROM foo'), 0)
+        result = ParallelQueryIterableResult(
+            FakeHandle(1000, 4, fail_operation=2),
+            QueryRequest().set_statement('SELECT * FROM foo'), 4)
+        self.assertRaises(NoSQLException, list, result)
+
+    def testProcessScanExecutorIllegalArguments(self):
+        self.assertRaises(IllegalArgumentException, ProcessScanExecutor, None)
+        # a lambda can not be pickled
+        self.assertRaises(IllegalArgumentException, ProcessScanExecutor,
+                          lambda: create_config())
+        self.assertRaises(IllegalArgumentException, ProcessScanExecutor,
+                          create_config, 0)
+        with ProcessScanExecutor(create_config, 1) as executor:
+            self.assertRaises(IllegalArgumentException, executor.scan, None)
+            self.assertRaises(IllegalArgumentException, executor.scan,
+                              'SELECT * FROM foo', output_format='csv')
+
+    def testProcessScanExecutor(self):
+        with ProcessScanExecutor(self.config_factory, 2,
+                                 batches_per_step=2) as executor:
+            ids = list()
+            payloads = list(executor.scan('SELECT * FROM foo',
+                                          num_operations=3))
+            for payload in payloads:
+                ids.extend(loads(line)['id']
+                           for line in payload.decode('utf-8').splitlines())
+            self.assertEqual(sorted(ids), list(range(100)))
+            # the operations of 34, 33 and 33 rows take 12, 11 and 11 query
+            # batches, each run as 6 steps of up to 2 batches
+            self.assertEqual(len(payloads), 18)
+            self.assertEqual({query[:2] for query in self.proxy.queries},
+                             {(3, 1), (3, 2), (3, 3)})
+            self.assertEqual(len(self.proxy.queries), 34)
+            # NSON
+            rows = list()
+            for payload in executor.scan(
+                    'SELECT * FROM foo',
+                    output_format=ProcessScanExecutor.FORMAT_NSON):
+                rows.extend(ProcessScanExecutor.decode_nson(payload))
+            self.assertEqual(sorted(row['id'] for row in rows),
+                             list(range(100)))
+            # the number of operations is limited by the maximum parallelism
+            self.proxy.queries = list()
+            self.assertEqual(sum(executor.scan(
+                'SELECT * FROM foo', num_operations=8, transform=len)), 100)
+            self.assertEqual({query[0] for query in self.proxy.queries}, {4})
+
+    def testProcessScanExecutorErrors(self):
+        self.proxy.fail_operation = 2
+        with ProcessScanExecutor(self.config_factory, 2) as executor:
+            self.assertRaisesRegex(IllegalArgumentException, 'Scan failed',
+                                   list, executor.scan('SELECT * FROM foo'))
+        self.proxy.reset()
+        self.proxy.max_parallelism = 0
+        with ProcessScanExecutor(self.config_factory, 1) as executor:
+            self.assertRaises(IllegalArgumentException, executor.scan,
+                              'SELECT * FROM foo')
+
+    def testProcessScanEncodeRows(self):
+        rows = [{'id': i, 'name': 'name' + str(i), 'price': Decimal('1.5'),
+                 'time': datetime(2020, 1, 2, 3, 4, 5),
+                 'data': bytearray(b'ab'), 'tags': [1, {'a': None}]}
+                for i in range(3)]
+        payload = _encode_rows(rows, ProcessScanExecutor.FORMAT_JSON)
+        lines = payload.decode('utf-8').splitlines()
+        self.assertEqual(len(lines), 3)
+        row = loads(lines[1])
+        self.assertEqual(row['id'], 1)
+        self.assertEqual(row['data'], 'YWI=')
+        self.assertEqual(row['tags'], [1, {'a': None}])
+        payload = _encode_rows(rows, ProcessScanExecutor.FORMAT_NSON)
+        decoded = ProcessScanExecutor.decode_nson(payload)
+        self.assertEqual(len(decoded), 3)
+        self.assertEqual(decoded[2]['name'], 'name2')
+        self.assertEqual(decoded[2]['price'], Decimal('1.5'))
+        self.assertEqual(decoded[2]['data'], bytearray(b'ab'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+#
+# Copyright (c) 2018, 2026 Oracle and/or its affiliates. All rights reserved.
+#
+# Licensed under the Universal Permissive License v 1.0 as shown at
+#  https://oss.oracle.com/licenses/upl/
+#
+
+import unittest
+from random import Random
+
+from borneo import StatsProfile
+from borneo.stats import Percentile, ReqStats
+
+
+class TestPercentile(unittest.TestCase):
+
+    percentiles = [0, 0.1, 0.5, 0.9, 0.95, 0.99, 0.999, 1]
+
+    def setUp(self):
+        self.random = Random(35)
+
+    def testEmpty(self):
+        percentile = Percentile()
+        self.assertEqual(percentile.get_percentile(self.percentiles),
+                         [-1] * len(self.percentiles))
+        self.assertEqual(percentile.get_95th99th_percentile(), (-1, -1))
+
+    def testRelativeError(self):
+        for values in [
+                [self.random.lognormvariate(1.5, 1) for _ in range(20000)],
+                [round(self.random.expovariate(0.1), 3) for _ in range(5000)],
+                [self.random.randint(1, 100) for _ in range(1000)],
+                [0.001 * i for i in range(1, 3001)], [7.5]]:
+            percentile = Percentile()
+            for v in values:
+                percentile.add_value(v)
+            self.assertEqual(percentile.get_count(), len(values))
+            expected = self._exact_percentile(values, self.percentiles)
+            result = percentile.get_percentile(self.percentiles)
+            self.assertEqual(result[0], min(values))
+            self.assertEqual(result[-1], max(values))
+            for e, r in zip(expected, result):
+                self.assertLessEqual(abs(r - e), e * 0.008 + 0.0005,
+                                     (e, r))
+
+    def testOutOfRange(self):
+        percentile = Percentile()
+        for v in [0, -1, 0.0000001, 10 ** 12]:
+            percentile.add_value(v)
+        self.assertEqual(percentile.get_percentile([0, 0.5, 0.75, 1]),
+                         [-1, 0.001, 0.001, 10 ** 12])
+        self.assertEqual(len(percentile._counts), 2)
+
+    def testBoundedMemory(self):
+        percentile = Percentile()
+        for _ in range(100000):
+            percentile.add_value(self.random.uniform(0, 10000))
+        self.assertLessEqual(len(percentile._counts),
+                             Percentile._BUCKET_COUNT)
+        self.assertLess(len(percentile._counts), 1000)
+
+    def testMerge(self):
+        values = [self.random.lognormvariate(2, 1) for _ in range(10000)]
+        total = Percentile()
+        parts = [Percentile() for _ in range(4)]
+        for i, v in enumerate(values):
+            total.add_value(v)
+            parts[i % 4].add_value(v)
+        merged = Percentile()
+        merged.merge(Percentile())
+        for part in parts:
+            merged.merge(part)
+        self.assertEqual(merged.get_count(), total.get_count())
+        self.assertEqual(merged.get_percentile(self.percentiles),
+                         total.get_percentile(self.percentiles))
+        merged.clear()
+        self.assertEqual(merged.get_count(), 0)
+        self.assertEqual(merged.get_percentile([0.5]), [-1])
+
+    def testReqStats(self):
+        stats = ReqStats(StatsProfile.MORE)
+        for v in range(1, 1001):
+            stats.observe(False, 0, 0, 0, 0, 0, 10, 10, v)
+        value = dict()
+        stats.to_map_value(value)
+        latency = value['httpRequestLatencyMs']
+        for name, exact in [('50th', 500), ('90th', 900), ('95th', 950),
+                            ('99th', 990), ('99.9th', 999)]:
+            self.assertAlmostEqual(latency[name], exact, delta=exact * 0.008)
+        stats = ReqStats(StatsProfile.REGULAR)
+        stats.observe(False, 0, 0, 0, 0, 0, 10, 10, 5)
+        value = dict()
+        stats.to_map_value(value)
+        self.assertNotIn('95th', value['httpRequestLatencyMs'])
+
+    @staticmethod
+    def _exact_percentile(values, percentiles):
+        # The list based implementation replaced by the histogram.
+        values = sorted(values)
+        size = len(values)
+        return [values[0] if round(v * size) <= 0 else
+                values[size - 1] if round(v * size) >= size
+                else values[round(v * size) - 1]
+                for v in percentiles]
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+#
+# Copyright (c) 2018, 2026 Oracle and/or its affiliates. All rights reserved.
+#
+# Licensed under the Universal Permissive License v 1.0 as shown at
+#  https://oss.oracle.com/licenses/upl/
+#
+
+import unittest
+from threading import Thread
+from time import time
+
+from borneo import (
+    GetRequest, IllegalArgumentException, NoSQLHandleConfig, Priority,
+    QueryRequest)
+from borneo.http import FairRateLimiter, RateLimiterMap
+
+
+class TestFairRateLimiter(unittest.TestCase):
+
+    def testSingleClass(self):
+        # a limiter used by a single class behaves as a SimpleRateLimiter
+        limiter = FairRateLimiter(10)
+        self.assertEqual(limiter.get_limit_per_second(), 10)
+        self.assertTrue(limiter.try_consume_units(10))
+        self.assertFalse(limiter.try_consume_units(1))
+        limiter.reset()
+        self.assertTrue(limiter.get_lane(Priority.INTERACTIVE).
+                        try_consume_units(1))
+
+    def testShares(self):
+        limiter = FairRateLimiter(100)
+        interactive = limiter.get_lane(Priority.INTERACTIVE)
+        batch = limiter.get_lane(Priority.BATCH)
+        self.assertIs(limiter.get_lane(Priority.BATCH), batch)
+        self.assertAlmostEqual(interactive.get_limit_per_second(), 80, 0)
+        self.assertAlmostEqual(batch.get_limit_per_second(), 20, 0)
+        limiter.set_limit_per_second(50)
+        self.assertAlmostEqual(interactive.get_limit_per_second(), 40, 0)
+        self.assertAlmostEqual(batch.get_limit_per_second(), 10, 0)
+        limiter = FairRateLimiter(
+            100, 1, {Priority.INTERACTIVE: 1, Priority.BATCH: 1})
+        self.assertAlmostEqual(
+            limiter.get_lane(Priority.BATCH).get_limit_per_second(), 50, 0)
+
+    def testBorrowing(self):
+        limiter = FairRateLimiter(100, 1)
+        batch = limiter.get_lane(Priority.BATCH)
+        interactive = limiter.get_lane(Priority.INTERACTIVE)
+        # the interactive lane did not use its units for a second
+        interactive.set_current_rate(0.0)
+        batch.consume_units_unconditionally(40)
+        # the batch lane is over its share, it uses the units of the
+        # interactive lane
+        self.assertTrue(batch.try_consume_units(50))
+        stats = limiter.get_stats()
+        self.assertEqual(stats['batch']['units'], 90)
+        self.assertEqual(stats['batch']['borrowedUnits'], 50)
+        # the lender is not put over its share
+        self.assertTrue(interactive.try_consume_units(20))
+        self.assertFalse(batch.try_consume_units(20))
+        self.assertEqual(limiter.get_stats()['batch']['units'], 0)
+
+    def testFairShares(self):
+        limiter = FairRateLimiter(100, 0.1)
+        seconds = 1.0
+        consumed = dict()
+
+        def consume(priority):
+            lane = limiter.get_lane(priority)
+            count = 0
+            start = time()
+            while time() - start < seconds:
+                lane.consume_units(1)
+                count += 1
+            consumed[priority] = count
+
+        threads = [Thread(target=consume, args=(priority,)) for priority in
+                   (Priority.INTERACTIVE, Priority.BATCH)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        # the batch requests get their share, and no more
+        self.assertGreater(consumed[Priority.BATCH], 10)
+        self.assertLess(consumed[Priority.BATCH], 35)
+        self.assertGreater(consumed[Priority.INTERACTIVE], 60)
+        self.assertLess(consumed[Priority.INTERACTIVE] +
+                        consumed[Priority.BATCH], 120)
+        stats = limiter.get_stats()
+        self.assertGreater(stats['batch']['delayCount'], 0)
+        self.assertGreater(stats['batch']['delayMaxMs'], 0)
+
+    def testRateLimiterMap(self):
+        limiter_map = RateLimiterMap(
+            weights={Priority.INTERACTIVE: 3, Priority.BATCH: 1})
+        limiter_map.update('Users', 100, 200, 1)
+        read_limiter = limiter_map.get_read_limiter('users')
+        self.assertIsInstance(read_limiter, FairRateLimiter)
+        batch = read_limiter.get_lane(Priority.BATCH)
+        self.assertAlmostEqual(batch.get_limit_per_second(), 25, 0)
+        # a limit update keeps the shares
+        limiter_map.update('Users', 40, 200, 1)
+        self.assertAlmostEqual(batch.get_limit_per_second(), 10, 0)
+        stats = limiter_map.get_stats()
+        self.assertEqual([(s['table'], s['direction']) for s in stats],
+                         [('users', 'read'), ('users', 'write')])
+        self.assertEqual(set(stats[0]['priorities']),
+                         {'interactive', 'batch'})
+        self.assertEqual(list(stats[1]['priorities']), ['interactive'])
+
+
+class TestRequestPriority(unittest.TestCase):
+
+    def testRequestPriority(self):
+        request = GetRequest()
+        self.assertEqual(request.get_priority(), Priority.INTERACTIVE)
+        self.assertEqual(request.set_priority(Priority.BATCH), request)
+        self.assertEqual(request.get_priority(), Priority.BATCH)
+        self.assertRaises(IllegalArgumentException, request.set_priority, 2)
+        query = QueryRequest().set_statement('SELECT * FROM users')
+        query.set_priority(Priority.BATCH)
+        self.assertEqual(query.copy().get_priority(), Priority.BATCH)
+
+    def testConfigWeights(self):
+        config = NoSQLHandleConfig('http://localhost:8080')
+        self.assertEqual(config.get_priority_weight(Priority.INTERACTIVE), 4)
+        self.assertEqual(config.get_priority_weight(Priority.BATCH), 1)
+        config.set_priority_weight(Priority.BATCH, 2)
+        self.assertEqual(config.get_priority_weight(Priority.BATCH), 2)
+        self.assertRaises(IllegalArgumentException,
+                          config.set_priority_weight, Priority.BATCH, 0)
+        self.assertRaises(IllegalArgumentException,
+                          config.set_priority_weight, 5, 1)
+        self.assertRaises(IllegalArgumentException,
+                          config.get_priority_weight, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+#
+# Copyright (c) 2018, 2026 Oracle and/or its affiliates. All rights reserved.
+#
+# Licensed under the Universal Permissive License v 1.0 as shown at
+#  https://oss.oracle.com/licenses/upl/
+#
+
+import unittest
+from time import perf_counter
+
+from requests import Timeout
+
+from borneo import IllegalArgumentException, Priority
+from borneo.http import FairRateLimiter, SimpleRateLimiter
+
+
+class TestRateLimiterAsync(unittest.TestCase):
+
+    def testReserveUnits(self):
+        limiter = SimpleRateLimiter(10)
+        limiter.set_current_rate(150.0)
+        start = perf_counter()
+        # the units are consumed and the time to wait is returned at once
+        ms_to_wait = limiter.reserve_units(5)
+        self.assertGreater(ms_to_wait, 0)
+        self.assertLess(perf_counter() - start, 0.1)
+        # the next consumes are queued behind the reserved units
+        self.assertGreater(limiter.reserve_units(1), ms_to_wait)
+        self.assertRaises(IllegalArgumentException, limiter.reserve_units, 1,
+                          -1)
+
+    def testReserveTimeout(self):
+        limiter = SimpleRateLimiter(10)
+        limiter.set_current_rate(200.0)
+        start = perf_counter()
+        self.assertRaises(Timeout, limiter.reserve_units, 1, 100)
+        self.assertLess(perf_counter() - start, 0.1)
+        # the units were not consumed
+        self.assertAlmostEqual(limiter.get_current_rate(), 200.0, 0)
+        self.assertRaises(Timeout, limiter.reserve_units, 10, 100, True)
+        self.assertAlmostEqual(limiter.get_current_rate(), 300.0, 0)
+
+    def testConsumeUnitsAsync(self):
+        limiter = SimpleRateLimiter(10)
+        self.assertEqual(limiter.consume_units_async(1).result(0), 0)
+        limiter.set_current_rate(150.0)
+        start = perf_counter()
+        future = limiter.consume_units_async(2)
+        self.assertLess(perf_counter() - start, 0.1)
+        self.assertFalse(future.done())
+        ms_waited = future.result(5)
+        self.assertGreater(ms_waited, 0)
+        self.assertGreaterEqual(perf_counter() - start,
+                                ms_waited / 1000 - 0.01)
+        # a timeout completes the future with the exception once it expires
+        limiter.set_current_rate(200.0)
+        start = perf_counter()
+        future = limiter.consume_units_async(1, 50)
+        self.assertRaises(Timeout, future.result, 5)
+        self.assertGreaterEqual(perf_counter() - start, 0.04)
+
+    def testFairRateLimiter(self):
+        limiter = FairRateLimiter(10)
+        lane = limiter.get_lane(Priority.INTERACTIVE)
+        lane.set_current_rate(150.0)
+        self.assertGreater(limiter.reserve_units(1), 0)
+        future = limiter.consume_units_async(1)
+        self.assertGreater(future.result(5), 0)
+        stats = limiter.get_stats()['interactive']
+        self.assertEqual(stats['units'], 2)
+        self.assertEqual(stats['delayCount'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
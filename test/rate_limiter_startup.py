@@ -0,0 +1,100 @@
+#
+# Copyright (c) 2018, 2026 Oracle and/or its affiliates. All rights reserved.
+#
+# Licensed under the Universal Permissive License v 1.0 as shown at
+#  https://oss.oracle.com/licenses/upl/
+#
+
+import unittest
+from time import sleep, time
+
+from borneo import (
+    GetRequest, IllegalArgumentException, NoSQLHandle, NoSQLHandleConfig)
+from borneo.client import Client
+from testutils import InsecureAuthorizationProvider, ProxyServer
+
+
+class TestRateLimiterStartup(unittest.TestCase):
+
+    # The delay of the answers of the proxy.
+    DELAY = 0.3
+
+    @classmethod
+    def setUpClass(cls):
+        cls.proxy = ProxyServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.proxy.stop()
+
+    def setUp(self):
+        self.proxy.reset()
+        self.proxy.delay = self.DELAY
+        self.proxy.tables = {'users': 100, 'orders': 200, 'items': 300,
+                             'events': 400}
+        self.config = NoSQLHandleConfig(self.proxy.get_endpoint())
+        self.config.set_authorization_provider(
+            InsecureAuthorizationProvider('TestTenant'))
+        self.config.set_rate_limiting_enabled(True)
+
+    def testStartup(self):
+        tables = ['users', 'orders', 'items', 'events']
+        start = time()
+        handle = NoSQLHandle(self.config.set_rate_limiting_tables(tables))
+        try:
+            # the limits are fetched in parallel
+            self.assertLess(time() - start, 2 * self.DELAY)
+            limiter_map = handle.get_client()._rate_limiter_map
+            for table_name in tables:
+                self.assertEqual(limiter_map.get_read_limiter(
+                    table_name).get_limit_per_second(),
+                    self.proxy.tables[table_name])
+        finally:
+            handle.close()
+
+    def testBackgroundUpdate(self):
+        handle = NoSQLHandle(self.config)
+        try:
+            limiter_map = handle.get_client()._rate_limiter_map
+            handle.get(GetRequest().set_table_name('users').set_key({'id': 1}))
+            # the limits of the table are fetched in the background
+            for i in range(50):
+                if limiter_map.limiters_exist('users'):
+                    break
+                sleep(0.05)
+            self.assertEqual(
+                limiter_map.get_write_limiter('users').get_limit_per_second(),
+                self.proxy.tables['users'])
+        finally:
+            handle.close()
+
+    def testRefresh(self):
+        refresh_nanos = Client.LIMITER_REFRESH_NANOS
+        Client.LIMITER_REFRESH_NANOS = 200000000
+        try:
+            handle = NoSQLHandle(self.config.set_rate_limiting_tables(
+                ['users']))
+        finally:
+            Client.LIMITER_REFRESH_NANOS = refresh_nanos
+        try:
+            limiter = handle.get_client()._rate_limiter_map.get_read_limiter(
+                'users')
+            self.assertEqual(limiter.get_limit_per_second(), 100)
+            self.proxy.tables['users'] = 150
+            sleep(0.2 + 3 * self.DELAY)
+            self.assertEqual(limiter.get_limit_per_second(), 150)
+        finally:
+            handle.close()
+
+    def testConfig(self):
+        self.assertEqual(self.config.get_rate_limiting_tables(), [])
+        self.config.set_rate_limiting_tables(['users'])
+        self.assertEqual(self.config.get_rate_limiting_tables(), ['users'])
+        self.assertRaises(IllegalArgumentException,
+                          self.config.set_rate_limiting_tables, 'users')
+        self.assertRaises(IllegalArgumentException,
+                          self.config.set_rate_limiting_tables, ['users', 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
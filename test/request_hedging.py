@@ -0,0 +1,222 @@
+#
+# Copyright (c) 2018, 2026 Oracle and/or its affiliates. All rights reserved.
+#
+# Licensed under the Universal Permissive License v 1.0 as shown at
+#  https://oss.oracle.com/licenses/upl/
+#
+
+import unittest
+from threading import Lock
+from time import sleep, time
+
+from borneo import (
+    GetRequest, GetResult, IllegalArgumentException, NoSQLHandle,
+    NoSQLHandleConfig, Priority, PutRequest, TableNotFoundException)
+from borneo.hedging import Hedger
+from borneo.serdeutil import SerdeUtil
+from testutils import InsecureAuthorizationProvider, ProxyServer
+
+
+class SlowExecute(object):
+    # Executes the requests, the first ones in the given number of seconds, or
+    # fails them after the seconds if a delay is a (seconds, error) tuple, and
+    # the others immediately. The result of a request has its number as read
+    # units.
+
+    def __init__(self, delays):
+        self.delays = list(delays)
+        self.count = 0
+        self.requests = list()
+        self.lock = Lock()
+
+    def __call__(self, request):
+        with self.lock:
+            self.count += 1
+            count = self.count
+            self.requests.append(request)
+            delay = self.delays.pop(0) if self.delays else 0
+        error = None
+        if isinstance(delay, tuple):
+            delay, error = delay
+        sleep(delay)
+        if error is not None:
+            raise error
+        return GetResult().set_read_units(count)
+
+
+class TestHedger(unittest.TestCase):
+
+    def testHedge(self):
+        execute = SlowExecute([1.0])
+        hedger = Hedger(execute, 20, 5, False)
+        start = time()
+        request = GetRequest().set_table_name('users')
+        result = hedger.execute(request)
+        self.assertLess(time() - start, 0.5)
+        # the result of the hedge is used, the first request is still in
+        # flight
+        self.assertEqual(result.get_read_units(), 2)
+        self.assertTrue(request.is_hedge_loser())
+        self.assertFalse(execute.requests[1].is_hedge_loser())
+        # a request that completes before the delay is not hedged
+        hedger.execute(GetRequest().set_table_name('users'))
+        self.assertEqual(execute.count, 3)
+        stats = hedger.get_stats()
+        self.assertEqual(stats['requestCount'], 2)
+        self.assertEqual(stats['hedgeCount'], 1)
+        self.assertEqual(stats['winCount'], 1)
+        self.assertEqual(stats['winRate'], 1)
+        # only the get requests are hedged
+        execute.delays = [0.1]
+        hedger.execute(PutRequest().set_table_name('users'))
+        self.assertEqual(execute.count, 4)
+        self.assertEqual(hedger.get_stats()['requestCount'], 0)
+
+    def testFirstRequestWins(self):
+        # the first request completes after the delay, before its hedge
+        execute = SlowExecute([0.1, 0.5])
+        hedger = Hedger(execute, 20, 5, False)
+        start = time()
+        request = GetRequest().set_table_name('users')
+        result = hedger.execute(request)
+        self.assertLess(time() - start, 0.4)
+        self.assertEqual(result.get_read_units(), 1)
+        self.assertFalse(request.is_hedge_loser())
+        self.assertTrue(execute.requests[1].is_hedge_loser())
+        stats = hedger.get_stats()
+        self.assertEqual(stats['hedgeCount'], 1)
+        self.assertEqual(stats['winCount'], 0)
+        self.assertEqual(stats['winRate'], 0)
+
+    def testErrors(self):
+        # the error of a request that fails before the delay is raised
+        execute = SlowExecute([(0, TableNotFoundException('first'))])
+        hedger = Hedger(execute, 20, 5, False)
+        self.assertRaises(TableNotFoundException, hedger.execute,
+                          GetRequest().set_table_name('users'))
+        self.assertEqual(execute.count, 1)
+        # the result of the hedge is used if the first request fails after
+        # the delay
+        execute.delays = [(0.1, TableNotFoundException('first')), 0.2]
+        result = hedger.execute(GetRequest().set_table_name('users'))
+        self.assertEqual(result.get_read_units(), 3)
+        # the error of the request that failed first is raised if both fail
+        execute.delays = [(0.1, TableNotFoundException('first')),
+                          (0.2, TableNotFoundException('second'))]
+        self.assertRaisesRegex(TableNotFoundException, 'first',
+                               hedger.execute,
+                               GetRequest().set_table_name('users'))
+        self.assertEqual(execute.count, 5)
+        stats = hedger.get_stats()
+        self.assertEqual(stats['hedgeCount'], 2)
+        self.assertEqual(stats['winCount'], 1)
+
+    def testBudget(self):
+        execute = SlowExecute([])
+        hedger = Hedger(execute, 1, 10, False)
+        hedges = int(Hedger.BUDGET_CAPACITY) + 10
+        execute.delays = [0.02] * (2 * hedges)
+        for i in range(hedges):
+            hedger.execute(GetRequest().set_table_name('users'))
+        stats = hedger.get_stats()
+        # the initial budget and the share of the requests
+        self.assertEqual(stats['hedgeCount'], int(Hedger.BUDGET_CAPACITY) + 1)
+        self.assertEqual(stats['deniedCount'], 9)
+        # the token of a request that completes in time is returned
+        execute.delays = []
+        for i in range(hedges):
+            hedger.execute(GetRequest().set_table_name('users'))
+        self.assertGreaterEqual(hedger._tokens, 1.0)
+
+    def testAdaptiveDelay(self):
+        execute = SlowExecute([])
+        hedger = Hedger(execute, 1000, 5, True)
+        for i in range(Hedger.ADAPTIVE_SAMPLES):
+            hedger._observe(10 if i % 20 else 100, False)
+        self.assertAlmostEqual(hedger.get_delay_ms(), 10, 0)
+
+
+class TestRequestHedging(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.proxy = ProxyServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.proxy.stop()
+
+    def setUp(self):
+        self.proxy.reset()
+        self.proxy.tables = {'users': 1000}
+        self.proxy.read_units = 5
+        self.config = NoSQLHandleConfig(self.proxy.get_endpoint())
+        self.config.set_authorization_provider(
+            InsecureAuthorizationProvider('TestTenant'))
+        self.request = GetRequest().set_table_name('users').set_key({'id': 1})
+
+    def testHedging(self):
+        handle = NoSQLHandle(self.config.set_hedging(50))
+        try:
+            self.proxy.delays = [1]
+            start = time()
+            result = handle.get(self.request)
+            self.assertLess(time() - start, 0.5)
+            # the units of the response used
+            self.assertEqual(result.get_read_units(), 5)
+            stats = handle.get_client().get_stats_control().get_stats_sources()
+            stats = stats['hedging']()
+            self.assertEqual(stats['hedgeCount'], 1)
+            self.assertEqual(stats['winCount'], 1)
+        finally:
+            handle.close()
+
+    def testLoserUnits(self):
+        self.config.set_rate_limiting_enabled(True)
+        self.config.set_rate_limiting_tables(['users'])
+        handle = NoSQLHandle(self.config.set_hedging(50))
+        try:
+            lane = handle.get_client()._rate_limiter_map.get_read_limiter(
+                'users').get_lane(Priority.INTERACTIVE)
+            handle.get(self.request)
+            self.assertEqual(lane._units, 5)
+            # the units of the request that lost are consumed once it
+            # completes
+            self.proxy.delays = [0.3]
+            handle.get(self.request)
+            sleep(0.5)
+            self.assertEqual(lane._units, 15)
+            # the estimated units of the request that lost are kept if it
+            # fails
+            self.proxy.delays = [0.3]
+            self.proxy.errors = [
+                (SerdeUtil.USER_ERROR.TABLE_NOT_FOUND, 'users', 0)]
+            handle.get(self.request)
+            sleep(0.5)
+            self.assertEqual(lane._units, 25)
+        finally:
+            handle.close()
+
+    def testConfig(self):
+        self.assertEqual(self.config.get_hedging_delay(), 0)
+        self.config.set_hedging(10, 2.5, True)
+        self.assertEqual(self.config.get_hedging_delay(), 10)
+        self.assertEqual(self.config.get_hedging_budget_percent(), 2.5)
+        self.assertTrue(self.config.get_hedging_adaptive())
+        self.assertRaises(IllegalArgumentException,
+                          self.config.set_hedging, -1)
+        self.assertRaises(IllegalArgumentException, self.config.set_hedging,
+                          10, 0)
+        self.assertRaises(IllegalArgumentException, self.config.set_hedging,
+                          10, 5, 1)
+        handle = NoSQLHandle(self.config.set_hedging(0))
+        try:
+            self.assertNotIn(
+                'hedging',
+                handle.get_client().get_stats_control().get_stats_sources())
+        finally:
+            handle.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+#
+# Copyright (c) 2018, 2026 Oracle and/or its affiliates. All rights reserved.
+#
+# Licensed under the Universal Permissive License v 1.0 as shown at
+#  https://oss.oracle.com/licenses/upl/
+#
+
+import unittest
+
+from borneo import (
+    GetRequest, NoSQLHandle, NoSQLHandleConfig, RequestTimings, StatsProfile)
+from borneo.kv import StoreAccessTokenProvider
+from testutils import ProxyServer
+
+
+class TestRequestTimings(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.proxy = ProxyServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.proxy.stop()
+
+    def setUp(self):
+        self.stats = list()
+        self.handle = None
+
+    def tearDown(self):
+        if self.handle is not None:
+            self.handle.close()
+
+    def testRequestTimings(self):
+        handle = self._create_handle(StatsProfile.REGULAR)
+        result = handle.get(self._get_request())
+        timings = result.get_request_timings()
+        self.assertIsInstance(timings, RequestTimings)
+        phases = [timings.get_serialization_ms(), timings.get_signing_ms(),
+                  timings.get_rate_limit_ms(), timings.get_network_ms(),
+                  timings.get_deserialization_ms()]
+        for phase in phases:
+            self.assertGreaterEqual(phase, 0)
+        self.assertGreater(timings.get_serialization_ms(), 0)
+        self.assertGreater(timings.get_network_ms(), 0)
+        # the network time is the time of the http request, not a timestamp
+        self.assertLess(timings.get_network_ms(), 10000)
+        self.assertGreaterEqual(timings.get_total_ms() + 0.01, sum(phases))
+        self.assertIn('network_ms=', str(timings))
+
+        handle.get(self._get_request())
+        handle.get_client().get_stats_control()._stats.log_client_stats()
+        request = [r for r in self.stats[-1]['requests']
+                   if r['name'] == 'Get'][0]
+        self.assertEqual(request['httpRequestCount'], 2)
+        self.assertLess(request['httpRequestLatencyMs']['max'], 10000)
+        phases = request['phaseLatencyMs']
+        self.assertEqual(set(phases), {'serialization', 'signing',
+                                       'rateLimit', 'network',
+                                       'deserialization'})
+        for phase in phases.values():
+            self.assertGreaterEqual(phase['max'], phase['avg'])
+        self.assertGreater(phases['network']['avg'], 0)
+
+    def testStatsDisabled(self):
+        handle = self._create_handle(StatsProfile.NONE)
+        result = handle.get(self._get_request())
+        self.assertIsNone(result.get_request_timings())
+
+    def _create_handle(self, profile):
+        config = NoSQLHandleConfig(self.proxy.get_endpoint())
+        config.set_authorization_provider(
+            StoreAccessTokenProvider()).set_stats_profile(
+            profile).set_stats_handler(self.stats.append)
+        self.handle = NoSQLHandle(config)
+        return self.handle
+
+    @staticmethod
+    def _get_request():
+        return GetRequest().set_table_name('users').set_key({'id': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+#
+# Copyright (c) 2018, 2026 Oracle and/or its affiliates. All rights reserved.
+#
+# Licensed under the Universal Permissive License v 1.0 as shown at
+#  https://oss.oracle.com/licenses/upl/
+#
+
+import unittest
+from threading import Event, current_thread
+
+from borneo import IllegalArgumentException
+from borneo.scheduler import Scheduler, get_scheduler
+
+
+class TestScheduler(unittest.TestCase):
+
+    def testScheduleOrder(self):
+        scheduler = Scheduler('test-scheduler')
+        done = Event()
+        runs = list()
+        threads = set()
+
+        def task(value):
+            runs.append(value)
+            threads.add(current_thread().name)
+            if len(runs) == 4:
+                done.set()
+
+        scheduler.schedule(0.2, task, 3)
+        scheduler.schedule(0.05, task, 1)
+        scheduler.schedule(0.1, task, 2)
+        scheduler.schedule(0.3, task, value=4)
+        self.assertTrue(done.wait(5))
+        self.assertEqual(runs, [1, 2, 3, 4])
+        self.assertEqual(threads, {'test-scheduler'})
+        stats = scheduler.get_stats()
+        self.assertEqual(stats['threadCount'], 1)
+        self.assertEqual(stats['taskCount'], 4)
+        self.assertEqual(stats['pendingTasks'], 0)
+        self.assertGreaterEqual(stats['lagMaxMs'], stats['lagAvgMs'])
+
+    def testCancel(self):
+        scheduler = Scheduler()
+        done = Event()
+        runs = list()
+        task = scheduler.schedule(0.05, runs.append, 1)
+        scheduler.schedule(0.1, runs.append, 2)
+        scheduler.schedule(0.2, done.set)
+        self.assertEqual(scheduler.get_stats()['pendingTasks'], 3)
+        task.cancel()
+        self.assertTrue(task.is_cancelled())
+        self.assertEqual(scheduler.get_stats()['pendingTasks'], 2)
+        self.assertTrue(done.wait(5))
+        self.assertEqual(runs, [2])
+
+    def testFailedTask(self):
+        scheduler = Scheduler()
+        done = Event()
+
+        def fail():
+            raise RuntimeError('failed')
+
+        scheduler.schedule(0, fail)
+        scheduler.schedule(0.01, done.set)
+        # The scheduler thread keeps running after a task failure.
+        self.assertTrue(done.wait(5))
+
+    def testBlockingTask(self):
+        scheduler = Scheduler('test-scheduler')
+        release = Event()
+        done = Event()
+        threads = list()
+
+        def blocking():
+            threads.append(current_thread().name)
+            release.wait(5)
+
+        scheduler.schedule_blocking(0, blocking)
+        scheduler.schedule(0.05, done.set)
+        # The blocking task does not delay the tasks due after it.
+        self.assertTrue(done.wait(1))
+        release.set()
+        self.assertEqual(len(threads), 1)
+        self.assertTrue(threads[0].startswith('test-scheduler-worker'))
+        self.assertEqual(scheduler.get_stats()['taskCount'], 2)
+
+    def testIllegalDelay(self):
+        self.assertRaises(IllegalArgumentException, get_scheduler().schedule,
+                          -1, print)
+        self.assertRaises(IllegalArgumentException,
+                          get_scheduler().schedule_blocking, -1, print)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+#
+# Copyright (c) 2018, 2026 Oracle and/or its affiliates. All rights reserved.
+#
+# Licensed under the Universal Permissive License v 1.0 as shown at
+#  https://oss.oracle.com/licenses/upl/
+#
+
+import os
+import unittest
+from shutil import rmtree
+from tempfile import mkdtemp
+from time import time
+
+from borneo import IllegalArgumentException, NoSQLHandleConfig
+from borneo.http import (
+    FairRateLimiter, RateLimiterMap, SharedRateLimiter, fcntl)
+from borneo.kv import StoreAccessTokenProvider
+
+
+@unittest.skipIf(fcntl is None, 'fcntl is not available')
+class TestSharedRateLimiter(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = mkdtemp()
+        self.file_name = os.path.join(self.directory, 'users.read')
+
+    def tearDown(self):
+        rmtree(self.directory)
+
+    def testSharedBudget(self):
+        limiter = SharedRateLimiter(self.file_name, 10)
+        other = SharedRateLimiter(self.file_name, 10)
+        # a second of units consumed by one limiter is seen by the other
+        self.assertTrue(limiter.try_consume_units(10))
+        self.assertFalse(other.try_consume_units(1))
+        self.assertFalse(limiter.try_consume_units(1))
+        # a new limiter does not reset the shared state
+        limiter = SharedRateLimiter(self.file_name, 10)
+        self.assertFalse(limiter.try_consume_units(1))
+        other.reset()
+        self.assertTrue(limiter.try_consume_units(1))
+
+    def testRateLimiterMap(self):
+        limiter_map = RateLimiterMap(self.directory)
+        limiter_map.update('ns:Users', 100, 200, 1)
+        read_limiter = limiter_map.get_read_limiter('ns:users')
+        self.assertIsInstance(read_limiter, SharedRateLimiter)
+        self.assertEqual(read_limiter.get_limit_per_second(), 100)
+        self.assertEqual(
+            limiter_map.get_write_limiter('ns:users').get_limit_per_second(),
+            200)
+        self.assertEqual(sorted(os.listdir(self.directory)),
+                         ['ns_users.read', 'ns_users.write'])
+        limiter_map = RateLimiterMap()
+        limiter_map.update('users', 100, 200, 1)
+        self.assertIsInstance(limiter_map.get_read_limiter('users'),
+                              FairRateLimiter)
+
+    @unittest.skipUnless(hasattr(os, 'fork'), 'os.fork is not available')
+    def testProcessesShareBudget(self):
+        processes = 3
+        rate = 100
+        seconds = 1.0
+        limiter = SharedRateLimiter(self.file_name, rate)
+        start = time()
+        pids = list()
+        for i in range(processes):
+            pid = os.fork()
+            if pid == 0:
+                # child process, consumes units until the end of the test and
+                # returns the number of units it consumed
+                limiter.after_fork()
+                consumed = 0
+                while time() - start < seconds:
+                    limiter.consume_units(1)
+                    consumed += 1
+                os._exit(consumed)
+            pids.append(pid)
+        total = 0
+        for pid in pids:
+            _, status = os.waitpid(pid, 0)
+            total += os.WEXITSTATUS(status)
+        # the processes together stay close to the limit of a single limiter
+        self.assertGreater(total, rate * seconds * 0.5)
+        self.assertLess(total, rate * seconds * 1.5)
+
+
+class TestRateLimiterDirectory(unittest.TestCase):
+
+    def testConfig(self):
+        config = NoSQLHandleConfig('http://localhost:8080')
+        config.set_authorization_provider(StoreAccessTokenProvider())
+        self.assertIsNone(config.get_rate_limiter_directory())
+        directory = mkdtemp()
+        try:
+            config.set_rate_limiter_directory(directory)
+            self.assertEqual(config.get_rate_limiter_directory(), directory)
+            self.assertEqual(
+                config.clone().get_rate_limiter_directory(), directory)
+        finally:
+            rmtree(directory)
+        self.assertRaises(IllegalArgumentException,
+                          config.set_rate_limiter_directory, directory)
+        self.assertRaises(IllegalArgumentException,
+                          config.set_rate_limiter_directory, 1)
+        config.set_rate_limiter_directory(None)
+        self.assertIsNone(config.get_rate_limiter_directory())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -192,6 +192,81 @@ class TestSignatureProvider(unittest.TestCase):
                 auth_string,
                 self.token_provider.get_authorization_string(self.request))
 
+        def testAccessTokenProviderSingleFlightSigning(self):
+            self.token_provider = SignatureProvider(
+                config_file=fake_credentials_file)
+            self.token_provider.set_service_url(self.handle_config)
+            latch = TestSignatureProvider.CountDownLatch(1)
+            auth_strings = list()
+
+            def get_auth_string():
+                latch.wait()
+                auth_strings.append(
+                    self.token_provider.get_authorization_string(self.request))
+
+            threads = [Thread(target=get_auth_string) for _ in range(8)]
+            for t in threads:
+                t.start()
+            latch.count_down()
+            for t in threads:
+                t.join()
+            self.assertEqual(len(set(auth_strings)), 1)
+            stats = self.token_provider.get_signing_stats()
+            # Only one thread signs, the others use its signature.
+            self.assertEqual(stats['count'], 1)
+            self.assertEqual(stats['contentCount'], 0)
+            self.assertLessEqual(stats['waits'], 7)
+            self.assertGreater(stats['totalMs'], 0)
+            # Content signatures are not cached.
+            for _ in range(2):
+                headers = dict()
+                self.token_provider.set_required_headers(
+                    self.request, auth_strings[0], headers, b'content')
+                self.assertIsNotNone(headers['x-content-sha256'])
+            stats = self.token_provider.get_signing_stats()
+            self.assertEqual(stats['count'], 2)
+            self.assertEqual(stats['contentCount'], 2)
+            self.assertEqual(
+                self.token_provider.get_signing_stats()['count'], 0)
+
+        def testAccessTokenProviderReuseSignature(self):
+            self.token_provider = SignatureProvider(
+                config_file=fake_credentials_file)
+            self.token_provider.set_service_url(self.handle_config)
+            auth_string = self.token_provider.get_authorization_string(
+                self.request)
+            headers = dict()
+            self.token_provider.set_required_headers(
+                self.request, auth_string, headers)
+            # The headers are those of the signature of the authorization
+            # string, no other signature is created.
+            self.assertEqual(headers['Authorization'], auth_string)
+            self.assertIsNotNone(headers['date'])
+            self.assertEqual(
+                self.token_provider.get_signing_stats()['count'], 1)
+
+        def testAccessTokenProviderRefresh(self):
+            self.token_provider = SignatureProvider(
+                config_file=fake_credentials_file, duration_seconds=2,
+                refresh_ahead=1)
+            self.token_provider.set_service_url(self.handle_config)
+            self.token_provider.get_authorization_string(self.request)
+            refresh_id = self.token_provider._refresh_id
+            # A refresh replaced by a newer one does not sign.
+            self.token_provider.get_signature_details_internal()
+            self.assertEqual(
+                self.token_provider.get_signing_stats()['count'], 2)
+            self.token_provider._refresh_task(refresh_id)
+            self.assertEqual(
+                self.token_provider.get_signing_stats()['count'], 0)
+            # Nor does a refresh of a closed provider, and none is scheduled.
+            self.token_provider.close()
+            self.token_provider._refresh_task(refresh_id + 1)
+            sleep(1.5)
+            self.assertEqual(
+                self.token_provider.get_signing_stats()['count'], 0)
+            self.assertIsNone(self.token_provider._timer)
+
         def testAccessTokenProviderGetRegion(self):
             # no region
             config = oci.config.from_file(file_location=fake_credentials_file)
@@ -0,0 +1,83 @@
+#
+# Copyright (c) 2018, 2026 Oracle and/or its affiliates. All rights reserved.
+#
+# Licensed under the Universal Permissive License v 1.0 as shown at
+#  https://oss.oracle.com/licenses/upl/
+#
+
+import unittest
+from threading import Barrier, Thread
+
+from borneo import (
+    GetRequest, NoSQLHandleConfig, PutRequest, QueryRequest, StatsProfile)
+from borneo.stats import StatsControl
+
+
+class TestStatsShards(unittest.TestCase):
+
+    def setUp(self):
+        self.stats = list()
+        config = NoSQLHandleConfig('http://localhost:8080').set_stats_profile(
+            StatsProfile.ALL).set_stats_handler(self.stats.append)
+        self.stats_control = StatsControl(config, None, False)
+
+    def tearDown(self):
+        self.stats_control.shutdown()
+
+    def testMergeThreads(self):
+        threads = 8
+        count = 500
+        barrier = Barrier(threads)
+
+        def observe(index):
+            barrier.wait()
+            get = GetRequest().set_table_name('users')
+            put = PutRequest().set_table_name('users')
+            query = QueryRequest().set_statement('SELECT * FROM users')
+            for i in range(count):
+                self.stats_control.observe(get, 10, 100, index + i / 1000)
+                self.stats_control.observe(put, 200, 20, 1)
+                self.stats_control.observe_query(query)
+                self.stats_control.observe(query, 30, 300, 2)
+            self.stats_control.observe_error(put)
+
+        workers = [Thread(target=observe, args=(i,)) for i in range(threads)]
+        for t in workers:
+            t.start()
+        for t in workers:
+            t.join()
+        stats = self.stats_control._stats
+        self.assertEqual(len(stats._shards), threads)
+        stats.log_client_stats()
+        # the shards of the threads that ended are dropped
+        self.assertEqual(len(stats._shards), 0)
+
+        requests = {r['name']: r for r in self.stats[-1]['requests']}
+        get = requests['Get']
+        self.assertEqual(get['httpRequestCount'], threads * count)
+        self.assertEqual(get['errors'], 0)
+        latency = get['httpRequestLatencyMs']
+        self.assertEqual(latency['min'], 0)
+        self.assertEqual(latency['max'], threads - 1 + (count - 1) / 1000)
+        self.assertAlmostEqual(latency['50th'], 3.499, delta=0.03)
+        self.assertEqual(get['requestSize']['avg'], 10)
+        put = requests['Put']
+        self.assertEqual(put['httpRequestCount'], threads * (count + 1))
+        self.assertEqual(put['errors'], threads)
+        queries = self.stats[-1]['queries']
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(queries[0]['count'], threads * count)
+        self.assertEqual(queries[0]['httpRequestCount'], threads * count)
+
+        # the stats are reset after they are logged
+        self.stats_control.observe(GetRequest(), 10, 100, 5)
+        stats.log_client_stats()
+        requests = self.stats[-1]['requests']
+        self.assertEqual(len(requests), 1)
+        self.assertEqual(requests[0]['httpRequestCount'], 1)
+        self.assertNotIn('queries', self.stats[-1])
+        self.assertEqual(len(stats._shards), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+#
+# Copyright (c) 2018, 2026 Oracle and/or its affiliates. All rights reserved.
+#
+# Licensed under the Universal Permissive License v 1.0 as shown at
+#  https://oss.oracle.com/licenses/upl/
+#
+
+import unittest
+from threading import Thread
+
+from borneo import (
+    GetRequest, GetResult, NoSQLHandleConfig, PutRequest, PutResult,
+    QueryRequest, StatsProfile)
+from borneo.stats import ExtraQueryStats, StatsControl, TopK
+
+
+class Counter(object):
+
+    def __init__(self):
+        self.value = 0
+
+    def merge(self, other):
+        self.value += other.value
+
+
+class TestTopK(unittest.TestCase):
+
+    def testHeavyHitters(self):
+        top_k = TopK(4, Counter)
+        for i in range(1000):
+            top_k.get('hot').value += 1
+            if i % 2 == 0:
+                top_k.get('warm').value += 1
+            # one observation of many distinct keys
+            top_k.get('cold' + str(i)).value += 1
+        self.assertEqual(len(top_k), 4)
+        items = top_k.items()
+        self.assertEqual([k for k, _, _ in items[:2]], ['hot', 'warm'])
+        # the stats of the keys seen since the start are exact
+        self.assertEqual(items[0][1], 0)
+        self.assertEqual(items[0][2].value, 1000)
+        self.assertEqual(items[1][2].value, 500)
+
+    def testMerge(self):
+        top_k = TopK(3, Counter)
+        other = TopK(3, Counter)
+        for key, count in (('a', 10), ('b', 5), ('c', 1)):
+            for i in range(count):
+                top_k.get(key).value += 1
+        for key, count in (('a', 2), ('d', 8), ('e', 4)):
+            for i in range(count):
+                other.get(key).value += 1
+        top_k.merge(other)
+        items = top_k.items()
+        self.assertEqual([k for k, _, _ in items], ['a', 'd', 'b'])
+        self.assertEqual(items[0][2].value, 12)
+        # the counts of the keys missing from the other instance are bounded
+        # by its minimum count
+        self.assertEqual(items[1][1], 1)
+        self.assertEqual(items[2][1], 2)
+
+        top_k.clear()
+        self.assertEqual(len(top_k), 0)
+
+
+class TestStatsTopK(unittest.TestCase):
+
+    def setUp(self):
+        self.stats = list()
+        config = NoSQLHandleConfig('http://localhost:8080').set_stats_profile(
+            StatsProfile.ALL).set_stats_handler(self.stats.append)
+        self.stats_control = StatsControl(config, None, False)
+
+    def tearDown(self):
+        self.stats_control.shutdown()
+
+    def testQueryShape(self):
+        shape = ExtraQueryStats.get_query_shape
+        self.assertEqual(shape('SELECT * FROM users'), 'SELECT * FROM users')
+        self.assertEqual(
+            shape("SELECT  name FROM users2\n " +
+                  "WHERE id = 10 AND name = 'a''b'"),
+            'SELECT name FROM users2 WHERE id = ? AND name = ?')
+        self.assertEqual(
+            shape('SELECT * FROM users u WHERE u.id IN (1, 2,3) AND ' +
+                  'u.score > 1.5e3 AND u.city = "Paris" AND u.age = $age'),
+            'SELECT * FROM users u WHERE u.id IN (?) AND u.score > ? AND ' +
+            'u.city = ? AND u.age = $age')
+
+    def testTables(self):
+        threads = 4
+        count = 50
+
+        def observe():
+            get = GetRequest().set_table_name('users')
+            put = PutRequest().set_table_name('orders')
+            get_result = GetResult().set_read_units(2)
+            put_result = PutResult().set_write_kb(3)
+            for i in range(count):
+                self.stats_control.observe(get, 10, 100, 5, get_result)
+                self.stats_control.observe(put, 100, 10, 10, put_result)
+                self.stats_control.observe(put, 100, 10, 20, put_result)
+            self.stats_control.observe_error(get)
+
+        workers = [Thread(target=observe) for _ in range(threads)]
+        for t in workers:
+            t.start()
+        for t in workers:
+            t.join()
+        self.stats_control._stats.log_client_stats()
+        tables = self.stats[-1]['tables']
+        self.assertEqual([t['table'] for t in tables], ['orders', 'users'])
+        orders = tables[0]
+        self.assertEqual(orders['httpRequestCount'], threads * count * 2)
+        self.assertEqual(orders['writeUnits'], threads * count * 6)
+        self.assertEqual(orders['readUnits'], 0)
+        self.assertEqual(orders['httpRequestLatencyMs']['max'], 20)
+        self.assertNotIn('countError', orders)
+        users = tables[1]
+        self.assertEqual(users['httpRequestCount'], threads * (count + 1))
+        self.assertEqual(users['errors'], threads)
+        self.assertEqual(users['readUnits'], threads * count * 2)
+        requests = {r['name']: r for r in self.stats[-1]['requests']}
+        self.assertEqual(requests['Put']['writeUnits'], threads * count * 6)
+
+    def testQueriesBounded(self):
+        for i in range(ExtraQueryStats._CAPACITY * 4):
+            # the literals do not create new entries
+            query = QueryRequest().set_statement(
+                'SELECT * FROM users WHERE id = ' + str(i))
+            self.stats_control.observe_query(query)
+            self.stats_control.observe(query, 10, 100, 5)
+            query = QueryRequest().set_statement(
+                'SELECT * FROM users' + str(i))
+            self.stats_control.observe_query(query)
+        self.stats_control._stats.log_client_stats()
+        queries = self.stats[-1]['queries']
+        self.assertEqual(len(queries), ExtraQueryStats._CAPACITY)
+        self.assertEqual(queries[0]['query'],
+                         'SELECT * FROM users WHERE id = ?')
+        self.assertEqual(queries[0]['count'], ExtraQueryStats._CAPACITY * 4)
+        self.assertEqual(queries[0]['httpRequestCount'],
+                         ExtraQueryStats._CAPACITY * 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,10 +8,14 @@
 from collections import OrderedDict
 from datetime import datetime
 from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, HTTPServer
 from logging import FileHandler, Logger
 from os import getcwd, getenv, mkdir, path, remove
 from re import match
+from socketserver import ThreadingMixIn
 from struct import pack
+from threading import Lock, Thread
+from time import sleep
 
 from requests import codes, delete, post
 from rsa import newkeys
@@ -19,8 +23,13 @@ from rsa import newkeys
 from borneo import (
     AuthorizationProvider, DefaultRetryHandler, IllegalArgumentException,
     IllegalStateException, NoSQLHandle, NoSQLHandleConfig, Regions)
+from borneo.common import ByteOutputStream
 from borneo.iam import SignatureProvider
 from borneo.kv import StoreAccessTokenProvider
+from borneo.nson import NsonSerializer, Proto
+from borneo.nson_protocol import (
+    CONSUMED, ERROR_CODE, EXCEPTION, LIMITS, READ_UNITS, RETRY_HINT,
+    STORAGE_GB, TABLE_NAME, TABLE_STATE, WRITE_UNITS)
 from parameters import (
     ca_certs, consistency, endpoint, iam_principal, is_cloudsim, is_dev_pod,
     is_minicloud, is_onprem, is_prod_pod, logger_level, password,
@@ -341,3 +350,135 @@ class TestSignatureProvider(AuthorizationProvider):
             compartment = self._tenant_id
         headers['x-nosql-compartment-id'] = compartment
         headers['Authorization'] = auth_string
+
+
+class ProxyServer(ThreadingMixIn, HTTPServer):
+    """
+    Stand-in for the proxy, for the tests that do not need a server. Each
+    request is answered in its own thread, by default with an empty result.
+    The answers are set with the attributes of the server:
+
+    delay: the delay of the answers in seconds.
+    delays: the delays of the next answers, used before delay.
+    errors: the errors of the next answers, each an (error code, message,
+        retry hint in ms) tuple. No retry hint is sent if it is 0.
+    down: whether the requests are answered with a 503 status, as a proxy
+        whose server is down.
+    tables: the limits of the tables, in units, keyed by the table names. A
+        result has the name and the limits of the table named in the request,
+        so it can serve as the result of a get table request.
+    read_units, write_units: the units consumed by each request.
+
+    The server counts the requests in count and keeps their headers in
+    request_headers. Subclasses can override next_error and write_result to
+    answer with other errors and results.
+    """
+
+    daemon_threads = True
+
+    def __init__(self):
+        HTTPServer.__init__(self, ('localhost', 0), ProxyHandler)
+        self.lock = Lock()
+        self.reset()
+
+    def reset(self):
+        self.delay = 0
+        self.delays = list()
+        self.errors = list()
+        self.down = False
+        self.tables = dict()
+        self.read_units = 0
+        self.write_units = 0
+        self.count = 0
+        self.request_headers = list()
+
+    def start(self):
+        thread = Thread(target=self.serve_forever)
+        thread.daemon = True
+        thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def get_endpoint(self):
+        return 'http://localhost:' + str(self.server_address[1])
+
+    def answer(self, headers, content):
+        # Returns the status and the content of the answer to a request.
+        with self.lock:
+            self.count += 1
+            self.request_headers.append(headers)
+            delay = self.delays.pop(0) if self.delays else self.delay
+            error = self.next_error(content)
+            down = self.down
+        if delay > 0:
+            sleep(delay)
+        if down:
+            return codes.service_unavailable, b'Service unavailable'
+        ns = NsonSerializer(ByteOutputStream(bytearray()))
+        ns.start_map()
+        if error is None:
+            Proto.write_int_map_field(ns, ERROR_CODE, 0)
+            self.write_result(ns, content)
+        else:
+            error_code, message, retry_hint_ms = error
+            Proto.write_int_map_field(ns, ERROR_CODE, error_code)
+            Proto.write_string_map_field(ns, EXCEPTION, message)
+            if retry_hint_ms > 0:
+                Proto.write_int_map_field(ns, RETRY_HINT, retry_hint_ms)
+        ns.end_map()
+        return codes.ok, ns.get_stream().get_content()
+
+    def next_error(self, content):
+        # Returns the error of the answer to a request, or None, called with
+        # the lock held.
+        return self.errors.pop(0) if self.errors else None
+
+    def write_result(self, ns, content):
+        # Writes the fields of a successful result, content is the request.
+        for table_name, units in self.tables.items():
+            if table_name.encode() in content:
+                Proto.write_string_map_field(ns, TABLE_NAME, table_name)
+                Proto.write_int_map_field(ns, TABLE_STATE, 0)
+                Proto.start_map(ns, LIMITS)
+                Proto.write_int_map_field(ns, READ_UNITS, units)
+                Proto.write_int_map_field(ns, WRITE_UNITS, units)
+                Proto.write_int_map_field(ns, STORAGE_GB, 1)
+                Proto.end_map(ns, LIMITS)
+                break
+        if self.read_units > 0 or self.write_units > 0:
+            Proto.start_map(ns, CONSUMED)
+            Proto.write_int_map_field(ns, READ_UNITS, self.read_units)
+            Proto.write_int_map_field(ns, WRITE_UNITS, self.write_units)
+            Proto.end_map(ns, CONSUMED)
+
+
+class ProxyHandler(BaseHTTPRequestHandler):
+    # The handler of the requests to a ProxyServer.
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_HEAD(self):
+        self.send_response(codes.service_unavailable if self.server.down
+                           else codes.ok)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_GET(self):
+        self._send(*self.server.answer(self.headers, b''))
+
+    def do_POST(self):
+        self._send(*self.server.answer(
+            self.headers, self.rfile.read(int(self.headers['Content-Length']))))
+
+    def _send(self, status, content):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_request(self, code='-', size='-'):
+        pass
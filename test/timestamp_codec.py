@@ -0,0 +1,93 @@
+#
+# Copyright (c) 2018, 2026 Oracle and/or its affiliates. All rights reserved.
+#
+# Licensed under the Universal Permissive License v 1.0 as shown at
+#  https://oss.oracle.com/licenses/upl/
+#
+
+import unittest
+from datetime import datetime, timedelta, timezone
+from random import Random
+
+from dateutil import parser, tz
+
+from borneo.common import ByteInputStream, ByteOutputStream
+from borneo.serdeutil import SerdeUtil
+
+
+class TestTimestampCodec(unittest.TestCase):
+
+    def setUp(self):
+        self.random = Random(20201)
+
+    def testRoundTrip(self):
+        start = datetime(1, 1, 1)
+        span = (datetime(9999, 12, 31, 23, 59, 59) - start).total_seconds()
+        for _ in range(5000):
+            value = start + timedelta(
+                seconds=self.random.randint(0, int(span)),
+                microseconds=self.random.choice(
+                    [0, self.random.randint(0, 999999)]))
+            iso = SerdeUtil.datetime_to_iso(value)
+            self.assertEqual(SerdeUtil.iso_to_datetime(iso),
+                             value.replace(tzinfo=tz.UTC))
+            self.assertEqual(iso, self._old_datetime_to_iso(value))
+            self.assertEqual(SerdeUtil.iso_to_datetime(iso), parser.parse(iso))
+
+    def testFractionOfSecond(self):
+        value = '2020-01-02T03:04:05'
+        for digits in range(1, 10):
+            frac = ''.join(str(self.random.randint(0, 9))
+                           for _ in range(digits))
+            iso = value + '.' + frac + 'Z'
+            self.assertEqual(SerdeUtil.iso_to_datetime(iso), parser.parse(iso))
+
+    def testFallback(self):
+        for iso in ['2020-01-02', '2020-01-02T03:04:05', '2020-1-2T3:04:05Z',
+                    '2020-01-02T03:04:05+01:00', '2020-01-02 03:04:05Z',
+                    '2020-01-02T03:04:05.1234567890Z', '2020-01-02T03:04Z']:
+            self.assertEqual(SerdeUtil.iso_to_datetime(iso), parser.parse(iso))
+        for iso in ['2020-13-02T03:04:05Z', '2020-02-30T03:04:05Z',
+                    '2020-01-02T03:04:05.Z', 'foo']:
+            self.assertRaises(ValueError, SerdeUtil.iso_to_datetime, iso)
+
+    def testReadWriteDatetime(self):
+        value = datetime(2021, 5, 6, 7, 8, 9, 120000,
+                         timezone(timedelta(hours=2)))
+        bos = ByteOutputStream(bytearray())
+        SerdeUtil.write_datetime(bos, value)
+        bis = ByteInputStream(bos.get_content())
+        result = SerdeUtil.read_datetime(bis)
+        self.assertEqual(result, value)
+        self.assertEqual(result.hour, 5)
+
+    def testIsoTimeToMs(self):
+        self.assertEqual(SerdeUtil.iso_time_to_ms('1970-01-01T00:00:00Z'), 0)
+        self.assertEqual(
+            SerdeUtil.iso_time_to_ms('1970-01-01T00:00:01.5Z'), 1500)
+        # strings without timezone are UTC
+        self.assertEqual(SerdeUtil.iso_time_to_ms('1970-01-02'), 86400000)
+        self.assertEqual(
+            SerdeUtil.iso_time_to_ms('1970-01-01T01:00:00+01:00'), 0)
+        self.assertEqual(
+            SerdeUtil.iso_time_to_ms('2021-05-06T07:08:09.123Z'),
+            1620284889123)
+
+    @staticmethod
+    def _old_datetime_to_iso(date):
+        # The implementation replaced by the format based datetime_to_iso.
+        val = SerdeUtil.append_with_pad(None, str(date.year), 4) + '-'
+        val = SerdeUtil.append_with_pad(val, str(date.month), 2) + '-'
+        val = SerdeUtil.append_with_pad(val, str(date.day), 2) + 'T'
+        val = SerdeUtil.append_with_pad(val, str(date.hour), 2) + ':'
+        val = SerdeUtil.append_with_pad(val, str(date.minute), 2) + ':'
+        val = SerdeUtil.append_with_pad(val, str(date.second), 2)
+        if date.microsecond > 0:
+            val += '.'
+            val = SerdeUtil.append_with_pad(
+                val, str(date.microsecond), 6).rstrip('0')
+        return val + 'Z'
+
+
+if __name__ == '__main__':
+    unittest.main()
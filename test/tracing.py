@@ -0,0 +1,125 @@
+#
+# Copyright (c) 2018, 2026 Oracle and/or its affiliates. All rights reserved.
+#
+# Licensed under the Universal Permissive License v 1.0 as shown at
+#  https://oss.oracle.com/licenses/upl/
+#
+
+import unittest
+
+from borneo import (
+    GetRequest, IllegalArgumentException, NoSQLHandle, NoSQLHandleConfig)
+from borneo.kv import StoreAccessTokenProvider
+from borneo.serdeutil import SerdeUtil
+from borneo.tracing import Tracer, otel_trace
+from testutils import ProxyServer
+
+try:
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+        InMemorySpanExporter)
+except ImportError:
+    TracerProvider = None
+
+
+@unittest.skipIf(TracerProvider is None, 'opentelemetry-sdk is not installed')
+class TestTracing(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.proxy = ProxyServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.proxy.stop()
+
+    def setUp(self):
+        self.proxy.reset()
+        self.exporter = InMemorySpanExporter()
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(self.exporter))
+        config = NoSQLHandleConfig(self.proxy.get_endpoint())
+        config.set_authorization_provider(
+            StoreAccessTokenProvider()).set_tracer_provider(provider)
+        self.handle = NoSQLHandle(config)
+
+    def tearDown(self):
+        self.handle.close()
+
+    def testRequestSpans(self):
+        self.handle.get(self._get_request())
+        spans = {s.name: s for s in self.exporter.get_finished_spans()}
+        self.assertEqual(set(spans), {'Get users', 'nosql.attempt',
+                                      'nosql.sign'})
+        request = spans['Get users']
+        self.assertIsNone(request.parent)
+        self.assertEqual(request.kind, otel_trace.SpanKind.CLIENT)
+        self.assertEqual(request.attributes['db.system.name'],
+                         Tracer.DB_SYSTEM)
+        self.assertEqual(request.attributes['db.operation.name'], 'Get')
+        self.assertEqual(request.attributes['db.collection.name'], 'users')
+        attempt = spans['nosql.attempt']
+        self.assertEqual(attempt.parent.span_id, request.context.span_id)
+        self.assertEqual(attempt.attributes['nosql.attempt'], 1)
+        self.assertEqual(attempt.attributes['http.response.status_code'], 200)
+        self.assertTrue(attempt.status.is_ok)
+        self.assertEqual(spans['nosql.sign'].parent.span_id,
+                         attempt.context.span_id)
+        # the context of the attempt is propagated to the proxy
+        traceparents = self._get_traceparents()
+        self.assertEqual(len(traceparents), 1)
+        self.assertTrue(traceparents[0].startswith(
+            '00-{:032x}-{:016x}-'.format(attempt.context.trace_id,
+                                         attempt.context.span_id)))
+
+    def testRetrySpans(self):
+        self.proxy.errors = [
+            (SerdeUtil.SERVER_RETRY_ERROR.SECURITY_INFO_UNAVAILABLE,
+             'not ready', 0)]
+        self.handle.get(self._get_request())
+        spans = self.exporter.get_finished_spans()
+        request = [s for s in spans if s.name == 'Get users'][0]
+        attempts = sorted([s for s in spans if s.name == 'nosql.attempt'],
+                          key=lambda s: s.attributes['nosql.attempt'])
+        self.assertEqual(len(attempts), 2)
+        for attempt in attempts:
+            self.assertEqual(attempt.parent.span_id, request.context.span_id)
+        self.assertFalse(attempts[0].status.is_ok)
+        self.assertEqual(attempts[0].attributes['error.type'],
+                         'SecurityInfoNotReadyException')
+        self.assertTrue(attempts[1].status.is_ok)
+        # the retry delay is not part of the failed attempt
+        self.assertLessEqual(attempts[0].end_time, attempts[1].start_time)
+        self.assertEqual(len(set(self._get_traceparents())), 2)
+
+    def testTracingDisabled(self):
+        config = NoSQLHandleConfig('http://localhost:8080')
+        self.assertIsNone(config.get_tracer_provider())
+        self.assertRaises(IllegalArgumentException,
+                          config.set_tracer_provider, 'provider')
+        handle = NoSQLHandle(config.set_authorization_provider(
+            StoreAccessTokenProvider()))
+        try:
+            self.assertIsNone(handle.get_client().get_tracer())
+        finally:
+            handle.close()
+
+    def _get_traceparents(self):
+        return [headers.get('traceparent')
+                for headers in self.proxy.request_headers]
+
+    @staticmethod
+    def _get_request():
+        return GetRequest().set_table_name('users').set_key({'id': 1})
+
+
+class TestTracingRequiresPackage(unittest.TestCase):
+
+    @unittest.skipUnless(otel_trace is None, 'opentelemetry-api is installed')
+    def testImportError(self):
+        self.assertRaises(ImportError, Tracer, object())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+#
+# Copyright (c) 2018, 2026 Oracle and/or its affiliates. All rights reserved.
+#
+# Licensed under the Universal Permissive License v 1.0 as shown at
+#  https://oss.oracle.com/licenses/upl/
+#
+
+import unittest
+from threading import Thread
+from time import sleep
+
+from borneo import (
+    GetRequest, IllegalArgumentException, NoSQLHandle, NoSQLHandleConfig,
+    Priority, PutRequest, TableNotFoundException)
+from borneo.estimator import UnitCostEstimator
+from borneo.serdeutil import SerdeUtil
+from testutils import InsecureAuthorizationProvider, ProxyServer
+
+
+class TestUnitCostEstimator(unittest.TestCase):
+
+    def testEstimate(self):
+        estimator = UnitCostEstimator()
+        get = GetRequest().set_table_name('Users')
+        shape = UnitCostEstimator.get_shape(get, 100)
+        self.assertEqual(shape, ('users', 'Get', 7))
+        # the requests of another kind, table or size have their own shape
+        self.assertNotEqual(UnitCostEstimator.get_shape(get, 200), shape)
+        self.assertNotEqual(UnitCostEstimator.get_shape(
+            PutRequest().set_table_name('users'), 100), shape)
+        self.assertEqual(estimator.estimate(shape), (0, 0))
+        estimator.observe(shape, 10, 0)
+        self.assertEqual(estimator.estimate(shape), (10, 0))
+        estimator.observe(shape, 5, 0)
+        self.assertEqual(estimator.estimate(shape), (9, 0))
+        stats = estimator.get_stats()
+        self.assertEqual(stats['shapes'], 1)
+        self.assertEqual(stats['observeCount'], 1)
+        self.assertEqual(stats['readErrorAvg'], 5)
+        self.assertEqual(stats['writeErrorAvg'], 0)
+
+    def testMaxShapes(self):
+        estimator = UnitCostEstimator()
+        for i in range(UnitCostEstimator.MAX_SHAPES):
+            estimator.observe(('users', 'Get', i), 1, 0)
+        # the shape used last is kept
+        estimator.observe(('users', 'Get', 0), 1, 0)
+        estimator.observe(('users', 'Put', 0), 0, 1)
+        self.assertEqual(estimator.get_stats()['shapes'],
+                         UnitCostEstimator.MAX_SHAPES)
+        self.assertEqual(estimator.estimate(('users', 'Get', 0)), (1, 0))
+        self.assertEqual(estimator.estimate(('users', 'Get', 1)), (0, 0))
+
+
+class TestRateLimiterPrecharge(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.proxy = ProxyServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.proxy.stop()
+
+    def setUp(self):
+        self.proxy.reset()
+        self.proxy.tables = {'users': 1000}
+        self.proxy.read_units = 5
+        self.config = NoSQLHandleConfig(self.proxy.get_endpoint())
+        self.config.set_authorization_provider(
+            InsecureAuthorizationProvider('TestTenant'))
+        self.config.set_rate_limiting_enabled(True)
+        self.config.set_rate_limiting_tables(['users'])
+        self.request = GetRequest().set_table_name('users').set_key({'id': 1})
+
+    def testPrecharge(self):
+        handle = NoSQLHandle(self.config)
+        try:
+            lane = handle.get_client()._rate_limiter_map.get_read_limiter(
+                'users').get_lane(Priority.INTERACTIVE)
+            # the units of the first request are consumed once it completes
+            handle.get(self.request)
+            self.assertEqual(lane._units, 5)
+            # the estimate is consumed before the request is sent
+            self.proxy.delay = 0.3
+            thread = Thread(target=handle.get, args=[self.request])
+            thread.start()
+            sleep(0.15)
+            self.assertEqual(lane._units, 10)
+            thread.join()
+            self.assertEqual(lane._units, 10)
+            # the excess of the estimate is returned
+            self.proxy.delay = 0
+            self.proxy.read_units = 2
+            result = handle.get(self.request)
+            self.assertEqual(result.get_read_units(), 2)
+            self.assertEqual(lane._units, 12)
+            # the estimate of a failed request is returned
+            self.proxy.errors = [
+                (SerdeUtil.USER_ERROR.TABLE_NOT_FOUND, 'users', 0)]
+            self.assertRaises(TableNotFoundException, handle.get, self.request)
+            self.assertEqual(lane._units, 12)
+            stats = handle.get_client().get_stats_control().get_stats_sources()
+            stats = stats['unitEstimator']()
+            self.assertEqual(stats['observeCount'], 2)
+            self.assertEqual(stats['readErrorAvg'], 1.5)
+        finally:
+            handle.close()
+
+    def testDisabled(self):
+        handle = NoSQLHandle(self.config.set_rate_limiting_precharge(False))
+        try:
+            self.assertIsNone(handle.get_client().get_unit_estimator())
+            lane = handle.get_client()._rate_limiter_map.get_read_limiter(
+                'users').get_lane(Priority.INTERACTIVE)
+            for i in range(3):
+                handle.get(self.request)
+            self.assertEqual(lane._units, 15)
+        finally:
+            handle.close()
+
+    def testConfig(self):
+        self.assertTrue(self.config.get_rate_limiting_precharge())
+        self.config.set_rate_limiting_precharge(False)
+        self.assertFalse(self.config.get_rate_limiting_precharge())
+        self.assertRaises(IllegalArgumentException,
+                          self.config.set_rate_limiting_precharge, 'no')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+#
+# Copyright (c) 2018, 2026 Oracle and/or its affiliates. All rights reserved.
+#
+# Licensed under the Universal Permissive License v 1.0 as shown at
+#  https://oss.oracle.com/licenses/upl/
+#
+
+import unittest
+from collections import OrderedDict
+from datetime import datetime
+from decimal import Decimal
+from enum import IntEnum
+
+from dateutil import tz
+
+from borneo import IllegalStateException
+from borneo.common import (
+    ByteInputStream, ByteOutputStream, CheckValue, Empty, JsonNone)
+from borneo.nson import Proto
+from borneo.serde import BinaryProtocol
+from borneo.serdeutil import SerdeUtil
+
+
+class Color(IntEnum):
+    RED = 1
+
+
+class Row(dict):
+    pass
+
+
+class Values(list):
+    pass
+
+
+class TestValueType(unittest.TestCase):
+
+    def testGetType(self):
+        values = [0, 1, -1, 2 ** 31 - 1, 2 ** 31, -2 ** 31, -2 ** 31 - 1,
+                  2 ** 63 - 1, 2 ** 63, -2 ** 63, -2 ** 63 - 1, 2 ** 100,
+                  True, False, Color.RED, 1.5, 'a', None, Empty(), JsonNone(),
+                  [], Values(), {}, Row(), OrderedDict(), bytearray(b'a'),
+                  Decimal('1.5'), datetime(2020, 1, 2)]
+        # twice, the first time the types of the subclasses are not cached
+        for _ in range(2):
+            for value in values:
+                self.assertEqual(SerdeUtil.get_type(value),
+                                 self._expected_type(value), repr(value))
+        self.assertRaises(IllegalStateException, SerdeUtil.get_type, object())
+        self.assertRaises(IllegalStateException, SerdeUtil.get_type, b'a')
+
+    def testNsonRoundTrip(self):
+        row = OrderedDict()
+        for i in range(100):
+            row['int' + str(i)] = i * 1000003
+            row['long' + str(i)] = i * 2 ** 40
+            row['number' + str(i)] = Decimal(i) / 7
+            row['string' + str(i)] = 'string' + str(i)
+        row['big'] = 2 ** 100
+        row['enum'] = Color.RED
+        row['bool'] = True
+        row['double'] = 1.5
+        row['null'] = None
+        row['time'] = datetime(2020, 1, 2, 3, 4, 5, 600000, tz.UTC)
+        row['binary'] = bytearray(b'abc')
+        row['array'] = Values([1, 'a', [2 ** 33, {'a': Row(b=1)}]])
+        value = Proto.nson_to_value(
+            ByteInputStream(Proto.value_to_nson(row)))
+        self.assertEqual(value, row)
+        self.assertEqual(value['big'], Decimal(2 ** 100))
+
+    def testBinaryProtocolWriteFieldValue(self):
+        for value in [1, 2 ** 40, 2 ** 70, 'a', [1, {'a': 2}], Row(a=1.5)]:
+            bos = ByteOutputStream(bytearray())
+            BinaryProtocol.write_field_value(bos, value)
+            self.assertEqual(bos.get_content()[0], SerdeUtil.get_type(value))
+        self.assertRaises(IllegalStateException,
+                          BinaryProtocol.write_field_value,
+                          ByteOutputStream(bytearray()), Empty())
+
+    @staticmethod
+    def _expected_type(value):
+        # The isinstance based implementation replaced by the type cache, ints
+        # out of the range of a long are numbers.
+        if isinstance(value, list):
+            return SerdeUtil.FIELD_VALUE_TYPE.ARRAY
+        elif isinstance(value, bytearray):
+            return SerdeUtil.FIELD_VALUE_TYPE.BINARY
+        elif isinstance(value, bool):
+            return SerdeUtil.FIELD_VALUE_TYPE.BOOLEAN
+        elif isinstance(value, float):
+            return SerdeUtil.FIELD_VALUE_TYPE.DOUBLE
+        elif CheckValue.is_int_value(value):
+            return SerdeUtil.FIELD_VALUE_TYPE.INTEGER
+        elif CheckValue.is_overlong(value):
+            return SerdeUtil.FIELD_VALUE_TYPE.NUMBER
+        elif CheckValue.is_long_value(value):
+            return SerdeUtil.FIELD_VALUE_TYPE.LONG
+        elif isinstance(value, dict):
+            return SerdeUtil.FIELD_VALUE_TYPE.MAP
+        elif CheckValue.is_str(value):
+            return SerdeUtil.FIELD_VALUE_TYPE.STRING
+        elif isinstance(value, datetime):
+            return SerdeUtil.FIELD_VALUE_TYPE.TIMESTAMP
+        elif isinstance(value, Decimal):
+            return SerdeUtil.FIELD_VALUE_TYPE.NUMBER
+        elif value is None:
+            return SerdeUtil.FIELD_VALUE_TYPE.NULL
+        elif isinstance(value, Empty):
+            return SerdeUtil.FIELD_VALUE_TYPE.EMPTY
+        elif isinstance(value, JsonNone):
+            return SerdeUtil.FIELD_VALUE_TYPE.JSON_NULL
+
+
+if __name__ == '__main__':
+    unittest.main()